@@ -1,7 +1,9 @@
 """API Dependencies"""
 
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal, SessionLocal
 
 def get_db_session() -> Session:
     """데이터베이스 세션 의존성"""
@@ -10,3 +12,9 @@ def get_db_session() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db_session() -> AsyncIterator[AsyncSession]:
+    """비동기 데이터베이스 세션 의존성 (쿼리 중 이벤트 루프를 막지 않음)"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,19 +2,33 @@
 import logging
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.curation import CurateMoviesRequest, CurateMoviesResponse, CuratedMovie
-from app.api.dependencies import get_db_session
+from app.api.dependencies import get_async_db_session
+from app.core.metrics import CURATION_SAMPLES
+from app.services.curation_pool import curation_pools
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/curate-movies", response_model=CurateMoviesResponse)
-async def curate_movies_by_ticket(request: CurateMoviesRequest, db: Session = Depends(get_db_session)):
-    """티켓에 속한 영화 중 랜덤으로 큐레이션"""
+async def curate_movies_by_ticket(request: CurateMoviesRequest, db: AsyncSession = Depends(get_async_db_session)):
+    """티켓에 속한 영화 중 랜덤으로 큐레이션 (미리 계산한 티켓 풀, 미준비 시 Postgres)"""
     try:
         logger.info(f"Curating movies for ticket {request.ticketId}, limit: {request.limit}")
-        
+
+        pooled = curation_pools.sample(request.ticketId, request.limit, request.isAdultAllowed)
+        if pooled is not None:
+            CURATION_SAMPLES.labels(backend="memory").inc()
+            if not pooled:
+                logger.warning(f"No movies found for ticket {request.ticketId}")
+                raise HTTPException(status_code=404, detail=f"No movies found for ticket {request.ticketId}")
+            return CurateMoviesResponse(
+                ticketId=request.ticketId,
+                movies=[CuratedMovie(**movie) for movie in pooled],
+            )
+
+        CURATION_SAMPLES.labels(backend="postgres").inc()
         query = text("""
             SELECT m.id as movie_id, m.title_ko, m.poster_path
             FROM ticket_group_movies tgm
@@ -28,7 +42,7 @@ async def curate_movies_by_ticket(request: CurateMoviesRequest, db: Session = De
             LIMIT :limit
         """)
         
-        result = db.execute(query, {
+        result = await db.execute(query, {
             "ticket_id": request.ticketId, 
             "limit": request.limit,
             "is_adult_allowed": request.isAdultAllowed
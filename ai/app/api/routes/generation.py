@@ -1,185 +1,369 @@
 """AI 전시회 생성 엔드포인트"""
+import asyncio
 import json
 import logging
+import time
+from typing import Optional, Tuple
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 from app.schemas.generation import GenerateRequest, GenerateResponse
 from app.models.model_loader import model_manager
-from app.api.dependencies import get_db_session
+from app.models.embedding_loader import embedding_manager
+from app.models.postprocess import clean_generated_text
+from app.api.dependencies import get_async_db_session
+from app.core.database import AsyncSessionLocal
 from app.services.retrieval_service import RetrievalService
+from app.services.comment_cache import comment_cache
 from app.core.guardrails_manager import guardrails_manager
+from app.core.inference_executor import inference_executor
+from app.core.metrics import COMMENT_CACHE_LOOKUPS, PIPELINE_IN_FLIGHT, PIPELINE_STAGE_LATENCY, theme_label
+from app.core.prompts import build_curation_system_prompt
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.post("/generate", response_model=GenerateResponse)
-async def generate_exhibition(request: GenerateRequest, db: Session = Depends(get_db_session)):
-    """AI 전시회 생성 (PGVECTOR-first + 큐레이션 코멘트)"""
+DEFAULT_DESIGN = {
+    "font": "Pretendard",
+    "colorScheme": "dark",
+    "cukeeStyle": "grid",
+    "frameStyle": "modern",
+    "background": "#1a1a1a",
+    "backgroundImage": ""
+}
+
+# 큐레이션 영화 수 (고정 영화 + 검색 영화)
+MAX_MOVIES = 5
+
+GENERATION_PARAMS = {
+    "max_new_tokens": 90, # 안전 상한 (보통 target_chars 이후 문장 끝에서 먼저 종료)
+    "target_chars": 40, # 목표 40~60자
+    "top_p": 0.9,
+    "top_k": 50
+}
+
+
+def _blocked_result(refusal_message: str) -> dict:
+    """Guardrails 차단 시 안내 응답"""
+    return {
+        "title": "안내",
+        "curatorComment": refusal_message,
+        "movies": [],
+        "design": dict(DEFAULT_DESIGN),
+        "keywords": ["안내"]
+    }
+
+
+def _observe_stage(endpoint: str, stage: str, theme: str, seconds: float):
+    PIPELINE_STAGE_LATENCY.labels(endpoint=endpoint, stage=stage, theme=theme_label(theme)).observe(seconds)
+
+
+async def _timed(stage: str, timings: dict, awaitable, theme: str, endpoint: str = "generate"):
+    """단계 실행 시간 기록 (취소/실패 포함)"""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = time.perf_counter() - started
+        _observe_stage(endpoint, stage, theme, timings[stage])
+
+
+def _consume_exception(task: asyncio.Task):
+    if not task.cancelled():
+        task.exception()
+
+
+async def _fetch_pinned_movies(movie_ids: list) -> list:
+    """고정 영화 조회 (검색과 동시에 실행되므로 별도 세션 사용)"""
+    if not movie_ids:
+        return []
+    async with AsyncSessionLocal() as session:
+        return await RetrievalService.get_movies_by_ids(session, movie_ids)
+
+
+async def _prepare_curation(
+    request: GenerateRequest, db: AsyncSession, endpoint: str = "generate"
+) -> Tuple[Optional[dict], list, list, Optional[list]]:
+    """
+    생성 전 단계 (guardrails → 고정 영화 → PGVECTOR 검색 → ChatML 메시지)
+    - 프롬프트 임베딩 1회를 guardrails 로컬 분류기와 유사 영화 검색이 공유
+      (guardrails는 임베딩을 기다리지 않고 시작, 로컬 분류기가 필요할 때만 await)
+    - 임베딩은 배처/전용 스레드에서 계산 → LLM 추론 슬롯 대기열에 줄 서지 않음
+    - guardrails / 고정 영화 조회 / 임베딩+검색을 동시에 시작, 차단 시 나머지 취소
+    → LLM 호출 전 지연 = 단계 합이 아닌 가장 느린 단계
+    Returns: (차단 응답 또는 None, 최종 영화 목록, 메시지, 프롬프트 임베딩 또는 None)
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    embedding_task = asyncio.create_task(
+        _timed("embedding", timings, embedding_manager.encode_async(request.prompt), request.theme, endpoint)
+    )
+
+    async def _embedding_or_none():
+        try:
+            return await asyncio.shield(embedding_task)
+        except Exception as e:
+            logger.error(f"Prompt embedding failed: {e}")
+            return None
+
+    async def _guard():
+        return await guardrails_manager.check_input(request.prompt, embedding=embedding_task)
+
+    async def _retrieve():
+        # 고정 영화 수를 기다리지 않도록 최대 개수로 검색 후 차감
+        return await RetrievalService.retrieve_similar_movies(
+            db, request.prompt, request.ticketId, limit=MAX_MOVIES, exclude_ids=request.pinnedMovieIds,
+            is_adult_allowed=request.isAdultAllowed, embedding=await _embedding_or_none()
+        )
+
+    guard_task = asyncio.create_task(_timed("guardrails", timings, _guard(), request.theme, endpoint))
+    pinned_task = asyncio.create_task(
+        _timed("pinned", timings, _fetch_pinned_movies(request.pinnedMovieIds), request.theme, endpoint)
+    )
+    retrieval_task = asyncio.create_task(_timed("retrieval", timings, _retrieve(), request.theme, endpoint))
+    tasks = [embedding_task, guard_task, pinned_task, retrieval_task]
+    for task in tasks:
+        # 차단/오류로 결과를 읽지 않은 단계의 예외가 "never retrieved" 경고로 남지 않도록
+        task.add_done_callback(_consume_exception)
+
     try:
-        # 0. Guardrails 검사 (주제 차단)
-        allowed, refusal_message = await guardrails_manager.check_input(request.prompt)
+        # 0. Guardrails 검사 (주제 차단) - 차단 시 검색 취소
+        allowed, refusal_message = await guard_task
         if not allowed:
             logger.info(f"Guardrails blocked request: {request.prompt}")
-            return GenerateResponse(
-                result_json={
-                    "title": "안내",
-                    "curatorComment": refusal_message,
-                    "movies": [],
-                    "design": {
-                        "font": "Pretendard",
-                        "colorScheme": "dark",
-                        "cukeeStyle": "grid",
-                        "frameStyle": "modern",
-                        "background": "#1a1a1a",
-                        "backgroundImage": ""
-                    },
-                    "keywords": ["안내"]
-                },
-                theme=request.theme
-            )
+            return _blocked_result(refusal_message), [], [], None
 
         if not model_manager.is_ready():
             raise HTTPException(status_code=503, detail="Model not ready")
-        
+
         if request.theme not in model_manager.get_loaded_themes():
             raise HTTPException(status_code=400, detail=f"Theme not found: {request.theme}")
-        
+
         logger.info(f"Generating for theme: {request.theme}")
-        
-        # 1. 고정된 영화 처리
-        pinned_movies = []
-        if request.pinnedMovieIds:
-            pinned_movies = await RetrievalService.get_movies_by_ids(db, request.pinnedMovieIds)
-            logger.info(f"Loaded {len(pinned_movies)} pinned movies")
-
-        # 2. PGVECTOR로 유사 영화 검색 (빠름, ~1초) - 티켓별 필터링
-        # 고정된 개수만큼 limit에서 차감
-        limit = max(0, 5 - len(pinned_movies))
-        
-        retrieved_movies = []
-        if limit > 0:
-            retrieved_movies = await RetrievalService.retrieve_similar_movies(
-                db, request.prompt, request.ticketId, limit=limit, exclude_ids=request.pinnedMovieIds, is_adult_allowed=request.isAdultAllowed
-            )
-        
-        logger.info(f"Retrieved {len(retrieved_movies)} movies from PGVECTOR")
-        
-        # 합치기: 고정된 영화 + 검색된 영화
-        final_movies = pinned_movies + retrieved_movies
-        
-        if not final_movies:
-            logger.warning("No movies found from PGVECTOR search")
-            raise HTTPException(status_code=404, detail="No similar movies found")
-        
+
+        # 1. 고정된 영화 처리 + 2. 유사 영화 검색 (티켓별 필터링)
+        pinned_movies, retrieved_movies = await asyncio.gather(pinned_task, retrieval_task)
+        embedding = await _embedding_or_none()
+        logger.info(f"Loaded {len(pinned_movies)} pinned movies")
+        retrieved_movies = retrieved_movies[:max(0, MAX_MOVIES - len(pinned_movies))]
         logger.info(f"Retrieved {len(retrieved_movies)} movies from PGVECTOR")
-        
-        # 2. 큐레이션 전체에 대한 코멘트 생성 (시스템 프롬프팅으로 페르소나 주입)
-        from app.core.prompts import get_persona
-        persona = get_persona(request.theme)
-        
-        # 영화 제목 추출 (환각 방지용)
-        movie_titles_str = ", ".join([f"<{m['title']}>" for m in final_movies])
-        
-        system_instruction = f"""당신은 '{request.theme}' 테마의 영화 큐레이터입니다.
-다음 페르소나 지침을 완벽하게 따라 연기하세요.
-
-[Persona]
-- 말투/스타일: {persona['style']}
-- 행동 지침: {persona['instruction']}
-
-[Instruction]
-위 [Persona]의 말투를 200% 살려서, **사용자의 요청에 대해 공감하거나 반응하는** 멘트를 작성하세요.
-**지침**:
-1. 구체적인 영화 제목을 나열하지 마세요. (예: "<영화이름> 추천해요" X)
-2. 대신 "이런 따뜻한 영화들을 모아봤어요", "완전 취향 저격일 거예요" 처럼 묶어서 추천하세요.
-3. 상투적인 인사말("안녕하세요")은 생략하고, 바로 본론이나 감탄사로 시작하세요.
-4. 한국어로 자연스럽게, 40-60자 내외로 짧고 강렬하게 작성하세요.
-
-따옴표(")는 쓰지 마세요.
-**형식 금지**: '멘트:', '답변:', '예시:', '[결과]' 같은 머리말을 절대 붙이지 마세요. 그냥 대사만 출력하세요.
-**생각 과정 생략**: `<think>` 태그나 내부 추론 과정은 절대 출력하지 마세요. 결과만 출력하세요."""
-
-        user_content = f"""[Context]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        timings["prepare"] = time.perf_counter() - started
+        _observe_stage(endpoint, "prepare", request.theme, timings["prepare"])
+        logger.info("Prepare stages: " + ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+
+    # 합치기: 고정된 영화 + 검색된 영화
+    final_movies = pinned_movies + retrieved_movies
+
+    if not final_movies:
+        logger.warning("No movies found from PGVECTOR search")
+        raise HTTPException(status_code=404, detail="No similar movies found")
+
+    # 3. 큐레이션 전체에 대한 코멘트 프롬프트 (시스템 프롬프팅으로 페르소나 주입)
+    # 영화 제목 추출 (환각 방지용)
+    movie_titles_str = ", ".join([f"<{m['title']}>" for m in final_movies])
+
+    system_instruction = build_curation_system_prompt(request.theme)
+
+    user_content = f"""[Context]
 사용자 요청: "{request.prompt}"
 추천 영화 목록: {movie_titles_str} (총 {len(final_movies)}편)
 
 멘트:"""
 
-        # ChatML 구조로 메시지 생성
-        messages = [
-            {"role": "system", "content": system_instruction},
-            {"role": "user", "content": user_content}
-        ]
-        
-        curator_comment = model_manager.generate(
-            prompt=messages, # 이제 list를 넘김
-            theme=request.theme,
-            max_new_tokens=90, # 출력 길이
-            top_p=0.9,
-            top_k=50
-        ).strip()
-        
-        # 코멘트 후처리 (강력한 필터링)
-        # <think> 태그 제거
-        import re
-        curator_comment = re.sub(r'<think>.*?</think>', '', curator_comment, flags=re.DOTALL).strip()
-        
-        lines = curator_comment.split('\n')
-        filtered_lines = []
-        for line in lines:
-            clean_line = line.strip()
-            # 불필요한 시스템 텍스트/헤더 제거
-            if any(x in clean_line for x in ["User Request:", "Theme:", "Example:", "예시:", "[Output]", "[Role]", "[Context]", "[Task]", "[Rules]", "[결과]"]):
-                continue
-            if not clean_line:
-                continue
-            filtered_lines.append(clean_line)
-            
-        # 남은 줄들을 공백으로 이어붙임 (기존처럼 첫 줄만 가져오는 버그 수정)
-        if filtered_lines:
-            curator_comment = " ".join(filtered_lines)
-        else:
-            # 예시/Example 라벨 제거 시도 (백업 로직)
-            if "Example:" in curator_comment:
-                curator_comment = curator_comment.split("Example:")[1].strip()
-            elif "예시:" in curator_comment:
-                curator_comment = curator_comment.split("예시:")[1].strip()
-            elif "[결과]" in curator_comment:
-                 curator_comment = curator_comment.split("[결과]")[1].strip()
-        
-        curator_comment = curator_comment.strip('"').strip("'")
-        
+    # ChatML 구조로 메시지 생성
+    messages = [
+        {"role": "system", "content": system_instruction},
+        {"role": "user", "content": user_content}
+    ]
+    return None, final_movies, messages, embedding
+
+
+def _generate_comment(messages: list, theme: str) -> Tuple[str, float]:
+    """코멘트 생성 + 후처리 (추론 스레드에서 실행), 생성 소요 초 함께 반환"""
+    started = time.perf_counter()
+    curator_comment = model_manager.generate(
+        prompt=messages, # 이제 list를 넘김
+        theme=theme,
+        prefix_key=("generate", theme),
+        **GENERATION_PARAMS
+    )
+    return clean_generated_text(curator_comment, strip_quotes=True), time.perf_counter() - started
+
+
+def _cached_comment(request: GenerateRequest, embedding: Optional[list], final_movies: list) -> Optional[str]:
+    """비슷한 프롬프트 + 겹치는 영화 목록의 이전 코멘트 (캐시 미사용/미스 시 None)"""
+    if comment_cache is None:
+        return None
+    if not request.useCache or embedding is None:
+        COMMENT_CACHE_LOOKUPS.labels(result="bypass").inc()
+        return None
+    entry = comment_cache.lookup(request.theme, embedding, [m['id'] for m in final_movies])
+    return entry.comment if entry is not None else None
+
+
+def _store_comment(request: GenerateRequest, embedding: Optional[list], final_movies: list, comment: str, seconds: float):
+    if comment_cache is None or not request.useCache or embedding is None:
+        return
+    comment_cache.store(request.theme, embedding, [m['id'] for m in final_movies], comment, seconds)
+
+
+def _build_result_json(request: GenerateRequest, final_movies: list, curator_comment: str) -> dict:
+    """영화 목록 구성 (PGVECTOR 결과 사용, 개별 코멘트 없음) + 응답 구성"""
+    movies_list = []
+    for movie in final_movies:
+        movies_list.append({
+            "movieId": movie['id'],
+            "posterUrl": f"https://image.tmdb.org/t/p/w500{movie['poster_path']}" if movie['poster_path'] else ""
+        })
+
+    return {
+        "title": f"{request.theme} 큐레이션",
+        "curatorComment": curator_comment,  # 전체 큐레이션에 대한 코멘트
+        "movies": movies_list,
+        "design": dict(DEFAULT_DESIGN),
+        "keywords": [request.theme, request.prompt[:20]]
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 한 건"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/generate", response_model=GenerateResponse)
+async def generate_exhibition(request: GenerateRequest, db: AsyncSession = Depends(get_async_db_session)):
+    """AI 전시회 생성 (PGVECTOR-first + 큐레이션 코멘트)"""
+    started = time.perf_counter()
+    PIPELINE_IN_FLIGHT.labels(endpoint="generate").inc()
+    try:
+        blocked, final_movies, messages, embedding = await _prepare_curation(request, db)
+        if blocked is not None:
+            return GenerateResponse(result_json=blocked, theme=request.theme)
+
+        lookup_started = time.perf_counter()
+        curator_comment = _cached_comment(request, embedding, final_movies)
+        _observe_stage("generate", "cache_lookup", request.theme, time.perf_counter() - lookup_started)
+        if curator_comment is None:
+            generation_started = time.perf_counter()
+            curator_comment, seconds = await inference_executor.run(_generate_comment, messages, request.theme)
+            _observe_stage("generate", "generation", request.theme, time.perf_counter() - generation_started)
+            _store_comment(request, embedding, final_movies, curator_comment, seconds)
+
         logger.info(f"Generated curation comment: {curator_comment}")
-        
-        # 3. 영화 목록 구성 (PGVECTOR 결과 사용, 개별 코멘트 없음)
-        movies_list = []
-        for movie in final_movies:
-            movies_list.append({
-                "movieId": movie['id'],
-                "posterUrl": f"https://image.tmdb.org/t/p/w500{movie['poster_path']}" if movie['poster_path'] else ""
-            })
-        
-        # 4. 응답 구성
-        result_json = {
-            "title": f"{request.theme} 큐레이션",
-            "curatorComment": curator_comment,  # 전체 큐레이션에 대한 코멘트
-            "movies": movies_list,
-            "design": {
-                "font": "Pretendard",
-                "colorScheme": "dark",
-                "cukeeStyle": "grid",
-                "frameStyle": "modern",
-                "background": "#1a1a1a",
-                "backgroundImage": ""
-            },
-            "keywords": [request.theme, request.prompt[:20]]
-        }
-        
-        logger.info(f"Successfully generated curation with {len(movies_list)} movies")
+
+        result_json = _build_result_json(request, final_movies, curator_comment)
+
+        logger.info(f"Successfully generated curation with {len(result_json['movies'])} movies")
         return GenerateResponse(result_json=result_json, theme=request.theme)
-        
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Generation error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        PIPELINE_IN_FLIGHT.labels(endpoint="generate").dec()
+        _observe_stage("generate", "total", request.theme, time.perf_counter() - started)
+
+
+@router.post("/generate/stream")
+async def generate_exhibition_stream(request: GenerateRequest, db: AsyncSession = Depends(get_async_db_session)):
+    """
+    AI 전시회 생성 - 큐레이션 코멘트 토큰 스트리밍 (text/event-stream)
+    - event: meta  → 영화 목록/디자인 (curatorComment는 빈 문자열)
+    - event: token → {"delta": 코멘트 조각}
+    - event: done  → 후처리된 최종 result_json
+    - event: error → 스트리밍 도중 실패
+    검색/대기열 단계의 오류(404, 503 등)는 스트림 시작 전에 일반 HTTP 오류로 반환
+    """
+    request_started = time.perf_counter()
+    in_flight = PIPELINE_IN_FLIGHT.labels(endpoint="generate_stream")
+    in_flight.inc()
+    finished = False
+
+    def _finish():
+        # 스트림 종료 / 연결 끊김 정리 / 시작 전 오류 중 먼저 오는 한 번만 기록
+        nonlocal finished
+        if not finished:
+            finished = True
+            in_flight.dec()
+            _observe_stage("generate_stream", "total", request.theme, time.perf_counter() - request_started)
+
+    try:
+        blocked, final_movies, messages, embedding = await _prepare_curation(request, db, endpoint="generate_stream")
+        stream = None
+        cached = _cached_comment(request, embedding, final_movies) if blocked is None else None
+        if blocked is None and cached is None:
+            stream = await inference_executor.open_stream(
+                model_manager.stream,
+                prompt=messages,
+                prefix_key=("generate", request.theme),
+                **GENERATION_PARAMS
+            )
+        started = time.perf_counter()
     except HTTPException:
+        _finish()
         raise
     except Exception as e:
+        _finish()
         logger.error(f"Generation error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+    async def _cleanup():
+        if stream is not None:
+            await stream.aclose()
+        _finish()
+
+    async def event_stream():
+        if blocked is not None:
+            yield _sse("meta", {"result_json": blocked, "theme": request.theme})
+            yield _sse("done", {"result_json": blocked, "theme": request.theme})
+            _finish()
+            return
+
+        result_json = _build_result_json(request, final_movies, "")
+        yield _sse("meta", {"result_json": result_json, "theme": request.theme})
+        if cached is not None:
+            # 캐시 hit: 코멘트 전체를 한 조각으로
+            result_json["curatorComment"] = cached
+            yield _sse("token", {"delta": cached})
+            yield _sse("done", {"result_json": result_json, "theme": request.theme})
+            _finish()
+            return
+
+        parts = []
+        try:
+            async for delta in stream:
+                if not parts:
+                    # 클라이언트 기준 첫 토큰 (검색/대기열 포함 요청 시작부터)
+                    _observe_stage("generate_stream", "first_token", request.theme, time.perf_counter() - request_started)
+                parts.append(delta)
+                yield _sse("token", {"delta": delta})
+        except Exception as e:
+            logger.error(f"Streaming generation error: {e}", exc_info=True)
+            yield _sse("error", {"detail": str(e)})
+            _finish()
+            return
+        finally:
+            await stream.aclose()
+        _observe_stage("generate_stream", "generation", request.theme, time.perf_counter() - started)
+
+        result_json["curatorComment"] = clean_generated_text("".join(parts), strip_quotes=True)
+        _store_comment(request, embedding, final_movies, result_json["curatorComment"], time.perf_counter() - started)
+        logger.info(f"Streamed curation comment: {result_json['curatorComment']}")
+        yield _sse("done", {"result_json": result_json, "theme": request.theme})
+        _finish()
+
+    # 본문이 시작되기 전에 연결이 끊겨도 추론 슬롯이 반환되도록 종료 후 정리
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(_cleanup)
+    )
@@ -1,15 +1,38 @@
 """영화 상세 설명 생성 엔드포인트"""
 import logging
+import time
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.api.dependencies import get_db_session
+from app.api.dependencies import get_async_db_session
 from app.models.model_loader import model_manager
+from app.core.inference_executor import inference_executor
+from app.core.metrics import PIPELINE_IN_FLIGHT, PIPELINE_STAGE_LATENCY, theme_label
+from app.services.persona_detail_service import (
+    DETAIL_GENERATION_PARAMS,
+    build_movie_detail_messages,
+    clean_movie_detail,
+    get_precomputed_detail,
+    store_detail,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 고정 SQL (asyncpg prepared statement 캐시 재사용)
+MOVIE_QUERY = text("""
+    SELECT id, title_ko, overview_ko, directors, release_date_kr, runtime
+    FROM movies
+    WHERE id = :movie_id
+""")
+
+def _observe_stage(stage: str, theme: str, started: float) -> float:
+    """단계 소요 시간 기록 후 다음 단계 시작 시각 반환"""
+    now = time.perf_counter()
+    PIPELINE_STAGE_LATENCY.labels(endpoint="movie_detail", stage=stage, theme=theme_label(theme)).observe(now - started)
+    return now
+
 class MovieDetailRequest(BaseModel):
     movieId: int
     theme: str = "일반"
@@ -22,22 +45,26 @@ class MovieDetailResponse(BaseModel):
 @router.post("/movie-detail", response_model=MovieDetailResponse)
 async def generate_movie_detail(
     request: MovieDetailRequest,
-    db: Session = Depends(get_db_session)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
-    """영화 포스터 클릭 시 상세 소개 생성"""
+    """영화 포스터 클릭 시 상세 소개 (사전 생성 결과 우선, 없으면 라이브 생성)"""
+    started = stage_started = time.perf_counter()
+    PIPELINE_IN_FLIGHT.labels(endpoint="movie_detail").inc()
     try:
+        # 0. 사전 생성된 소개 (현재 모델/프롬프트 버전)
+        precomputed = await get_precomputed_detail(db, request.movieId, request.theme)
+        stage_started = _observe_stage("precomputed_lookup", request.theme, stage_started)
+        if precomputed is not None:
+            logger.info(f"Serving precomputed detail for movie {request.movieId}")
+            return MovieDetailResponse(movieId=request.movieId, title=precomputed.title, detail=precomputed.detail)
+
         if not model_manager.is_ready():
             raise HTTPException(status_code=503, detail="Model not ready")
         
         # 1. DB에서 영화 정보 조회
-        query = text("""
-            SELECT id, title_ko, overview_ko, directors, release_date_kr, runtime
-            FROM movies
-            WHERE id = :movie_id
-        """)
-        
-        result = db.execute(query, {"movie_id": request.movieId})
+        result = await db.execute(MOVIE_QUERY, {"movie_id": request.movieId})
         movie = result.fetchone()
+        stage_started = _observe_stage("movie_query", request.theme, stage_started)
         
         if not movie:
             raise HTTPException(status_code=404, detail=f"Movie {request.movieId} not found")
@@ -45,77 +72,22 @@ async def generate_movie_detail(
         logger.info(f"Generating detail for movie: {movie.title_ko}")
         
         # 2. LLM으로 상세 소개 생성 (테마별 말투 변환)
-        from app.core.prompts import get_persona
-        persona = get_persona(request.theme)
-
-        system_instruction = f"""당신은 '{request.theme}' 테마의 큐레이터입니다.
-다음 페르소나에 맞춰 영화를 소개하세요.
-
-[Persona]
-- 말투/스타일: {persona['style']}
-- 행동 지침: {persona['instruction']}
-
-[Task]
-제공된 '원본 줄거리'를 바탕으로, 이 영화가 왜 '{request.theme}' 테마에 어울리는지 설명하세요.
-반드시 위 [Persona]의 말투를 사용하여, 마치 직접 친구나 손님에게 이야기하듯 쓰세요.
-절대로 "이 영화는..." 이라고 시작하지 마세요. 바로 훅 들어가는 첫 문장을 쓰세요.
-100-150자 내외로 작성하세요.
-**형식 금지**: '작성 내용:', '소개:', '예시:', '[결과]' 같은 머리말을 절대 붙이지 마세요. 그냥 대사만 출력하세요.
-**내용 금지**: 영화 제목을 첫 줄에 쓰거나 다시 언급하지 마세요. 이미 화면에 포스터가 있으니, 제목 없이 바로 내용으로 시작하세요.
-**구성 금지**: 중간에 줄바꿈을 하지 마세요. 처음부터 끝까지 한 문단으로 이어 쓰세요.
-**생각 과정 생략**: `<think>` 태그나 내부 추론 과정은 절대 출력하지 마세요. 결과만 출력하세요."""
+        messages = build_movie_detail_messages(movie.title_ko, movie.overview_ko, request.theme)
 
-        user_content = f"""[Data]
-- 영화 제목: {movie.title_ko}
-- 원본 줄거리: {movie.overview_ko or '정보 없음'}
-
-작성 내용:"""
-        
-        # ChatML 구조
-        messages = [
-            {"role": "system", "content": system_instruction},
-            {"role": "user", "content": user_content}
-        ]
-
-        detail_comment = model_manager.generate(
+        detail_comment = await inference_executor.run(
+            model_manager.generate,
             prompt=messages, # list 전달
             theme=request.theme,
-            max_new_tokens=150, # 120 -> 150 (잘림 방지)
-            temperature=0.7, 
-            top_p=0.9,
-            top_k=50
-        ).strip()
-        
-        # 코멘트 후처리 (강력한 필터링)
-        # <think> 태그 제거
-        import re
-        detail_comment = re.sub(r'<think>.*?</think>', '', detail_comment, flags=re.DOTALL).strip()
-        
-        lines = detail_comment.split('\n')
-        filtered_lines = []
-        for line in lines:
-            clean_line = line.strip()
-            # 불필요한 공백/빈줄 제거
-            if not clean_line:
-                continue
-                
-            # 시스템 헤더 제거
-            if any(x in clean_line for x in ["User Request:", "Theme:", "Example:", "예시:", "[Output]", "[Role]", "[Context]", "[Task]", "[Rules]", "[결과]"]):
-                continue
+            prefix_key=("movie_detail", request.theme),
+            workload="movie_detail",
+            **DETAIL_GENERATION_PARAMS
+        )
+        detail_comment = clean_movie_detail(detail_comment)
+        stage_started = _observe_stage("generation", request.theme, stage_started)
 
-            if not clean_line:
-                continue
-            
-            filtered_lines.append(clean_line)
-            
-        # 남은 줄들을 공백으로 이어붙임 (기존처럼 첫 줄만 가져오는 버그 수정)
-        if filtered_lines:
-            detail_comment = " ".join(filtered_lines)
-        else:
-            if "Example:" in detail_comment:
-                detail_comment = detail_comment.split("Example:")[1].strip()
-            elif "[결과]" in detail_comment:
-                detail_comment = detail_comment.split("[결과]")[1].strip()
+        # 3. 다음 요청부터는 저장된 결과 사용
+        await store_detail(db, movie.id, request.theme, movie.title_ko, detail_comment)
+        _observe_stage("store", request.theme, stage_started)
         
         logger.info(f"Successfully generated detail for movie {request.movieId}")
         
@@ -130,3 +102,6 @@ async def generate_movie_detail(
     except Exception as e:
         logger.error(f"Movie detail generation error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        PIPELINE_IN_FLIGHT.labels(endpoint="movie_detail").dec()
+        _observe_stage("total", request.theme, started)
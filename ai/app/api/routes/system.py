@@ -1,17 +1,42 @@
 """시스템 관련 엔드포인트"""
-import torch
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.startup import startup_state
 from app.models.model_loader import model_manager
+from app.models.embedding_loader import embedding_manager
+from app.services.curation_pool import curation_pools
+from app.services.vector_index import vector_index
 
 router = APIRouter()
 
+@router.get("/health/live")
+def liveness():
+    """liveness - 프로세스 응답 가능 + 필수 구성요소 로드 실패 없음 (로딩 중에도 200)"""
+    if not startup_state.is_alive():
+        return JSONResponse(status_code=503, content={"status": "failed", **startup_state.snapshot()})
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+def readiness():
+    """readiness - 모델 로드 + warm-up 완료 후에만 200 (트래픽 라우팅 기준)"""
+    snapshot = startup_state.snapshot()
+    if not snapshot["ready"]:
+        return JSONResponse(status_code=503, content={"status": "starting", **snapshot})
+    return {"status": "ready", **snapshot}
+
 @router.get("/health")
 def health_check():
-    """헬스 체크"""
+    """헬스 체크 (구성요소 상태 + 캐시/엔진 통계)"""
     return {
-        "status": "healthy",
+        "status": "healthy" if startup_state.is_ready() else "starting",
+        "startup": startup_state.snapshot(),
         "model_loaded": model_manager.is_ready(),
-        "loaded_themes": len(model_manager.get_loaded_themes())
+        "loaded_themes": len(model_manager.get_loaded_themes()),
+        "engines": model_manager.engine_stats(),
+        "prefix_cache": model_manager.prefix_cache_stats(),
+        "embedding_cache": embedding_manager.cache_stats(),
+        "vector_index": vector_index.stats(),
+        "curation_pools": curation_pools.stats()
     }
 
 @router.get("/themes")
@@ -25,6 +50,8 @@ def list_themes():
 @router.get("/gpu-info")
 def gpu_info():
     """GPU 정보"""
+    import torch
+
     if not torch.cuda.is_available():
         return {"gpu_available": False}
     return {
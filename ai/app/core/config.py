@@ -11,10 +11,91 @@ class Settings(BaseSettings):
     # AI Model Settings
     BASE_MODEL: str = "Qwen/Qwen3-14B"  # User requested model
     EMBEDDING_MODEL_PATH: str = "/app/model/bge-m3"
+    # 임베딩 백엔드 (torch: SentenceTransformer / onnx: int8 ONNX Runtime CPU / fake: 벤치마크용 결정적 벡터)
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_PATH: str = "/app/model/bge-m3-onnx-int8"
+    EMBEDDING_ONNX_THREADS: int = 0  # 0이면 CPU 코어 수
+    EMBEDDING_MAX_SEQ_LENGTH: int = 512
+    EMBEDDING_FAKE_DIM: int = 1024  # EMBEDDING_BACKEND=fake (벤치마크용)
+    EMBEDDING_FAKE_LATENCY_MS: float = 0.0
     MAX_LENGTH: int = 2048
     TEMPERATURE: float = 0.7
     TOP_P: float = 0.9
     TOP_K: int = 50
+
+    # LLM Engine (hf: transformers 4-bit GPU / llama_cpp: GGUF CPU / fake: 결정적 가짜 엔진)
+    LLM_ENGINE: str = "hf"
+    MOVIE_DETAIL_ENGINE: str = ""  # 비우면 LLM_ENGINE과 같은 엔진 사용
+    LLM_GGUF_PATH: str = ""
+    LLM_CONTEXT_SIZE: int = 4096
+    LLM_CPU_THREADS: int = 0  # 0이면 llama.cpp 기본값
+    LLM_FAKE_TOKEN_LATENCY_MS: float = 0.0
+
+    # Query Embedding Cache / Micro-batching (BGE-M3 단건 encode)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_MB: int = 64
+    EMBEDDING_CACHE_TTL_SECONDS: float = 3600.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_ENCODE_WORKERS: int = 4  # 배처 미사용/원격 단건 임베딩 스레드 (LLM 추론 슬롯과 분리)
+
+    # Batching Settings (동시 생성 요청 묶음 처리)
+    GENERATION_MAX_BATCH_SIZE: int = 8
+    GENERATION_MAX_WAIT_MS: int = 20
+
+    # Persona Prefix KV Cache
+    PREFIX_CACHE_ENABLED: bool = True
+    PREFIX_CACHE_MAX_MB: int = 512
+    PREFIX_CACHE_WARM_ON_STARTUP: bool = True
+
+    # Inference Executor (이벤트 루프 밖 추론 실행 + load shedding)
+    INFERENCE_MAX_CONCURRENCY: int = 8
+    INFERENCE_MAX_QUEUE_SIZE: int = 32
+    INFERENCE_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    INFERENCE_RETRY_AFTER_SECONDS: int = 5
+
+    # In-process Vector Index (티켓별 임베딩 행렬, 미준비 시 PGVECTOR 폴백)
+    VECTOR_INDEX_ENABLED: bool = True
+    VECTOR_INDEX_DTYPE: str = "float16"
+    VECTOR_INDEX_REFRESH_SECONDS: float = 30.0
+    VECTOR_INDEX_FULL_RELOAD_SECONDS: float = 3600.0
+    VECTOR_INDEX_INCREMENTAL_OVERLAP_SECONDS: float = 300.0  # 증분 갱신 시 이전 최신 updated_at보다 앞서 다시 읽는 구간
+    VECTOR_INDEX_NOTIFY_CHANNEL: str = "movie_index_changed"
+
+    # Curation Pools (티켓별 후보 영화 id 풀에서 샘플링, 미준비 시 ORDER BY RANDOM() 폴백)
+    CURATION_POOL_ENABLED: bool = True
+    CURATION_POOL_REFRESH_SECONDS: float = 30.0
+    CURATION_POOL_FULL_RELOAD_SECONDS: float = 3600.0
+    CURATION_POOL_NOTIFY_CHANNEL: str = "movie_index_changed"
+    
+    # Topic Pre-filter (임베딩 kNN으로 확실한 통과/차단은 로컬 판정, 애매한 구간만 NeMo 호출)
+    TOPIC_FILTER_ENABLED: bool = True
+    TOPIC_FILTER_EXAMPLES_PATH: str = ""  # 비우면 app/guardrails/topic_examples.yml
+    TOPIC_FILTER_TOP_K: int = 3
+    TOPIC_FILTER_ALLOW_THRESHOLD: float = 0.05  # on - off 유사도 차이가 이 이상이면 통과
+    TOPIC_FILTER_BLOCK_THRESHOLD: float = 0.08  # off - on 유사도 차이가 이 이상이면 차단
+    
+    # Curator Comment Semantic Cache (같은 테마의 비슷한 프롬프트 + 겹치는 영화 목록이면 코멘트 재사용)
+    COMMENT_CACHE_ENABLED: bool = True
+    COMMENT_CACHE_MAX_ENTRIES: int = 2000
+    COMMENT_CACHE_TTL_SECONDS: float = 1800.0
+    COMMENT_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+    COMMENT_CACHE_MIN_MOVIE_OVERLAP: float = 0.6  # 영화 집합 Jaccard
+    
+    # Startup (구성요소 동시 로드 → warm-up 후 ready)
+    STARTUP_WARMUP_ENABLED: bool = True
+    STARTUP_WARMUP_MAX_NEW_TOKENS: int = 8
+    
+    # Model Host (python -m app.model_host 프로세스 하나가 모델 보유, uvicorn 워커들은 IPC로 추론)
+    MODEL_HOST_SOCKET: str = ""  # 비우면 워커 프로세스 안에서 직접 모델 로드 (WORKERS=1)
+    MODEL_HOST_EMBEDDING: bool = True  # false면 임베딩은 워커별 로드 (예: EMBEDDING_BACKEND=onnx CPU)
+    MODEL_HOST_TIMEOUT_SECONDS: float = 120.0
+    MODEL_HOST_POOL_SIZE: int = 16  # 워커당 유지하는 IPC 연결 수
+    MODEL_HOST_STARTUP_TIMEOUT_SECONDS: float = 900.0  # 워커가 호스트 ready를 기다리는 최대 시간
+    MODEL_HOST_METRICS_PORT: int = 9101  # 모델 호스트 /metrics (엔진 메트릭), 0이면 비활성
+    
+    # Persona Detail 사전 생성 (프롬프트 외 사유로 전체 무효화가 필요할 때 올림)
+    PERSONA_DETAIL_REVISION: str = "1"
     
     # Server Settings
     HOST: str = "0.0.0.0"
@@ -27,6 +108,11 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    # 비동기 엔진 (API 라우트) - 동시 추론 수보다 넉넉하게
+    ASYNC_DB_POOL_SIZE: int = 20
+    ASYNC_DB_MAX_OVERFLOW: int = 10
+    ASYNC_DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    ASYNC_DB_STATEMENT_CACHE_SIZE: int = 256
 
     
     class Config:
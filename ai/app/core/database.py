@@ -1,7 +1,11 @@
 """
 PostgreSQL 데이터베이스 연결 관리
+- 동기 엔진: 스크립트, 벡터 인덱스 갱신 스레드 등 이벤트 루프 밖 작업용
+- 비동기 엔진(asyncpg): API 라우트/RetrievalService용 (prepared statement 캐시 사용)
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from contextlib import contextmanager
@@ -18,6 +22,35 @@ engine = create_engine(
 # 세션 팩토리
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str):
+    """DATABASE_URL의 드라이버만 asyncpg로 교체"""
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+# 비동기 엔진 (asyncpg는 연결마다 prepared statement를 캐시 - SQL 문자열이 고정이어야 재사용됨)
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_size=settings.ASYNC_DB_POOL_SIZE,
+    max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+    pool_timeout=settings.ASYNC_DB_POOL_TIMEOUT_SECONDS,
+    connect_args={
+        "prepared_statement_cache_size": settings.ASYNC_DB_STATEMENT_CACHE_SIZE,
+    },
+)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _register_vector_codec(dbapi_connection, connection_record):
+    """pgvector 타입 코덱 등록 (임베딩을 문자열이 아닌 vector 파라미터로 바인딩)"""
+    from pgvector.asyncpg import register_vector
+
+    dbapi_connection.run_async(register_vector)
+
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
 # Base 클래스
 Base = declarative_base()
 
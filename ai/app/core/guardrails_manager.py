@@ -1,74 +1,143 @@
+import asyncio
+import inspect
 import os
 import logging
+import time
+from typing import Awaitable, Optional, Union
 from dotenv import load_dotenv
-from nemoguardrails import LLMRails, RailsConfig
+
+from app.core.config import settings
+from app.core.metrics import GUARDRAILS_DECISIONS, GUARDRAILS_LATENCY
+from app.core.topic_filter import ALLOW, BLOCK, DEFAULT_EXAMPLES_PATH, TopicFilter, load_topic_examples
+from app.models.embedding_loader import embedding_manager
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+REFUSAL_MESSAGE = "죄송합니다. 저는 영화 추천과 관련된 질문에만 답변할 수 있습니다. 영화 취향에 대해 이야기해 주세요!"
+
 class GuardrailsManager:
     _instance = None
     _rails = None
+    _topic_filter: Optional[TopicFilter] = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(GuardrailsManager, cls).__new__(cls)
-            cls._instance._initialize()
         return cls._instance
 
-    def _initialize(self):
-        """Guardrails 초기화"""
+    def initialize(self):
+        """
+        NeMo Guardrails 초기화 (서버 시작 시 다른 모델 로드와 동시에 스레드에서 호출)
+        - nemoguardrails(langchain 등) import 비용이 커서 여기서 import
+        - 실패 시 예외 (self._rails는 None으로 남고 check_input은 fail-open)
+        """
+        from nemoguardrails import LLMRails, RailsConfig
+
+        # 설정 파일 경로 계산
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        # app/core -> app/guardrails
+        config_path = os.path.join(current_dir, "..", "guardrails")
+        config_path = os.path.normpath(config_path)
+
+        logger.info(f"Initializing Guardrails from path: {config_path}")
+
+        config_file = os.path.join(config_path, "config.yml")
+        if not os.path.exists(config_file):
+            raise RuntimeError(f"Missing config.yml at {config_file}")
+        logger.info(f"Found config.yml at {config_file}")
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            logger.warning("OPENAI_API_KEY is not set. Guardrails might fail.")
+        else:
+            masked_key = api_key[:5] + "..." + api_key[-4:]
+            logger.info(f"OPENAI_API_KEY found: {masked_key}")
+
+        
+        config = RailsConfig.from_path(config_path)
+        self._rails = LLMRails(config)
+        logger.info("NeMo Guardrails initialized successfully")
+
+    def init_topic_filter(self):
+        """로컬 주제 분류기 준비 (임베딩 모델 로드 후 호출, 실패 시 모든 요청을 NeMo로)"""
+        if not settings.TOPIC_FILTER_ENABLED:
+            logger.info("Topic pre-filter disabled")
+            return
         try:
-            # 설정 파일 경로 계산
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # app/core -> app/guardrails
-            config_path = os.path.join(current_dir, "..", "guardrails")
-            config_path = os.path.normpath(config_path)
-            
-            logger.info(f"Initializing Guardrails from path: {config_path}")
-            
-            if not os.path.exists(config_path):
-                 logger.error(f"Guardrails directory NOT found at {config_path}")
-                 return
-
-            config_file = os.path.join(config_path, "config.yml")
-            # topics_file is verified implicitly by from_path but good to log
-
-            if os.path.exists(config_file):
-                logger.info(f"Found config.yml at {config_file}")
-            else:
-                logger.error(f"Missing config.yml at {config_file}")
-                return
-
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                logger.warning("OPENAI_API_KEY is not set. Guardrails might fail.")
-            else:
-                masked_key = api_key[:5] + "..." + api_key[-4:]
-                logger.info(f"OPENAI_API_KEY found: {masked_key}")
-
-            # 로딩 시도
-            config = RailsConfig.from_path(config_path)
-            self._rails = LLMRails(config)
-            logger.info("NeMo Guardrails initialized successfully")
-            
+            on_topic, off_topic = load_topic_examples(settings.TOPIC_FILTER_EXAMPLES_PATH or DEFAULT_EXAMPLES_PATH)
+            self._topic_filter = TopicFilter(
+                on_topic,
+                off_topic,
+                top_k=settings.TOPIC_FILTER_TOP_K,
+                allow_threshold=settings.TOPIC_FILTER_ALLOW_THRESHOLD,
+                block_threshold=settings.TOPIC_FILTER_BLOCK_THRESHOLD,
+            ).fit(embedding_manager.encode_batch)
         except Exception as e:
-            logger.error(f"Failed to initialize Guardrails: {e}", exc_info=True)
-            self._rails = None
+            logger.error(f"Failed to initialize topic pre-filter: {e}", exc_info=True)
+            self._topic_filter = None
 
-    async def check_input(self, prompt: str):
+    async def check_input(self, prompt: str, embedding: Union[list, Awaitable, None] = None):
         """
         입력이 주제에 맞는지 검사
+        1) 로컬 임베딩 분류기로 확실한 통과/차단 판정
+        2) 애매한 구간만 NeMo self check input 호출
+        Args:
+            embedding: 프롬프트 임베딩 또는 계산 중인 Task (로컬 분류기가 쓸 때만 await, 없으면 여기서 생성)
         Returns:
             (bool, str): (통과여부, 응답메시지)
             통과 시: (True, None)
             차단 시: (False, 거절메시지)
         """
+        started = time.perf_counter()
+        decision = await self._classify_locally(prompt, embedding)
+        if decision is not None:
+            allowed = decision.decision == ALLOW
+            self._observe("local", allowed, started)
+            logger.info(
+                f"{'✅ Passed' if allowed else '🚫 Blocked by'} topic pre-filter "
+                f"(on={decision.on_score:.3f}, off={decision.off_score:.3f})"
+            )
+            return (True, None) if allowed else (False, REFUSAL_MESSAGE)
+
         if not self._rails:
             logging.warning("Guardrails not initialized, skipping check")
+            self._observe("bypass", True, started)
             return True, None
 
+        allowed, message = await self._check_with_nemo(prompt)
+        self._observe("nemo", allowed, started)
+        return allowed, message
+
+    async def _classify_locally(self, prompt: str, embedding: Union[list, Awaitable, None]):
+        """로컬 판정 결과 (애매하거나 분류기를 쓸 수 없으면 None)"""
+        topic_filter = self._topic_filter
+        if topic_filter is None or not topic_filter.is_ready():
+            return None
+        try:
+            if inspect.isawaitable(embedding):
+                # 검색 단계와 공유하는 Task → 이 판정이 취소되어도 임베딩은 계속
+                embedding = await asyncio.shield(embedding)
+            if embedding is None:
+                embedding = await embedding_manager.encode_async(prompt)
+            decision = topic_filter.classify(embedding)
+        except Exception as e:
+            logger.error(f"Topic pre-filter failed, escalating to NeMo: {e}")
+            return None
+        if decision.decision in (ALLOW, BLOCK):
+            return decision
+        logger.info(f"Topic pre-filter ambiguous (margin={decision.margin:.3f}), escalating to NeMo")
+        return None
+
+    @staticmethod
+    def _observe(path: str, allowed: bool, started: float):
+        GUARDRAILS_DECISIONS.labels(path=path, result="allowed" if allowed else "blocked").inc()
+        GUARDRAILS_LATENCY.labels(path=path).observe(time.perf_counter() - started)
+
+    async def _check_with_nemo(self, prompt: str):
+        """NeMo Guardrails (OpenAI 호출) 판정"""
+
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             logger.error("Create FAIL: OPENAI_API_KEY is missing!")
@@ -91,8 +160,7 @@ class GuardrailsManager:
             content = response.get("content", "")
             if response and ("blocked" in content.lower() or "영화 추천과 관련된 질문에만 답변할 수 있습니다" in content):
                  logger.info("🚫 Blocked by Guardrails!")
-                 refusal_message = "죄송합니다. 저는 영화 추천과 관련된 질문에만 답변할 수 있습니다. 영화 취향에 대해 이야기해 주세요!"
-                 return False, refusal_message
+                 return False, REFUSAL_MESSAGE
             
             logger.info("✅ Passed Guardrails")
             return True, None
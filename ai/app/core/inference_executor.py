@@ -0,0 +1,219 @@
+"""
+Inference Executor - 블로킹 추론(LLM 생성, 임베딩)을 이벤트 루프 밖 전용 스레드에서 실행
+- 동시 실행 수 제한 + 대기열 크기 제한
+- 대기열이 가득 차거나 대기 시간이 초과되면 즉시 503 + Retry-After 반환 (load shedding)
+- 스트리밍 생성은 open_stream으로 슬롯을 잡고, 스트림이 닫힐 때 반환
+"""
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import (
+    INFERENCE_IN_FLIGHT,
+    INFERENCE_QUEUE_DEPTH,
+    INFERENCE_QUEUE_WAIT,
+    INFERENCE_REJECTED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceOverloadedError(HTTPException):
+    """추론 대기열 포화/대기 시간 초과 (503 Service Unavailable)"""
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class InferenceExecutor:
+    """제한된 대기열을 가진 추론 전용 실행기"""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue_size: int,
+        queue_timeout: float,
+        retry_after: int,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue_size = max(0, max_queue_size)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="inference"
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        # 수락되어 아직 슬롯을 반환하지 않은 요청 수 (대기 + 실행)
+        self._outstanding = 0
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # 이벤트 루프 안에서 처음 사용할 때 생성
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def _reject(self, reason: str, detail: str) -> InferenceOverloadedError:
+        INFERENCE_REJECTED.labels(reason=reason).inc()
+        logger.warning(f"Inference rejected ({reason}): waiting={self._waiting}")
+        return InferenceOverloadedError(detail=detail, retry_after=self.retry_after)
+
+    async def _acquire(self, queue_timeout: Optional[float]):
+        """실행 슬롯 획득 (대기열 포화/대기 시간 초과 시 503)"""
+        slots = self._get_slots()
+        timeout = queue_timeout if queue_timeout is not None else self.queue_timeout
+
+        if self._outstanding >= self.max_concurrency + self.max_queue_size:
+            raise self._reject("queue_full", "Inference queue is full")
+
+        enqueued_at = time.monotonic()
+        self._outstanding += 1
+        self._waiting += 1
+        INFERENCE_QUEUE_DEPTH.set(self._waiting)
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._outstanding -= 1
+            raise self._reject("queue_timeout", "Timed out waiting for an inference slot")
+        except BaseException:
+            self._outstanding -= 1
+            raise
+        finally:
+            self._waiting -= 1
+            INFERENCE_QUEUE_DEPTH.set(self._waiting)
+        INFERENCE_QUEUE_WAIT.observe(time.monotonic() - enqueued_at)
+
+    def _release_when_done(self, future: Future, loop: asyncio.AbstractEventLoop):
+        """스레드 작업이 끝나면 이벤트 루프에서 슬롯 반환"""
+        def _on_done(_):
+            INFERENCE_IN_FLIGHT.dec()
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                # 종료 중 이벤트 루프가 이미 닫힌 경우
+                pass
+
+        future.add_done_callback(_on_done)
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args,
+        queue_timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        func(*args, **kwargs)를 추론 스레드에서 실행하고 결과 반환
+        - 실행 슬롯이 없고 대기열이 가득 차면 즉시 503
+        - queue_timeout 안에 슬롯을 얻지 못하면 503
+        """
+        await self._acquire(queue_timeout)
+
+        # 슬롯은 스레드 작업이 실제로 끝날 때 반환 (클라이언트가 끊겨도 초과 실행 방지)
+        loop = asyncio.get_running_loop()
+        INFERENCE_IN_FLIGHT.inc()
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except Exception:
+            INFERENCE_IN_FLIGHT.dec()
+            self._release()
+            raise
+
+        self._release_when_done(future, loop)
+        return await asyncio.wrap_future(future)
+
+    async def open_stream(
+        self,
+        func: Callable[..., Iterator[Any]],
+        *args,
+        queue_timeout: Optional[float] = None,
+        **kwargs
+    ) -> "InferenceStream":
+        """
+        iterator를 반환하는 func를 슬롯 하나로 실행하고 async iterator로 감싸 반환
+        - 수락 여부(503)는 반환 전에 결정되므로 응답 헤더 전송 전에 처리 가능
+        - 슬롯은 스트림이 끝나거나 aclose() 될 때 반환
+        """
+        await self._acquire(queue_timeout)
+        INFERENCE_IN_FLIGHT.inc()
+        try:
+            iterator = await asyncio.wrap_future(
+                self._executor.submit(functools.partial(func, *args, **kwargs))
+            )
+        except BaseException:
+            INFERENCE_IN_FLIGHT.dec()
+            self._release()
+            raise
+        return InferenceStream(self, iterator)
+
+    def _release(self):
+        self._outstanding -= 1
+        self._get_slots().release()
+
+    def shutdown(self):
+        """대기 중인 작업 취소 후 스레드 종료"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_END = object()
+
+
+class InferenceStream:
+    """추론 스레드에서 next()를 호출하는 async iterator (슬롯 하나를 스트림 수명 동안 점유)"""
+
+    def __init__(self, executor: InferenceExecutor, iterator: Iterator[Any]):
+        self._executor = executor
+        self._iterator = iterator
+        self._pending: Optional[Future] = None
+        self._closed = False
+
+    def __aiter__(self) -> "InferenceStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._closed:
+            raise StopAsyncIteration
+        self._pending = self._executor._executor.submit(next, self._iterator, _END)
+        item = await asyncio.wrap_future(self._pending)
+        if item is _END:
+            await self.aclose()
+            raise StopAsyncIteration
+        return item
+
+    async def aclose(self):
+        """생성 중단 요청 후 슬롯 반환 (진행 중인 next()가 있으면 끝난 뒤 반환)"""
+        if self._closed:
+            return
+        self._closed = True
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+        if self._pending is not None and not self._pending.done():
+            self._executor._release_when_done(self._pending, asyncio.get_running_loop())
+        else:
+            INFERENCE_IN_FLIGHT.dec()
+            self._executor._release()
+
+
+# 전역 추론 실행기
+inference_executor = InferenceExecutor(
+    max_concurrency=settings.INFERENCE_MAX_CONCURRENCY,
+    max_queue_size=settings.INFERENCE_MAX_QUEUE_SIZE,
+    queue_timeout=settings.INFERENCE_QUEUE_TIMEOUT_SECONDS,
+    retry_after=settings.INFERENCE_RETRY_AFTER_SECONDS,
+)
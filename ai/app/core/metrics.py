@@ -0,0 +1,221 @@
+"""
+AI 서버 커스텀 Prometheus 메트릭
+- prometheus_fastapi_instrumentator가 노출하는 /metrics (기본 레지스트리)에 함께 노출됨
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.prompts import THEME_PERSONAS
+
+# 테마 라벨은 알려진 테마 + "other" 로 제한 (요청 값 그대로 쓰면 시계열 수가 무한히 늘어남)
+_THEME_LABELS = {theme: theme.strip() for theme in THEME_PERSONAS}
+
+
+def theme_label(theme) -> str:
+    return _THEME_LABELS.get(theme, "other")
+
+# Inference Executor
+INFERENCE_QUEUE_DEPTH = Gauge(
+    "cukee_ai_inference_queue_depth",
+    "추론 실행 대기 중인 요청 수",
+)
+
+INFERENCE_IN_FLIGHT = Gauge(
+    "cukee_ai_inference_in_flight",
+    "추론 스레드에서 실행 중인 작업 수",
+)
+
+INFERENCE_QUEUE_WAIT = Histogram(
+    "cukee_ai_inference_queue_wait_seconds",
+    "추론 큐 대기 시간(초)",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+INFERENCE_REJECTED = Counter(
+    "cukee_ai_inference_rejected_total",
+    "부하로 거절된 추론 요청 수",
+    ["reason"],
+)
+
+# LLM Engine
+LLM_GENERATED_TOKENS = Counter(
+    "cukee_ai_llm_generated_tokens_total",
+    "엔진별 생성 토큰 수",
+    ["engine"],
+)
+
+LLM_BATCH_STAGE_LATENCY = Histogram(
+    "cukee_ai_llm_batch_stage_seconds",
+    "배치 생성 단계별 소요 시간(초) (tokenize / prefill / decode)",
+    ["engine", "stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+LLM_QUEUE_WAIT = Histogram(
+    "cukee_ai_llm_queue_wait_seconds",
+    "엔진 제출 → 배치/워커 실행 시작까지 대기 시간(초)",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+LLM_IN_FLIGHT = Gauge(
+    "cukee_ai_llm_in_flight_requests",
+    "엔진에 제출되어 아직 끝나지 않은 생성 요청 수",
+    ["engine"],
+)
+
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "cukee_ai_llm_time_to_first_token_seconds",
+    "엔진 제출 → 첫 토큰까지 시간(초)",
+    ["endpoint", "theme"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+LLM_PROMPT_TOKENS = Histogram(
+    "cukee_ai_llm_prompt_tokens",
+    "요청별 프롬프트 토큰 수 (캐시된 system prefix 포함)",
+    ["endpoint", "theme"],
+    buckets=(32, 64, 128, 256, 512, 1024, 2048, 4096),
+)
+
+LLM_REQUEST_GENERATED_TOKENS = Histogram(
+    "cukee_ai_llm_request_generated_tokens",
+    "요청별 생성 토큰 수",
+    ["endpoint", "theme"],
+    buckets=(8, 16, 32, 64, 128, 256, 512),
+)
+
+LLM_TOKENS_PER_SECOND = Histogram(
+    "cukee_ai_llm_tokens_per_second",
+    "엔진별 생성 속도 (배치/요청 단위 tokens/sec)",
+    ["engine"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000),
+)
+
+# Query Embedding Cache / Micro-batching
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "cukee_ai_embedding_cache_lookups_total",
+    "쿼리 임베딩 캐시 조회 수 (hit / miss / coalesced: 진행 중 요청 합류)",
+    ["result"],
+)
+
+EMBEDDING_CACHE_BYTES = Gauge(
+    "cukee_ai_embedding_cache_bytes",
+    "쿼리 임베딩 캐시 메모리 사용량(bytes)",
+)
+
+EMBEDDING_BATCH_SIZE = Histogram(
+    "cukee_ai_embedding_batch_size",
+    "micro-batch 한 번에 encode 한 프롬프트 수",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+EMBEDDING_ENCODE_LATENCY = Histogram(
+    "cukee_ai_embedding_encode_seconds",
+    "micro-batch encode 소요 시간(초)",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+# Persona Prefix KV Cache
+PREFIX_CACHE_LOOKUPS = Counter(
+    "cukee_ai_prefix_cache_lookups_total",
+    "페르소나 prefix KV 캐시 조회 수",
+    ["result"],
+)
+
+PREFIX_CACHE_BYTES = Gauge(
+    "cukee_ai_prefix_cache_bytes",
+    "페르소나 prefix KV 캐시 메모리 사용량(bytes)",
+)
+
+# In-process Vector Index
+VECTOR_INDEX_MOVIES = Gauge(
+    "cukee_ai_vector_index_movies",
+    "벡터 인덱스에 적재된 영화 수",
+)
+
+VECTOR_INDEX_REFRESHES = Counter(
+    "cukee_ai_vector_index_refreshes_total",
+    "벡터 인덱스 갱신 수",
+    ["kind"],
+)
+
+VECTOR_INDEX_SEARCHES = Counter(
+    "cukee_ai_vector_index_searches_total",
+    "유사 영화 검색 수 (memory: 인덱스, postgres: 폴백)",
+    ["backend"],
+)
+
+# Curation Pools (티켓별 큐레이션 후보 풀)
+CURATION_POOL_MOVIES = Gauge(
+    "cukee_ai_curation_pool_movies",
+    "큐레이션 풀에 적재된 영화 수",
+)
+
+CURATION_POOL_REFRESHES = Counter(
+    "cukee_ai_curation_pool_refreshes_total",
+    "큐레이션 풀 갱신 수",
+    ["kind"],
+)
+
+CURATION_SAMPLES = Counter(
+    "cukee_ai_curation_samples_total",
+    "큐레이션 샘플링 수 (memory: 풀, postgres: 폴백)",
+    ["backend"],
+)
+
+# Guardrails (로컬 주제 분류기 → NeMo)
+GUARDRAILS_DECISIONS = Counter(
+    "cukee_ai_guardrails_decisions_total",
+    "주제 검사 판정 수 (path: local / nemo / bypass)",
+    ["path", "result"],
+)
+
+GUARDRAILS_LATENCY = Histogram(
+    "cukee_ai_guardrails_latency_seconds",
+    "주제 검사 소요 시간(초)",
+    ["path"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# Request Pipeline
+PIPELINE_STAGE_LATENCY = Histogram(
+    "cukee_ai_pipeline_stage_seconds",
+    "요청 처리 단계별 소요 시간(초)",
+    ["endpoint", "stage", "theme"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+PIPELINE_IN_FLIGHT = Gauge(
+    "cukee_ai_pipeline_in_flight_requests",
+    "엔드포인트별 처리 중인 요청 수",
+    ["endpoint"],
+)
+
+# Curator Comment Semantic Cache
+COMMENT_CACHE_LOOKUPS = Counter(
+    "cukee_ai_comment_cache_lookups_total",
+    "큐레이션 코멘트 캐시 조회 수 (hit / miss / bypass)",
+    ["result"],
+)
+
+COMMENT_CACHE_SAVED_SECONDS = Counter(
+    "cukee_ai_comment_cache_saved_gpu_seconds_total",
+    "캐시 hit으로 생략한 코멘트 생성 시간 합계(초)",
+)
+
+COMMENT_CACHE_ENTRIES = Gauge(
+    "cukee_ai_comment_cache_entries",
+    "큐레이션 코멘트 캐시 항목 수",
+)
+
+# Startup
+STARTUP_COMPONENT_SECONDS = Gauge(
+    "cukee_ai_startup_component_seconds",
+    "구성요소별 로드/warm-up 소요 시간(초)",
+    ["component"],
+)
+
+SERVER_READY = Gauge(
+    "cukee_ai_server_ready",
+    "요청 처리 준비 완료 여부 (1=ready)",
+)
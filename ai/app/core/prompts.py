@@ -56,3 +56,69 @@ def get_persona(theme: str) -> dict:
         "instruction": "친절하고 전문적인 태도로 영화를 추천하세요."
     }
     return THEME_PERSONAS.get(theme, default_persona)
+
+
+def build_curation_system_prompt(theme: str) -> str:
+    """/generate 큐레이터 코멘트용 시스템 프롬프트 (테마별로 고정 → KV prefix 캐시 대상)"""
+    persona = get_persona(theme)
+    return f"""당신은 '{theme}' 테마의 영화 큐레이터입니다.
+다음 페르소나 지침을 완벽하게 따라 연기하세요.
+
+[Persona]
+- 말투/스타일: {persona['style']}
+- 행동 지침: {persona['instruction']}
+
+[Instruction]
+위 [Persona]의 말투를 200% 살려서, **사용자의 요청에 대해 공감하거나 반응하는** 멘트를 작성하세요.
+**지침**:
+1. 구체적인 영화 제목을 나열하지 마세요. (예: "<영화이름> 추천해요" X)
+2. 대신 "이런 따뜻한 영화들을 모아봤어요", "완전 취향 저격일 거예요" 처럼 묶어서 추천하세요.
+3. 상투적인 인사말("안녕하세요")은 생략하고, 바로 본론이나 감탄사로 시작하세요.
+4. 한국어로 자연스럽게, 40-60자 내외로 짧고 강렬하게 작성하세요.
+
+따옴표(")는 쓰지 마세요.
+**형식 금지**: '멘트:', '답변:', '예시:', '[결과]' 같은 머리말을 절대 붙이지 마세요. 그냥 대사만 출력하세요.
+**생각 과정 생략**: `<think>` 태그나 내부 추론 과정은 절대 출력하지 마세요. 결과만 출력하세요."""
+
+
+def build_movie_detail_system_prompt(theme: str) -> str:
+    """/movie-detail 영화 소개용 시스템 프롬프트 (테마별로 고정 → KV prefix 캐시 대상)"""
+    persona = get_persona(theme)
+    return f"""당신은 '{theme}' 테마의 큐레이터입니다.
+다음 페르소나에 맞춰 영화를 소개하세요.
+
+[Persona]
+- 말투/스타일: {persona['style']}
+- 행동 지침: {persona['instruction']}
+
+[Task]
+제공된 '원본 줄거리'를 바탕으로, 이 영화가 왜 '{theme}' 테마에 어울리는지 설명하세요.
+반드시 위 [Persona]의 말투를 사용하여, 마치 직접 친구나 손님에게 이야기하듯 쓰세요.
+절대로 "이 영화는..." 이라고 시작하지 마세요. 바로 훅 들어가는 첫 문장을 쓰세요.
+100-150자 내외로 작성하세요.
+**형식 금지**: '작성 내용:', '소개:', '예시:', '[결과]' 같은 머리말을 절대 붙이지 마세요. 그냥 대사만 출력하세요.
+**내용 금지**: 영화 제목을 첫 줄에 쓰거나 다시 언급하지 마세요. 이미 화면에 포스터가 있으니, 제목 없이 바로 내용으로 시작하세요.
+**구성 금지**: 중간에 줄바꿈을 하지 마세요. 처음부터 끝까지 한 문단으로 이어 쓰세요.
+**생각 과정 생략**: `<think>` 태그나 내부 추론 과정은 절대 출력하지 마세요. 결과만 출력하세요."""
+
+
+# endpoint 템플릿별 시스템 프롬프트 빌더 (prefix 캐시 키: (template, theme))
+SYSTEM_PROMPT_BUILDERS = {
+    "generate": build_curation_system_prompt,
+    "movie_detail": build_movie_detail_system_prompt,
+}
+
+# ticketId(ticket_group_id) -> 테마 매핑 (백엔드 app/api/ai.py와 동일)
+TICKET_TO_THEME = {
+    1: "숏폼 러버 MZ 스타일",
+    2: "영화덕후의 최애 마이너영화",
+    3: "편안하고 잔잔한 감성 추구",
+    4: "찝찝한 여운의 우울한 명작들",
+    5: "뇌 빼고도 볼 수 있는 레전드 코미디 ",
+    6: "심장 터질 것 같은 액션 범죄 영화",
+    7: "세계관 과몰입 판타지러버",
+    8: "이거 실화야? 실화야. ",
+    9: "여름에 찰떡인 역대급 호러 ",
+    10: "설레고 싶은 날의 로맨스 ",
+    11: "3D 보단 2D ",
+}
@@ -0,0 +1,121 @@
+"""
+AI 서버 시작 상태 (liveness / readiness)
+- 구성요소(LLM, 임베딩, Guardrails)를 각자 스레드에서 동시에 로드 → 콜드 스타트 = 가장 느린 구성요소
+- 로드 후 warm-up 단계(짧은 생성/encode 등)까지 끝나야 ready
+- required=False 구성요소는 실패해도 ready (예: Guardrails는 fail-open)
+- required 구성요소가 실패하면 liveness도 실패 → 오케스트레이터가 재시작
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.metrics import SERVER_READY, STARTUP_COMPONENT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class ComponentState:
+    required: bool = True
+    status: str = PENDING
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    def snapshot(self) -> dict:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "seconds": round(self.seconds, 2) if self.seconds is not None else None,
+            "error": self.error,
+        }
+
+
+class StartupState:
+    """구성요소별 로드 상태 + 전체 ready 여부"""
+
+    def __init__(self):
+        self.components: Dict[str, ComponentState] = {}
+        self.warmup = ComponentState()
+        self._started_at = time.monotonic()
+        self._ready_seconds: Optional[float] = None
+
+    def register(self, name: str, required: bool = True):
+        self.components[name] = ComponentState(required=required)
+
+    async def run(
+        self,
+        loaders: Dict[str, Callable[[], None]],
+        warmups: List[Tuple[str, Callable[[], None]]] = (),
+    ):
+        """
+        loaders를 동시에 실행한 뒤 warmups를 동시에 실행
+        - warmups: (의존 구성요소 이름, 함수) - 의존 구성요소가 ready일 때만 실행
+        """
+        self._started_at = time.monotonic()
+        await asyncio.gather(*(self._load(name, loader) for name, loader in loaders.items()))
+        if self._failed_required():
+            logger.error("Startup failed: required component could not be loaded")
+            return
+
+        if warmups:
+            self.warmup.status = LOADING
+            started = time.perf_counter()
+            runnable = [fn for name, fn in warmups if self.components[name].status == READY]
+            results = await asyncio.gather(*(asyncio.to_thread(fn) for fn in runnable), return_exceptions=True)
+            errors = [r for r in results if isinstance(r, BaseException)]
+            self.warmup.seconds = time.perf_counter() - started
+            STARTUP_COMPONENT_SECONDS.labels(component="warmup").set(self.warmup.seconds)
+            # warm-up 실패는 첫 요청이 느려질 뿐이므로 ready 처리
+            if errors:
+                self.warmup.error = str(errors[0])
+                logger.warning(f"Warm-up failed ({len(errors)} step(s)): {errors[0]}")
+        self.warmup.status = READY
+
+        self._ready_seconds = time.monotonic() - self._started_at
+        SERVER_READY.set(1)
+        logger.info(f"✓ Server ready in {self._ready_seconds:.1f}s")
+
+    async def _load(self, name: str, loader: Callable[[], None]):
+        state = self.components.setdefault(name, ComponentState())
+        state.status = LOADING
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(loader)
+            state.status = READY
+        except Exception as e:
+            state.status = FAILED
+            state.error = str(e)
+            logger.error(f"Failed to load {name}: {e}", exc_info=True)
+        state.seconds = time.perf_counter() - started
+        STARTUP_COMPONENT_SECONDS.labels(component=name).set(state.seconds)
+        logger.info(f"{name}: {state.status} in {state.seconds:.1f}s")
+
+    def _failed_required(self) -> bool:
+        return any(state.required and state.status == FAILED for state in self.components.values())
+
+    def is_alive(self) -> bool:
+        return not self._failed_required()
+
+    def is_ready(self) -> bool:
+        return self.warmup.status == READY and all(
+            state.status == READY or not state.required for state in self.components.values()
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "ready_seconds": round(self._ready_seconds, 2) if self._ready_seconds is not None else None,
+            "components": {name: state.snapshot() for name, state in self.components.items()},
+            "warmup": self.warmup.snapshot(),
+        }
+
+
+# 전역 시작 상태
+startup_state = StartupState()
@@ -0,0 +1,113 @@
+"""
+임베딩 기반 로컬 주제 분류기 (NeMo Guardrails 앞단 pre-filter)
+- 이미 로드된 BGE-M3 임베딩으로 on_topic / off_topic 예시 문장과의 코사인 유사도 비교
+- 클래스별 상위 k개 유사도 평균(kNN) 차이(margin)로 판정
+  - margin >= allow_threshold  → 로컬 통과
+  - margin <= -block_threshold → 로컬 차단
+  - 그 사이 (애매한 구간)       → NeMo로 escalate
+- 예시 문장: app/guardrails/topic_examples.yml
+"""
+import logging
+import os
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXAMPLES_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "guardrails", "topic_examples.yml")
+)
+
+ALLOW = "allow"
+BLOCK = "block"
+ESCALATE = "escalate"
+
+
+@dataclass(frozen=True)
+class TopicDecision:
+    """분류 결과 (decision: allow / block / escalate)"""
+    decision: str
+    on_score: float
+    off_score: float
+
+    @property
+    def margin(self) -> float:
+        return self.on_score - self.off_score
+
+
+def load_topic_examples(path: str = DEFAULT_EXAMPLES_PATH) -> Tuple[List[str], List[str]]:
+    """YAML 예시 파일 로드 → (on_topic, off_topic)"""
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    on_topic = [s.strip() for s in data.get("on_topic") or [] if s and s.strip()]
+    off_topic = [s.strip() for s in data.get("off_topic") or [] if s and s.strip()]
+    return on_topic, off_topic
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class TopicFilter:
+    """on/off 예시 임베딩 kNN 분류기 (fit 전에는 항상 escalate)"""
+
+    def __init__(
+        self,
+        on_topic: Sequence[str],
+        off_topic: Sequence[str],
+        top_k: int = 3,
+        allow_threshold: float = 0.05,
+        block_threshold: float = 0.08,
+    ):
+        if not on_topic or not off_topic:
+            raise ValueError("TopicFilter requires both on_topic and off_topic examples")
+        self.on_topic = list(on_topic)
+        self.off_topic = list(off_topic)
+        self.top_k = max(1, top_k)
+        self.allow_threshold = allow_threshold
+        self.block_threshold = block_threshold
+        self._on_matrix: Optional[np.ndarray] = None
+        self._off_matrix: Optional[np.ndarray] = None
+
+    def fit(self, encode: Callable[[List[str]], np.ndarray]):
+        """예시 문장 임베딩 (encode: 텍스트 목록 → [n, dim] 행렬)"""
+        matrix = _normalize(encode(self.on_topic + self.off_topic))
+        self._on_matrix = matrix[:len(self.on_topic)]
+        self._off_matrix = matrix[len(self.on_topic):]
+        logger.info(
+            f"Topic filter ready: {len(self.on_topic)} on-topic / {len(self.off_topic)} off-topic examples "
+            f"(k={self.top_k}, allow>={self.allow_threshold}, block<=-{self.block_threshold})"
+        )
+        return self
+
+    def is_ready(self) -> bool:
+        return self._on_matrix is not None
+
+    def _knn_score(self, matrix: np.ndarray, query: np.ndarray) -> float:
+        scores = matrix @ query
+        k = min(self.top_k, len(scores))
+        return float(np.partition(scores, -k)[-k:].mean())
+
+    def classify(self, embedding) -> TopicDecision:
+        """프롬프트 임베딩 하나를 판정"""
+        if not self.is_ready():
+            return TopicDecision(ESCALATE, 0.0, 0.0)
+
+        query = _normalize(np.asarray(embedding, dtype=np.float32).reshape(-1))
+        on_score = self._knn_score(self._on_matrix, query)
+        off_score = self._knn_score(self._off_matrix, query)
+        margin = on_score - off_score
+
+        if margin >= self.allow_threshold:
+            decision = ALLOW
+        elif margin <= -self.block_threshold:
+            decision = BLOCK
+        else:
+            decision = ESCALATE
+        return TopicDecision(decision, on_score, off_score)
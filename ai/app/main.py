@@ -1,13 +1,22 @@
 """
 Cukee AI Model API Server
 """
+import asyncio
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.models.model_loader import model_manager
 from app.models.embedding_loader import embedding_manager
+from app.core.inference_executor import inference_executor
+from app.core.guardrails_manager import guardrails_manager
+from app.core.config import settings
+from app.core.database import async_engine, engine
+from app.core.startup import startup_state
+from app.services.curation_pool import curation_pools
+from app.services.vector_index import vector_index
 from app.api.routes import generation, curation, system, movie_detail
 
 # 로깅 설정
@@ -22,14 +31,40 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """애플리케이션 시작/종료 시 실행"""
     logger.info("Starting Cukee AI Server...")
-    
-    # 모델 로드 (순차적)
-    model_manager.initialize()
-    embedding_manager.initialize()
-    
-    logger.info("✓ All models loaded successfully")
+
+    # 모델 로드 (LLM / 임베딩 / NeMo Guardrails 동시에, 백그라운드)
+    # - 서버는 바로 뜨고 /health/live 200, 로드 + warm-up이 끝나야 /health/ready 200
+    startup_state.register("llm")
+    startup_state.register("embedding")
+    startup_state.register("guardrails", required=False)
+    warmups = [("embedding", guardrails_manager.init_topic_filter)]  # 로컬 주제 분류기 (예시 문장 임베딩)
+    if settings.STARTUP_WARMUP_ENABLED:
+        warmups += [("llm", model_manager.warmup), ("embedding", embedding_manager.warmup)]
+    startup_task = asyncio.create_task(startup_state.run(
+        {
+            "llm": model_manager.initialize,
+            "embedding": embedding_manager.initialize,
+            "guardrails": guardrails_manager.initialize,
+        },
+        warmups,
+    ))
+
+    # 영화 임베딩 인메모리 인덱스 (백그라운드 적재, 그 전까지는 PGVECTOR 검색)
+    if settings.VECTOR_INDEX_ENABLED:
+        vector_index.start(engine)
+    # 티켓별 큐레이션 후보 풀 (백그라운드 적재, 그 전까지는 ORDER BY RANDOM() 쿼리)
+    if settings.CURATION_POOL_ENABLED:
+        curation_pools.start(engine)
+
     yield
     logger.info("Shutting down Cukee AI Server...")
+    startup_task.cancel()
+    vector_index.stop()
+    curation_pools.stop()
+    await async_engine.dispose()
+    inference_executor.shutdown()
+    embedding_manager.shutdown()
+    model_manager.shutdown()
 
 
 # FastAPI 앱 생성
@@ -42,6 +77,18 @@ app = FastAPI(
 
 Instrumentator().instrument(app).expose(app)
 
+
+@app.middleware("http")
+async def reject_until_ready(request: Request, call_next):
+    """모델 로드/warm-up 전에는 추론 API를 503으로 거절 (헬스/메트릭은 통과)"""
+    if request.url.path.startswith("/api/") and not startup_state.is_ready():
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "AI server is starting up"},
+            headers={"Retry-After": "10"},
+        )
+    return await call_next(request)
+
 # 라우터 등록
 app.include_router(generation.router, prefix="/api/v1", tags=["AI"])
 app.include_router(curation.router, prefix="/api/v1", tags=["Curation"])
@@ -0,0 +1,166 @@
+"""
+Cukee AI Model Host - 모델을 한 번만 올리고 여러 API 워커에 IPC로 추론 제공
+실행: python -m app.model_host   (MODEL_HOST_SOCKET 경로에서 대기)
+
+- LLM 엔진(+ MODEL_HOST_EMBEDDING=true면 BGE-M3)을 이 프로세스만 로드
+  → uvicorn --workers N 의 각 워커는 HTTP/SQL/guardrails만 처리하고 모델 메모리는 하나
+- 워커들의 동시 요청이 한 프로세스로 모이므로 배치 스케줄러/임베딩 micro-batcher가 워커 전체를 묶어 처리
+- 연결당 요청 하나씩 순차 처리 (워커 쪽 연결 풀이 동시성 담당)
+- op: health / generate / stream / encode / encode_batch
+- 엔진 메트릭(TTFT, 토큰 수, 배치 단계 시간 등)은 이 프로세스에서 기록 → MODEL_HOST_METRICS_PORT로 노출
+"""
+import asyncio
+import logging
+import os
+
+from app.core.config import settings
+from app.core.startup import StartupState
+from app.models.embedding_loader import EmbeddingManager
+from app.models.ipc import pack_array, read_frame, write_frame
+from app.models.model_loader import ModelManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ModelHost:
+    """Unix socket 모델 서버"""
+
+    def __init__(self, socket_path: str, serve_embedding: bool = True, warmup: bool = True):
+        self.socket_path = socket_path
+        self.models = ModelManager()
+        self.embeddings = EmbeddingManager() if serve_embedding else None
+        self.warmup = warmup
+        self.state = StartupState()
+        self._server = None
+
+    async def start(self):
+        """소켓을 먼저 열고 (health 응답 가능) 모델은 백그라운드 로드"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"Model host listening on {self.socket_path}")
+
+        loaders = {"llm": self.models.initialize}
+        warmups = [("llm", self.models.warmup)] if self.warmup else []
+        self.state.register("llm")
+        if self.embeddings is not None:
+            loaders["embedding"] = self.embeddings.initialize
+            self.state.register("embedding")
+            if self.warmup:
+                warmups.append(("embedding", self.embeddings.warmup))
+        await self.state.run(loaders, warmups)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def shutdown(self):
+        if self.embeddings is not None:
+            self.embeddings.shutdown()
+        self.models.shutdown()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_frame(reader)
+                if request is None:
+                    break
+                op, kwargs = request.get("op"), request.get("kwargs") or {}
+                try:
+                    if op == "stream":
+                        await self._stream(writer, kwargs)
+                    else:
+                        await write_frame(writer, {"result": await self._dispatch(op, kwargs)})
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    logger.error(f"Model host {op} failed: {e}")
+                    await write_frame(writer, {"error": str(e), "type": type(e).__name__})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, op: str, kwargs: dict):
+        if op == "health":
+            return self.health()
+        if not self.state.is_ready():
+            raise RuntimeError("Model host is starting up")
+        if op == "generate":
+            return await asyncio.to_thread(self.models.generate, **_generation_kwargs(kwargs))
+        if self.embeddings is None:
+            raise RuntimeError(f"Unsupported op (embedding not served): {op}")
+        if op == "encode":
+            return await asyncio.to_thread(self.embeddings.encode, kwargs["texts"])
+        if op == "encode_batch":
+            vectors = await asyncio.to_thread(
+                self.embeddings.encode_batch, kwargs["texts"], kwargs.get("batch_size", 64)
+            )
+            return pack_array(vectors)
+        raise RuntimeError(f"Unknown op: {op}")
+
+    async def _stream(self, writer: asyncio.StreamWriter, kwargs: dict):
+        """delta 프레임 전송, 클라이언트가 끊으면 생성 중단"""
+        if not self.state.is_ready():
+            raise RuntimeError("Model host is starting up")
+        stream = await asyncio.to_thread(self.models.stream, **_generation_kwargs(kwargs))
+        try:
+            while True:
+                delta = await asyncio.to_thread(next, stream, None)
+                if delta is None:
+                    break
+                await write_frame(writer, {"delta": delta})
+            await write_frame(writer, {"done": True})
+        finally:
+            stream.close()
+
+    def health(self) -> dict:
+        snapshot = self.state.snapshot()
+        snapshot["engines"] = self.models.engine_stats()
+        snapshot["prefix_cache"] = self.models.prefix_cache_stats()
+        snapshot["embedding_cache"] = self.embeddings.cache_stats() if self.embeddings is not None else None
+        return snapshot
+
+
+def _generation_kwargs(kwargs: dict) -> dict:
+    # JSON 왕복으로 tuple → list가 된 prefix 캐시 키 복원
+    prefix_key = kwargs.get("prefix_key")
+    if isinstance(prefix_key, list):
+        kwargs = {**kwargs, "prefix_key": tuple(prefix_key)}
+    return kwargs
+
+
+async def main():
+    if settings.MODEL_HOST_METRICS_PORT:
+        from prometheus_client import start_http_server
+
+        start_http_server(settings.MODEL_HOST_METRICS_PORT)
+    host = ModelHost(
+        settings.MODEL_HOST_SOCKET or "/tmp/cukee-model-host.sock",
+        serve_embedding=settings.MODEL_HOST_EMBEDDING,
+        warmup=settings.STARTUP_WARMUP_ENABLED,
+    )
+    try:
+        await host.serve_forever()
+    finally:
+        host.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
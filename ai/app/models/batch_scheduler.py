@@ -0,0 +1,419 @@
+"""
+Request-level Batch Scheduler
+- 동시에 들어온 채팅 생성 요청을 모아 하나의 패딩 배치로 실행
+- 요청별 샘플링 설정(temperature, top_p, top_k, max_new_tokens)은 행 단위로 적용
+- 스트리밍 요청은 decode step마다 on_token 콜백으로 토큰을 받고, cancelled로 중단 가능
+- target_chars가 있는 요청은 목표 글자 수를 넘긴 뒤 첫 문장 경계에서 종료 (max_new_tokens는 안전 상한)
+- 채팅 템플릿은 enable_thinking=False로 렌더링 (Qwen3 <think> 토큰 미생성)
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Hashable, List, Optional
+
+import torch
+
+from app.models.generation_request import GenerationRequest  # noqa: F401 (기존 import 경로 호환)
+from app.models.postprocess import BOUNDARY_CHARS, budget_reached
+from app.models.prefix_cache import PrefixCache, PrefixEntry, cache_to_tuples, tuples_to_cache
+
+logger = logging.getLogger(__name__)
+
+
+class BatchScheduler:
+    """대기 중인 요청을 최대 max_batch_size개, 최대 max_wait_ms 동안 모아 한 번에 생성"""
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        device: str,
+        max_batch_size: int = 8,
+        max_wait_ms: int = 20,
+        prefix_cache: Optional[PrefixCache] = None,
+        on_batch: Optional[Callable[[int, int, float], None]] = None,
+        on_stage: Optional[Callable[[str, float], None]] = None,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0, max_wait_ms)
+        self.prefix_cache = prefix_cache
+        # 배치 완료 시 (요청 수, 생성 토큰 수, 소요 초) 전달 - 엔진 tokens/sec 집계용
+        self.on_batch = on_batch
+        # 배치 단계별 (tokenize / prefill / decode) 소요 초 전달
+        self.on_stage = on_stage
+        self.last_batch_tokens = 0
+
+        self.pad_token_id = tokenizer.pad_token_id
+        if self.pad_token_id is None:
+            self.pad_token_id = tokenizer.eos_token_id
+        self.eos_token_ids = self._collect_eos_ids()
+        # 토큰 id → 문장 끝 문자 포함 여부 (글자 수 예산 검사 대상 토큰 선별)
+        self._boundary_tokens: dict = {}
+
+        self._queue: "queue.Queue[Optional[GenerationRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def _collect_eos_ids(self) -> List[int]:
+        """토크나이저와 generation_config의 EOS 토큰 통합"""
+        eos_ids = set()
+        if self.tokenizer.eos_token_id is not None:
+            eos_ids.add(self.tokenizer.eos_token_id)
+        generation_config = getattr(self.model, "generation_config", None)
+        config_eos = getattr(generation_config, "eos_token_id", None)
+        if isinstance(config_eos, int):
+            eos_ids.add(config_eos)
+        elif config_eos:
+            eos_ids.update(config_eos)
+        return sorted(eos_ids)
+
+    # ------------------------------------------------------------------
+    # 스케줄링
+    # ------------------------------------------------------------------
+    def start(self):
+        """배치 워커 스레드 시작"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._loop, name="generation-batcher", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Batch scheduler started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait_ms})"
+        )
+
+    def stop(self, timeout: float = 5.0):
+        """워커 종료 (이미 큐에 들어온 요청은 처리 후 종료)"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, request: GenerationRequest) -> Future:
+        """요청을 큐에 넣고 결과 Future 반환"""
+        if not self.is_running():
+            raise RuntimeError("Batch scheduler is not running")
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self, first: GenerationRequest) -> tuple[List[GenerationRequest], bool]:
+        """첫 요청 이후 max_wait_ms 동안 추가 요청 수집"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch, stopping = self._collect(first)
+            # 취소된 요청은 배치에서 제외
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if batch:
+                started = time.perf_counter()
+                try:
+                    texts = self.run_batch(batch)
+                except Exception as e:
+                    logger.error(f"Batched generation failed: {e}", exc_info=True)
+                    for request in batch:
+                        request.future.set_exception(e)
+                else:
+                    if self.on_batch is not None:
+                        self.on_batch(len(batch), self.last_batch_tokens, time.perf_counter() - started)
+                    for request, text in zip(batch, texts):
+                        request.future.set_result(text)
+
+            if stopping:
+                break
+
+    # ------------------------------------------------------------------
+    # 배치 생성
+    # ------------------------------------------------------------------
+    def _render(self, messages: list, add_generation_prompt: bool) -> str:
+        # enable_thinking: Qwen3 템플릿 변수 (빈 <think></think>를 미리 넣어 추론 토큰 생략), 다른 템플릿은 무시
+        return self.tokenizer.apply_chat_template(
+            messages,
+            tokenize=False,
+            add_generation_prompt=add_generation_prompt,
+            enable_thinking=False
+        )
+
+    def _tokenize(self, text: str) -> List[int]:
+        return self.tokenizer(text, add_special_tokens=False)["input_ids"]
+
+    @torch.no_grad()
+    def prefill_prefix(self, key: Hashable, messages: list) -> Optional[PrefixEntry]:
+        """system 메시지를 렌더링/토큰화하고 prefill 하여 prefix 캐시에 저장"""
+        if self.prefix_cache is None:
+            return None
+        text = self._render(messages[:1], add_generation_prompt=False)
+        input_ids = self._tokenize(text)
+        outputs = self.model(
+            input_ids=torch.tensor([input_ids], dtype=torch.long, device=self.device),
+            use_cache=True
+        )
+        layers = [(k.detach(), v.detach()) for k, v in cache_to_tuples(outputs.past_key_values)]
+        nbytes = sum(k.numel() * k.element_size() + v.numel() * v.element_size() for k, v in layers)
+        entry = PrefixEntry(key=key, text=text, input_ids=input_ids, past_key_values=layers, nbytes=nbytes)
+        self.prefix_cache.put(entry)
+        return entry
+
+    def _encode(self, batch: List[GenerationRequest]) -> List[tuple[Optional[PrefixEntry], List[int]]]:
+        """ChatML 템플릿 적용 후 토큰화 - 캐시된 system prefix가 있으면 suffix만 토큰화"""
+        encoded = []
+        for request in batch:
+            prompt = self._render(request.messages, add_generation_prompt=True)
+            entry = None
+            if (
+                self.prefix_cache is not None
+                and request.prefix_key is not None
+                and request.messages
+                and request.messages[0].get("role") == "system"
+            ):
+                prefix_text = self._render(request.messages[:1], add_generation_prompt=False)
+                # prefix 경계가 특수 토큰(<|im_end|>\n) 뒤라서 분리 토큰화해도 동일한 토큰열
+                if prompt.startswith(prefix_text):
+                    entry = self.prefix_cache.get(request.prefix_key, prefix_text)
+                    if entry is None:
+                        entry = self.prefill_prefix(request.prefix_key, request.messages)
+            if entry is not None:
+                encoded.append((entry, self._tokenize(prompt[len(entry.text):])))
+            else:
+                encoded.append((None, self._tokenize(prompt)))
+        return encoded
+
+    def _stack_prefixes(
+        self,
+        entries: List[Optional[PrefixEntry]],
+    ) -> tuple[Optional[object], torch.Tensor, torch.Tensor]:
+        """행별 prefix KV를 왼쪽 패딩으로 정렬해 하나의 캐시로 합침 (prefix 없는 행은 전부 패딩)"""
+        batch_size = len(entries)
+        prefix_len = max((len(e) for e in entries if e is not None), default=0)
+        prefix_ids = torch.full((batch_size, prefix_len), self.pad_token_id, dtype=torch.long)
+        prefix_mask = torch.zeros((batch_size, prefix_len), dtype=torch.long)
+        if prefix_len == 0:
+            return None, prefix_ids.to(self.device), prefix_mask.to(self.device)
+
+        template = next(e for e in entries if e is not None).past_key_values
+        layers = []
+        for layer_idx, (template_key, template_value) in enumerate(template):
+            keys, values = [], []
+            for entry in entries:
+                key_shape = (1, template_key.size(1), prefix_len, template_key.size(3))
+                value_shape = (1, template_value.size(1), prefix_len, template_value.size(3))
+                key = template_key.new_zeros(key_shape)
+                value = template_value.new_zeros(value_shape)
+                if entry is not None:
+                    entry_key, entry_value = entry.past_key_values[layer_idx]
+                    key[:, :, prefix_len - len(entry):] = entry_key
+                    value[:, :, prefix_len - len(entry):] = entry_value
+                keys.append(key)
+                values.append(value)
+            layers.append((torch.cat(keys, dim=0), torch.cat(values, dim=0)))
+
+        for i, entry in enumerate(entries):
+            if entry is not None:
+                prefix_ids[i, prefix_len - len(entry):] = torch.tensor(entry.input_ids, dtype=torch.long)
+                prefix_mask[i, prefix_len - len(entry):] = 1
+        return tuples_to_cache(layers), prefix_ids.to(self.device), prefix_mask.to(self.device)
+
+    def _left_pad(self, sequences: List[List[int]]) -> tuple[torch.Tensor, torch.Tensor]:
+        """왼쪽 패딩으로 마지막 위치를 정렬"""
+        max_len = max(len(seq) for seq in sequences)
+        input_ids = torch.full((len(sequences), max_len), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(sequences), max_len), dtype=torch.long)
+        for i, seq in enumerate(sequences):
+            if seq:
+                input_ids[i, max_len - len(seq):] = torch.tensor(seq, dtype=torch.long)
+                attention_mask[i, max_len - len(seq):] = 1
+        return input_ids.to(self.device), attention_mask.to(self.device)
+
+    @staticmethod
+    def _emit_tokens(batch, streaming_rows, next_tokens, finished):
+        """아직 끝나지 않은 스트리밍 행에 이번 step 토큰 전달 (콜백 예외 시 해당 행만 중단)"""
+        tokens = next_tokens.tolist()
+        done = finished.tolist()
+        for i in streaming_rows:
+            if done[i]:
+                continue
+            try:
+                batch[i].on_token(tokens[i])
+            except Exception as e:
+                logger.warning(f"Token callback failed, cancelling row: {e}")
+                batch[i].cancelled.set()
+
+    def _is_boundary_token(self, token_id: int) -> bool:
+        boundary = self._boundary_tokens.get(token_id)
+        if boundary is None:
+            piece = self.tokenizer.decode([token_id], skip_special_tokens=True)
+            boundary = any(ch in BOUNDARY_CHARS for ch in piece)
+            self._boundary_tokens[token_id] = boundary
+        return boundary
+
+    def _budget_reached(self, batch, budget_rows, generated, lengths, next_tokens, finished) -> List[bool]:
+        """목표 글자 수를 넘기고 문장 경계에서 끝난 행 (문장 끝 문자 토큰이 나온 행만 디코딩)"""
+        reached = [False] * len(batch)
+        tokens = next_tokens.tolist()
+        done = finished.tolist()
+        for i in budget_rows:
+            if done[i] or not self._is_boundary_token(tokens[i]):
+                continue
+            text = self.tokenizer.decode(generated[i, :lengths[i]], skip_special_tokens=True)
+            reached[i] = budget_reached(text, batch[i].target_chars)
+        return reached
+
+    @torch.no_grad()
+    def run_batch(self, batch: List[GenerationRequest]) -> List[str]:
+        """배치를 한 번의 prefill + 반복 decode로 실행하고 요청별 텍스트 반환"""
+        started = time.perf_counter()
+        for request in batch:
+            request.started_at = started
+        encoded = self._encode(batch)
+        for request, (entry, suffix) in zip(batch, encoded):
+            request.prompt_tokens = (len(entry) if entry is not None else 0) + len(suffix)
+        tokenized = time.perf_counter()
+        entries = [entry for entry, _ in encoded]
+        input_ids, suffix_mask = self._left_pad([suffix for _, suffix in encoded])
+        past_key_values, prefix_ids, prefix_mask = self._stack_prefixes(entries)
+        batch_size, device = input_ids.size(0), input_ids.device
+
+        temperatures = torch.tensor([r.temperature for r in batch], dtype=torch.float, device=device)
+        top_ps = torch.tensor([r.top_p for r in batch], dtype=torch.float, device=device)
+        top_ks = torch.tensor([r.top_k or 0 for r in batch], dtype=torch.long, device=device)
+        penalties = torch.tensor(
+            [r.repetition_penalty for r in batch], dtype=torch.float, device=device
+        ).unsqueeze(1)
+        max_new_tokens = torch.tensor([r.max_new_tokens for r in batch], dtype=torch.long, device=device)
+        eos_ids = torch.tensor(self.eos_token_ids, dtype=torch.long, device=device)
+
+        # 1. Prefill (캐시된 prefix 뒤의 suffix만 계산)
+        prefix_lens = prefix_mask.sum(dim=-1, keepdim=True)
+        attention_mask = torch.cat([prefix_mask, suffix_mask], dim=1)
+        position_ids = prefix_lens + (suffix_mask.cumsum(-1) - 1).clamp(min=0)
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=past_key_values,
+            use_cache=True
+        )
+        past_key_values = outputs.past_key_values
+        logits = outputs.logits[:, -1, :].float()
+
+        # 반복 패널티용 등장 토큰 (패딩 제외)
+        presence = torch.zeros((batch_size, logits.size(-1)), dtype=torch.long, device=device)
+        presence.scatter_add_(1, torch.cat([prefix_ids, input_ids], dim=1), attention_mask)
+        presence = presence > 0
+
+        rows = torch.arange(batch_size, device=device)
+        generated = torch.empty((batch_size, 0), dtype=torch.long, device=device)
+        lengths = torch.zeros(batch_size, dtype=torch.long, device=device)
+        finished = max_new_tokens <= 0
+        streaming_rows = [i for i, r in enumerate(batch) if r.on_token is not None]
+        budget_rows = [i for i, r in enumerate(batch) if r.target_chars]
+
+        # 2. Decode (행마다 다른 종료 시점)
+        for step in range(int(max_new_tokens.max().item())):
+            if finished.all():
+                break
+            logits = _apply_repetition_penalty(logits, presence, penalties)
+            next_tokens = _sample(logits, temperatures, top_ks, top_ps)
+            next_tokens = torch.where(finished, torch.full_like(next_tokens, self.pad_token_id), next_tokens)
+
+            generated = torch.cat([generated, next_tokens.unsqueeze(1)], dim=1)
+            lengths += (~finished).long()
+            presence[rows, next_tokens] = True
+            if streaming_rows:
+                self._emit_tokens(batch, streaming_rows, next_tokens, finished)
+            cancelled = torch.tensor([r.cancelled.is_set() for r in batch], dtype=torch.bool, device=device)
+            finished = finished | torch.isin(next_tokens, eos_ids) | (lengths >= max_new_tokens) | cancelled
+            if budget_rows:
+                reached = self._budget_reached(batch, budget_rows, generated, lengths, next_tokens, finished)
+                finished = finished | torch.tensor(reached, dtype=torch.bool, device=device)
+            all_finished = bool(finished.all())
+            if step == 0:
+                # 위 bool() 에서 첫 토큰까지 동기화됨 → prefill 종료 시점
+                first_token_at = time.perf_counter()
+                for request in batch:
+                    request.first_token_at = first_token_at
+            if all_finished:
+                break
+
+            attention_mask = torch.cat([attention_mask, attention_mask.new_ones((batch_size, 1))], dim=1)
+            position_ids = position_ids[:, -1:] + 1
+            outputs = self.model(
+                input_ids=next_tokens.unsqueeze(1),
+                attention_mask=attention_mask,
+                position_ids=position_ids,
+                past_key_values=past_key_values,
+                use_cache=True
+            )
+            past_key_values = outputs.past_key_values
+            logits = outputs.logits[:, -1, :].float()
+
+        # 3. 요청별 디코딩
+        token_counts = lengths.tolist()
+        self.last_batch_tokens = sum(token_counts)
+        for request, count in zip(batch, token_counts):
+            request.generated_tokens = count
+        if self.on_stage is not None:
+            finished_at = time.perf_counter()
+            first_token_at = batch[0].first_token_at or finished_at
+            self.on_stage("tokenize", tokenized - started)
+            self.on_stage("prefill", first_token_at - tokenized)
+            self.on_stage("decode", finished_at - first_token_at)
+        return [
+            self.tokenizer.decode(generated[i, :lengths[i]], skip_special_tokens=True)
+            for i in range(batch_size)
+        ]
+
+
+def _apply_repetition_penalty(logits: torch.Tensor, presence: torch.Tensor, penalties: torch.Tensor) -> torch.Tensor:
+    """HF RepetitionPenaltyLogitsProcessor와 동일한 규칙을 행 단위 패널티로 적용"""
+    penalized = torch.where(logits < 0, logits * penalties, logits / penalties)
+    return torch.where(presence, penalized, logits)
+
+
+def _sample(
+    logits: torch.Tensor,
+    temperatures: torch.Tensor,
+    top_ks: torch.Tensor,
+    top_ps: torch.Tensor,
+) -> torch.Tensor:
+    """행마다 다른 temperature/top_k/top_p로 샘플링 (temperature <= 0이면 greedy)"""
+    greedy = temperatures <= 0
+    scaled = logits / temperatures.clamp(min=1e-5).unsqueeze(1)
+
+    sorted_logits, sorted_idx = scaled.sort(dim=-1, descending=True)
+    vocab_size = logits.size(-1)
+    ranks = torch.arange(vocab_size, device=logits.device).unsqueeze(0)
+    k = torch.where(top_ks > 0, top_ks, torch.full_like(top_ks, vocab_size)).unsqueeze(1)
+    remove = ranks >= k
+
+    probs = sorted_logits.masked_fill(remove, float("-inf")).softmax(dim=-1)
+    cumulative = probs.cumsum(dim=-1)
+    # 누적 확률이 top_p를 넘기 전까지의 토큰만 유지 (최소 1개)
+    remove = remove | ((cumulative - probs) > top_ps.unsqueeze(1))
+
+    filtered = sorted_logits.masked_fill(remove, float("-inf"))
+    sampled_rank = torch.multinomial(filtered.softmax(dim=-1), num_samples=1)
+    sampled = sorted_idx.gather(1, sampled_rank).squeeze(1)
+    return torch.where(greedy, logits.argmax(dim=-1), sampled)
@@ -0,0 +1,139 @@
+"""
+BGE-M3 임베딩 백엔드 (EMBEDDING_BACKEND 설정으로 선택)
+- torch: SentenceTransformer (CUDA 있으면 GPU, 없으면 fp32 CPU)
+- onnx: ONNX Runtime + dynamic int8 양자화 모델 (app.scripts.export_embedding_onnx로 생성, CPU 전용)
+- fake: 텍스트 hash로 시드한 결정적 랜덤 벡터 (모델 없이 벤치마크/부하 테스트용, 의미 유사도 없음)
+- 두 백엔드 모두 BGE-M3 dense 임베딩 = CLS 토큰 hidden state + L2 정규화
+  → movie_embeddings에 저장된 벡터(torch fp32)와 같은 공간 (app.scripts.evaluate_embedding_backends로 검증)
+"""
+import hashlib
+import logging
+import os
+import time
+from typing import List
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILE = "model.int8.onnx"
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+class TorchEmbeddingBackend:
+    """SentenceTransformer (PyTorch)"""
+
+    name = "torch"
+
+    def __init__(self, model_path: str):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = SentenceTransformer(model_path)
+        self.model.to(self.device)
+        self.model.eval()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+
+class OnnxEmbeddingBackend:
+    """ONNX Runtime int8 (CPU) - 출력 last_hidden_state의 CLS 벡터 사용"""
+
+    name = "onnx"
+
+    def __init__(self, model_dir: str, threads: int = 0, max_length: int = 512):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_file = os.path.join(model_dir, ONNX_MODEL_FILE)
+        if not os.path.exists(model_file):
+            raise RuntimeError(
+                f"ONNX embedding model not found at {model_file} "
+                f"(run: python -m app.scripts.export_embedding_onnx --output {model_dir})"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        # 요청 병렬성은 micro-batcher가 맡으므로 연산 내부 스레드만 사용
+        options.intra_op_num_threads = threads or (os.cpu_count() or 1)
+        options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(model_file, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_length = max_length
+        self.device = "cpu"
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        # 길이순으로 묶어 패딩 최소화 후 원래 순서로 복원
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        output = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), max(1, batch_size)):
+            chunk = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in chunk],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+            hidden = self.session.run(None, feeds)[0]
+            vectors = _l2_normalize(hidden[:, 0])
+            if output.shape[1] == 0:
+                output = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            output[chunk] = vectors
+        return output
+
+
+class FakeEmbeddingBackend:
+    """결정적 가짜 임베딩 - 같은 텍스트에는 항상 같은 벡터, latency_ms로 배치당 encode 시간 흉내"""
+
+    name = "fake"
+
+    def __init__(self, dim: int = 1024, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency = max(0.0, latency_ms) / 1000
+        self.device = "cpu"
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        if self.latency:
+            time.sleep(self.latency)
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+            vectors[i] = np.random.default_rng(seed).normal(size=self.dim)
+        return _l2_normalize(vectors)
+
+
+BACKENDS = ("torch", "onnx", "fake")
+
+
+def create_embedding_backend(name: str):
+    """설정값으로 임베딩 백엔드 생성"""
+    if name == "torch":
+        return TorchEmbeddingBackend(settings.EMBEDDING_MODEL_PATH)
+    if name == "onnx":
+        return OnnxEmbeddingBackend(
+            settings.EMBEDDING_ONNX_PATH,
+            threads=settings.EMBEDDING_ONNX_THREADS,
+            max_length=settings.EMBEDDING_MAX_SEQ_LENGTH
+        )
+    if name == "fake":
+        return FakeEmbeddingBackend(dim=settings.EMBEDDING_FAKE_DIM, latency_ms=settings.EMBEDDING_FAKE_LATENCY_MS)
+    raise ValueError(f"Unknown embedding backend: {name} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,217 @@
+"""
+쿼리 임베딩 캐시 + micro-batcher
+- EmbeddingCache: 정규화한 프롬프트 → 임베딩 LRU + TTL (메모리 상한 bytes 기준)
+- EmbeddingBatcher: 동시에 들어온 encode 호출을 max_wait_ms 동안 모아 model.encode 한 번으로 처리
+  같은 프롬프트가 이미 대기/처리 중이면 그 결과를 함께 기다림 (중복 forward 없음)
+- 쿼리 임베딩은 LLM 추론 실행기(inference_executor)를 거치지 않음 → 긴 생성 뒤에 줄 서지 않음
+  (배처 Future를 이벤트 루프에서 바로 await, 배처가 없으면 전용 스레드 풀)
+"""
+import asyncio
+import logging
+import queue
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_BYTES,
+    EMBEDDING_CACHE_LOOKUPS,
+    EMBEDDING_ENCODE_LATENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """캐시 키: 유니코드 정규화(NFKC) + 공백 정리 + 소문자"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+
+
+class EmbeddingCache:
+    """프롬프트 임베딩 LRU + TTL 캐시 (thread-safe)"""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            vector, expires_at = item
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        if vector.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+            self._bytes += vector.nbytes
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            EMBEDDING_CACHE_BYTES.set(self._bytes)
+
+    def _remove(self, key: str):
+        vector, _ = self._entries.pop(key)
+        self._bytes -= vector.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            EMBEDDING_CACHE_BYTES.set(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+class EmbeddingBatcher:
+    """
+    단건 encode 요청을 모아 배치 encode (워커 스레드 1개)
+    - encode_many: 텍스트 목록 → 정규화된 float32 [n, dim]
+    """
+
+    def __init__(
+        self,
+        encode_many: Callable[[List[str]], np.ndarray],
+        cache: Optional[EmbeddingCache] = None,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self.encode_many = encode_many
+        self.cache = cache
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._queue: "queue.Queue" = queue.Queue()
+        # 정규화 키 → 대기/처리 중인 Future (동시 중복 요청 합치기)
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._loop, name="embedding-batcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Embedding batcher started (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait_ms})")
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def encode(self, text: str) -> np.ndarray:
+        """프롬프트 하나 임베딩 (블로킹)"""
+        return self.submit(text).result()
+
+    def submit(self, text: str) -> Future:
+        """프롬프트 하나 임베딩 요청 (캐시 → 진행 중 요청 합류 → 배치 대기열), 결과 Future 반환"""
+        key = normalize_prompt(text)
+        if self.cache is not None:
+            vector = self.cache.get(key)
+            if vector is not None:
+                EMBEDDING_CACHE_LOOKUPS.labels(result="hit").inc()
+                future = Future()
+                future.set_result(vector)
+                return future
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                EMBEDDING_CACHE_LOOKUPS.labels(result="coalesced").inc()
+            else:
+                EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc()
+                future = Future()
+                self._pending[key] = future
+                if not self.is_running():
+                    self._pending.pop(key)
+                    raise RuntimeError("Embedding batcher is not running")
+                self._queue.put((key, text, future))
+        return future
+
+    def _collect(self, first) -> Tuple[list, bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            self._run(batch)
+            if stopping:
+                break
+
+    def _run(self, batch: list):
+        started = time.perf_counter()
+        try:
+            vectors = np.asarray(self.encode_many([text for _, text, _ in batch]), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Batched embedding failed: {e}")
+            vectors, error = None, e
+        EMBEDDING_BATCH_SIZE.observe(len(batch))
+        EMBEDDING_ENCODE_LATENCY.observe(time.perf_counter() - started)
+
+        for i, (key, _, future) in enumerate(batch):
+            if vectors is None:
+                future.set_exception(error)
+            else:
+                vector = vectors[i].copy()
+                vector.setflags(write=False)
+                if self.cache is not None:
+                    self.cache.put(key, vector)
+                future.set_result(vector)
+            with self._lock:
+                self._pending.pop(key, None)
+
+
+_encode_executor: Optional[ThreadPoolExecutor] = None
+
+
+async def run_encode(func: Callable[..., Any], *args) -> Any:
+    """배처를 거치지 않는 임베딩 호출을 전용 스레드 풀에서 실행"""
+    global _encode_executor
+    if _encode_executor is None:
+        _encode_executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.EMBEDDING_ENCODE_WORKERS), thread_name_prefix="embedding"
+        )
+    return await asyncio.get_running_loop().run_in_executor(_encode_executor, func, *args)
@@ -1,11 +1,12 @@
 """
 BGE-M3 임베딩 모델 로더
 """
+import asyncio
 import logging
-from typing import List, Union
-from sentence_transformers import SentenceTransformer
-import torch
+from typing import List, Optional, Union
 from app.core.config import settings
+from app.models.embedding_backends import create_embedding_backend
+from app.models.embedding_batcher import EmbeddingBatcher, EmbeddingCache, run_encode
 
 logger = logging.getLogger(__name__)
 
@@ -13,36 +14,95 @@ class EmbeddingManager:
     """BGE-M3 임베딩 모델 관리"""
     
     def __init__(self):
+        # EMBEDDING_BACKEND: torch(SentenceTransformer) / onnx(int8 ONNX Runtime)
         self.model = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # 단건 쿼리 임베딩: 캐시 + 동시 요청 micro-batching
+        self.cache: Optional[EmbeddingCache] = None
+        self.batcher: Optional[EmbeddingBatcher] = None
         
     def initialize(self):
         """임베딩 모델 로드"""
         try:
-            logger.info(f"Loading embedding model from: {settings.EMBEDDING_MODEL_PATH}")
-            self.model = SentenceTransformer(settings.EMBEDDING_MODEL_PATH)
-            self.model.to(self.device)
-            self.model.eval()
-            logger.info("Embedding model loaded successfully")
+            logger.info(f"Loading embedding model ({settings.EMBEDDING_BACKEND} backend)")
+            self.model = create_embedding_backend(settings.EMBEDDING_BACKEND)
+            logger.info(f"Embedding model loaded successfully (device={self.model.device})")
+
+            if settings.EMBEDDING_CACHE_ENABLED:
+                self.cache = EmbeddingCache(
+                    max_bytes=settings.EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+                    ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS
+                )
+            self.batcher = EmbeddingBatcher(
+                lambda texts: self.encode_batch(texts, batch_size=len(texts)),
+                cache=self.cache,
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS
+            )
+            self.batcher.start()
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise
 
     def encode(self, texts: Union[str, List[str]]) -> List[float]:
-        """텍스트 임베딩 생성 (1024차원)"""
+        """텍스트 임베딩 생성 (1024차원) - 단건 문자열은 캐시/배처 경유"""
         if not self.model:
             raise RuntimeError("Embedding model not initialized")
+
+        if isinstance(texts, str) and self.batcher is not None and self.batcher.is_running():
+            return self.batcher.encode(texts).tolist()
             
         try:
             # BGE-M3는 [1024] 차원 벡터 반환
-            embeddings = self.model.encode(texts, normalize_embeddings=True)
-            return embeddings.tolist()
+            if isinstance(texts, str):
+                return self.model.encode([texts])[0].tolist()
+            return self.model.encode(texts).tolist()
         except Exception as e:
             logger.error(f"Embedding generation failed: {e}")
             raise
 
+    async def encode_async(self, text: str) -> List[float]:
+        """프롬프트 하나 임베딩 (이벤트 루프용, LLM 추론 슬롯을 쓰지 않음)"""
+        if not self.model:
+            raise RuntimeError("Embedding model not initialized")
+        if self.batcher is not None and self.batcher.is_running():
+            vector = await asyncio.wrap_future(self.batcher.submit(text))
+            return vector.tolist()
+        return await run_encode(self.encode, text)
+
+    def encode_batch(self, texts: List[str], batch_size: int = 64):
+        """여러 텍스트를 한 번에 임베딩 (정규화된 float32 ndarray [n, 1024])"""
+        if not self.model:
+            raise RuntimeError("Embedding model not initialized")
+
+        return self.model.encode(texts, batch_size=batch_size)
+
+    def warmup(self):
+        """단건(배처 경유) + 배치 encode 한 번씩 (첫 요청의 커널/세션 초기화 비용 제거)"""
+        self.encode_batch(["영화 추천해줘", "잔잔한 감성 영화"], batch_size=2)
+        if self.batcher is not None and self.batcher.is_running():
+            self.batcher.encode("영화 추천해줘")
+        logger.info("✓ Embedding model warmed up")
+
     def is_ready(self) -> bool:
         return self.model is not None
 
+    def cache_stats(self) -> Optional[dict]:
+        return self.cache.stats() if self.cache is not None else None
+
+    def shutdown(self):
+        """배처 워커 종료"""
+        if self.batcher is not None:
+            self.batcher.stop()
+            self.batcher = None
+
+def _create_embedding_manager():
+    """MODEL_HOST_SOCKET + MODEL_HOST_EMBEDDING이면 모델 호스트 프록시"""
+    if settings.MODEL_HOST_SOCKET and settings.MODEL_HOST_EMBEDDING:
+        from app.models.remote import RemoteEmbeddingManager, model_host_client
+
+        return RemoteEmbeddingManager(model_host_client(), settings.MODEL_HOST_STARTUP_TIMEOUT_SECONDS)
+    return EmbeddingManager()
+
+
 # 전역 임베딩 매니저
-embedding_manager = EmbeddingManager()
+embedding_manager = _create_embedding_manager()
@@ -0,0 +1,411 @@
+"""
+LLM 추론 엔진 (LLM_ENGINE 설정으로 선택)
+- hf: transformers + bitsandbytes 4-bit + BatchScheduler (GPU, 기본값)
+- llama_cpp: llama.cpp GGUF 양자화 모델 (CPU 서버/스테이징, llama-cpp-python 필요)
+- fake: 모델 없는 결정적 엔진 (CI, 벤치마크)
+- 모든 엔진은 GenerationRequest를 받아 request.future로 결과 텍스트 반환
+  (on_token 스트리밍, cancelled 중단, max_new_tokens / target_chars 정지 조건 공통)
+- 엔진별 생성 토큰 수와 tokens/sec 집계 (stats(), Prometheus)
+- torch/transformers 등 무거운 import는 load()에서 (서버 시작 시 다른 구성요소 로드와 겹쳐 진행)
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import LLM_BATCH_STAGE_LATENCY, LLM_GENERATED_TOKENS, LLM_TOKENS_PER_SECOND
+from app.models.generation_request import GenerationRequest
+from app.models.postprocess import BOUNDARY_CHARS, budget_reached
+
+if TYPE_CHECKING:
+    from app.models.batch_scheduler import BatchScheduler
+    from app.models.prefix_cache import PrefixCache
+
+logger = logging.getLogger(__name__)
+
+# (prefix 캐시 키, system 메시지) - 엔진 로드 시 미리 prefill 할 프롬프트
+PrefixPrompt = Tuple[Hashable, list]
+
+# GGUF에 chat template이 없을 때 사용하는 ChatML
+CHATML_TEMPLATE = (
+    "{% for message in messages %}"
+    "<|im_start|>{{ message['role'] }}\n{{ message['content'] }}<|im_end|>\n"
+    "{% endfor %}"
+    "{% if add_generation_prompt %}<|im_start|>assistant\n"
+    "{% if enable_thinking is defined and not enable_thinking %}<think>\n\n</think>\n\n{% endif %}"
+    "{% endif %}"
+)
+
+
+class EngineStats:
+    """엔진별 처리량 집계 (여러 스레드에서 record)"""
+
+    def __init__(self, engine: str):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.tokens = 0
+        self.busy_seconds = 0.0
+
+    def record(self, requests: int, tokens: int, seconds: float):
+        with self._lock:
+            self.requests += requests
+            self.tokens += tokens
+            self.busy_seconds += seconds
+        LLM_GENERATED_TOKENS.labels(engine=self.engine).inc(tokens)
+        if tokens and seconds > 0:
+            LLM_TOKENS_PER_SECOND.labels(engine=self.engine).observe(tokens / seconds)
+
+    def record_stage(self, stage: str, seconds: float):
+        """배치 단계(tokenize / prefill / decode) 소요 시간"""
+        LLM_BATCH_STAGE_LATENCY.labels(engine=self.engine, stage=stage).observe(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "engine": self.engine,
+                "requests": self.requests,
+                "tokens": self.tokens,
+                "tokens_per_sec": round(self.tokens / self.busy_seconds, 2) if self.busy_seconds else 0.0,
+            }
+
+
+class LLMEngine:
+    """추론 엔진 공통 인터페이스"""
+
+    name = "base"
+
+    def __init__(self):
+        self.tokenizer = None
+        self.stats = EngineStats(self.name)
+
+    def load(self, prefix_prompts: Iterable[PrefixPrompt] = ()):
+        """모델 로드 (prefix_prompts: prefix 캐시를 지원하는 엔진만 사용)"""
+        raise NotImplementedError
+
+    def submit(self, request: GenerationRequest) -> Future:
+        """요청 제출 후 request.future 반환"""
+        raise NotImplementedError
+
+    def is_ready(self) -> bool:
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+    def prefix_cache_stats(self) -> Optional[dict]:
+        return None
+
+
+class HFEngine(LLMEngine):
+    """transformers + bitsandbytes 4-bit (동시 요청은 BatchScheduler로 묶어 decode)"""
+
+    name = "hf"
+
+    def __init__(self, model_name: str, max_batch_size: int = 8, max_wait_ms: int = 20, prefix_cache_mb: int = 0):
+        super().__init__()
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.prefix_cache_mb = prefix_cache_mb
+        self.model = None
+        self.scheduler: Optional["BatchScheduler"] = None
+        self.prefix_cache: Optional["PrefixCache"] = None
+
+    def load(self, prefix_prompts: Iterable[PrefixPrompt] = ()):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+
+        from app.models.batch_scheduler import BatchScheduler
+        from app.models.prefix_cache import PrefixCache
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        logger.info(f"Loading model: {self.model_name} (device={device})")
+
+        # 4-bit 양자화 설정 (메모리 절약, bitsandbytes는 CUDA 전용 → CPU는 fp32 그대로)
+        bnb_config = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_use_double_quant=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.float16
+        ) if device == "cuda" else None
+
+        # 토크나이저 로드
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name, trust_remote_code=True)
+
+        # 패딩 토큰 설정
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        # 모델 로드
+        self.model = AutoModelForCausalLM.from_pretrained(
+            self.model_name,
+            quantization_config=bnb_config,
+            device_map="auto" if device == "cuda" else None,
+            trust_remote_code=True,
+            dtype=torch.float16 if device == "cuda" else torch.float32
+        )
+        logger.info("✓ Model loaded successfully")
+
+        # 테마별 페르소나 system prompt KV 캐시
+        if self.prefix_cache_mb > 0:
+            self.prefix_cache = PrefixCache(max_bytes=self.prefix_cache_mb * 1024 * 1024)
+
+        # 동시 요청을 한 번의 forward pass로 묶는 배치 스케줄러
+        self.scheduler = BatchScheduler(
+            self.model,
+            self.tokenizer,
+            device,
+            max_batch_size=self.max_batch_size,
+            max_wait_ms=self.max_wait_ms,
+            prefix_cache=self.prefix_cache,
+            on_batch=self.stats.record,
+            on_stage=self.stats.record_stage
+        )
+        # 스케줄러 스레드 시작 전에 prefill (모델 동시 접근 방지)
+        if self.prefix_cache is not None:
+            count = sum(
+                1 for key, messages in prefix_prompts
+                if self.scheduler.prefill_prefix(key, messages) is not None
+            )
+            if count:
+                logger.info(f"✓ Prefix cache warmed: {count} prompts, {self.prefix_cache.stats()}")
+        self.scheduler.start()
+
+    def submit(self, request: GenerationRequest) -> Future:
+        if self.scheduler is None:
+            raise RuntimeError("Model is not initialized")
+        return self.scheduler.submit(request)
+
+    def is_ready(self) -> bool:
+        return self.model is not None and self.scheduler is not None
+
+    def shutdown(self):
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler = None
+
+    def prefix_cache_stats(self) -> Optional[dict]:
+        return self.prefix_cache.stats() if self.prefix_cache is not None else None
+
+
+class SequentialEngine(LLMEngine):
+    """요청을 워커 스레드에서 한 건씩 토큰 단위로 생성하는 엔진 공통 루프"""
+
+    eos_token_ids: frozenset = frozenset()
+
+    def __init__(self, workers: int = 1):
+        super().__init__()
+        self.workers = max(1, workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _generate_tokens(self, request: GenerationRequest) -> Iterator[int]:
+        """요청의 토큰 id를 순서대로 생성 (중단 시 iterator를 버림)"""
+        raise NotImplementedError
+
+    def _start_pool(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-engine")
+
+    def submit(self, request: GenerationRequest) -> Future:
+        if self._pool is None:
+            raise RuntimeError(f"{self.name} engine is not loaded")
+        self._pool.submit(self._run, request)
+        return request.future
+
+    def is_ready(self) -> bool:
+        return self._pool is not None
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _budget_reached(self, tokens: List[int], target_chars: int) -> bool:
+        # 문장 끝 문자가 포함된 토큰이 나왔을 때만 전체 디코딩
+        piece = self.tokenizer.decode(tokens[-1:], skip_special_tokens=True)
+        if not any(ch in BOUNDARY_CHARS for ch in piece):
+            return False
+        return budget_reached(self.tokenizer.decode(tokens, skip_special_tokens=True), target_chars)
+
+    def _run(self, request: GenerationRequest):
+        if not request.future.set_running_or_notify_cancel():
+            return
+        started = request.started_at = time.perf_counter()
+        tokens: List[int] = []
+        try:
+            for token in self._generate_tokens(request):
+                if token in self.eos_token_ids:
+                    break
+                if not tokens:
+                    request.first_token_at = time.perf_counter()
+                tokens.append(token)
+                if request.on_token is not None:
+                    try:
+                        request.on_token(token)
+                    except Exception as e:
+                        logger.warning(f"Token callback failed, cancelling request: {e}")
+                        request.cancelled.set()
+                if len(tokens) >= request.max_new_tokens or request.cancelled.is_set():
+                    break
+                if request.target_chars and self._budget_reached(tokens, request.target_chars):
+                    break
+            text = self.tokenizer.decode(tokens, skip_special_tokens=True)
+            request.generated_tokens = len(tokens)
+        except Exception as e:
+            logger.error(f"{self.name} generation failed: {e}", exc_info=True)
+            request.future.set_exception(e)
+            return
+        self.stats.record(1, len(tokens), time.perf_counter() - started)
+        request.future.set_result(text)
+
+
+class _LlamaTokenizer:
+    """llama.cpp detokenize를 HF tokenizer.decode 형태로 감쌈 (TokenStream 호환)"""
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def decode(self, token_ids, skip_special_tokens: bool = True) -> str:
+        # 불완전한 멀티바이트 문자는 "�"로 → TokenStream이 확정될 때까지 보류
+        return self.llm.detokenize(list(token_ids)).decode("utf-8", errors="replace")
+
+
+class LlamaCppEngine(SequentialEngine):
+    """
+    llama.cpp GGUF 엔진 (CPU)
+    - 컨텍스트 하나를 순차 사용, 직전 요청과 겹치는 prompt prefix(페르소나 system prompt)는 llama.cpp가 재사용
+    """
+
+    name = "llama_cpp"
+
+    def __init__(self, model_path: str, n_ctx: int = 4096, n_threads: int = 0):
+        super().__init__(workers=1)
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.llm = None
+        self._template = None
+        self._special_tokens = {}
+
+    def load(self, prefix_prompts: Iterable[PrefixPrompt] = ()):
+        try:
+            from llama_cpp import Llama
+        except ImportError as e:
+            raise RuntimeError("LLM_ENGINE=llama_cpp requires llama-cpp-python (pip install llama-cpp-python)") from e
+        from jinja2.sandbox import ImmutableSandboxedEnvironment
+
+        if not self.model_path:
+            raise RuntimeError("LLM_GGUF_PATH is not set")
+
+        logger.info(f"Loading GGUF model: {self.model_path} (n_ctx={self.n_ctx}, n_threads={self.n_threads or 'auto'})")
+        self.llm = Llama(
+            model_path=self.model_path,
+            n_ctx=self.n_ctx,
+            n_threads=self.n_threads or None,
+            n_gpu_layers=0,
+            verbose=False
+        )
+        self.tokenizer = _LlamaTokenizer(self.llm)
+        self.eos_token_ids = frozenset({self.llm.token_eos()})
+        self._special_tokens = {
+            "bos_token": self.tokenizer.decode([self.llm.token_bos()]),
+            "eos_token": self.tokenizer.decode([self.llm.token_eos()]),
+        }
+        template = self.llm.metadata.get("tokenizer.chat_template") or CHATML_TEMPLATE
+        self._template = ImmutableSandboxedEnvironment(trim_blocks=True, lstrip_blocks=True).from_string(template)
+        self._start_pool()
+        logger.info("✓ GGUF model loaded successfully")
+
+    def _generate_tokens(self, request: GenerationRequest) -> Iterator[int]:
+        prompt = self._template.render(
+            messages=request.messages,
+            add_generation_prompt=True,
+            enable_thinking=False,
+            **self._special_tokens
+        )
+        prompt_tokens = self.llm.tokenize(prompt.encode("utf-8"), add_bos=False, special=True)
+        request.prompt_tokens = len(prompt_tokens)
+        return self.llm.generate(
+            prompt_tokens,
+            top_k=request.top_k or 0,
+            top_p=request.top_p,
+            temp=request.temperature,
+            repeat_penalty=request.repetition_penalty,
+            reset=True
+        )
+
+
+class _CharTokenizer:
+    """FakeEngine용: 토큰 id = 유니코드 코드포인트 (0은 EOS)"""
+
+    def decode(self, token_ids, skip_special_tokens: bool = True) -> str:
+        return "".join(chr(t) for t in token_ids if t)
+
+
+class FakeEngine(SequentialEngine):
+    """
+    결정적 가짜 엔진 - 같은 메시지에는 항상 같은 출력, 글자 하나가 토큰 하나
+    - token_latency_ms로 decode 속도를 흉내 내 벤치마크/부하 테스트에 사용
+    """
+
+    name = "fake"
+    eos_token_ids = frozenset({0})
+
+    SENTENCES = [
+        "오늘 같은 날엔 이 영화들이 딱이에요.",
+        "잔잔하게 마음을 어루만져 줄 거예요.",
+        "한 편씩 천천히 음미해 보세요.",
+        "끝나고 나면 긴 여운이 남을 거예요!",
+        "당신의 취향을 제대로 저격할 라인업이에요.",
+        "팝콘 준비하셨나요?",
+    ]
+
+    def __init__(self, token_latency_ms: float = 0.0, workers: int = 8):
+        super().__init__(workers=workers)
+        self.token_latency = max(0.0, token_latency_ms) / 1000
+
+    def load(self, prefix_prompts: Iterable[PrefixPrompt] = ()):
+        self.tokenizer = _CharTokenizer()
+        self._start_pool()
+        logger.info(f"Fake engine ready (token_latency={self.token_latency * 1000:.1f}ms)")
+
+    def _generate_tokens(self, request: GenerationRequest) -> Iterator[int]:
+        request.prompt_tokens = sum(len(m.get("content", "")) for m in request.messages)
+        digest = hashlib.sha256(json.dumps(request.messages, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        seed = int(digest.hexdigest()[:8], 16)
+        text = " ".join(self.SENTENCES[(seed + i) % len(self.SENTENCES)] for i in range(len(self.SENTENCES)))
+        for ch in text:
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            yield ord(ch)
+        yield 0
+
+
+ENGINES = ("hf", "llama_cpp", "fake")
+
+
+def create_engine(name: str) -> LLMEngine:
+    """설정값으로 엔진 생성 (로드는 호출 측에서 load())"""
+    if name == "hf":
+        return HFEngine(
+            settings.BASE_MODEL,
+            max_batch_size=settings.GENERATION_MAX_BATCH_SIZE,
+            max_wait_ms=settings.GENERATION_MAX_WAIT_MS,
+            prefix_cache_mb=settings.PREFIX_CACHE_MAX_MB if settings.PREFIX_CACHE_ENABLED else 0
+        )
+    if name == "llama_cpp":
+        return LlamaCppEngine(
+            settings.LLM_GGUF_PATH,
+            n_ctx=settings.LLM_CONTEXT_SIZE,
+            n_threads=settings.LLM_CPU_THREADS
+        )
+    if name == "fake":
+        return FakeEngine(
+            token_latency_ms=settings.LLM_FAKE_TOKEN_LATENCY_MS,
+            workers=settings.GENERATION_MAX_BATCH_SIZE
+        )
+    raise ValueError(f"Unknown LLM engine: {name} (expected one of {', '.join(ENGINES)})")
@@ -0,0 +1,34 @@
+"""
+생성 요청 데이터 (torch 등 무거운 의존성 없이 import 가능 - 엔진/스트림/모델 매니저 공용)
+"""
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Optional
+
+
+@dataclass
+class GenerationRequest:
+    """배치에 들어가는 단일 생성 요청"""
+    messages: list
+    max_new_tokens: int = 512
+    temperature: float = 0.7
+    top_p: float = 0.9
+    top_k: int = 50
+    repetition_penalty: float = 1.1
+    # 목표 글자 수 - 넘긴 뒤 문장이 끝나면 종료 (None이면 max_new_tokens/EOS까지)
+    target_chars: Optional[int] = None
+    # (endpoint 템플릿, 테마) - 첫 system 메시지의 KV prefix 캐시 키
+    prefix_key: Optional[Hashable] = None
+    # 스트리밍: 생성된 토큰 id를 decode step마다 전달 (배치 스레드에서 호출)
+    on_token: Optional[Callable[[int], None]] = None
+    # 설정되면 다음 decode step에서 해당 행 생성 중단 (클라이언트 연결 종료 등)
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    future: Future = field(default_factory=Future)
+    # 계측 (엔진이 채움, perf_counter 기준) - 대기 시간 / TTFT / 토큰 수 메트릭용
+    submitted_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+    first_token_at: Optional[float] = None
+    prompt_tokens: int = 0
+    generated_tokens: int = 0
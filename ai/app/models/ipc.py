@@ -0,0 +1,87 @@
+"""
+모델 호스트 ↔ API 워커 IPC 프레이밍 (Unix domain socket)
+- 프레임: 4바이트 big-endian 길이 + UTF-8 JSON
+- 임베딩 행렬은 float32 바이트를 base64로 담아 전송 (JSON 숫자 배열 대비 직렬화 비용/크기 절감)
+- 요청: {"op": ..., "kwargs": {...}} / 응답: {"result": ...} | {"delta": ...}* + {"done": true} | {"error": ..., "type": ...}
+"""
+import asyncio
+import base64
+import json
+import socket
+import struct
+from typing import Any
+
+import numpy as np
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class ModelHostError(RuntimeError):
+    """모델 호스트가 처리 중 오류를 반환 (연결 실패 포함)"""
+
+
+def pack_array(array: np.ndarray) -> dict:
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    return {"shape": list(array.shape), "data": base64.b64encode(array.tobytes()).decode("ascii")}
+
+
+def unpack_array(payload: dict) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype=np.float32).reshape(payload["shape"])
+
+
+def _encode(message: Any) -> bytes:
+    body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+def _decode(body: bytes) -> Any:
+    return json.loads(body.decode("utf-8"))
+
+
+def _check_length(length: int):
+    if length > MAX_FRAME_BYTES:
+        raise ModelHostError(f"IPC frame too large: {length} bytes")
+
+
+# 블로킹 소켓 (API 워커의 추론 스레드)
+
+def send_frame(sock: socket.socket, message: Any):
+    sock.sendall(_encode(message))
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Model host closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_frame(sock: socket.socket) -> Any:
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    _check_length(length)
+    return _decode(_recv_exact(sock, length))
+
+
+# asyncio 스트림 (모델 호스트)
+
+async def read_frame(reader: asyncio.StreamReader) -> Any:
+    """다음 프레임 (연결이 정상 종료되면 None)"""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise
+    (length,) = _HEADER.unpack(header)
+    _check_length(length)
+    return _decode(await reader.readexactly(length))
+
+
+async def write_frame(writer: asyncio.StreamWriter, message: Any):
+    writer.write(_encode(message))
+    await writer.drain()
@@ -1,64 +1,99 @@
 """
 AI Model Loader - Single Model (Qwen) with System Prompting
 """
-import os
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
-
 import logging
-from typing import Dict, Optional
+from concurrent.futures import Future
+from typing import Hashable, Optional
 from app.core.config import settings
+from app.core.metrics import (
+    LLM_IN_FLIGHT,
+    LLM_PROMPT_TOKENS,
+    LLM_QUEUE_WAIT,
+    LLM_REQUEST_GENERATED_TOKENS,
+    LLM_TIME_TO_FIRST_TOKEN,
+    theme_label,
+)
+from app.core.prompts import SYSTEM_PROMPT_BUILDERS
+from app.models.generation_request import GenerationRequest
+from app.models.engines import LLMEngine, create_engine
+from app.models.postprocess import strip_think
+from app.models.token_stream import TokenStream
 
 logger = logging.getLogger(__name__)
 
 
 class ModelManager:
-    """Qwen-14B 단일 모델 관리 클래스 (시스템 프롬프팅 전용)"""
+    """Qwen 단일 모델 관리 클래스 (시스템 프롬프팅 전용, 추론은 LLM_ENGINE 엔진에 위임)"""
     
     def __init__(self):
-        self.model = None
-        self.tokenizer = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Using device: {self.device}")
+        self.engine: Optional[LLMEngine] = None
+        # 영화 상세 소개 전용 엔진 (MOVIE_DETAIL_ENGINE 설정 시, 예: 저렴한 CPU GGUF)
+        self.detail_engine: Optional[LLMEngine] = None
         
     def initialize(self):
-        """모델 및 토크나이저 로드"""
+        """추론 엔진 로드"""
         try:
-            logger.info(f"Loading model: {settings.BASE_MODEL}")
-            
-            # 4-bit 양자화 설정 (메모리 절약)
-            bnb_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_use_double_quant=True,
-                bnb_4bit_quant_type="nf4",
-                bnb_4bit_compute_dtype=torch.float16
-            )
-            
-            # 토크나이저 로드
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                settings.BASE_MODEL,
-                trust_remote_code=True
-            )
-            
-            # 패딩 토큰 설정
-            if self.tokenizer.pad_token is None:
-                self.tokenizer.pad_token = self.tokenizer.eos_token
-            
-            # 모델 로드
-            self.model = AutoModelForCausalLM.from_pretrained(
-                settings.BASE_MODEL,
-                quantization_config=bnb_config,
-                device_map="auto",
-                trust_remote_code=True,
-                dtype=torch.float16
-            )
-            
-            logger.info("✓ Model loaded successfully")
+            self.engine = create_engine(settings.LLM_ENGINE)
+            self.engine.load(self._prefix_prompts())
+            logger.info(f"✓ LLM engine ready: {self.engine.name}")
+
+            detail_engine = settings.MOVIE_DETAIL_ENGINE
+            if detail_engine and detail_engine != settings.LLM_ENGINE:
+                self.detail_engine = create_engine(detail_engine)
+                self.detail_engine.load(self._prefix_prompts(templates=("movie_detail",)))
+                logger.info(f"✓ Movie detail engine ready: {self.detail_engine.name}")
             
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             raise
+
+    def _prefix_prompts(self, templates=None) -> list:
+        """(endpoint 템플릿, 테마) 전체 조합의 system prompt (엔진 시작 전 prefix 캐시 warm-up용)"""
+        if not (settings.PREFIX_CACHE_ENABLED and settings.PREFIX_CACHE_WARM_ON_STARTUP):
+            return []
+        return [
+            ((template, theme), [{"role": "system", "content": build_system_prompt(theme)}])
+            for template, build_system_prompt in SYSTEM_PROMPT_BUILDERS.items()
+            if templates is None or template in templates
+            for theme in self.THEMES
+        ]
+
+    def _engine_for(self, workload: Optional[str]) -> LLMEngine:
+        if self.engine is None:
+            raise RuntimeError("Model is not initialized")
+        if workload == "movie_detail" and self.detail_engine is not None:
+            return self.detail_engine
+        return self.engine
     
+    def _build_request(
+        self,
+        prompt: str | list,
+        max_new_tokens: Optional[int],
+        temperature: Optional[float],
+        top_p: Optional[float],
+        top_k: Optional[int],
+        prefix_key: Optional[Hashable],
+        target_chars: Optional[int] = None
+    ) -> GenerationRequest:
+        """기본값을 채운 생성 요청"""
+        # ChatML 메시지 구성
+        if isinstance(prompt, str):
+            # 구형 호환: 문자열로 들어오면 유저 메시지로 포장
+            messages = [{"role": "user", "content": prompt}]
+        else:
+            messages = prompt
+
+        return GenerationRequest(
+            messages=messages,
+            max_new_tokens=max_new_tokens if max_new_tokens else 512,
+            temperature=temperature if temperature is not None else settings.TEMPERATURE,
+            top_p=top_p if top_p is not None else settings.TOP_P,
+            top_k=top_k if top_k is not None else settings.TOP_K,
+            repetition_penalty=1.1,
+            target_chars=target_chars,
+            prefix_key=prefix_key
+        )
+
     def generate(
         self,
         prompt: str | list, # str 또는 list[dict] 지원
@@ -67,87 +102,88 @@ class ModelManager:
         max_new_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         top_p: Optional[float] = None,
-        top_k: Optional[int] = None
+        top_k: Optional[int] = None,
+        prefix_key: Optional[Hashable] = None,
+        target_chars: Optional[int] = None,
+        workload: Optional[str] = None
     ) -> str:
-        """텍스트 생성 (Chat Template 적용)"""
-        if self.model is None:
-            raise RuntimeError("Model is not initialized")
-            
-        # 기본값 설정
-        max_length = max_length or settings.MAX_LENGTH
-        temperature = temperature if temperature is not None else settings.TEMPERATURE
-        top_p = top_p if top_p is not None else settings.TOP_P
-        top_k = top_k if top_k is not None else settings.TOP_K
-        
+        """
+        텍스트 생성 (Chat Template 적용)
+        - prefix_key: 첫 system 메시지의 KV 캐시 키 (예: ("generate", theme))
+        - target_chars: 목표 글자 수 (넘긴 뒤 첫 문장 경계에서 종료, max_new_tokens는 상한)
+        - workload: "movie_detail"이면 MOVIE_DETAIL_ENGINE 사용
+        """
         try:
-            # 1. ChatML 템플릿 적용
-            if isinstance(prompt, str):
-                # 구형 호환: 문자열로 들어오면 유저 메시지로 포장
-                messages = [{"role": "user", "content": prompt}]
-            else:
-                messages = prompt
-                
-            # 토크나이징 (apply_chat_template 사용)
-            # add_generation_prompt=True ensures model generates 'assistant' response
-            model_inputs = self.tokenizer.apply_chat_template(
-                messages, 
-                tokenize=True, 
-                add_generation_prompt=True, 
-                return_tensors="pt",
-                return_dict=True
-            ).to(self.device)
-            
-            # 2. 생성 파라미터 구성
-            gen_kwargs = {
-                "max_new_tokens": max_new_tokens if max_new_tokens else 512,
-                "temperature": temperature,
-                "top_p": top_p,
-                "top_k": top_k,
-                "do_sample": True,
-                "pad_token_id": self.tokenizer.pad_token_id,
-                "eos_token_id": self.tokenizer.eos_token_id,
-                "repetition_penalty": 1.1,
-            }
-            
-            # 3. 생성
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    model_inputs.input_ids,
-                    attention_mask=model_inputs.attention_mask,
-                    **gen_kwargs
-                )
-            
-            # 4. 디코딩 (입력 토큰 이후부터 디코딩)
-            # outputs[0] contains [input_ids + generated_ids]
-            new_tokens = outputs[0][model_inputs.input_ids.shape[1]:]
-            generated_text = self.tokenizer.decode(new_tokens, skip_special_tokens=True)
-            
-            # 5. Qwen 특화 후처리 (<think> 등 제거)
-            generated_text = generated_text.replace("<|im_start|>", "").replace("<|im_end|>", "")
-            
-            # 강력한 <think> 태그 제거 (정규식)
-            import re
-            # <think> 내용 </think> 제거
-            generated_text = re.sub(r'<think>.*?</think>', '', generated_text, flags=re.DOTALL)
-            # 닫히지 않은 <think>가 있을 경우 (끝까지 제거)
-            if "<think>" in generated_text:
-                 generated_text = generated_text.split("<think>")[0]
-            # 닫는 태그만 남은 경우 (앞부분이 잘린 경우)
-            if "</think>" in generated_text:
-                generated_text = generated_text.split("</think>")[-1]
-            
-            return generated_text.strip()
-            
+            # 1. 엔진에 제출 (HF는 동시 요청과 함께 배치 prefill/decode)
+            request = self._build_request(
+                prompt, max_new_tokens, temperature, top_p, top_k, prefix_key, target_chars
+            )
+            generated_text = _submit(self._engine_for(workload), request).result()
+
+            # 2. Qwen 특화 후처리 (<think> 등 제거)
+            return strip_think(generated_text).strip()
+
         except Exception as e:
             logger.error(f"Generation failed: {e}")
             raise
-    
+
+    def stream(
+        self,
+        prompt: str | list,
+        max_new_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        top_k: Optional[int] = None,
+        prefix_key: Optional[Hashable] = None,
+        target_chars: Optional[int] = None,
+        workload: Optional[str] = None
+    ) -> TokenStream:
+        """
+        토큰 스트리밍 생성 - 텍스트 delta를 내보내는 iterator 반환
+        - 다른 요청과 함께 decode 되며, close() 시 해당 요청만 중단
+        """
+        engine = self._engine_for(workload)
+        request = self._build_request(prompt, max_new_tokens, temperature, top_p, top_k, prefix_key, target_chars)
+        stream = TokenStream(engine.tokenizer, request)
+        _submit(engine, request)
+        return stream
+
+    def warmup(self):
+        """짧은 생성으로 커널/할당자 warm-up (첫 실제 요청의 지연 제거)"""
+        for engine in (self.engine, self.detail_engine):
+            if engine is None:
+                continue
+            request = self._build_request(
+                "영화 추천해줘", settings.STARTUP_WARMUP_MAX_NEW_TOKENS, None, None, None, None
+            )
+            _submit(engine, request).result()
+            logger.info(f"✓ LLM engine warmed up: {engine.name}")
+
+    def shutdown(self):
+        """엔진 종료 (HF: 배치 스케줄러 종료)"""
+        for engine in (self.engine, self.detail_engine):
+            if engine is not None:
+                engine.shutdown()
+        self.engine = None
+        self.detail_engine = None
+
+    def prefix_cache_stats(self) -> Optional[dict]:
+        return self.engine.prefix_cache_stats() if self.engine is not None else None
+
+    def engine_stats(self) -> dict:
+        """엔진별 생성 토큰 수 / tokens/sec"""
+        return {
+            workload: engine.stats.snapshot()
+            for workload, engine in (("default", self.engine), ("movie_detail", self.detail_engine))
+            if engine is not None
+        }
+
     def get_loaded_themes(self) -> list:
         """하위 호환성: 모든 테마 지원 가능"""
         return ModelManager.THEMES
     
     def is_ready(self) -> bool:
-        return self.model is not None
+        return self.engine is not None and self.engine.is_ready()
 
     # 테마 목록 유지 (유효성 검사용)
     THEMES = [
@@ -164,4 +200,46 @@ class ModelManager:
         "편안하고 잔잔한 감성 추구"
     ]
 
-model_manager = ModelManager()
+def _submit(engine: LLMEngine, request: GenerationRequest) -> Future:
+    """엔진 제출 + 완료 시 요청 단위 메트릭 (대기 시간 / TTFT / 토큰 수) 기록"""
+    LLM_IN_FLIGHT.labels(engine=engine.name).inc()
+    try:
+        future = engine.submit(request)
+    except BaseException:
+        LLM_IN_FLIGHT.labels(engine=engine.name).dec()
+        raise
+    future.add_done_callback(lambda _: _observe_request(engine.name, request))
+    return future
+
+
+def _observe_request(engine: str, request: GenerationRequest):
+    LLM_IN_FLIGHT.labels(engine=engine).dec()
+    if request.started_at is None:
+        # 실행 전에 취소됨
+        return
+    LLM_QUEUE_WAIT.labels(engine=engine).observe(request.started_at - request.submitted_at)
+
+    # prefix_key = (endpoint 템플릿, 테마) - 라벨 값은 알려진 값으로 제한
+    prefix_key = request.prefix_key
+    template, theme = prefix_key if isinstance(prefix_key, tuple) and len(prefix_key) == 2 else (None, None)
+    labels = {
+        "endpoint": template if template in SYSTEM_PROMPT_BUILDERS else "other",
+        "theme": theme_label(theme),
+    }
+    if request.first_token_at is not None:
+        LLM_TIME_TO_FIRST_TOKEN.labels(**labels).observe(request.first_token_at - request.submitted_at)
+    if request.prompt_tokens:
+        LLM_PROMPT_TOKENS.labels(**labels).observe(request.prompt_tokens)
+    LLM_REQUEST_GENERATED_TOKENS.labels(**labels).observe(request.generated_tokens)
+
+
+def _create_model_manager():
+    """MODEL_HOST_SOCKET이 있으면 모델 호스트 프록시 (워커 프로세스마다 모델을 올리지 않음)"""
+    if settings.MODEL_HOST_SOCKET:
+        from app.models.remote import RemoteModelManager, model_host_client
+
+        return RemoteModelManager(model_host_client(), settings.MODEL_HOST_STARTUP_TIMEOUT_SECONDS)
+    return ModelManager()
+
+
+model_manager = _create_model_manager()
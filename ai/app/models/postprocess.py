@@ -0,0 +1,60 @@
+"""
+생성 텍스트 후처리 (큐레이션 코멘트 / 영화 상세 / 스트리밍 공통)
+- 정규식은 모듈 로드 시 한 번만 컴파일
+- <think> 블록/채팅 토큰 제거 → 시스템 헤더 줄 제거 → 줄 이어붙이기
+"""
+import re
+
+# 채팅 특수 토큰
+_CHAT_TOKENS = re.compile(r"<\|im_(?:start|end)\|>")
+# <think> 내용 </think> 블록
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", flags=re.DOTALL)
+# 모델이 프롬프트 형식을 흉내 낸 헤더 줄
+HEADER_MARKERS = ["User Request:", "Theme:", "Example:", "예시:", "[Output]", "[Role]", "[Context]", "[Task]", "[Rules]", "[결과]"]
+_HEADER_LINE = re.compile("|".join(re.escape(marker) for marker in HEADER_MARKERS))
+# 헤더만 남았을 때 라벨 뒤 내용을 살리는 백업 로직
+_FALLBACK_LABEL = re.compile(r"(?:Example:|예시:|\[결과\])(.*)", flags=re.DOTALL)
+# 문장 끝/닫는 문자 - 이 문자가 포함된 토큰이 나올 때만 글자 수 예산 검사
+BOUNDARY_CHARS = frozenset(".!?。！？…~\"'”’)]")
+# 문장 끝 (마침표/느낌표/물음표/말줄임/물결 + 닫는 따옴표·괄호·이모지 없이 끝나는 경우)
+_SENTENCE_END = re.compile(r"[.!?。！？…~]+[\"'”’)\]]*\s*$")
+
+
+def strip_think(text: str) -> str:
+    """Qwen 특화 후처리: 채팅 토큰과 <think> 블록 제거"""
+    text = _THINK_BLOCK.sub("", _CHAT_TOKENS.sub("", text))
+    # 닫히지 않은 <think>가 있을 경우 (끝까지 제거)
+    if "<think>" in text:
+        text = text.split("<think>")[0]
+    # 닫는 태그만 남은 경우 (앞부분이 잘린 경우)
+    if "</think>" in text:
+        text = text.split("</think>")[-1]
+    return text
+
+
+def clean_generated_text(text: str, strip_quotes: bool = False) -> str:
+    """코멘트 후처리 (강력한 필터링) - 남은 줄들을 공백으로 이어붙임"""
+    text = strip_think(text).strip()
+
+    lines = [line.strip() for line in text.split("\n")]
+    filtered_lines = [line for line in lines if line and not _HEADER_LINE.search(line)]
+
+    if filtered_lines:
+        text = " ".join(filtered_lines)
+    else:
+        match = _FALLBACK_LABEL.search(text)
+        if match:
+            text = match.group(1).strip()
+
+    return text.strip('"').strip("'") if strip_quotes else text
+
+
+def is_sentence_end(text: str) -> bool:
+    """텍스트가 문장 경계에서 끝나는지"""
+    return _SENTENCE_END.search(text) is not None
+
+
+def budget_reached(text: str, target_chars: int) -> bool:
+    """목표 글자 수를 넘겼고 문장 경계에서 끝났는지 (글자 수 예산 정지 조건)"""
+    text = strip_think(text).strip()
+    return len(text) >= target_chars and is_sentence_end(text)
@@ -0,0 +1,112 @@
+"""
+Persona System Prompt KV Prefix Cache
+- (endpoint 템플릿, 테마)별 시스템 프롬프트의 토큰과 past_key_values를 보관
+- 생성 시 사용자별 suffix만 prefill 하도록 BatchScheduler가 사용
+- 메모리 상한을 넘으면 LRU 순으로 제거
+"""
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Tuple
+
+import torch
+
+from app.core.metrics import PREFIX_CACHE_BYTES, PREFIX_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PrefixEntry:
+    """캐시된 prefix 하나 (batch 차원 1)"""
+    key: Hashable
+    text: str
+    input_ids: List[int]
+    past_key_values: List[Tuple[torch.Tensor, torch.Tensor]]  # 레이어별 (key, value): [1, heads, len, dim]
+    nbytes: int
+
+    def __len__(self) -> int:
+        return len(self.input_ids)
+
+
+class PrefixCache:
+    """메모리 상한이 있는 LRU prefix 캐시"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, PrefixEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, text: str) -> Optional[PrefixEntry]:
+        """키와 렌더링된 prefix 텍스트가 모두 일치할 때만 반환"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.text == text:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                PREFIX_CACHE_LOOKUPS.labels(result="hit").inc()
+                return entry
+            self.misses += 1
+            PREFIX_CACHE_LOOKUPS.labels(result="miss").inc()
+            return None
+
+    def put(self, entry: PrefixEntry) -> bool:
+        """엔트리 저장 (상한보다 큰 엔트리는 저장하지 않음)"""
+        if entry.nbytes > self.max_bytes:
+            logger.warning(f"Prefix {entry.key} ({entry.nbytes} bytes) exceeds cache cap, not cached")
+            return False
+        with self._lock:
+            previous = self._entries.pop(entry.key, None)
+            if previous is not None:
+                self.total_bytes -= previous.nbytes
+            while self._entries and self.total_bytes + entry.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.nbytes
+                self.evictions += 1
+            self._entries[entry.key] = entry
+            self.total_bytes += entry.nbytes
+            PREFIX_CACHE_BYTES.set(self.total_bytes)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            PREFIX_CACHE_BYTES.set(0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def cache_to_tuples(past_key_values) -> List[Tuple[torch.Tensor, torch.Tensor]]:
+    """transformers 버전별 Cache 객체를 레이어별 (key, value) 리스트로 변환"""
+    if hasattr(past_key_values, "layers"):
+        return [(layer.keys, layer.values) for layer in past_key_values.layers]
+    if hasattr(past_key_values, "to_legacy_cache"):
+        return [(k, v) for k, v in past_key_values.to_legacy_cache()]
+    return [(k, v) for k, v in past_key_values]
+
+
+def tuples_to_cache(layers: List[Tuple[torch.Tensor, torch.Tensor]]):
+    """레이어별 (key, value) 리스트로 새 DynamicCache 생성 (forward가 캐시를 제자리 수정하므로 매번 새로 생성)"""
+    from transformers import DynamicCache
+
+    cache = DynamicCache()
+    for layer_idx, (key, value) in enumerate(layers):
+        cache.update(key, value, layer_idx)
+    return cache
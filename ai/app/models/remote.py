@@ -0,0 +1,228 @@
+"""
+모델 호스트 클라이언트 (MODEL_HOST_SOCKET 설정 시 API 워커에서 사용)
+- RemoteModelManager / RemoteEmbeddingManager는 ModelManager / EmbeddingManager와 같은 인터페이스
+  → 라우트/서비스 코드는 로컬/원격을 구분하지 않음
+- 블로킹 호출 (추론 스레드에서 실행), 워커별 연결 풀 재사용
+- 스트리밍은 전용 연결 하나를 점유하고, close() 시 연결을 끊어 호스트 쪽 생성 중단
+"""
+import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Union
+
+from app.core.config import settings
+from app.models.embedding_batcher import run_encode
+from app.models.ipc import ModelHostError, recv_frame, send_frame, unpack_array
+
+logger = logging.getLogger(__name__)
+
+
+class ModelHostClient:
+    """Unix socket 연결 풀 + 요청/응답 호출"""
+
+    def __init__(self, socket_path: str, timeout: float = 120.0, pool_size: int = 16):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self._idle: List[socket.socket] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise ModelHostError(f"Cannot connect to model host at {self.socket_path}: {e}") from e
+        return sock
+
+    def acquire(self) -> socket.socket:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, sock: socket.socket):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(sock)
+                return
+        sock.close()
+
+    @contextmanager
+    def connection(self):
+        """오류가 나면 연결을 버림 (응답 프레임 경계가 어긋났을 수 있음)"""
+        sock = self.acquire()
+        try:
+            yield sock
+        except BaseException:
+            sock.close()
+            raise
+        self.release(sock)
+
+    def call(self, op: str, **kwargs):
+        with self.connection() as sock:
+            send_frame(sock, {"op": op, "kwargs": kwargs})
+            response = recv_frame(sock)
+        if "error" in response:
+            raise ModelHostError(f"{response.get('type', 'Error')}: {response['error']}")
+        return response["result"]
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sock in idle:
+            sock.close()
+
+
+class RemoteTokenStream(Iterator[str]):
+    """호스트의 TokenStream delta를 그대로 전달하는 iterator (TokenStream과 같은 인터페이스)"""
+
+    def __init__(self, client: ModelHostClient, kwargs: dict):
+        self._client = client
+        self._sock: Optional[socket.socket] = client.acquire()
+        self._emitted = ""
+        try:
+            send_frame(self._sock, {"op": "stream", "kwargs": kwargs})
+        except BaseException:
+            self._discard()
+            raise
+
+    @property
+    def text(self) -> str:
+        return self._emitted
+
+    def __next__(self) -> str:
+        sock = self._sock
+        if sock is None:
+            raise StopIteration
+        try:
+            frame = recv_frame(sock)
+        except (OSError, ConnectionError):
+            if self._sock is None:
+                # close()로 끊긴 경우
+                raise StopIteration
+            self._discard()
+            raise
+        if "error" in frame:
+            self._discard()
+            raise ModelHostError(f"{frame.get('type', 'Error')}: {frame['error']}")
+        if frame.get("done"):
+            self._sock = None
+            self._client.release(sock)
+            raise StopIteration
+        self._emitted += frame["delta"]
+        return frame["delta"]
+
+    def _discard(self):
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            sock.close()
+
+    def close(self):
+        """연결 종료 → 호스트가 감지해 해당 요청 생성 중단 (블로킹 중인 recv도 깨움)"""
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+
+class _RemoteManager:
+    """호스트 ready 대기 + 상태 조회 공통"""
+
+    def __init__(self, client: ModelHostClient, startup_timeout: float):
+        self.client = client
+        self.startup_timeout = startup_timeout
+        self._ready = False
+
+    def initialize(self):
+        """모델 호스트가 ready가 될 때까지 대기 (호스트가 모델 로드 + warm-up 담당)"""
+        deadline = time.monotonic() + self.startup_timeout
+        last_error = None
+        while time.monotonic() < deadline:
+            try:
+                if self.client.call("health")["ready"]:
+                    self._ready = True
+                    logger.info(f"✓ Model host ready at {self.client.socket_path}")
+                    return
+            except (ModelHostError, OSError) as e:
+                last_error = e
+            time.sleep(1.0)
+        raise ModelHostError(f"Model host not ready after {self.startup_timeout:.0f}s: {last_error}")
+
+    def warmup(self):
+        """호스트가 warm-up 수행"""
+
+    def is_ready(self) -> bool:
+        return self._ready
+
+    def _stats(self, key: str):
+        try:
+            return self.client.call("health").get(key)
+        except (ModelHostError, OSError) as e:
+            logger.warning(f"Model host stats unavailable: {e}")
+            return None
+
+    def shutdown(self):
+        self._ready = False
+        self.client.close()
+
+
+class RemoteModelManager(_RemoteManager):
+    """ModelManager 원격 프록시"""
+
+    def generate(self, prompt: Union[str, list], **kwargs) -> str:
+        kwargs.pop("max_length", None)
+        return self.client.call("generate", prompt=prompt, **kwargs)
+
+    def stream(self, prompt: Union[str, list], **kwargs) -> RemoteTokenStream:
+        return RemoteTokenStream(self.client, {"prompt": prompt, **kwargs})
+
+    def get_loaded_themes(self) -> list:
+        from app.models.model_loader import ModelManager
+
+        return ModelManager.THEMES
+
+    def engine_stats(self) -> dict:
+        return self._stats("engines") or {}
+
+    def prefix_cache_stats(self) -> Optional[dict]:
+        return self._stats("prefix_cache")
+
+
+class RemoteEmbeddingManager(_RemoteManager):
+    """EmbeddingManager 원격 프록시 (단건 캐시/micro-batching은 호스트에서 워커 전체 대상으로 동작)"""
+
+    def encode(self, texts: Union[str, List[str]]) -> List[float]:
+        return self.client.call("encode", texts=texts)
+
+    async def encode_async(self, text: str) -> List[float]:
+        return await run_encode(self.encode, text)
+
+    def encode_batch(self, texts: List[str], batch_size: int = 64):
+        return unpack_array(self.client.call("encode_batch", texts=texts, batch_size=batch_size))
+
+    def cache_stats(self) -> Optional[dict]:
+        return self._stats("embedding_cache")
+
+
+_client: Optional[ModelHostClient] = None
+
+
+def model_host_client() -> ModelHostClient:
+    """워커 프로세스 공용 클라이언트 (LLM/임베딩 프록시가 같은 연결 풀 사용)"""
+    global _client
+    if _client is None:
+        _client = ModelHostClient(
+            settings.MODEL_HOST_SOCKET,
+            timeout=settings.MODEL_HOST_TIMEOUT_SECONDS,
+            pool_size=settings.MODEL_HOST_POOL_SIZE,
+        )
+    return _client
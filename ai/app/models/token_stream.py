@@ -0,0 +1,75 @@
+"""
+Token Stream - BatchScheduler의 토큰 콜백을 텍스트 조각(delta) iterator로 변환
+- 누적 토큰을 다시 디코딩해 이전에 내보낸 텍스트 이후 부분만 반환
+- 불완전한 멀티바이트 문자(�)와 <think> 블록은 확정될 때까지 내보내지 않음
+"""
+import queue
+from typing import Iterator, List
+
+from app.models.generation_request import GenerationRequest
+from app.models.postprocess import strip_think
+
+_THINK_OPEN = "<think>"
+_END = object()
+
+
+def _stable_prefix(text: str) -> str:
+    """스트리밍 중 확정된 부분: 끝에 걸친 '<think' 같은 태그 조각은 보류"""
+    text = strip_think(text).lstrip()
+    for size in range(min(len(_THINK_OPEN) - 1, len(text)), 0, -1):
+        if _THINK_OPEN.startswith(text[-size:]):
+            return text[:-size]
+    return text
+
+
+class TokenStream(Iterator[str]):
+    """생성 요청 하나의 텍스트 delta iterator (블로킹, 추론 스레드에서 소비)"""
+
+    def __init__(self, tokenizer, request: GenerationRequest):
+        self.tokenizer = tokenizer
+        self.request = request
+        self._tokens: List[int] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._emitted = ""
+        self._done = False
+
+        request.on_token = self._queue.put
+        request.future.add_done_callback(lambda _: self._queue.put(_END))
+
+    @property
+    def text(self) -> str:
+        """지금까지 내보낸 전체 텍스트"""
+        return self._emitted
+
+    def __next__(self) -> str:
+        while not self._done:
+            item = self._queue.get()
+            if item is _END:
+                self._done = True
+                future = self.request.future
+                if not future.cancelled() and future.exception() is not None:
+                    raise future.exception()
+                delta = self._advance(strip_think(self._decode()).lstrip())
+            else:
+                self._tokens.append(item)
+                text = self._decode()
+                if text.endswith("�"):
+                    continue
+                delta = self._advance(_stable_prefix(text))
+            if delta:
+                return delta
+        raise StopIteration
+
+    def _decode(self) -> str:
+        return self.tokenizer.decode(self._tokens, skip_special_tokens=True)
+
+    def _advance(self, visible: str) -> str:
+        if len(visible) <= len(self._emitted) or not visible.startswith(self._emitted):
+            return ""
+        delta = visible[len(self._emitted):]
+        self._emitted = visible
+        return delta
+
+    def close(self):
+        """남은 생성 중단 (배치의 다른 행은 계속 진행)"""
+        self.request.cancelled.set()
@@ -13,6 +13,7 @@ class GenerateRequest(BaseModel):
     temperature: Optional[float] = Field(0.7, description="Temperature")
     top_p: Optional[float] = Field(0.9, description="Top-p")
     top_k: Optional[int] = Field(50, description="Top-k")
+    useCache: bool = Field(True, description="비슷한 요청의 큐레이션 코멘트 재사용 여부 (false면 항상 새로 생성)")
 
 class GenerateResponse(BaseModel):
     """AI 전시회 생성 응답"""
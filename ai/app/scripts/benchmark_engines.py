@@ -0,0 +1,92 @@
+"""
+LLM 엔진 처리량 비교 스크립트
+실행: python -m app.scripts.benchmark_engines --engines hf llama_cpp fake [--workload movie_detail] [--requests 32] [--concurrency 8]
+
+- 같은 프롬프트 묶음을 엔진별로 실행해 tokens/sec, 요청 지연(p50/p95)을 출력
+- 엔진 설정(LLM_GGUF_PATH 등)은 .env / 환경 변수 사용
+"""
+import argparse
+import json
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.prompts import TICKET_TO_THEME, build_curation_system_prompt
+from app.models.generation_request import GenerationRequest
+from app.models.engines import ENGINES, create_engine
+from app.services.persona_detail_service import DETAIL_GENERATION_PARAMS, build_movie_detail_messages
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROMPTS = ["잔잔한 영화 추천해줘", "비 오는 날 혼자 볼 영화", "스트레스 풀리는 액션", "여운이 남는 슬픈 영화"]
+GENERATE_PARAMS = {"max_new_tokens": 90, "target_chars": 40, "temperature": 0.7, "top_p": 0.9, "top_k": 50}
+
+
+def build_requests(workload: str, count: int) -> list:
+    themes = list(TICKET_TO_THEME.values())
+    requests = []
+    for i in range(count):
+        theme = themes[i % len(themes)]
+        prompt = PROMPTS[i % len(PROMPTS)]
+        if workload == "movie_detail":
+            messages = build_movie_detail_messages(f"영화 {i}", prompt, theme)
+            params = dict(DETAIL_GENERATION_PARAMS)
+        else:
+            messages = [
+                {"role": "system", "content": build_curation_system_prompt(theme)},
+                {"role": "user", "content": f"사용자 요청: \"{prompt}\"\n\n멘트:"},
+            ]
+            params = dict(GENERATE_PARAMS)
+        requests.append(GenerationRequest(messages=messages, prefix_key=(workload, theme), **params))
+    return requests
+
+
+def benchmark(name: str, workload: str, count: int, concurrency: int) -> dict:
+    engine = create_engine(name)
+    engine.load()
+    try:
+        # 첫 요청(커널/캐시 준비)은 측정에서 제외
+        engine.submit(build_requests(workload, 1)[0]).result()
+        before = engine.stats.snapshot()
+
+        def _run(request):
+            started = time.perf_counter()
+            engine.submit(request).result()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = sorted(pool.map(_run, build_requests(workload, count)))
+        elapsed = time.perf_counter() - started
+        tokens = engine.stats.snapshot()["tokens"] - before["tokens"]
+    finally:
+        engine.shutdown()
+
+    return {
+        "engine": name,
+        "workload": workload,
+        "requests": count,
+        "concurrency": concurrency,
+        "tokens": tokens,
+        "tokens_per_sec": round(tokens / elapsed, 2),
+        "requests_per_sec": round(count / elapsed, 2),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "latency_p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000, 1),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="LLM 엔진 처리량 비교")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["fake"], help="비교할 엔진")
+    parser.add_argument("--workload", choices=["generate", "movie_detail"], default="generate", help="프롬프트 종류")
+    parser.add_argument("--requests", type=int, default=32, help="엔진별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = [benchmark(name, args.workload, args.requests, max(1, args.concurrency)) for name in args.engines]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
@@ -0,0 +1,113 @@
+"""
+임베딩 백엔드 정확도 / 지연 비교 (torch fp32 기준 vs onnx int8)
+실행: python -m app.scripts.evaluate_embedding_backends [--from-db 200] [--min-cosine 0.99] [--runs 20]
+
+1. 정확도: 같은 문장을 두 백엔드로 임베딩해 행별 코사인 유사도 (평균/최소) + 검색 top-k 일치율
+   - 기본 문장: app/guardrails/topic_examples.yml (짧은 쿼리), --from-db N 이면 영화 제목/줄거리 N건 추가
+   - 최소 코사인이 --min-cosine 미만이면 종료 코드 1 (movie_embeddings와 호환되지 않음)
+2. 지연: 배치 크기 1(쿼리) / 32(배치) encode p50/p95 (ms)
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+from app.core.topic_filter import load_topic_examples
+from app.models.embedding_backends import BACKENDS, create_embedding_backend
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MOVIE_TEXTS_QUERY = """
+    SELECT title_ko, overview_ko FROM movies
+    WHERE overview_ko IS NOT NULL AND overview_ko <> ''
+    ORDER BY id
+    LIMIT :limit
+"""
+
+
+def load_samples(from_db: int = 0) -> List[str]:
+    on_topic, off_topic = load_topic_examples()
+    samples = on_topic + off_topic
+    if from_db:
+        from sqlalchemy import text
+        from app.core.database import engine
+
+        with engine.connect() as conn:
+            rows = conn.execute(text(MOVIE_TEXTS_QUERY), {"limit": from_db}).fetchall()
+        samples += [f"{row.title_ko} {row.overview_ko}" for row in rows]
+    return samples
+
+
+def compare(reference: np.ndarray, candidate: np.ndarray, k: int = 5) -> dict:
+    """행별 코사인 + 쿼리(앞 절반)→문서(뒤 절반) 검색 top-k 일치율"""
+    cosine = np.sum(reference * candidate, axis=1)
+    half = len(reference) // 2
+    overlaps = []
+    if half >= k:
+        ref_top = np.argsort(-(reference[:half] @ reference[half:].T), axis=1)[:, :k]
+        cand_top = np.argsort(-(candidate[:half] @ candidate[half:].T), axis=1)[:, :k]
+        overlaps = [len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)]
+    return {
+        "samples": len(reference),
+        "cosine_mean": round(float(cosine.mean()), 5),
+        "cosine_min": round(float(cosine.min()), 5),
+        f"top{k}_overlap": round(float(np.mean(overlaps)), 4) if overlaps else None,
+    }
+
+
+def measure_latency(backend, samples: List[str], batch_size: int, runs: int) -> dict:
+    backend.encode(samples[:batch_size], batch_size=batch_size)  # warm-up
+    latencies = []
+    for i in range(runs):
+        offset = (i * batch_size) % max(1, len(samples) - batch_size)
+        batch = samples[offset:offset + batch_size]
+        started = time.perf_counter()
+        backend.encode(batch, batch_size=batch_size)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "batch_size": batch_size,
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 2),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 정확도/지연 비교")
+    parser.add_argument("--reference", choices=BACKENDS, default="torch", help="기준 백엔드 (movie_embeddings 생성에 사용)")
+    parser.add_argument("--candidate", choices=BACKENDS, default="onnx", help="비교 백엔드")
+    parser.add_argument("--from-db", type=int, default=0, help="DB 영화 텍스트 샘플 수")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="허용 최소 코사인 유사도")
+    parser.add_argument("--runs", type=int, default=20, help="지연 측정 반복 수")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    samples = load_samples(args.from_db)
+    logger.info(f"Loaded {len(samples)} samples")
+
+    reference = create_embedding_backend(args.reference)
+    candidate = create_embedding_backend(args.candidate)
+
+    report = {
+        "reference": args.reference,
+        "candidate": args.candidate,
+        "accuracy": compare(reference.encode(samples), candidate.encode(samples)),
+        "latency": {
+            name: [measure_latency(backend, samples, size, args.runs) for size in (1, 32)]
+            for name, backend in ((args.reference, reference), (args.candidate, candidate))
+        },
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if report["accuracy"]["cosine_min"] < args.min_cosine:
+        logger.error(f"Cosine agreement below {args.min_cosine}: {report['accuracy']['cosine_min']}")
+        sys.exit(1)
@@ -0,0 +1,102 @@
+"""
+BGE-M3 → ONNX export + dynamic int8 양자화
+실행: python -m app.scripts.export_embedding_onnx [--output /app/model/bge-m3-onnx-int8] [--keep-fp32]
+
+- EMBEDDING_MODEL_PATH의 transformer를 last_hidden_state 출력 ONNX로 export (batch/seq 동적 축)
+- onnxruntime.quantization.quantize_dynamic 으로 Linear 가중치 int8 양자화 → model.int8.onnx
+- 토크나이저를 같은 디렉토리에 저장 (EMBEDDING_ONNX_PATH로 지정해 EMBEDDING_BACKEND=onnx 사용)
+- 배포 전 app.scripts.evaluate_embedding_backends 로 fp32 대비 코사인 일치도 확인
+"""
+import argparse
+import logging
+import os
+import shutil
+
+from app.core.config import settings
+from app.models.embedding_backends import ONNX_MODEL_FILE
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FP32_DIR = "fp32"
+FP32_MODEL_FILE = "model.onnx"
+
+
+def export_fp32(model_path: str, output_dir: str, opset: int = 17) -> str:
+    """transformer 본체를 fp32 ONNX로 export (2GB 초과 가중치는 external data로 저장)"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModel.from_pretrained(model_path)
+    model.eval()
+
+    class _Encoder(torch.nn.Module):
+        """(input_ids, attention_mask) → last_hidden_state (transformers 버전별 forward 인자 차이 회피)"""
+
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask):
+            return self.inner(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+    sample = tokenizer(["영화 추천해줘", "잔잔한 영화"], padding=True, return_tensors="pt")
+    # external data 파일이 여러 개 생길 수 있어 별도 디렉토리에 export
+    os.makedirs(os.path.join(output_dir, FP32_DIR), exist_ok=True)
+    fp32_path = os.path.join(output_dir, FP32_DIR, FP32_MODEL_FILE)
+    logger.info(f"Exporting {model_path} → {fp32_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(model),
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+            dynamo=False,  # TorchScript exporter (dynamic_axes 사용, onnxscript 불필요)
+        )
+    tokenizer.save_pretrained(output_dir)
+    return fp32_path
+
+
+def quantize_int8(fp32_path: str, output_dir: str) -> str:
+    """가중치 dynamic int8 양자화 (activation은 실행 시 양자화)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    logger.info(f"Quantizing {fp32_path} → {int8_path}")
+    quantize_dynamic(
+        fp32_path,
+        int8_path,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        op_types_to_quantize=["MatMul", "Gemm"],
+    )
+    return int8_path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BGE-M3 ONNX int8 export")
+    parser.add_argument("--model-path", default=settings.EMBEDDING_MODEL_PATH, help="원본 BGE-M3 경로")
+    parser.add_argument("--output", default=settings.EMBEDDING_ONNX_PATH, help="출력 디렉토리")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--keep-fp32", action="store_true", help="중간 fp32 ONNX 파일 유지")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    os.makedirs(args.output, exist_ok=True)
+    fp32_path = export_fp32(args.model_path, args.output, args.opset)
+    int8_path = quantize_int8(fp32_path, args.output)
+    if not args.keep_fp32:
+        shutil.rmtree(os.path.join(args.output, FP32_DIR), ignore_errors=True)
+    logger.info(f"✓ Exported {int8_path} ({os.path.getsize(int8_path) / 1e6:.0f} MB)")
@@ -1,82 +1,397 @@
 """
-영화 데이터 임베딩 생성 스크립트
-실행: python -m app.scripts.generate_embeddings
+영화 데이터 임베딩 생성 스크립트 (배치/재개/병렬)
+실행: python -m app.scripts.generate_embeddings [--batch-size 64] [--workers 1]
+
+파이프라인:
+1. Reader  - 서버 사이드 커서로 movies를 id 순으로 스트리밍 (체크포인트 이후부터)
+2. Encoder - 제목/장르/줄거리 content hash가 바뀐 영화만 모아 배치 encode
+3. Writer  - 별도 스레드에서 multi-row upsert (INSERT ... ON CONFLICT) 후 체크포인트 기록
+
+--workers N 이면 movie_id % N 으로 샤딩해 프로세스마다 모델을 따로 띄움 (CPU 코어 활용)
 """
-import sys
-import os
-import asyncio
+import argparse
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
 from sqlalchemy import text
-from app.core.database import SessionLocal
-from app.models.embedding_loader import embedding_manager
+
+from app.core.database import SessionLocal, engine
 
 # 로깅 설정
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(processName)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-def generate_embeddings():
-    """모든 영화에 대해 임베딩 생성 및 저장"""
-    logger.info("Initializing embedding model...")
+MODEL_NAME = "bge-m3"
+DEFAULT_CHECKPOINT = "embedding_checkpoint"
+
+ENSURE_HASH_COLUMN = """
+    ALTER TABLE movie_embeddings ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)
+"""
+
+# 장르는 movie_genres → genres 에서 이름순으로 모음 (hash 안정성)
+READ_QUERY = """
+    SELECT m.id, m.title_ko, m.overview_ko,
+           ARRAY(
+               SELECT g.name FROM movie_genres mg JOIN genres g ON g.id = mg.genre_id
+               WHERE mg.movie_id = m.id ORDER BY g.name
+           ) AS genres,
+           me.content_hash, (me.embedding IS NOT NULL) AS has_embedding
+    FROM movies m
+    LEFT JOIN movie_embeddings me ON m.id = me.movie_id
+    WHERE m.id > :after_id
+      AND m.id % :num_shards = :shard
+    ORDER BY m.id
+"""
+
+
+@dataclass
+class BackfillStats:
+    """샤드 하나의 처리 결과"""
+    scanned: int = 0
+    embedded: int = 0
+    skipped: int = 0
+    hash_only: int = 0
+    failed: int = 0
+    encode_seconds: float = 0.0
+    write_seconds: float = 0.0
+    failed_ids: List[int] = field(default_factory=list)
+
+    def merge(self, other: "BackfillStats"):
+        for name in ("scanned", "embedded", "skipped", "hash_only", "failed", "encode_seconds", "write_seconds"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.failed_ids.extend(other.failed_ids)
+
+
+# ------------------------------------------------------------------
+# 텍스트 / hash
+# ------------------------------------------------------------------
+def build_text_chunk(title: str, genres, overview: Optional[str]) -> str:
+    """텍스트 청크 생성 (제목 + 장르 + 줄거리)"""
+    # 장르는 배열일 수 있으므로 문자열로 변환 처리
+    if isinstance(genres, (list, tuple)):
+        genres_str = " ".join(genres)
+    else:
+        genres_str = str(genres) if genres else ""
+    return f"{title}\n{genres_str}\n{overview or ''}"
+
+
+def content_hash(text_chunk: str, model_name: str = MODEL_NAME) -> str:
+    """임베딩 입력 + 모델 이름 hash (둘 중 하나라도 바뀌면 재임베딩)"""
+    return hashlib.sha256(f"{model_name}\n{text_chunk}".encode("utf-8")).hexdigest()
+
+
+def format_vector(vector) -> str:
+    """pgvector 텍스트 형식 '[v1,v2,...]'"""
+    return "[" + ",".join(f"{float(v):.7g}" for v in vector) + "]"
+
+
+# ------------------------------------------------------------------
+# 체크포인트
+# ------------------------------------------------------------------
+class Checkpoint:
+    """
+    샤드별 마지막으로 커밋된 movie_id (샤드마다 파일 하나, 파일 교체로 원자적 저장)
+    - 중단된 실행을 이어가기 위한 용도이므로 전체가 정상 종료되면 삭제
+    """
+
+    def __init__(self, path: str, shard: int, num_shards: int):
+        self.path = f"{path}.{shard}-{num_shards}"
+
+    def load(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding="utf-8") as f:
+            return int(json.load(f).get("last_movie_id", 0))
+
+    def save(self, last_id: int):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"last_movie_id": last_id, "updated_at": time.time()}, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def clear(path: str):
+        """해당 경로의 모든 샤드 체크포인트 삭제"""
+        directory = os.path.dirname(os.path.abspath(path))
+        prefix = os.path.basename(path) + "."
+        for name in os.listdir(directory):
+            if name.startswith(prefix):
+                os.remove(os.path.join(directory, name))
+
+
+# ------------------------------------------------------------------
+# Writer
+# ------------------------------------------------------------------
+def upsert_embeddings(conn, rows: List[dict], model_name: str = MODEL_NAME):
+    """multi-row INSERT ... ON CONFLICT (movie_id) DO UPDATE 한 문장으로 저장"""
+    if not rows:
+        return
+    values = []
+    params = {"model_name": model_name}
+    for i, row in enumerate(rows):
+        values.append(f"(:movie_id_{i}, :embedding_{i}, :model_name, :content_hash_{i}, NOW())")
+        params[f"movie_id_{i}"] = row["movie_id"]
+        params[f"embedding_{i}"] = row["embedding"]
+        params[f"content_hash_{i}"] = row["content_hash"]
+    conn.execute(text(f"""
+        INSERT INTO movie_embeddings (movie_id, embedding, model_name, content_hash, updated_at)
+        VALUES {", ".join(values)}
+        ON CONFLICT (movie_id) DO UPDATE
+        SET embedding = EXCLUDED.embedding,
+            model_name = EXCLUDED.model_name,
+            content_hash = EXCLUDED.content_hash,
+            updated_at = EXCLUDED.updated_at
+    """), params)
+
+
+def update_hashes(conn, rows: List[dict]):
+    """기존 임베딩은 그대로 두고 content_hash만 기록 (--trust-existing)"""
+    if not rows:
+        return
+    conn.execute(
+        text("UPDATE movie_embeddings SET content_hash = :content_hash WHERE movie_id = :movie_id"),
+        rows
+    )
+
+
+class Writer(threading.Thread):
+    """encode와 겹쳐서 DB 쓰기 + 커밋 후 체크포인트 전진"""
+
+    _STOP = object()
+
+    def __init__(self, checkpoint: Checkpoint, stats: BackfillStats, max_pending: int = 4):
+        super().__init__(name="embedding-writer", daemon=True)
+        self.checkpoint = checkpoint
+        self.stats = stats
+        self.jobs: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self.error: Optional[BaseException] = None
+
+    def submit(self, embeddings: List[dict], hashes: List[dict], last_id: int):
+        if self.error is not None:
+            raise RuntimeError("Embedding writer failed") from self.error
+        self.jobs.put((embeddings, hashes, last_id))
+
+    def close(self):
+        self.jobs.put(self._STOP)
+        self.join()
+        if self.error is not None:
+            raise RuntimeError("Embedding writer failed") from self.error
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is self._STOP:
+                return
+            if self.error is not None:
+                continue
+            embeddings, hashes, last_id = job
+            started = time.monotonic()
+            try:
+                with engine.begin() as conn:
+                    upsert_embeddings(conn, embeddings)
+                    update_hashes(conn, hashes)
+                self.checkpoint.save(last_id)
+            except BaseException as e:
+                logger.error(f"Failed to write batch ending at movie {last_id}: {e}")
+                self.error = e
+            self.stats.write_seconds += time.monotonic() - started
+
+
+# ------------------------------------------------------------------
+# Shard 실행
+# ------------------------------------------------------------------
+def run_shard(shard: int, num_shards: int, options: dict) -> BackfillStats:
+    """샤드 하나의 reader → encoder → writer 파이프라인"""
+    from app.models.embedding_loader import embedding_manager
+
+    if options["torch_threads"]:
+        import torch
+        torch.set_num_threads(options["torch_threads"])
+
+    stats = BackfillStats()
+    checkpoint = Checkpoint(options["checkpoint"], shard, num_shards)
+    after_id = checkpoint.load()
+    if after_id:
+        logger.info(f"[shard {shard}/{num_shards}] Resuming after movie_id {after_id}")
+
+    logger.info(f"[shard {shard}/{num_shards}] Initializing embedding model...")
     embedding_manager.initialize()
-    
-    db = SessionLocal()
-    try:
-        # 1. 임베딩이 없는 영화 조회 (movie_embeddings 테이블과 LEFT JOIN)
-        logger.info("Fetching movies without embeddings...")
-        query = text("""
-            SELECT m.id, m.title_ko, m.overview_ko, m.genres 
-            FROM movies m 
-            LEFT JOIN movie_embeddings me ON m.id = me.movie_id 
-            WHERE me.id IS NULL
-        """)
-        movies = db.execute(query).fetchall()
-        
-        total_movies = len(movies)
-        logger.info(f"Found {total_movies} movies to embed")
-        
-        for i, movie in enumerate(movies):
+
+    writer = Writer(checkpoint, stats)
+    writer.start()
+
+    batch_size = options["batch_size"]
+    pending_texts: List[str] = []
+    pending_rows: List[tuple] = []
+    pending_hashes: List[dict] = []
+    last_id = after_id
+
+    def flush():
+        nonlocal pending_texts, pending_rows, pending_hashes
+        embeddings = []
+        if pending_texts:
+            started = time.monotonic()
             try:
-                # 2. 텍스트 청크 생성 (제목 + 줄거리 + 장르)
-                # 장르는 배열일 수 있으므로 문자열로 변환 처리
-                genres_str = ""
-                if hasattr(movie, 'genres') and movie.genres:
-                    if isinstance(movie.genres, list):
-                        genres_str = " ".join(movie.genres)
-                    else:
-                        genres_str = str(movie.genres)
-                        
-                text_chunk = f"{movie.title_ko}\n{genres_str}\n{movie.overview_ko or ''}"
-                
-                # 3. 임베딩 생성
-                embedding = embedding_manager.encode(text_chunk)
-                
-                # 4. DB 저장 (movie_embeddings 테이블에 INSERT)
-                # vector 타입은 문자열로 변환하여 저장
-                embedding_str = str(embedding)
-                
-                insert_query = text("""
-                    INSERT INTO movie_embeddings (movie_id, embedding, model_name, updated_at)
-                    VALUES (:movie_id, :embedding, 'bge-m3', NOW())
-                """)
-                db.execute(insert_query, {"movie_id": movie.id, "embedding": embedding_str})
-                
-                # 50개마다 커밋
-                if (i + 1) % 50 == 0:
-                    db.commit()
-                    logger.info(f"Progress: {i + 1}/{total_movies} movies processed")
-                    
+                vectors = embedding_manager.encode_batch(pending_texts, batch_size=batch_size)
+                embeddings = [
+                    {"movie_id": movie_id, "embedding": format_vector(vector), "content_hash": digest}
+                    for (movie_id, digest), vector in zip(pending_rows, vectors)
+                ]
+                stats.embedded += len(embeddings)
             except Exception as e:
-                logger.error(f"Failed to process movie {movie.id} ({movie.title_ko}): {e}")
-                continue
-                
+                # 배치 실패 시 해당 영화만 기록하고 계속 (다음 실행 때 hash 불일치로 재시도)
+                logger.error(f"[shard {shard}] Encode failed for {len(pending_rows)} movies: {e}")
+                stats.failed += len(pending_rows)
+                stats.failed_ids.extend(movie_id for movie_id, _ in pending_rows)
+            stats.encode_seconds += time.monotonic() - started
+        writer.submit(embeddings, pending_hashes, last_id)
+        pending_texts, pending_rows, pending_hashes = [], [], []
+
+    try:
+        # 1. 서버 사이드 커서로 스트리밍 (전체 결과를 메모리에 올리지 않음)
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=options["read_batch"]).execute(
+                text(READ_QUERY), {"after_id": after_id, "num_shards": num_shards, "shard": shard}
+            )
+            for movie in result:
+                stats.scanned += 1
+                last_id = movie.id
+                text_chunk = build_text_chunk(movie.title_ko, movie.genres, movie.overview_ko)
+                digest = content_hash(text_chunk)
+
+                # 2. 내용이 바뀐 영화만 재임베딩
+                if movie.has_embedding and not options["force"]:
+                    if movie.content_hash == digest:
+                        stats.skipped += 1
+                        continue
+                    if movie.content_hash is None and options["trust_existing"]:
+                        pending_hashes.append({"movie_id": movie.id, "content_hash": digest})
+                        stats.hash_only += 1
+                        continue
+
+                pending_texts.append(text_chunk)
+                pending_rows.append((movie.id, digest))
+                if len(pending_texts) >= options["write_batch"]:
+                    flush()
+
+                if stats.scanned % 1000 == 0:
+                    logger.info(
+                        f"[shard {shard}] Progress: scanned={stats.scanned} embedded={stats.embedded} "
+                        f"skipped={stats.skipped}"
+                    )
+        # 3. 남은 배치 + 체크포인트 마무리
+        flush()
+    finally:
+        writer.close()
+    return stats
+
+
+def _run_shard_process(args):
+    shard, num_shards, options = args
+    return run_shard(shard, num_shards, options)
+
+
+def generate_embeddings(
+    batch_size: int = 64,
+    write_batch: int = 256,
+    read_batch: int = 1000,
+    workers: int = 1,
+    checkpoint: str = DEFAULT_CHECKPOINT,
+    reset: bool = False,
+    force: bool = False,
+    trust_existing: bool = False,
+) -> BackfillStats:
+    """모든 영화에 대해 변경된 임베딩만 생성 및 저장"""
+    db = SessionLocal()
+    try:
+        db.execute(text(ENSURE_HASH_COLUMN))
         db.commit()
-        logger.info("Successfully finished generating embeddings for all movies!")
-        
-    except Exception as e:
-        logger.error(f"Script failed: {e}")
-        db.rollback()
     finally:
         db.close()
 
+    if reset:
+        Checkpoint.clear(checkpoint)
+
+    workers = max(1, workers)
+    options = {
+        "batch_size": batch_size,
+        "write_batch": max(write_batch, 1),
+        "read_batch": read_batch,
+        "checkpoint": checkpoint,
+        "force": force,
+        "trust_existing": trust_existing,
+        # 프로세스마다 코어를 나눠 쓰도록 torch 스레드 수 제한
+        "torch_threads": max(1, (os.cpu_count() or 1) // workers) if workers > 1 else 0,
+    }
+
+    started = time.monotonic()
+    total = BackfillStats()
+    if workers == 1:
+        total.merge(run_shard(0, 1, options))
+    else:
+        # 부모 프로세스의 DB 커넥션을 자식에게 넘기지 않도록 spawn 사용
+        engine.dispose()
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes=workers) as pool:
+            for stats in pool.imap_unordered(_run_shard_process, [(i, workers, options) for i in range(workers)]):
+                total.merge(stats)
+    # 모든 샤드가 끝까지 커밋됨 - 다음 실행은 처음부터 스캔 (변경 없는 영화는 hash로 건너뜀)
+    Checkpoint.clear(checkpoint)
+
+    elapsed = time.monotonic() - started
+    logger.info("=" * 60)
+    logger.info(
+        f"Embedding backfill finished in {elapsed:.1f}s "
+        f"(workers={workers}, batch_size={batch_size})"
+    )
+    logger.info(
+        f"scanned={total.scanned} embedded={total.embedded} skipped(unchanged)={total.skipped} "
+        f"hash_only={total.hash_only} failed={total.failed}"
+    )
+    logger.info(
+        f"Throughput: {total.embedded / elapsed if elapsed else 0:.1f} embedded movies/sec, "
+        f"{total.scanned / elapsed if elapsed else 0:.1f} scanned movies/sec "
+        f"(encode {total.encode_seconds:.1f}s, write {total.write_seconds:.1f}s)"
+    )
+    if total.failed_ids:
+        logger.warning(f"Failed movie ids (retried on next run): {total.failed_ids[:50]}")
+    return total
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="영화 임베딩 배치 생성 (변경분만, 재개 가능)")
+    parser.add_argument("--batch-size", type=int, default=64, help="SentenceTransformer encode 배치 크기")
+    parser.add_argument("--write-batch", type=int, default=256, help="한 번에 encode/upsert 할 영화 수")
+    parser.add_argument("--read-batch", type=int, default=1000, help="서버 사이드 커서 fetch 크기")
+    parser.add_argument("--workers", type=int, default=1, help="movie_id 샤딩 프로세스 수 (CPU 병렬)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="체크포인트 파일 경로 (샤드별 접미사)")
+    parser.add_argument("--reset", action="store_true", help="체크포인트를 지우고 처음부터 스캔")
+    parser.add_argument("--force", action="store_true", help="content hash와 무관하게 모두 재임베딩")
+    parser.add_argument(
+        "--trust-existing",
+        action="store_true",
+        help="hash가 없는 기존 임베딩은 재임베딩하지 않고 hash만 기록",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    generate_embeddings()
+    args = parse_args()
+    generate_embeddings(
+        batch_size=args.batch_size,
+        write_batch=args.write_batch,
+        read_batch=args.read_batch,
+        workers=args.workers,
+        checkpoint=args.checkpoint,
+        reset=args.reset,
+        force=args.force,
+        trust_existing=args.trust_existing,
+    )
@@ -0,0 +1,188 @@
+"""
+티켓별 영화 페르소나 소개 사전 생성 스크립트
+실행: python -m app.scripts.pregenerate_movie_details [--batch-size 8] [--rate 2] [--prune]
+
+- ticket_group_movies의 (영화, 티켓 테마) 중 현재 버전 결과가 없는 쌍만 생성
+- batch-size 만큼 동시에 제출해 BatchScheduler가 한 번의 forward로 묶어 생성
+- 배치마다 커밋하므로 중단 후 다시 실행하면 남은 쌍부터 이어서 생성
+- --rate 로 초당 생성 수 제한 (서빙 중인 GPU와 공유할 때)
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.core.prompts import TICKET_TO_THEME
+from app.models.model_loader import model_manager
+from app.services.persona_detail_service import (
+    DETAIL_GENERATION_PARAMS,
+    UPSERT_DETAIL_QUERY,
+    build_movie_detail_messages,
+    clean_movie_detail,
+    persona_detail_version,
+)
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PAIRS_QUERY = """
+    SELECT DISTINCT tgm.ticket_group_id, m.id, m.title_ko, m.overview_ko
+    FROM ticket_group_movies tgm
+    JOIN movies m ON m.id = tgm.movie_id
+    ORDER BY m.id, tgm.ticket_group_id
+"""
+
+EXISTING_QUERY = """
+    SELECT movie_id, theme, version FROM movie_persona_details
+"""
+
+PRUNE_QUERY = """
+    DELETE FROM movie_persona_details WHERE theme = :theme AND version <> :version
+"""
+
+
+def find_missing_pairs(ticket_ids: Optional[List[int]] = None, all_themes: bool = False) -> List[dict]:
+    """현재 버전 결과가 없는 (영화, 테마) 목록"""
+    with engine.connect() as conn:
+        existing = {
+            (row.movie_id, row.theme)
+            for row in conn.execute(text(EXISTING_QUERY))
+            if row.version == persona_detail_version(row.theme)
+        }
+        rows = conn.execute(text(PAIRS_QUERY)).fetchall()
+
+    pairs, seen = [], set()
+    for row in rows:
+        if ticket_ids and row.ticket_group_id not in ticket_ids:
+            continue
+        themes = TICKET_TO_THEME.values() if all_themes else [TICKET_TO_THEME.get(row.ticket_group_id)]
+        for theme in themes:
+            key = (row.id, theme)
+            if theme is None or key in existing or key in seen:
+                continue
+            seen.add(key)
+            pairs.append({"movie_id": row.id, "title": row.title_ko, "overview": row.overview_ko, "theme": theme})
+    return pairs
+
+
+def prune_stale_versions() -> int:
+    """프롬프트/모델 버전이 바뀐 이전 결과 삭제"""
+    deleted = 0
+    with engine.begin() as conn:
+        for theme in TICKET_TO_THEME.values():
+            result = conn.execute(text(PRUNE_QUERY), {"theme": theme, "version": persona_detail_version(theme)})
+            deleted += result.rowcount
+    logger.info(f"Pruned {deleted} stale persona details")
+    return deleted
+
+
+def _generate(pair: dict) -> dict:
+    detail = model_manager.generate(
+        prompt=build_movie_detail_messages(pair["title"], pair["overview"], pair["theme"]),
+        theme=pair["theme"],
+        prefix_key=("movie_detail", pair["theme"]),
+        workload="movie_detail",
+        **DETAIL_GENERATION_PARAMS
+    )
+    return {
+        "movie_id": pair["movie_id"],
+        "theme": pair["theme"],
+        "version": persona_detail_version(pair["theme"]),
+        "title": pair["title"],
+        "detail": clean_movie_detail(detail),
+    }
+
+
+def pregenerate(
+    batch_size: int = 8,
+    rate: float = 0.0,
+    limit: Optional[int] = None,
+    ticket_ids: Optional[List[int]] = None,
+    all_themes: bool = False,
+    prune: bool = False,
+) -> int:
+    """누락된 쌍 생성 후 저장, 생성 수 반환"""
+    if prune:
+        prune_stale_versions()
+
+    pairs = find_missing_pairs(ticket_ids, all_themes)
+    if limit:
+        pairs = pairs[:limit]
+    logger.info(f"Found {len(pairs)} (movie, theme) pairs to generate")
+    if not pairs:
+        return 0
+
+    logger.info("Initializing model...")
+    model_manager.initialize()
+
+    generated, failed = 0, 0
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=batch_size, thread_name_prefix="pregenerate") as pool:
+            for offset in range(0, len(pairs), batch_size):
+                chunk = pairs[offset:offset + batch_size]
+                chunk_started = time.monotonic()
+
+                # 동시에 제출 → 스케줄러가 한 배치로 묶음
+                futures = [pool.submit(_generate, pair) for pair in chunk]
+                rows = []
+                for pair, future in zip(chunk, futures):
+                    try:
+                        row = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to generate movie {pair['movie_id']} ({pair['theme']}): {e}")
+                        failed += 1
+                        continue
+                    if row["detail"]:
+                        rows.append(row)
+
+                # 배치 단위 커밋 (재실행 시 저장된 쌍은 건너뜀)
+                if rows:
+                    with engine.begin() as conn:
+                        conn.execute(UPSERT_DETAIL_QUERY, rows)
+                generated += len(rows)
+                logger.info(f"Progress: {offset + len(chunk)}/{len(pairs)} (saved {generated}, failed {failed})")
+
+                # 초당 rate 개로 제한
+                if rate > 0:
+                    remaining = len(chunk) / rate - (time.monotonic() - chunk_started)
+                    if remaining > 0:
+                        time.sleep(remaining)
+    finally:
+        logger.info(f"Engine stats: {model_manager.engine_stats()}")
+        model_manager.shutdown()
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Pregeneration finished: saved={generated} failed={failed} in {elapsed:.1f}s "
+        f"({generated / elapsed if elapsed else 0:.2f} details/sec)"
+    )
+    return generated
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="티켓별 영화 페르소나 소개 사전 생성")
+    parser.add_argument("--batch-size", type=int, default=8, help="동시에 생성할 쌍 수 (GENERATION_MAX_BATCH_SIZE 이하 권장)")
+    parser.add_argument("--rate", type=float, default=0.0, help="초당 최대 생성 수 (0이면 제한 없음)")
+    parser.add_argument("--limit", type=int, default=None, help="이번 실행에서 생성할 최대 쌍 수")
+    parser.add_argument("--ticket-ids", type=int, nargs="*", default=None, help="대상 티켓 ID (기본: 전체)")
+    parser.add_argument("--all-themes", action="store_true", help="티켓 테마뿐 아니라 모든 테마로 생성")
+    parser.add_argument("--prune", action="store_true", help="현재 버전이 아닌 이전 결과 삭제")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    pregenerate(
+        batch_size=max(1, args.batch_size),
+        rate=args.rate,
+        limit=args.limit,
+        ticket_ids=args.ticket_ids,
+        all_themes=args.all_themes,
+        prune=args.prune,
+    )
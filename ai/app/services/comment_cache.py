@@ -0,0 +1,147 @@
+"""
+큐레이션 코멘트 시맨틱 캐시
+- 키: (테마, 프롬프트 임베딩) - 같은 테마에서 코사인 유사도가 threshold 이상인 이전 프롬프트 검색
+- 추천 영화 집합의 Jaccard 겹침이 min_movie_overlap 이상일 때만 재사용 (코멘트가 영화 제목을 언급하므로)
+- 전체 max_entries 개 LRU + TTL, 테마별 임베딩 행렬은 변경 시에만 다시 쌓음
+- 이벤트 루프에서만 접근 (락 없음)
+"""
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import COMMENT_CACHE_ENTRIES, COMMENT_CACHE_LOOKUPS, COMMENT_CACHE_SAVED_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedComment:
+    theme: str
+    embedding: np.ndarray
+    movie_ids: FrozenSet[int]
+    comment: str
+    generation_seconds: float
+    expires_at: float
+
+
+def movie_overlap(a: Iterable[int], b: Iterable[int]) -> float:
+    """두 영화 집합의 Jaccard 유사도"""
+    a, b = set(a), set(b)
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class SemanticCommentCache:
+    """테마별 프롬프트 임베딩 근접 검색 기반 코멘트 캐시"""
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        ttl_seconds: float = 1800.0,
+        similarity_threshold: float = 0.92,
+        min_movie_overlap: float = 0.6,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.min_movie_overlap = min_movie_overlap
+        self._next_id = 0
+        self._entries: "OrderedDict[int, CachedComment]" = OrderedDict()
+        # 테마 → (entry id 목록, 임베딩 행렬) - None이면 다시 쌓아야 함
+        self._theme_index: Dict[str, Optional[tuple]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, theme: str, embedding, movie_ids: Iterable[int]) -> Optional[CachedComment]:
+        """재사용 가능한 코멘트 (없으면 None)"""
+        self._expire()
+        index = self._index_for(theme)
+        if index is None:
+            COMMENT_CACHE_LOOKUPS.labels(result="miss").inc()
+            return None
+
+        entry_ids, matrix = index
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        similarities = matrix @ query
+        movie_ids = frozenset(movie_ids)
+
+        # 유사도 높은 순으로 영화 겹침 조건까지 만족하는 첫 항목
+        for position in np.argsort(-similarities):
+            if similarities[position] < self.similarity_threshold:
+                break
+            entry = self._entries[entry_ids[position]]
+            if movie_overlap(entry.movie_ids, movie_ids) >= self.min_movie_overlap:
+                self._entries.move_to_end(entry_ids[position])
+                COMMENT_CACHE_LOOKUPS.labels(result="hit").inc()
+                COMMENT_CACHE_SAVED_SECONDS.inc(entry.generation_seconds)
+                logger.info(f"Comment cache hit (theme={theme}, similarity={similarities[position]:.3f})")
+                return entry
+
+        COMMENT_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    def store(self, theme: str, embedding, movie_ids: Iterable[int], comment: str, generation_seconds: float):
+        if not comment:
+            return
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        self._entries[self._next_id] = CachedComment(
+            theme=theme,
+            embedding=vector,
+            movie_ids=frozenset(movie_ids),
+            comment=comment,
+            generation_seconds=generation_seconds,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._next_id += 1
+        self._theme_index[theme] = None
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._theme_index[evicted.theme] = None
+        COMMENT_CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self):
+        self._entries.clear()
+        self._theme_index.clear()
+        COMMENT_CACHE_ENTRIES.set(0)
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.expires_at <= now]
+        for entry_id in expired:
+            self._theme_index[self._entries.pop(entry_id).theme] = None
+        if expired:
+            COMMENT_CACHE_ENTRIES.set(len(self._entries))
+
+    def _index_for(self, theme: str) -> Optional[tuple]:
+        if theme not in self._theme_index:
+            return None
+        index = self._theme_index[theme]
+        if index is None:
+            entry_ids: List[int] = [i for i, entry in self._entries.items() if entry.theme == theme]
+            if not entry_ids:
+                del self._theme_index[theme]
+                return None
+            index = (entry_ids, np.stack([self._entries[i].embedding for i in entry_ids]))
+            self._theme_index[theme] = index
+        return index
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "themes": len(self._theme_index)}
+
+
+# 전역 코멘트 캐시 (COMMENT_CACHE_ENABLED=false면 None)
+comment_cache = SemanticCommentCache(
+    max_entries=settings.COMMENT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.COMMENT_CACHE_TTL_SECONDS,
+    similarity_threshold=settings.COMMENT_CACHE_SIMILARITY_THRESHOLD,
+    min_movie_overlap=settings.COMMENT_CACHE_MIN_MOVIE_OVERLAP,
+) if settings.COMMENT_CACHE_ENABLED else None
@@ -0,0 +1,186 @@
+"""
+티켓별 큐레이션 후보 풀 - ORDER BY RANDOM() 대신 미리 계산한 영화 id 풀에서 샘플링
+- ticket_group_id별 전체 풀 / 성인 비허용 풀(허용 등급만)을 tuple로 보관
+- 포스터/제목 메타데이터도 같은 스냅샷에 보관 → 요청당 DB 조회 없음
+- 샘플링은 random.sample (limit에 비례, 카탈로그 크기와 무관)
+- ticket_group_movies / movies 변경은 LISTEN/NOTIFY(없으면 주기적 버전 확인)로 감지해 재적재
+- 준비 전이거나 티켓 풀이 없으면 None을 반환해 Postgres 쿼리로 폴백
+"""
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.metrics import CURATION_POOL_MOVIES, CURATION_POOL_REFRESHES
+from app.services.snapshot_refresher import SnapshotRefresher
+from app.services.vector_index import ALLOWED_CERTIFICATIONS
+
+logger = logging.getLogger(__name__)
+
+_ROWS_QUERY = """
+    SELECT tgm.ticket_group_id, m.id, m.title_ko, m.poster_path, m.certification
+    FROM ticket_group_movies tgm
+    JOIN movies m ON m.id = tgm.movie_id
+"""
+
+_SIGNATURE_QUERY = """
+    SELECT
+        (SELECT count(*) FROM ticket_group_movies) AS ticket_movie_count,
+        (SELECT max(created_at) FROM ticket_group_movies) AS ticket_movie_created_at,
+        (SELECT count(*) FROM movies) AS movie_count,
+        (SELECT max(id) FROM movies) AS movie_max_id
+"""
+
+
+@dataclass(frozen=True)
+class TicketPool:
+    """티켓 그룹 하나의 후보 영화 id"""
+    all_ids: Tuple[int, ...]
+    general_ids: Tuple[int, ...]  # 성인 비허용 요청에서도 노출 가능한 영화
+
+    def candidates(self, is_adult_allowed: bool) -> Tuple[int, ...]:
+        return self.all_ids if is_adult_allowed else self.general_ids
+
+
+@dataclass(frozen=True)
+class PoolSnapshot:
+    """교체 단위가 되는 불변 스냅샷"""
+    pools: Dict[int, TicketPool]
+    movies: Dict[int, Tuple[str, str]]  # movie_id → (title, posterUrl)
+    signature: tuple
+    loaded_at: float
+
+
+def build_pools(rows: Iterable) -> Tuple[Dict[int, TicketPool], Dict[int, Tuple[str, str]]]:
+    """(ticket_group_id, 영화) 행으로 티켓별 풀 구성. Returns: (pools, movies)"""
+    all_ids: Dict[int, List[int]] = {}
+    general_ids: Dict[int, List[int]] = {}
+    movies: Dict[int, Tuple[str, str]] = {}
+    for row in rows:
+        all_ids.setdefault(row.ticket_group_id, []).append(row.id)
+        if row.certification and row.certification in ALLOWED_CERTIFICATIONS:
+            general_ids.setdefault(row.ticket_group_id, []).append(row.id)
+        movies[row.id] = (row.title_ko, row.poster_path or "")
+
+    pools = {
+        ticket_id: TicketPool(all_ids=tuple(ids), general_ids=tuple(general_ids.get(ticket_id, ())))
+        for ticket_id, ids in all_ids.items()
+    }
+    return pools, movies
+
+
+class CurationPools(SnapshotRefresher):
+    """티켓별 큐레이션 후보 풀 (읽기는 lock 없이 현재 스냅샷 참조)"""
+
+    label = "Curation pools"
+
+    def __init__(
+        self,
+        engine=None,
+        refresh_interval: float = 30.0,
+        full_reload_interval: float = 3600.0,
+        notify_channel: Optional[str] = None,
+    ):
+        super().__init__(engine=engine, refresh_interval=refresh_interval, notify_channel=notify_channel)
+        self.full_reload_interval = full_reload_interval
+        self._snapshot: Optional[PoolSnapshot] = None
+
+    def sample(self, ticket_id: int, limit: int, is_adult_allowed: bool = False) -> Optional[List[dict]]:
+        """
+        티켓 풀에서 중복 없이 limit개 무작위 추출
+        Returns: [{"movieId", "title", "posterUrl"}], 풀 미준비/티켓 없음이면 None (호출측 Postgres 폴백)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        pool = snapshot.pools.get(ticket_id)
+        if pool is None:
+            return None
+
+        candidates = pool.candidates(is_adult_allowed)
+        picked = random.sample(candidates, min(max(limit, 0), len(candidates)))
+        movies = []
+        for movie_id in picked:
+            title, poster_url = snapshot.movies[movie_id]
+            movies.append({"movieId": movie_id, "title": title, "posterUrl": poster_url})
+        return movies
+
+    # ------------------------------------------------------------------
+    # 적재 / 갱신
+    # ------------------------------------------------------------------
+    def _fetch_signature(self, conn) -> tuple:
+        return tuple(conn.execute(text(_SIGNATURE_QUERY)).one())
+
+    def load(self) -> PoolSnapshot:
+        """전체 적재 후 스냅샷 교체 (id/제목/포스터만 읽어 가벼움)"""
+        started = time.monotonic()
+        with self.engine.connect() as conn:
+            signature = self._fetch_signature(conn)
+            pools, movies = build_pools(conn.execute(text(_ROWS_QUERY)))
+
+        snapshot = PoolSnapshot(pools=pools, movies=movies, signature=signature, loaded_at=time.time())
+        self._swap(snapshot, "full")
+        logger.info(
+            f"✓ Curation pools loaded: {len(movies)} movies, {len(pools)} tickets "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return snapshot
+
+    def refresh(self) -> str:
+        """
+        버전(매핑 건수/최신 created_at, 영화 건수/최대 id) 비교 후 변경 시 전체 재적재
+        - 영화 제목/포스터/등급 수정은 버전에 안 잡히므로 NOTIFY 또는 full_reload_interval로 반영
+        """
+        with self._refresh_lock:
+            current = self._snapshot
+            if current is not None and time.time() - current.loaded_at < self.full_reload_interval:
+                with self.engine.connect() as conn:
+                    if self._fetch_signature(conn) == current.signature:
+                        CURATION_POOL_REFRESHES.labels(kind="noop").inc()
+                        return "noop"
+            self.load()
+            return "full"
+
+    def invalidate(self):
+        """다음 갱신 주기에 버전과 무관하게 재적재 (NOTIFY로 영화 메타데이터 수정이 들어온 경우)"""
+        current = self._snapshot
+        if current is not None:
+            self._snapshot = PoolSnapshot(
+                pools=current.pools, movies=current.movies, signature=current.signature, loaded_at=0.0
+            )
+
+    def _on_notify(self):
+        # NOTIFY는 movies UPDATE처럼 버전이 안 바뀌는 변경도 알리므로 무조건 재적재
+        self.invalidate()
+
+    def _swap(self, snapshot: PoolSnapshot, kind: str):
+        # 참조 대입은 원자적 - 진행 중인 sample은 이전 스냅샷을 끝까지 사용
+        self._snapshot = snapshot
+        CURATION_POOL_MOVIES.set(len(snapshot.movies))
+        CURATION_POOL_REFRESHES.labels(kind=kind).inc()
+
+    def _on_refresh_error(self):
+        CURATION_POOL_REFRESHES.labels(kind="error").inc()
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"ready": False}
+        return {
+            "ready": True,
+            "movies": len(snapshot.movies),
+            "tickets": len(snapshot.pools),
+            "loaded_at": snapshot.loaded_at,
+        }
+
+
+# 전역 큐레이션 풀 (DB 엔진은 서버 시작 시 start()로 주입)
+curation_pools = CurationPools(
+    refresh_interval=settings.CURATION_POOL_REFRESH_SECONDS,
+    full_reload_interval=settings.CURATION_POOL_FULL_RELOAD_SECONDS,
+    notify_channel=settings.CURATION_POOL_NOTIFY_CHANNEL or None,
+)
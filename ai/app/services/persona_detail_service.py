@@ -0,0 +1,128 @@
+"""
+영화 페르소나 상세 소개 서비스
+- /movie-detail 라이브 생성과 사전 생성 배치(app.scripts.pregenerate_movie_details)가 같은 프롬프트/후처리 사용
+- 사전 생성 결과는 movie_persona_details (movie_id, theme, version)에 저장
+- version은 엔진/모델 + 프롬프트 + 생성 파라미터 hash → 하나라도 바뀌면 기존 행은 자동으로 무효
+"""
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.prompts import build_movie_detail_system_prompt
+from app.models.postprocess import clean_generated_text
+
+logger = logging.getLogger(__name__)
+
+DETAIL_GENERATION_PARAMS = {
+    "max_new_tokens": 150, # 안전 상한 (보통 target_chars 이후 문장 끝에서 먼저 종료)
+    "target_chars": 100, # 목표 100~150자
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "top_k": 50
+}
+
+USER_CONTENT_TEMPLATE = """[Data]
+- 영화 제목: {title}
+- 원본 줄거리: {overview}
+
+작성 내용:"""
+
+SELECT_DETAIL_QUERY = text("""
+    SELECT title, detail
+    FROM movie_persona_details
+    WHERE movie_id = :movie_id AND theme = :theme AND version = :version
+""")
+
+UPSERT_DETAIL_QUERY = text("""
+    INSERT INTO movie_persona_details (movie_id, theme, version, title, detail, created_at)
+    VALUES (:movie_id, :theme, :version, :title, :detail, NOW())
+    ON CONFLICT (movie_id, theme, version) DO UPDATE
+    SET title = EXCLUDED.title, detail = EXCLUDED.detail, created_at = EXCLUDED.created_at
+""")
+
+
+def detail_engine_identity() -> dict:
+    """상세 소개를 실제로 생성하는 엔진 (MOVIE_DETAIL_ENGINE 미설정 시 LLM_ENGINE) + 모델 파일"""
+    engine = settings.MOVIE_DETAIL_ENGINE or settings.LLM_ENGINE
+    identity = {"engine": engine, "model": settings.BASE_MODEL}
+    if engine == "llama_cpp":
+        identity["gguf"] = settings.LLM_GGUF_PATH
+    return identity
+
+
+@lru_cache(maxsize=64)
+def persona_detail_version(theme: str) -> str:
+    """(엔진/모델, 시스템/유저 프롬프트, 생성 파라미터, 수동 리비전) hash"""
+    payload = json.dumps(
+        {
+            **detail_engine_identity(),
+            "revision": settings.PERSONA_DETAIL_REVISION,
+            "system": build_movie_detail_system_prompt(theme),
+            "user": USER_CONTENT_TEMPLATE,
+            "params": DETAIL_GENERATION_PARAMS,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_movie_detail_messages(title: str, overview: Optional[str], theme: str) -> List[dict]:
+    """ChatML 구조 (테마별 말투 변환)"""
+    return [
+        {"role": "system", "content": build_movie_detail_system_prompt(theme)},
+        {"role": "user", "content": USER_CONTENT_TEMPLATE.format(title=title, overview=overview or '정보 없음')}
+    ]
+
+
+def clean_movie_detail(detail_comment: str) -> str:
+    """코멘트 후처리 (공통 후처리기 사용)"""
+    return clean_generated_text(detail_comment)
+
+
+async def get_precomputed_detail(db: AsyncSession, movie_id: int, theme: str):
+    """현재 버전의 사전 생성 소개 조회 (없거나 조회 실패 시 None)"""
+    try:
+        result = await db.execute(SELECT_DETAIL_QUERY, {
+            "movie_id": movie_id,
+            "theme": theme,
+            "version": persona_detail_version(theme),
+        })
+        return result.fetchone()
+    except Exception as e:
+        logger.error(f"Failed to read precomputed detail for movie {movie_id}: {e}")
+        # 같은 세션으로 라이브 생성 경로의 영화 조회가 이어지므로 aborted 트랜잭션 정리
+        await _rollback_quietly(db)
+        return None
+
+
+async def store_detail(db: AsyncSession, movie_id: int, theme: str, title: str, detail: str):
+    """라이브 생성 결과 저장 (다음 요청부터는 사전 생성 결과처럼 바로 반환)"""
+    if not detail:
+        return
+    try:
+        await db.execute(UPSERT_DETAIL_QUERY, {
+            "movie_id": movie_id,
+            "theme": theme,
+            "version": persona_detail_version(theme),
+            "title": title,
+            "detail": detail,
+        })
+        await db.commit()
+    except Exception as e:
+        logger.error(f"Failed to store detail for movie {movie_id}: {e}")
+        await _rollback_quietly(db)
+
+
+async def _rollback_quietly(db: AsyncSession):
+    """실패한 트랜잭션 정리 (연결이 끊긴 경우 rollback 실패는 로그만)"""
+    try:
+        await db.rollback()
+    except Exception as e:
+        logger.error(f"Rollback after persona detail error failed: {e}")
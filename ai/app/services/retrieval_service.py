@@ -2,17 +2,47 @@
 RAG 검색 서비스
 """
 import logging
+import numpy as np
 from sqlalchemy import text
-from app.api.dependencies import get_db_session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.embedding_loader import embedding_manager
+from app.core.metrics import VECTOR_INDEX_SEARCHES
+from app.services.vector_index import vector_index
 
 logger = logging.getLogger(__name__)
 
+# 고정 SQL (asyncpg prepared statement 캐시 재사용) - 값은 모두 바인딩 파라미터
+MOVIES_BY_IDS_QUERY = text("""
+    SELECT m.id, m.title_ko, m.overview_ko, m.poster_path
+    FROM movies m
+    WHERE m.id = ANY(:movie_ids)
+""")
+
+# 19금 필터링: is_adult_allowed가 False이면 18세 이상(18, 19, Restricted, R, NC-17) 및 NULL 인증 제외
+# 제외 ID: 빈 배열이면 <> ALL 조건은 항상 참
+SIMILAR_MOVIES_QUERY = text("""
+    SELECT m.id, m.title_ko, m.overview_ko, m.poster_path,
+           1 - (me.embedding <=> :embedding) as similarity
+    FROM movies m
+    JOIN movie_embeddings me ON m.id = me.movie_id
+    JOIN ticket_group_movies tgm ON m.id = tgm.movie_id
+    WHERE me.embedding IS NOT NULL
+      AND tgm.ticket_group_id = :ticket_id
+      AND m.id <> ALL(:exclude_ids)
+      AND (:is_adult_allowed = true
+           OR (m.certification IS NOT NULL
+               AND m.certification != ''
+               AND m.certification IN ('ALL', '12', '15', 'G', 'PG', 'PG-13')))
+    ORDER BY me.embedding <=> :embedding ASC
+    LIMIT :limit
+""")
+
+
 class RetrievalService:
     """PGVECTOR 기반 유사 영화 검색 서비스"""
 
     @staticmethod
-    async def get_movies_by_ids(db_session, movie_ids: list[int]):
+    async def get_movies_by_ids(db_session: AsyncSession, movie_ids: list[int]):
         """
         영화 ID 목록으로 영화 상세 정보 조회
         """
@@ -20,16 +50,7 @@ class RetrievalService:
             return []
             
         try:
-            # ID 목록을 문자열로 변환 (SQL IN 절 사용을위해)
-            ids_str = ",".join(map(str, movie_ids))
-            
-            query = text(f"""
-                SELECT m.id, m.title_ko, m.overview_ko, m.poster_path
-                FROM movies m
-                WHERE m.id IN ({ids_str})
-            """)
-            
-            result = db_session.execute(query)
+            result = await db_session.execute(MOVIES_BY_IDS_QUERY, {"movie_ids": list(movie_ids)})
             rows = result.fetchall()
             
             movies = []
@@ -48,47 +69,31 @@ class RetrievalService:
             return []
 
     @staticmethod
-    async def retrieve_similar_movies(db_session, prompt: str, ticket_id: int, limit: int = 5, exclude_ids: list[int] = None, is_adult_allowed: bool = False):
+    async def retrieve_similar_movies(db_session: AsyncSession, prompt: str, ticket_id: int, limit: int = 5, exclude_ids: list[int] = None, is_adult_allowed: bool = False, embedding=None):
         """
         사용자 프롬프트와 유사한 영화 검색 (티켓별 필터링 + 19금 필터링)
+        embedding: 이미 계산된 프롬프트 임베딩 (없으면 여기서 생성)
         """
         try:
             # 1. 프롬프트 임베딩 생성
-            embedding = embedding_manager.encode(prompt)
-            
-            # 제외할 ID 조건 추가
-            exclude_condition = ""
-            if exclude_ids:
-                exclude_ids_str = ",".join(map(str, exclude_ids))
-                exclude_condition = f"AND m.id NOT IN ({exclude_ids_str})"
+            if embedding is None:
+                embedding = await embedding_manager.encode_async(prompt)
 
-            # 19금 필터링 조건 추가
-            # is_adult_allowed가 False이면 18세 이상(18, 19, Restricted, R, NC-17) 및 NULL 인증 제외
-            # (:is_adult_allowed = true OR (m.certification IS NOT NULL AND ...))
-            
-            query = text(f"""
-                SELECT m.id, m.title_ko, m.overview_ko, m.poster_path, 
-                       1 - (me.embedding <=> :embedding) as similarity
-                FROM movies m
-                JOIN movie_embeddings me ON m.id = me.movie_id
-                JOIN ticket_group_movies tgm ON m.id = tgm.movie_id
-                WHERE me.embedding IS NOT NULL
-                  AND tgm.ticket_group_id = :ticket_id
-                {exclude_condition}
-                  AND (:is_adult_allowed = true 
-                       OR (m.certification IS NOT NULL 
-                           AND m.certification != '' 
-                           AND m.certification IN ('ALL', '12', '15', 'G', 'PG', 'PG-13')))
-                ORDER BY me.embedding <=> :embedding ASC
-                LIMIT :limit
-            """)
-            
-            # vector 타입은 문자열로 변환하여 전달해야 할 수도 있음 (pgvector 버전에 따라 다름)
-            embedding_str = str(embedding)
-            
-            result = db_session.execute(query, {
-                "embedding": embedding_str, 
+            # 2. In-process 벡터 인덱스 우선 (미준비/티켓 미적재 시 None → PGVECTOR 폴백)
+            movies = vector_index.search(
+                ticket_id, embedding, limit=limit, exclude_ids=exclude_ids, is_adult_allowed=is_adult_allowed
+            )
+            if movies is not None:
+                VECTOR_INDEX_SEARCHES.labels(backend="memory").inc()
+                logger.info(f"Retrieved {len(movies)} similar movies from vector index for prompt: {prompt[:30]}...")
+                return movies
+            VECTOR_INDEX_SEARCHES.labels(backend="postgres").inc()
+
+            # 3. PGVECTOR 검색 (임베딩은 pgvector 코덱으로 vector 파라미터 바인딩)
+            result = await db_session.execute(SIMILAR_MOVIES_QUERY, {
+                "embedding": np.asarray(embedding, dtype=np.float32),
                 "ticket_id": ticket_id,
+                "exclude_ids": list(exclude_ids or []),
                 "limit": limit,
                 "is_adult_allowed": is_adult_allowed
             })
@@ -0,0 +1,125 @@
+"""
+불변 스냅샷 + 백그라운드 갱신 스레드 공통 (벡터 인덱스, 큐레이션 풀)
+- 최초 적재 후 LISTEN/NOTIFY(없으면 refresh_interval 주기)로 변경을 감지해 refresh() 호출
+- 읽기 쪽은 lock 없이 현재 스냅샷 참조만 사용, 갱신은 새 스냅샷으로 참조 교체
+"""
+import logging
+import select
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotRefresher:
+    """load() / refresh()를 구현하고 self._snapshot을 교체하는 하위 클래스용 베이스"""
+
+    label = "Snapshot"
+
+    def __init__(self, engine=None, refresh_interval: float = 30.0, notify_channel: Optional[str] = None):
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self.notify_channel = notify_channel
+
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_ready(self) -> bool:
+        return self._snapshot is not None
+
+    def load(self):
+        raise NotImplementedError
+
+    def refresh(self) -> str:
+        raise NotImplementedError
+
+    def _on_refresh_error(self):
+        """갱신 실패 시 메트릭 기록용 hook"""
+
+    def _on_notify(self):
+        """NOTIFY 수신 시 (refresh() 직전) 호출되는 hook"""
+
+    # ------------------------------------------------------------------
+    # 백그라운드 갱신 스레드
+    # ------------------------------------------------------------------
+    def start(self, engine=None):
+        """백그라운드에서 최초 적재 후 변경 감시 (적재 전 조회는 호출측 Postgres 폴백)"""
+        if engine is not None:
+            self.engine = engine
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        thread_name = self.label.lower().replace(" ", "-")
+        self._thread = threading.Thread(target=self._run, name=thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        listener = None
+        while not self._stop.is_set():
+            try:
+                if self._snapshot is None:
+                    self.load()
+                if listener is None and self.notify_channel:
+                    listener = self._listen()
+                if self._wait_for_change(listener):
+                    self.refresh()
+            except Exception as e:
+                logger.error(f"{self.label} refresh failed: {e}")
+                self._on_refresh_error()
+                listener = self._close_listener(listener)
+                self._stop.wait(self.refresh_interval)
+        self._close_listener(listener)
+
+    def _listen(self):
+        """NOTIFY 수신용 전용 연결 (실패 시 주기적 버전 확인만 사용)"""
+        try:
+            raw = self.engine.raw_connection()
+            connection = raw.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.notify_channel}"')
+            logger.info(f"{self.label} listening on channel '{self.notify_channel}'")
+            return raw
+        except Exception as e:
+            logger.warning(f"LISTEN unavailable, falling back to polling: {e}")
+            return None
+
+    def _wait_for_change(self, listener) -> bool:
+        """NOTIFY가 오거나 refresh_interval이 지나면 True (중지 시 False)"""
+        if listener is None:
+            return not self._stop.wait(self.refresh_interval)
+
+        connection = listener.driver_connection
+        deadline = time.monotonic() + self.refresh_interval
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            # 중지 신호를 확인할 수 있도록 짧게 나눠 대기
+            readable, _, _ = select.select([connection], [], [], min(remaining, 1.0))
+            if readable:
+                connection.poll()
+                if connection.notifies:
+                    # 연속 변경은 한 번의 갱신으로 합침
+                    connection.notifies.clear()
+                    self._on_notify()
+                    return True
+        return False
+
+    @staticmethod
+    def _close_listener(listener):
+        if listener is not None:
+            try:
+                listener.invalidate()
+            except Exception:
+                pass
+        return None
@@ -0,0 +1,299 @@
+"""
+In-process Vector Index - 티켓 그룹별 영화 임베딩 행렬로 top-k 검색
+- 전체 임베딩을 ticket_group_id별 NumPy 행렬(정규화, float16/float32)로 보관
+- 성인 등급 마스크를 미리 계산하고, exclude_ids와 함께 벡터 연산으로 필터링
+- movie_embeddings 변경은 LISTEN/NOTIFY(없으면 주기적 버전 확인)로 감지해 증분 갱신
+- 영화 등급(certification)은 버전에 checksum으로 포함 → 등급이 바뀌면 전체 재적재 (성인 마스크 갱신)
+- 갱신은 새 스냅샷을 만든 뒤 참조를 교체 (검색 중인 요청은 이전 스냅샷을 그대로 사용)
+- 준비 전이거나 티켓 파티션이 없으면 None을 반환해 Postgres 검색으로 폴백
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.metrics import VECTOR_INDEX_MOVIES, VECTOR_INDEX_REFRESHES
+from app.services.snapshot_refresher import SnapshotRefresher
+
+logger = logging.getLogger(__name__)
+
+# 19금 필터 (Postgres 검색 쿼리와 동일한 허용 등급)
+ALLOWED_CERTIFICATIONS = frozenset({"ALL", "12", "15", "G", "PG", "PG-13"})
+
+_ROWS_QUERY = """
+    SELECT tgm.ticket_group_id, m.id, m.title_ko, m.overview_ko, m.poster_path,
+           m.certification, me.embedding::text AS embedding, me.updated_at
+    FROM movie_embeddings me
+    JOIN movies m ON m.id = me.movie_id
+    JOIN ticket_group_movies tgm ON tgm.movie_id = m.id
+    WHERE me.embedding IS NOT NULL
+"""
+
+_SIGNATURE_QUERY = """
+    SELECT
+        (SELECT count(*) FROM movie_embeddings WHERE embedding IS NOT NULL) AS embedding_count,
+        (SELECT max(updated_at) FROM movie_embeddings) AS embedding_updated_at,
+        (SELECT sum(extract(epoch FROM updated_at)) FROM movie_embeddings) AS embedding_updated_sum,
+        (SELECT count(*) FROM ticket_group_movies) AS ticket_movie_count,
+        (SELECT max(created_at) FROM ticket_group_movies) AS ticket_movie_created_at,
+        (SELECT md5(string_agg(id::text || ':' || coalesce(certification, ''), ',' ORDER BY id))
+         FROM movies) AS certification_checksum
+"""
+
+
+@dataclass(frozen=True)
+class TicketPartition:
+    """티켓 그룹 하나의 검색 행렬"""
+    movie_ids: np.ndarray        # [n] int64
+    vectors: np.ndarray          # [n, dim] L2 정규화된 임베딩
+    allowed_for_all: np.ndarray  # [n] bool - 성인 비허용 요청에서도 노출 가능한지
+
+    def __len__(self) -> int:
+        return len(self.movie_ids)
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """교체 단위가 되는 불변 스냅샷"""
+    partitions: Dict[int, TicketPartition]
+    movies: Dict[int, dict]
+    signature: tuple
+    loaded_at: float
+
+    @property
+    def embeddings_updated_at(self) -> Optional[datetime]:
+        return self.signature[1] if self.signature else None
+
+
+def parse_embedding(value) -> np.ndarray:
+    """pgvector '[..]' / float8[] '{..}' 텍스트 또는 시퀀스를 float32 벡터로 변환"""
+    if isinstance(value, str):
+        return np.array(value.strip("[]{}").split(","), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _movie_metadata(row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title_ko,
+        "overview": row.overview_ko or "설명 없음",
+        "poster_path": row.poster_path,
+    }
+
+
+def build_partitions(rows: Iterable, dtype=np.float16, base: Optional[IndexSnapshot] = None):
+    """
+    (ticket_group_id, 영화, 임베딩) 행으로 파티션 구성
+    - base가 있으면 해당 스냅샷의 파티션에 행을 덮어쓰거나 추가 (변경된 티켓만 새로 만듦)
+    Returns: (partitions, movies)
+    """
+    updates: Dict[int, Dict[int, tuple]] = {}
+    movies: Dict[int, dict] = dict(base.movies) if base is not None else {}
+    for row in rows:
+        vector = parse_embedding(row.embedding)
+        allowed = bool(row.certification) and row.certification in ALLOWED_CERTIFICATIONS
+        updates.setdefault(row.ticket_group_id, {})[row.id] = (vector, allowed)
+        movies[row.id] = _movie_metadata(row)
+
+    partitions: Dict[int, TicketPartition] = dict(base.partitions) if base is not None else {}
+    for ticket_id, ticket_rows in updates.items():
+        previous = partitions.get(ticket_id)
+        if previous is not None:
+            merged = {
+                int(movie_id): (previous.vectors[i].astype(np.float32), bool(previous.allowed_for_all[i]))
+                for i, movie_id in enumerate(previous.movie_ids)
+            }
+            merged.update(ticket_rows)
+            ticket_rows = merged
+
+        movie_ids = np.fromiter(ticket_rows.keys(), dtype=np.int64, count=len(ticket_rows))
+        vectors = _normalize(np.stack([vector for vector, _ in ticket_rows.values()]))
+        allowed_for_all = np.fromiter((allowed for _, allowed in ticket_rows.values()), dtype=bool)
+        partitions[ticket_id] = TicketPartition(
+            movie_ids=movie_ids,
+            vectors=vectors.astype(dtype),
+            allowed_for_all=allowed_for_all,
+        )
+    return partitions, movies
+
+
+class VectorIndex(SnapshotRefresher):
+    """티켓 그룹별 in-process 벡터 인덱스 (읽기는 lock 없이 현재 스냅샷 참조)"""
+
+    label = "Vector index"
+
+    def __init__(
+        self,
+        engine=None,
+        dtype: str = "float16",
+        refresh_interval: float = 30.0,
+        full_reload_interval: float = 3600.0,
+        incremental_overlap: float = 300.0,
+        notify_channel: Optional[str] = None,
+    ):
+        super().__init__(engine=engine, refresh_interval=refresh_interval, notify_channel=notify_channel)
+        self.dtype = np.dtype(dtype)
+        self.full_reload_interval = full_reload_interval
+        self.incremental_overlap = incremental_overlap
+        self._snapshot: Optional[IndexSnapshot] = None
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+    def search(
+        self,
+        ticket_id: int,
+        embedding: Sequence[float],
+        limit: int = 5,
+        exclude_ids: Optional[List[int]] = None,
+        is_adult_allowed: bool = False,
+    ) -> Optional[List[dict]]:
+        """
+        코사인 유사도 top-k (Postgres 쿼리와 같은 필터/정렬)
+        Returns: 영화 목록, 인덱스 미준비/파티션 없음이면 None (호출측 Postgres 폴백)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        partition = snapshot.partitions.get(ticket_id)
+        if partition is None:
+            return None
+        if limit <= 0 or len(partition) == 0:
+            return []
+
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        scores = partition.vectors @ query.astype(partition.vectors.dtype)
+        scores = scores.astype(np.float32)
+
+        mask = np.ones(len(partition), dtype=bool) if is_adult_allowed else partition.allowed_for_all.copy()
+        if exclude_ids:
+            mask &= ~np.isin(partition.movie_ids, np.asarray(exclude_ids, dtype=np.int64))
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0:
+            return []
+
+        k = min(limit, candidates.size)
+        candidate_scores = scores[candidates]
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+
+        movies = []
+        for index in top:
+            movie_id = int(partition.movie_ids[candidates[index]])
+            movie = dict(snapshot.movies[movie_id])
+            movie["similarity"] = float(candidate_scores[index])
+            movies.append(movie)
+        return movies
+
+    # ------------------------------------------------------------------
+    # 적재 / 갱신
+    # ------------------------------------------------------------------
+    def _fetch_signature(self, conn) -> tuple:
+        row = conn.execute(text(_SIGNATURE_QUERY)).one()
+        return (
+            row.embedding_count,
+            row.embedding_updated_at,
+            row.embedding_updated_sum,
+            row.ticket_movie_count,
+            row.ticket_movie_created_at,
+            row.certification_checksum,
+        )
+
+    def load(self) -> IndexSnapshot:
+        """전체 적재 후 스냅샷 교체"""
+        started = time.monotonic()
+        with self.engine.connect() as conn:
+            signature = self._fetch_signature(conn)
+            rows = conn.execute(text(_ROWS_QUERY))
+            partitions, movies = build_partitions(rows, dtype=self.dtype)
+
+        snapshot = IndexSnapshot(partitions=partitions, movies=movies, signature=signature, loaded_at=time.time())
+        self._swap(snapshot, "full")
+        logger.info(
+            f"✓ Vector index loaded: {len(movies)} movies, {len(partitions)} tickets "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return snapshot
+
+    def refresh(self) -> str:
+        """
+        버전(건수, 최신 updated_at, updated_at 합계) 비교 후 갱신
+        - 변경 없음: noop
+        - 임베딩 추가/수정만 있음: 이전 최신 updated_at - incremental_overlap 이후 행만 읽어
+          해당 티켓 파티션만 교체 (incremental)
+        - 삭제, 티켓-영화 매핑/영화 등급 변경, 오래된 스냅샷: 전체 재적재 (full)
+        """
+        with self._refresh_lock:
+            current = self._snapshot
+            if current is None or time.time() - current.loaded_at >= self.full_reload_interval:
+                self.load()
+                return "full"
+
+            with self.engine.connect() as conn:
+                signature = self._fetch_signature(conn)
+                if signature == current.signature:
+                    VECTOR_INDEX_REFRESHES.labels(kind="noop").inc()
+                    return "noop"
+
+                embedding_count = signature[0]
+                # 매핑 건수/시각, 등급 checksum - 성인 마스크가 바뀔 수 있으므로 증분 불가
+                mapping_changed = signature[3:] != current.signature[3:]
+                if mapping_changed or embedding_count < current.signature[0] or current.embeddings_updated_at is None:
+                    self.load()
+                    return "full"
+
+                # updated_at은 NOW()(트랜잭션 시작 시각)라 이전 최신값보다 먼저 시작해 늦게 커밋된 행이
+                # 있을 수 있음 → overlap만큼 겹쳐 다시 읽음 (중복 적용은 덮어쓰기)
+                # 최신값이 그대로인 수정도 updated_at 합계가 바뀌므로 여기까지 옴
+                since = current.embeddings_updated_at - timedelta(seconds=self.incremental_overlap)
+                rows = conn.execute(text(_ROWS_QUERY + " AND me.updated_at >= :since"), {"since": since}).fetchall()
+
+            partitions, movies = build_partitions(rows, dtype=self.dtype, base=current)
+            snapshot = IndexSnapshot(
+                partitions=partitions, movies=movies, signature=signature, loaded_at=current.loaded_at
+            )
+            self._swap(snapshot, "incremental")
+            logger.info(f"Vector index incrementally refreshed: {len(rows)} rows (updated_at >= {since})")
+            return "incremental"
+
+    def _swap(self, snapshot: IndexSnapshot, kind: str):
+        # 참조 대입은 원자적 - 진행 중인 search는 이전 스냅샷을 끝까지 사용
+        self._snapshot = snapshot
+        VECTOR_INDEX_MOVIES.set(len(snapshot.movies))
+        VECTOR_INDEX_REFRESHES.labels(kind=kind).inc()
+
+    def _on_refresh_error(self):
+        VECTOR_INDEX_REFRESHES.labels(kind="error").inc()
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"ready": False}
+        return {
+            "ready": True,
+            "movies": len(snapshot.movies),
+            "tickets": len(snapshot.partitions),
+            "dtype": self.dtype.name,
+            "embeddings_updated_at": str(snapshot.embeddings_updated_at),
+            "loaded_at": snapshot.loaded_at,
+        }
+
+
+# 전역 벡터 인덱스 (DB 엔진은 서버 시작 시 start()로 주입)
+vector_index = VectorIndex(
+    dtype=settings.VECTOR_INDEX_DTYPE,
+    refresh_interval=settings.VECTOR_INDEX_REFRESH_SECONDS,
+    full_reload_interval=settings.VECTOR_INDEX_FULL_RELOAD_SECONDS,
+    incremental_overlap=settings.VECTOR_INDEX_INCREMENTAL_OVERLAP_SECONDS,
+    notify_channel=settings.VECTOR_INDEX_NOTIFY_CHANNEL or None,
+)
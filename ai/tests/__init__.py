@@ -0,0 +1,3 @@
+"""
+AI 서버 테스트 모듈
+"""
@@ -0,0 +1,117 @@
+"""
+BatchScheduler 테스트 (CPU + 초소형 Causal LM, tests/conftest.py의 tiny_lm fixture)
+
+실행:
+    cd ai && pytest tests/test_batch_scheduler.py -v
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("torch")
+
+from app.models.batch_scheduler import BatchScheduler, GenerationRequest
+
+
+def _request(content: str, **kwargs) -> GenerationRequest:
+    params = {"max_new_tokens": 12, "temperature": 0.0, "top_p": 1.0, "top_k": 0}
+    params.update(kwargs)
+    return GenerationRequest(messages=[{"role": "user", "content": content}], **params)
+
+
+PROMPTS = ["잔잔한 영화 추천해줘", "hi", "액션 영화 중에 제일 박진감 넘치는 작품은 뭐가 있을까요?"]
+
+
+class TestBatchScheduler:
+    """패딩 배치 생성 테스트"""
+
+    def test_batched_output_matches_single(self, tiny_lm):
+        """greedy 디코딩 시 배치 결과가 단건 실행 결과와 동일해야 함"""
+        model, tokenizer = tiny_lm
+        scheduler = BatchScheduler(model, tokenizer, "cpu", max_batch_size=8)
+
+        singles = [scheduler.run_batch([_request(p)])[0] for p in PROMPTS]
+        batched = scheduler.run_batch([_request(p) for p in PROMPTS])
+
+        assert batched == singles
+
+    def test_per_request_max_new_tokens(self, tiny_lm):
+        """요청별 max_new_tokens가 행 단위로 적용되어야 함"""
+        model, tokenizer = tiny_lm
+        scheduler = BatchScheduler(model, tokenizer, "cpu")
+
+        short, long = scheduler.run_batch([
+            _request(PROMPTS[0], max_new_tokens=2),
+            _request(PROMPTS[0], max_new_tokens=10),
+        ])
+
+        assert short == scheduler.run_batch([_request(PROMPTS[0], max_new_tokens=2)])[0]
+        assert long == scheduler.run_batch([_request(PROMPTS[0], max_new_tokens=10)])[0]
+        assert len(short) < len(long) and long.startswith(short)
+
+    def test_concurrent_submit_is_batched(self, tiny_lm):
+        """동시에 제출된 요청이 한 배치로 묶여 각자 결과를 받아야 함"""
+        model, tokenizer = tiny_lm
+        scheduler = BatchScheduler(model, tokenizer, "cpu", max_batch_size=4, max_wait_ms=200)
+        batch_sizes = []
+        original_run_batch = scheduler.run_batch
+
+        def recording_run_batch(batch):
+            batch_sizes.append(len(batch))
+            return original_run_batch(batch)
+
+        scheduler.run_batch = recording_run_batch
+        scheduler.start()
+        try:
+            with ThreadPoolExecutor(max_workers=len(PROMPTS)) as pool:
+                futures = list(pool.map(lambda p: scheduler.submit(_request(p)), PROMPTS))
+                results = [f.result(timeout=60) for f in futures]
+        finally:
+            scheduler.stop()
+
+        assert len(results) == len(PROMPTS)
+        assert max(batch_sizes) > 1
+        assert results == [original_run_batch([_request(p)])[0] for p in PROMPTS]
+
+    def test_target_chars_stops_at_sentence_boundary(self, tiny_lm):
+        """목표 글자 수를 넘긴 뒤 문장 끝 토큰이 나온 행만 종료 대상"""
+        torch = pytest.importorskip("torch")
+        model, tokenizer = tiny_lm
+        scheduler = BatchScheduler(model, tokenizer, "cpu")
+        texts = ["잔잔한 영화예요.", "잔잔한 영화예요.", "잔잔한 영화예요", "영화."]
+        batch = [_request("x", target_chars=5), _request("x", target_chars=50), _request("x", target_chars=5), _request("x")]
+        ids = [tokenizer(t, add_special_tokens=False)["input_ids"] for t in texts]
+        width = max(len(row) for row in ids)
+        generated = torch.tensor([row + [tokenizer.pad_token_id] * (width - len(row)) for row in ids])
+        lengths = torch.tensor([len(row) for row in ids])
+        next_tokens = torch.tensor([row[-1] for row in ids])
+        finished = torch.zeros(len(batch), dtype=torch.bool)
+
+        reached = scheduler._budget_reached(batch, [0, 1, 2], generated, lengths, next_tokens, finished)
+
+        assert reached == [True, False, False, False]
+
+    def test_target_chars_never_longer_than_unbounded(self, tiny_lm):
+        model, tokenizer = tiny_lm
+        scheduler = BatchScheduler(model, tokenizer, "cpu")
+        bounded, unbounded = scheduler.run_batch([
+            _request(PROMPTS[0], max_new_tokens=24, target_chars=1),
+            _request(PROMPTS[0], max_new_tokens=24),
+        ])
+        assert unbounded.startswith(bounded)
+
+    def test_records_request_timings_and_stages(self, tiny_lm):
+        """계측 필드(토큰 수 / 첫 토큰 시각)와 단계별 시간 콜백"""
+        model, tokenizer = tiny_lm
+        stages = {}
+        scheduler = BatchScheduler(model, tokenizer, "cpu", on_stage=stages.__setitem__)
+        requests = [_request(PROMPTS[0], max_new_tokens=3), _request(PROMPTS[2], max_new_tokens=5)]
+
+        texts = scheduler.run_batch(requests)
+
+        assert set(stages) == {"tokenize", "prefill", "decode"}
+        for request, text in zip(requests, texts):
+            assert request.submitted_at <= request.started_at <= request.first_token_at
+            assert request.prompt_tokens == len(scheduler._tokenize(scheduler._render(request.messages, True)))
+            assert 0 < request.generated_tokens <= request.max_new_tokens
+        assert requests[0].prompt_tokens < requests[1].prompt_tokens
@@ -0,0 +1,70 @@
+"""
+서버 벤치마크 집계/인메모리 세션 테스트 (앱 기동 없음)
+
+실행:
+    cd ai && pytest tests/test_benchmark_server.py -v
+"""
+import asyncio
+
+from app.scripts.benchmark_server import InMemoryCatalog, compare, percentile, stage_breakdown, summarize
+from app.services.persona_detail_service import SELECT_DETAIL_QUERY, UPSERT_DETAIL_QUERY
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_stage_breakdown_uses_metric_deltas():
+    before = {"pipeline": {("generate", "retrieval"): [1.0, 10]}, "engine": {}, "engine_queue": {}, "inference_queue": {}}
+    after = {
+        "pipeline": {("generate", "retrieval"): [1.5, 20], ("movie_detail", "total"): [2.0, 4]},
+        "engine": {("hf", "decode"): [0.2, 2]},
+        "engine_queue": {},
+        "inference_queue": {},
+    }
+
+    stages = stage_breakdown(before, after, "generate")
+
+    assert stages == {
+        "retrieval": {"mean_ms": 50.0, "count": 10},
+        "engine.hf.decode": {"mean_ms": 100.0, "count": 2},
+    }
+
+
+def test_summarize_and_compare():
+    run = {"latencies": [0.01] * 9 + [0.1], "statuses": {"200": 9, "503": 1}, "elapsed": 0.5}
+    row = summarize("generate", 8, run, {})
+    assert row["ok"] == 9
+    assert row["throughput_rps"] == 20.0
+    assert row["latency_ms"]["p50"] == 10.0 and row["latency_ms"]["p99"] == 100.0
+
+    faster = dict(row, throughput_rps=30.0, latency_ms=dict(row["latency_ms"], p50=5.0))
+    changes = compare({"results": [row]}, {"results": [faster]})
+    assert changes[0]["throughput_change_pct"] == 50.0
+    assert changes[0]["p50_change_pct"] == -50.0
+    assert changes[0]["p99_change_pct"] == 0.0
+
+
+def test_in_memory_catalog_is_seeded_and_stores_details():
+    catalog = InMemoryCatalog(movies=50, tickets=[1, 2], movies_per_ticket=10, seed=7, store_details=True)
+    again = InMemoryCatalog(movies=50, tickets=[1, 2], movies_per_ticket=10, seed=7, store_details=True)
+    assert catalog.tickets == again.tickets
+    assert len(list(catalog.rows())) == 20
+
+    async def _queries():
+        session = catalog.session()
+        key = {"movie_id": 3, "theme": "t", "version": "v"}
+        missing = (await session.execute(SELECT_DETAIL_QUERY, key)).fetchone()
+        await session.execute(UPSERT_DETAIL_QUERY, {**key, "title": "벤치 영화 3", "detail": "소개"})
+        stored = (await session.execute(SELECT_DETAIL_QUERY, key)).fetchone()
+        return missing, stored
+
+    missing, stored = asyncio.run(_queries())
+    assert catalog.movies[3].title_ko == "벤치 영화 3"
+    assert missing is None
+    assert stored.detail == "소개"
@@ -0,0 +1,67 @@
+"""
+큐레이션 코멘트 시맨틱 캐시 테스트
+
+실행:
+    cd ai && pytest tests/test_comment_cache.py -v
+"""
+import time
+
+import numpy as np
+import pytest
+
+from app.services.comment_cache import SemanticCommentCache, movie_overlap
+
+THEME = "편안하고 잔잔한 감성 추구"
+
+
+def _vector(seed: int, dim: int = 16) -> np.ndarray:
+    vector = np.random.default_rng(seed).normal(size=dim)
+    return vector / np.linalg.norm(vector)
+
+
+def _near(vector: np.ndarray, scale: float = 0.05) -> np.ndarray:
+    return vector + np.random.default_rng(99).normal(scale=scale, size=vector.shape)
+
+
+@pytest.fixture
+def cache():
+    return SemanticCommentCache(max_entries=3, ttl_seconds=60, similarity_threshold=0.9, min_movie_overlap=0.6)
+
+
+class TestSemanticCommentCache:
+    def test_paraphrase_with_same_movies_hits(self, cache):
+        base = _vector(1)
+        cache.store(THEME, base, [1, 2, 3, 4, 5], "잔잔한 밤에 어울려요.", 1.5)
+
+        entry = cache.lookup(THEME, _near(base), [1, 2, 3, 4, 6])
+        assert entry is not None and entry.comment == "잔잔한 밤에 어울려요."
+
+    def test_theme_similarity_and_movie_overlap_must_match(self, cache):
+        base = _vector(1)
+        cache.store(THEME, base, [1, 2, 3, 4, 5], "코멘트", 1.0)
+
+        assert cache.lookup("3D 보단 2D ", base, [1, 2, 3, 4, 5]) is None
+        assert cache.lookup(THEME, _vector(2), [1, 2, 3, 4, 5]) is None
+        assert cache.lookup(THEME, base, [1, 2, 7, 8, 9]) is None
+
+    def test_lru_eviction_and_ttl(self):
+        cache = SemanticCommentCache(max_entries=2, ttl_seconds=60, similarity_threshold=0.9)
+        vectors = [_vector(i) for i in range(3)]
+        cache.store(THEME, vectors[0], [1], "a", 1.0)
+        cache.store(THEME, vectors[1], [1], "b", 1.0)
+        assert cache.lookup(THEME, vectors[0], [1]).comment == "a"
+        cache.store(THEME, vectors[2], [1], "c", 1.0)
+
+        assert len(cache) == 2
+        assert cache.lookup(THEME, vectors[1], [1]) is None
+        assert cache.lookup(THEME, vectors[0], [1]).comment == "a"
+
+        short = SemanticCommentCache(ttl_seconds=0.01)
+        short.store(THEME, vectors[0], [1], "a", 1.0)
+        time.sleep(0.02)
+        assert short.lookup(THEME, vectors[0], [1]) is None and len(short) == 0
+
+    def test_movie_overlap(self):
+        assert movie_overlap([1, 2, 3], [1, 2, 3]) == 1.0
+        assert movie_overlap([1, 2], [3, 4]) == 0.0
+        assert movie_overlap([1, 2, 3, 4], [1, 2, 3, 5]) == pytest.approx(0.6)
@@ -0,0 +1,96 @@
+"""
+티켓별 큐레이션 풀 테스트 (SQLite 메모리 DB로 적재/갱신 확인)
+
+실행:
+    cd ai && pytest tests/test_curation_pool.py -v
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.services.curation_pool import CurationPools
+
+ADULT = {3, 7, 11}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE movies (id INTEGER PRIMARY KEY, title_ko TEXT, poster_path TEXT, certification TEXT)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE ticket_group_movies (ticket_group_id INTEGER, movie_id INTEGER, "
+            "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        for movie_id in range(1, 41):
+            certification = "19" if movie_id in ADULT else ("" if movie_id == 5 else "15")
+            conn.execute(
+                text("INSERT INTO movies VALUES (:id, :title, :poster, :cert)"),
+                {"id": movie_id, "title": f"영화 {movie_id}", "poster": f"/{movie_id}.jpg", "cert": certification},
+            )
+            conn.execute(
+                text("INSERT INTO ticket_group_movies (ticket_group_id, movie_id) VALUES (:ticket, :movie)"),
+                {"ticket": 1 if movie_id <= 30 else 2, "movie": movie_id},
+            )
+    return engine
+
+
+@pytest.fixture
+def pools(engine):
+    pools = CurationPools(engine=engine)
+    pools.load()
+    return pools
+
+
+class TestCurationPools:
+    """풀 샘플링 결과와 ORDER BY RANDOM() 쿼리 의미(티켓/19금 필터, 중복 없음) 일치 테스트"""
+
+    def test_sample_respects_ticket_and_certification(self, pools):
+        for _ in range(20):
+            movies = pools.sample(1, 5, is_adult_allowed=False)
+            ids = [movie["movieId"] for movie in movies]
+            assert len(ids) == len(set(ids)) == 5
+            assert all(1 <= movie_id <= 30 for movie_id in ids)
+            # 19금 + 등급 미상('')은 성인 비허용 풀에서 제외
+            assert not set(ids) & (ADULT | {5})
+        movie = pools.sample(2, 1)[0]
+        assert movie == {
+            "movieId": movie["movieId"],
+            "title": f"영화 {movie['movieId']}",
+            "posterUrl": f"/{movie['movieId']}.jpg",
+        }
+
+    def test_limit_larger_than_pool_returns_whole_pool(self, pools):
+        adult_allowed = {movie["movieId"] for movie in pools.sample(2, 20, is_adult_allowed=True)}
+        general = {movie["movieId"] for movie in pools.sample(1, 50, is_adult_allowed=False)}
+
+        assert adult_allowed == set(range(31, 41))
+        assert general == set(range(1, 31)) - ADULT - {5}
+
+    def test_unknown_ticket_or_not_ready_falls_back(self, engine, pools):
+        assert CurationPools(engine=engine).sample(1, 5) is None
+        assert pools.sample(99, 5) is None
+
+    def test_refresh_reloads_only_when_mapping_changes(self, engine, pools):
+        before = pools._snapshot
+        assert pools.refresh() == "noop"
+        assert pools._snapshot is before
+
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO ticket_group_movies (ticket_group_id, movie_id) VALUES (2, 1)"))
+        assert pools.refresh() == "full"
+        assert 1 in {movie["movieId"] for movie in pools.sample(2, 20, is_adult_allowed=True)}
+        # 이전 스냅샷은 그대로 유지 (진행 중인 샘플링에 영향 없음)
+        assert len(before.pools[2].all_ids) == 10
+
+    def test_notify_forces_reload_for_metadata_updates(self, engine, pools):
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE movies SET title_ko = '새 제목' WHERE id = 31"))
+        assert pools.refresh() == "noop"
+
+        pools._on_notify()
+        assert pools.refresh() == "full"
+        titles = {movie["movieId"]: movie["title"] for movie in pools.sample(2, 20, is_adult_allowed=True)}
+        assert titles[31] == "새 제목"
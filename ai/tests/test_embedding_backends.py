@@ -0,0 +1,81 @@
+"""
+임베딩 백엔드 테스트
+- 비교 지표(코사인/top-k 일치율) 계산
+- onnxruntime이 있으면 초소형 XLM-R을 ONNX로 export 해 torch CLS 임베딩과 일치 확인
+
+실행:
+    cd ai && pytest tests/test_embedding_backends.py -v
+"""
+import numpy as np
+import pytest
+
+from app.models.embedding_backends import (
+    ONNX_MODEL_FILE,
+    FakeEmbeddingBackend,
+    OnnxEmbeddingBackend,
+    create_embedding_backend,
+)
+from app.scripts.evaluate_embedding_backends import compare
+
+
+def _unit(matrix):
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class TestCompare:
+    def test_identical_and_perturbed(self):
+        rng = np.random.default_rng(0)
+        reference = _unit(rng.normal(size=(20, 16)))
+        assert compare(reference, reference)["cosine_min"] == pytest.approx(1.0)
+        assert compare(reference, reference)["top5_overlap"] == 1.0
+
+        noisy = compare(reference, _unit(reference + rng.normal(scale=0.3, size=reference.shape)))
+        assert noisy["cosine_min"] < noisy["cosine_mean"] < 1.0
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_embedding_backend("nope")
+
+
+def test_fake_backend_is_deterministic_and_normalized():
+    backend = FakeEmbeddingBackend(dim=16)
+    first = backend.encode(["잔잔한 영화", "액션 영화"])
+    again = FakeEmbeddingBackend(dim=16).encode(["액션 영화"])
+
+    assert first.shape == (2, 16) and first.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(first[1], again[0])
+    assert not np.allclose(first[0], first[1])
+
+
+def test_onnx_backend_matches_torch_cls(tmp_path):
+    pytest.importorskip("onnxruntime")
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    from app.scripts.export_embedding_onnx import export_fp32
+
+    from tests.conftest import build_tiny_tokenizer
+
+    tokenizer = build_tiny_tokenizer()
+    config = transformers.XLMRobertaConfig(
+        vocab_size=len(tokenizer), hidden_size=32, num_hidden_layers=2, num_attention_heads=4,
+        intermediate_size=64, max_position_embeddings=64, pad_token_id=tokenizer.pad_token_id,
+    )
+    torch.manual_seed(0)
+    model_dir = tmp_path / "model"
+    transformers.XLMRobertaModel(config).save_pretrained(model_dir)
+    tokenizer.save_pretrained(model_dir)
+
+    output_dir = tmp_path / "onnx"
+    output_dir.mkdir()
+    fp32_path = export_fp32(str(model_dir), str(output_dir))
+    (output_dir / ONNX_MODEL_FILE).write_bytes(open(fp32_path, "rb").read())
+
+    texts = ["잔잔한 영화 추천해줘", "액션 영화 보고 싶어", "hi"]
+    backend = OnnxEmbeddingBackend(str(output_dir), threads=1)
+    with torch.no_grad():
+        encoded = tokenizer(texts, padding=True, return_tensors="pt")
+        hidden = transformers.XLMRobertaModel.from_pretrained(model_dir)(**encoded).last_hidden_state[:, 0]
+    expected = _unit(hidden.numpy())
+
+    np.testing.assert_allclose(backend.encode(texts, batch_size=2), expected, atol=1e-4)
@@ -0,0 +1,112 @@
+"""
+쿼리 임베딩 캐시 / micro-batcher 테스트 (임베딩 모델 대신 해시 기반 가짜 encode)
+
+실행:
+    cd ai && pytest tests/test_embedding_batcher.py -v
+"""
+import asyncio
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.models.embedding_batcher import EmbeddingBatcher, EmbeddingCache, normalize_prompt
+
+DIM = 8
+
+
+class FakeEncoder:
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.calls.append(list(texts))
+        time.sleep(self.delay)
+        return np.stack([
+            np.random.default_rng(zlib.crc32(normalize_prompt(t).encode())).normal(size=DIM) for t in texts
+        ]).astype(np.float32)
+
+
+@pytest.fixture
+def encoder():
+    return FakeEncoder(delay=0.02)
+
+
+@pytest.fixture
+def batcher(encoder):
+    batcher = EmbeddingBatcher(encoder, cache=EmbeddingCache(1024 * 1024, 60), max_batch_size=16, max_wait_ms=20)
+    batcher.start()
+    yield batcher
+    batcher.stop()
+
+
+class TestEmbeddingBatcher:
+    def test_concurrent_calls_share_one_batch(self, batcher, encoder):
+        prompts = [f"영화 추천 {i}" for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            vectors = list(pool.map(batcher.encode, prompts))
+
+        assert sum(len(call) for call in encoder.calls) == 8
+        assert len(encoder.calls) < 8
+        for prompt, vector in zip(prompts, vectors):
+            np.testing.assert_allclose(vector, encoder([prompt])[0])
+
+    def test_cache_hit_uses_normalized_prompt(self, batcher, encoder):
+        first = batcher.encode("잔잔한  영화 추천해줘")
+        calls = len(encoder.calls)
+        again = batcher.encode("  잔잔한 영화 추천해줘 ")
+        assert len(encoder.calls) == calls
+        np.testing.assert_array_equal(first, again)
+
+    def test_duplicate_inflight_prompts_coalesce(self, batcher, encoder):
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(batcher.encode, ["같은 질문"] * 6))
+        assert sum(len(call) for call in encoder.calls) == 1
+
+    def test_submit_is_awaitable_without_blocking_a_thread(self, batcher, encoder):
+        async def run():
+            return await asyncio.gather(*(asyncio.wrap_future(batcher.submit(f"영화 {i}")) for i in range(4)))
+
+        vectors = asyncio.run(run())
+        assert sum(len(call) for call in encoder.calls) == 4
+        np.testing.assert_allclose(vectors[0], encoder(["영화 0"])[0])
+        # 캐시 hit은 이미 완료된 Future
+        assert batcher.submit("영화 0").done()
+
+    def test_encode_error_propagates(self):
+        def broken(texts):
+            raise ValueError("boom")
+
+        batcher = EmbeddingBatcher(broken, max_wait_ms=1)
+        batcher.start()
+        try:
+            with pytest.raises(ValueError):
+                batcher.encode("x")
+        finally:
+            batcher.stop()
+
+
+class TestEmbeddingCache:
+    def test_ttl_expiry(self):
+        cache = EmbeddingCache(1024, ttl_seconds=0.01)
+        cache.put("a", np.ones(DIM, dtype=np.float32))
+        assert cache.get("a") is not None
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+    def test_lru_eviction_by_bytes(self):
+        vector = np.ones(DIM, dtype=np.float32)
+        cache = EmbeddingCache(max_bytes=vector.nbytes * 2, ttl_seconds=60)
+        cache.put("a", vector)
+        cache.put("b", vector)
+        cache.get("a")
+        cache.put("c", vector)
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.stats()["bytes"] == vector.nbytes * 2
@@ -0,0 +1,72 @@
+"""
+LLM 엔진 테스트 (fake 엔진 + ModelManager, 모델 파일 없이 실행)
+
+실행:
+    cd ai && pytest tests/test_engines.py -v
+"""
+import pytest
+
+pytest.importorskip("torch")
+
+from app.core.config import settings
+from app.models.batch_scheduler import GenerationRequest
+from app.models.engines import FakeEngine, create_engine
+from app.models.model_loader import ModelManager
+
+MESSAGES = [{"role": "system", "content": "큐레이터"}, {"role": "user", "content": "잔잔한 영화 추천해줘"}]
+
+
+@pytest.fixture
+def engine():
+    engine = FakeEngine(workers=2)
+    engine.load()
+    yield engine
+    engine.shutdown()
+
+
+def _generate(engine, **kwargs) -> str:
+    params = {"max_new_tokens": 200}
+    params.update(kwargs)
+    return engine.submit(GenerationRequest(messages=MESSAGES, **params)).result(timeout=5)
+
+
+class TestFakeEngine:
+    def test_deterministic_and_counts_tokens(self, engine):
+        first = _generate(engine)
+        assert first == _generate(engine)
+        stats = engine.stats.snapshot()
+        assert stats["engine"] == "fake" and stats["requests"] == 2
+        assert stats["tokens"] == 2 * len(first)
+
+    def test_max_new_tokens_and_target_chars(self, engine):
+        assert len(_generate(engine, max_new_tokens=5)) == 5
+        bounded = _generate(engine, target_chars=10)
+        assert len(bounded) >= 10 and bounded[-1] in ".!?"
+        assert _generate(engine).startswith(bounded)
+
+    def test_stream_matches_generate(self, engine):
+        from app.models.token_stream import TokenStream
+
+        request = GenerationRequest(messages=MESSAGES, max_new_tokens=200, target_chars=20)
+        stream = TokenStream(engine.tokenizer, request)
+        engine.submit(request)
+        assert "".join(stream) == _generate(engine, target_chars=20)
+
+
+class TestModelManagerEngines:
+    def test_selects_engine_by_setting(self, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_ENGINE", "fake")
+        monkeypatch.setattr(settings, "MOVIE_DETAIL_ENGINE", "")
+        manager = ModelManager()
+        manager.initialize()
+        try:
+            assert manager.is_ready()
+            assert manager.generate(MESSAGES, max_new_tokens=8) == manager.generate(MESSAGES, max_new_tokens=8)
+            assert set(manager.engine_stats()) == {"default"}
+        finally:
+            manager.shutdown()
+        assert not manager.is_ready()
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            create_engine("nope")
@@ -0,0 +1,194 @@
+"""
+임베딩 backfill 스크립트 테스트 (DB는 메모리 가짜 엔진, 인코더는 stub)
+
+실행:
+    cd ai && pytest tests/test_generate_embeddings.py -v
+"""
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import embedding_loader
+from app.scripts import generate_embeddings as backfill
+from app.scripts.generate_embeddings import Checkpoint, build_text_chunk, content_hash, run_shard
+
+
+class FakeMovieDB:
+    """run_shard가 보내는 읽기/upsert/hash 갱신 쿼리를 메모리 dict로 처리하는 엔진"""
+
+    def __init__(self, count: int):
+        self.movies = {
+            movie_id: {"title_ko": f"영화 {movie_id}", "overview_ko": f"줄거리 {movie_id}", "genres": ["드라마"]}
+            for movie_id in range(1, count + 1)
+        }
+        self.embeddings = {}
+        self.fail_on_movie = None
+
+    def connect(self):
+        return self
+
+    def begin(self):
+        return self
+
+    def execution_options(self, **options):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "FROM movies m" in sql:
+            return [
+                SimpleNamespace(
+                    id=movie_id,
+                    **movie,
+                    content_hash=self.embeddings.get(movie_id, {}).get("content_hash"),
+                    has_embedding=movie_id in self.embeddings,
+                )
+                for movie_id, movie in sorted(self.movies.items())
+                if movie_id > params["after_id"] and movie_id % params["num_shards"] == params["shard"]
+            ]
+        if sql.lstrip().startswith("INSERT INTO movie_embeddings"):
+            count = len(re.findall(r":movie_id_\d+", sql))
+            rows = {
+                params[f"movie_id_{i}"]: {
+                    "embedding": params[f"embedding_{i}"],
+                    "content_hash": params[f"content_hash_{i}"],
+                }
+                for i in range(count)
+            }
+            if self.fail_on_movie in rows:
+                raise RuntimeError("connection lost")
+            self.embeddings.update(rows)
+            return None
+        if sql.startswith("UPDATE movie_embeddings SET content_hash"):
+            for row in params:
+                self.embeddings[row["movie_id"]]["content_hash"] = row["content_hash"]
+            return None
+        raise AssertionError(f"unexpected query: {sql}")
+
+
+class StubEncoder:
+    """텍스트 길이로 만든 2차원 벡터 (호출된 텍스트 기록)"""
+
+    def __init__(self):
+        self.texts = []
+
+    def initialize(self):
+        pass
+
+    def encode_batch(self, texts, batch_size=64):
+        self.texts.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeMovieDB(10)
+    monkeypatch.setattr(backfill, "engine", db)
+    return db
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    encoder = StubEncoder()
+    monkeypatch.setattr(embedding_loader, "embedding_manager", encoder)
+    return encoder
+
+
+@pytest.fixture
+def options(tmp_path):
+    return {
+        "batch_size": 4,
+        "write_batch": 3,
+        "read_batch": 100,
+        "checkpoint": str(tmp_path / "checkpoint"),
+        "force": False,
+        "trust_existing": False,
+        "torch_threads": 0,
+    }
+
+
+def _expected_hash(movie: dict) -> str:
+    return content_hash(build_text_chunk(movie["title_ko"], movie["genres"], movie["overview_ko"]))
+
+
+class TestContentHash:
+    def test_unchanged_movies_are_not_reembedded(self, db, encoder, options):
+        first = run_shard(0, 1, options)
+        assert (first.scanned, first.embedded, first.skipped) == (10, 10, 0)
+        assert all(db.embeddings[i]["content_hash"] == _expected_hash(db.movies[i]) for i in db.movies)
+
+        # 정상 종료 후 다음 실행은 처음부터 스캔 (generate_embeddings가 체크포인트 삭제)
+        Checkpoint.clear(options["checkpoint"])
+        encoder.texts.clear()
+        db.movies[4]["overview_ko"] = "바뀐 줄거리"
+        second = run_shard(0, 1, options)
+        assert (second.scanned, second.embedded, second.skipped) == (10, 1, 9)
+        assert encoder.texts == [build_text_chunk("영화 4", ["드라마"], "바뀐 줄거리")]
+
+    def test_force_reembeds_everything(self, db, encoder, options):
+        run_shard(0, 1, options)
+        encoder.texts.clear()
+        Checkpoint.clear(options["checkpoint"])
+        stats = run_shard(0, 1, {**options, "force": True})
+        assert stats.embedded == 10 and len(encoder.texts) == 10
+
+    def test_trust_existing_records_hash_only(self, db, encoder, options):
+        db.embeddings = {i: {"embedding": "[0,0]", "content_hash": None} for i in db.movies}
+        stats = run_shard(0, 1, {**options, "trust_existing": True})
+        assert (stats.embedded, stats.hash_only) == (0, 10)
+        assert encoder.texts == []
+        assert db.embeddings[1] == {"embedding": "[0,0]", "content_hash": _expected_hash(db.movies[1])}
+
+
+class TestCheckpoint:
+    def test_resume_skips_committed_movies(self, db, encoder, options):
+        # 두 번째 배치(4~6) 쓰기 실패 → 체크포인트는 첫 배치 끝(3)에 머묾
+        db.fail_on_movie = 5
+        with pytest.raises(RuntimeError, match="writer failed"):
+            run_shard(0, 1, options)
+        assert Checkpoint(options["checkpoint"], 0, 1).load() == 3
+        assert set(db.embeddings) == {1, 2, 3}
+
+        db.fail_on_movie = None
+        encoder.texts.clear()
+        stats = run_shard(0, 1, options)
+        assert stats.scanned == 7
+        assert set(db.embeddings) == set(db.movies)
+        assert not any(text.startswith(("영화 1\n", "영화 2\n", "영화 3\n")) for text in encoder.texts)
+
+    def test_checkpoint_file_per_shard_and_clear(self, tmp_path):
+        path = str(tmp_path / "ckpt")
+        Checkpoint(path, 0, 2).save(5)
+        Checkpoint(path, 1, 2).save(8)
+        (tmp_path / "other").write_text("{}")
+
+        assert Checkpoint(path, 0, 2).load() == 5
+        assert json.loads((tmp_path / "ckpt.1-2").read_text())["last_movie_id"] == 8
+        assert Checkpoint(path, 0, 3).load() == 0  # 샤드 수가 바뀌면 처음부터
+
+        Checkpoint.clear(path)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["other"]
+
+
+class TestShards:
+    def test_shards_are_disjoint_and_complete(self, db, encoder, options):
+        num_shards = 3
+        per_shard = []
+        for shard in range(num_shards):
+            before = set(db.embeddings)
+            stats = run_shard(shard, num_shards, options)
+            written = set(db.embeddings) - before
+            assert stats.scanned == len(written)
+            assert all(movie_id % num_shards == shard for movie_id in written)
+            per_shard.append(written)
+
+        assert sum(len(ids) for ids in per_shard) == len(db.movies)
+        assert set().union(*per_shard) == set(db.movies)
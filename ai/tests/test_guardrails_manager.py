@@ -0,0 +1,129 @@
+"""
+GuardrailsManager 초기화 / 입력 검사 테스트 (nemoguardrails는 sys.modules에 가짜 모듈로 대체)
+
+실행:
+    cd ai && pytest tests/test_guardrails_manager.py -v
+"""
+import asyncio
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from app.core.guardrails_manager import GuardrailsManager
+from app.core.topic_filter import ALLOW, TopicDecision
+
+
+class _FakeRailsConfig:
+    loaded_paths = []
+
+    @classmethod
+    def from_path(cls, path):
+        cls.loaded_paths.append(path)
+        return cls()
+
+
+class _FakeLLMRails:
+    def __init__(self, config):
+        self.config = config
+
+
+@pytest.fixture
+def fake_nemoguardrails(monkeypatch):
+    module = types.ModuleType("nemoguardrails")
+    module.RailsConfig = _FakeRailsConfig
+    module.LLMRails = _FakeLLMRails
+    monkeypatch.setitem(sys.modules, "nemoguardrails", module)
+    _FakeRailsConfig.loaded_paths.clear()
+    yield module
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = GuardrailsManager()
+    monkeypatch.setattr(manager, "_rails", None)
+    monkeypatch.setattr(manager, "_topic_filter", None)
+    return manager
+
+
+class TestInitialize:
+    def test_loads_rails_from_bundled_config(self, fake_nemoguardrails, manager):
+        manager.initialize()
+
+        assert isinstance(manager._rails, _FakeLLMRails)
+        assert isinstance(manager._rails.config, _FakeRailsConfig)
+        assert _FakeRailsConfig.loaded_paths[0].endswith("guardrails")
+
+    def test_missing_package_raises(self, monkeypatch, manager):
+        # None으로 등록하면 import 시 ImportError
+        monkeypatch.setitem(sys.modules, "nemoguardrails", None)
+        with pytest.raises(ImportError):
+            manager.initialize()
+        assert manager._rails is None
+
+
+class _FakeRails:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_async(self, messages):
+        self.calls += 1
+        return {"content": "ok"}
+
+
+class _AllowAll:
+    def __init__(self):
+        self.embeddings = []
+
+    def is_ready(self):
+        return True
+
+    def classify(self, embedding):
+        self.embeddings.append(embedding)
+        return TopicDecision(ALLOW, 0.9, 0.1)
+
+
+class TestCheckInput:
+    """임베딩은 계산 중인 Task로 받아 로컬 분류기가 쓸 때만 기다려야 함"""
+
+    def test_nemo_does_not_wait_for_embedding(self, manager):
+        rails = _FakeRails()
+        manager._rails = rails
+
+        async def run():
+            pending = asyncio.get_running_loop().create_future()  # 끝나지 않는 임베딩
+            return await asyncio.wait_for(manager.check_input("영화 추천해줘", embedding=pending), timeout=1.0)
+
+        assert asyncio.run(run()) == (True, None)
+        assert rails.calls == 1
+
+    def test_local_filter_awaits_embedding_task(self, manager):
+        manager._topic_filter = _AllowAll()
+        manager._rails = _FakeRails()
+
+        async def run():
+            async def embed():
+                await asyncio.sleep(0.01)
+                return np.ones(4)
+
+            task = asyncio.create_task(embed())
+            result = await manager.check_input("영화 추천해줘", embedding=task)
+            return result, task
+
+        (allowed, message), task = asyncio.run(run())
+        assert (allowed, message) == (True, None)
+        assert manager._rails.calls == 0
+        np.testing.assert_array_equal(manager._topic_filter.embeddings[0], task.result())
+
+    def test_cancelled_check_keeps_shared_embedding(self, manager):
+        manager._topic_filter = _AllowAll()
+
+        async def run():
+            task = asyncio.create_task(asyncio.sleep(0.05, result=np.ones(4)))
+            check = asyncio.create_task(manager.check_input("영화", embedding=task))
+            await asyncio.sleep(0.01)
+            check.cancel()
+            return await task
+
+        np.testing.assert_array_equal(asyncio.run(run()), np.ones(4))
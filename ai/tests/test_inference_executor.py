@@ -0,0 +1,196 @@
+"""
+InferenceExecutor 테스트 (대기열 포화/대기 시간 초과 503, 취소 시 슬롯 반환, 스트림 aclose)
+
+실행:
+    cd ai && pytest tests/test_inference_executor.py -v
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.core.inference_executor import InferenceExecutor, InferenceOverloadedError
+
+
+class Gate:
+    """추론 스레드를 테스트가 풀어줄 때까지 붙잡아 두는 작업"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, value="done"):
+        self.started.set()
+        assert self.release.wait(5.0)
+        return value
+
+
+class BlockingIterator:
+    """Gate가 풀릴 때까지 next()가 끝나지 않는 iterator (close 호출 기록)"""
+
+    def __init__(self, items):
+        self.items = iter(items)
+        self.gate = Gate()
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self.gate()
+        return next(self.items)
+
+    def close(self):
+        self.closed = True
+
+
+def _executor(max_concurrency=1, max_queue_size=1, queue_timeout=5.0) -> InferenceExecutor:
+    return InferenceExecutor(
+        max_concurrency=max_concurrency,
+        max_queue_size=max_queue_size,
+        queue_timeout=queue_timeout,
+        retry_after=7,
+    )
+
+
+async def _wait_until(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.005)
+
+
+@pytest.fixture
+def executor():
+    executor = _executor()
+    yield executor
+    executor.shutdown()
+
+
+class TestLoadShedding:
+    def test_queue_full_rejects_with_retry_after(self, executor):
+        gate = Gate()
+
+        async def run():
+            running = asyncio.create_task(executor.run(gate))
+            await _wait_until(gate.started.is_set)
+            queued = asyncio.create_task(executor.run(lambda: "queued"))
+            await _wait_until(lambda: executor.queue_depth() == 1)
+
+            with pytest.raises(InferenceOverloadedError) as exc_info:
+                await executor.run(lambda: "rejected")
+
+            gate.release.set()
+            return exc_info.value, await running, await queued
+
+        error, first, second = asyncio.run(run())
+        assert error.status_code == 503
+        assert error.headers == {"Retry-After": "7"}
+        assert (first, second) == ("done", "queued")
+        assert executor._outstanding == 0
+
+    def test_queue_timeout_rejects_and_frees_queue_slot(self):
+        executor = _executor(max_queue_size=5, queue_timeout=0.05)
+        gate = Gate()
+
+        async def run():
+            running = asyncio.create_task(executor.run(gate))
+            await _wait_until(gate.started.is_set)
+            with pytest.raises(InferenceOverloadedError) as exc_info:
+                await executor.run(lambda: "late")
+            outstanding = executor._outstanding
+            gate.release.set()
+            await running
+            return exc_info.value, outstanding
+
+        try:
+            error, outstanding = asyncio.run(run())
+        finally:
+            executor.shutdown()
+        assert error.status_code == 503 and error.headers["Retry-After"] == "7"
+        assert "Timed out" in error.detail
+        assert outstanding == 1
+        assert executor._outstanding == 0 and executor.queue_depth() == 0
+
+
+class TestCancellation:
+    def test_cancelled_while_queued_gives_back_queue_slot(self, executor):
+        gate = Gate()
+
+        async def run():
+            running = asyncio.create_task(executor.run(gate))
+            await _wait_until(gate.started.is_set)
+            queued = asyncio.create_task(executor.run(lambda: "never"))
+            await _wait_until(lambda: executor.queue_depth() == 1)
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            assert executor._outstanding == 1 and executor.queue_depth() == 0
+
+            gate.release.set()
+            await running
+            # 취소된 대기 요청이 슬롯을 잡고 있지 않음
+            return await asyncio.wait_for(executor.run(lambda: "next"), timeout=1.0)
+
+        assert asyncio.run(run()) == "next"
+        assert executor._outstanding == 0
+
+    def test_cancelled_caller_keeps_slot_until_thread_finishes(self, executor):
+        gate = Gate()
+
+        async def run():
+            task = asyncio.create_task(executor.run(gate))
+            await _wait_until(gate.started.is_set)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            # 스레드 작업은 계속 실행 중 → 슬롯 유지 (초과 실행 방지)
+            assert executor._outstanding == 1
+            assert executor._get_slots().locked()
+
+            gate.release.set()
+            await _wait_until(lambda: executor._outstanding == 0)
+            return executor._get_slots().locked()
+
+        assert asyncio.run(run()) is False
+
+
+class TestInferenceStream:
+    def test_stream_releases_slot_at_end(self, executor):
+        async def run():
+            stream = await executor.open_stream(lambda: iter(["a", "b"]))
+            assert executor._outstanding == 1
+            return [item async for item in stream]
+
+        assert asyncio.run(run()) == ["a", "b"]
+        assert executor._outstanding == 0
+
+    def test_aclose_with_pending_next_releases_after_it_finishes(self, executor):
+        iterator = BlockingIterator(["a", "b"])
+
+        async def run():
+            stream = await executor.open_stream(lambda: iterator)
+            consumer = asyncio.create_task(stream.__anext__())
+            await _wait_until(iterator.gate.started.is_set)
+
+            # 클라이언트 연결 끊김: 소비 중인 Task 취소 후 정리
+            consumer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+            await stream.aclose()
+            await stream.aclose()  # 두 번 닫아도 한 번만 반환
+
+            assert iterator.closed
+            assert executor._outstanding == 1
+            assert executor._get_slots().locked()
+
+            iterator.gate.release.set()
+            await _wait_until(lambda: executor._outstanding == 0)
+            assert not executor._get_slots().locked()
+            with pytest.raises(StopAsyncIteration):
+                await stream.__anext__()
+
+        asyncio.run(run())
+        assert executor._outstanding == 0
@@ -0,0 +1,82 @@
+"""
+모델 호스트 IPC 테스트 (fake 엔진, Unix socket)
+
+실행:
+    cd ai && pytest tests/test_model_host.py -v
+"""
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.model_host import ModelHost
+from app.models.ipc import ModelHostError, pack_array, unpack_array
+from app.models.model_loader import ModelManager
+from app.models.remote import ModelHostClient, RemoteModelManager
+
+MESSAGES = [{"role": "system", "content": "큐레이터"}, {"role": "user", "content": "잔잔한 영화 추천해줘"}]
+
+
+@pytest.fixture
+def host(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_ENGINE", "fake")
+    monkeypatch.setattr(settings, "MOVIE_DETAIL_ENGINE", "")
+    monkeypatch.setattr(settings, "LLM_FAKE_TOKEN_LATENCY_MS", 1.0)
+    model_host = ModelHost(str(tmp_path / "host.sock"), serve_embedding=False, warmup=False)
+
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def _serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(model_host.start())
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=_serve, daemon=True)
+    thread.start()
+    assert ready.wait(timeout=10)
+    yield model_host
+    asyncio.run_coroutine_threadsafe(model_host.stop(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+    model_host.shutdown()
+
+
+@pytest.fixture
+def remote(host):
+    manager = RemoteModelManager(ModelHostClient(host.socket_path, timeout=10), startup_timeout=10)
+    manager.initialize()
+    yield manager
+    manager.shutdown()
+
+
+class TestModelHost:
+    def test_generate_matches_in_process(self, host, remote):
+        # 같은 fake 엔진 출력 → 프로세스 안에서 직접 호출한 결과와 동일
+        expected = host.models.generate(MESSAGES, max_new_tokens=30)
+        assert remote.generate(prompt=MESSAGES, prefix_key=["generate", "테마"], max_new_tokens=30) == expected
+        assert remote.is_ready() and remote.get_loaded_themes() == ModelManager.THEMES
+
+    def test_stream_and_close(self, remote):
+        stream = remote.stream(MESSAGES, max_new_tokens=20)
+        assert "".join(stream) == stream.text and len(stream.text) > 0
+
+        partial = remote.stream(MESSAGES, max_new_tokens=200)
+        first = next(partial)
+        partial.close()
+        assert first and list(partial) == []
+        # 연결 풀 재사용 후에도 정상 동작
+        assert remote.generate(prompt=MESSAGES, max_new_tokens=5)
+
+    def test_errors_are_raised(self, remote):
+        with pytest.raises(ModelHostError, match="embedding not served"):
+            remote.client.call("encode", texts="영화")
+
+
+def test_array_roundtrip():
+    array = np.random.default_rng(0).normal(size=(3, 8)).astype(np.float32)
+    assert np.array_equal(unpack_array(pack_array(array)), array)
@@ -0,0 +1,98 @@
+"""
+페르소나 소개 버전/후처리 테스트
+
+실행:
+    cd ai && pytest tests/test_persona_detail_service.py -v
+"""
+import asyncio
+
+from app.core.config import settings
+from app.services import persona_detail_service
+from app.services.persona_detail_service import (
+    clean_movie_detail,
+    get_precomputed_detail,
+    persona_detail_version,
+    store_detail,
+)
+
+THEME = "편안하고 잔잔한 감성 추구"
+
+
+class TestPersonaDetailVersion:
+    """모델/프롬프트/파라미터 변경 시 버전이 바뀌어 기존 사전 생성 결과가 무효화되어야 함"""
+
+    def test_version_is_stable_per_theme(self):
+        assert persona_detail_version(THEME) == persona_detail_version(THEME)
+        assert persona_detail_version(THEME) != persona_detail_version("3D 보단 2D ")
+
+    def test_revision_and_params_change_version(self, monkeypatch):
+        before = persona_detail_version(THEME)
+
+        persona_detail_version.cache_clear()
+        monkeypatch.setattr(settings, "PERSONA_DETAIL_REVISION", "2")
+        assert persona_detail_version(THEME) != before
+
+        persona_detail_version.cache_clear()
+        monkeypatch.setattr(settings, "PERSONA_DETAIL_REVISION", "1")
+        monkeypatch.setitem(persona_detail_service.DETAIL_GENERATION_PARAMS, "max_new_tokens", 99)
+        assert persona_detail_version(THEME) != before
+        persona_detail_version.cache_clear()
+
+    def test_detail_engine_changes_version(self, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_ENGINE", "hf")
+        monkeypatch.setattr(settings, "MOVIE_DETAIL_ENGINE", "")
+        persona_detail_version.cache_clear()
+        before = persona_detail_version(THEME)
+
+        # 상세 소개만 GGUF(CPU) 엔진으로 전환 → 기존 행 무효
+        persona_detail_version.cache_clear()
+        monkeypatch.setattr(settings, "MOVIE_DETAIL_ENGINE", "llama_cpp")
+        monkeypatch.setattr(settings, "LLM_GGUF_PATH", "/models/a.gguf")
+        gguf_a = persona_detail_version(THEME)
+        assert gguf_a != before
+
+        persona_detail_version.cache_clear()
+        monkeypatch.setattr(settings, "LLM_GGUF_PATH", "/models/b.gguf")
+        assert persona_detail_version(THEME) != gguf_a
+
+        # GGUF 경로는 llama_cpp 엔진일 때만 반영
+        persona_detail_version.cache_clear()
+        monkeypatch.setattr(settings, "MOVIE_DETAIL_ENGINE", "")
+        assert persona_detail_version(THEME) == before
+        persona_detail_version.cache_clear()
+
+    def test_clean_movie_detail(self):
+        raw = "<think>음</think>\n[Output]\n잔잔한 여운이 남는 영화예요.\n\n꼭 보세요."
+        assert clean_movie_detail(raw) == "잔잔한 여운이 남는 영화예요. 꼭 보세요."
+
+
+class _FailingSession:
+    """execute가 항상 실패하는 AsyncSession 대역 (rollback 호출 기록)"""
+
+    def __init__(self):
+        self.rollbacks = 0
+        self.commits = 0
+
+    async def execute(self, *args, **kwargs):
+        raise RuntimeError('relation "movie_persona_details" does not exist')
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class TestPersonaDetailStorage:
+    """조회/저장 실패가 같은 요청 세션의 트랜잭션을 aborted 상태로 남기지 않아야 함"""
+
+    def test_failed_read_rolls_back(self):
+        db = _FailingSession()
+        assert asyncio.run(get_precomputed_detail(db, 1, THEME)) is None
+        assert db.rollbacks == 1
+
+    def test_failed_store_rolls_back(self):
+        db = _FailingSession()
+        asyncio.run(store_detail(db, 1, THEME, "제목", "소개"))
+        assert db.rollbacks == 1
+        assert db.commits == 0
@@ -0,0 +1,28 @@
+"""
+생성 텍스트 공통 후처리 테스트
+
+실행:
+    cd ai && pytest tests/test_postprocess.py -v
+"""
+from app.models.postprocess import clean_generated_text, is_sentence_end, strip_think
+
+
+class TestPostprocess:
+    def test_strip_think_variants(self):
+        assert strip_think("<think>음</think>안녕<|im_end|>") == "안녕"
+        assert strip_think("안녕<think>끝나지 않은 생각") == "안녕"
+        assert strip_think("잘린 생각</think>결과") == "결과"
+
+    def test_clean_removes_headers_and_joins_lines(self):
+        raw = "<think>\n\n</think>\n[Output]\n잔잔한 여운이 남는 영화예요.\n\nTheme: x\n꼭 보세요."
+        assert clean_generated_text(raw) == "잔잔한 여운이 남는 영화예요. 꼭 보세요."
+
+    def test_clean_fallback_and_quotes(self):
+        assert clean_generated_text("예시: \"오늘은 잔잔하게\"", strip_quotes=True) == "오늘은 잔잔하게"
+        assert clean_generated_text("'따옴표 유지'") == "'따옴표 유지'"
+
+    def test_sentence_end(self):
+        assert is_sentence_end("좋아요!")
+        assert is_sentence_end("봐야죠~ ")
+        assert is_sentence_end("“정말 좋아요.”")
+        assert not is_sentence_end("좋아요 그리고")
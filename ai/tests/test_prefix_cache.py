@@ -0,0 +1,95 @@
+"""
+페르소나 system prompt KV prefix 캐시 테스트 (CPU + 초소형 Causal LM)
+
+실행:
+    cd ai && pytest tests/test_prefix_cache.py -v
+"""
+import pytest
+
+pytest.importorskip("torch")
+
+from app.core.prompts import build_curation_system_prompt, build_movie_detail_system_prompt
+from app.models.batch_scheduler import BatchScheduler, GenerationRequest
+from app.models.prefix_cache import PrefixCache
+
+THEMES = ["편안하고 잔잔한 감성 추구", "3D 보단 2D "]
+
+
+def _request(template: str, theme: str, user_content: str, cached: bool = True) -> GenerationRequest:
+    builder = build_curation_system_prompt if template == "generate" else build_movie_detail_system_prompt
+    return GenerationRequest(
+        messages=[
+            {"role": "system", "content": builder(theme)},
+            {"role": "user", "content": user_content},
+        ],
+        max_new_tokens=10,
+        temperature=0.0,
+        top_p=1.0,
+        top_k=0,
+        prefix_key=(template, theme) if cached else None,
+    )
+
+
+class TestPrefixCache:
+    """prefix 캐시 경로와 비캐시 경로의 출력 일치 테스트"""
+
+    def test_cached_output_matches_uncached(self, tiny_lm):
+        """greedy 디코딩 시 suffix만 prefill 한 결과가 전체 prefill 결과와 같아야 함"""
+        model, tokenizer = tiny_lm
+        uncached = BatchScheduler(model, tokenizer, "cpu")
+        cached = BatchScheduler(model, tokenizer, "cpu", prefix_cache=PrefixCache(max_bytes=64 * 1024 * 1024))
+
+        requests = [
+            ("generate", THEMES[0], "잔잔한 영화 추천해줘"),
+            ("generate", THEMES[1], "애니 보고 싶어"),
+            ("movie_detail", THEMES[0], "영화 제목: 리틀 포레스트"),
+        ]
+        expected = uncached.run_batch([_request(*r, cached=False) for r in requests])
+
+        # 1회차: 모두 miss 후 prefill, 2회차: 모두 hit
+        assert cached.run_batch([_request(*r) for r in requests]) == expected
+        assert cached.run_batch([_request(*r) for r in requests]) == expected
+
+        stats = cached.prefix_cache.stats()
+        assert stats["misses"] == 3
+        assert stats["hits"] == 3
+        assert stats["entries"] == 3
+
+    def test_mixed_batch_with_and_without_prefix(self, tiny_lm):
+        """prefix가 있는 행과 없는 행이 한 배치에 섞여도 결과가 같아야 함"""
+        model, tokenizer = tiny_lm
+        cache = PrefixCache(max_bytes=64 * 1024 * 1024)
+        scheduler = BatchScheduler(model, tokenizer, "cpu", prefix_cache=cache)
+        plain = GenerationRequest(
+            messages=[{"role": "user", "content": "hi"}],
+            max_new_tokens=10,
+            temperature=0.0,
+        )
+
+        expected = [
+            BatchScheduler(model, tokenizer, "cpu").run_batch([_request("generate", THEMES[1], "코미디", cached=False)])[0],
+            BatchScheduler(model, tokenizer, "cpu").run_batch([plain])[0],
+        ]
+        scheduler.prefill_prefix(("generate", THEMES[1]), _request("generate", THEMES[1], "").messages)
+
+        assert scheduler.run_batch([_request("generate", THEMES[1], "코미디"), plain]) == expected
+
+    def test_lru_eviction_by_memory_cap(self, tiny_lm):
+        """메모리 상한을 넘으면 가장 오래 사용하지 않은 prefix부터 제거"""
+        model, tokenizer = tiny_lm
+        probe = BatchScheduler(model, tokenizer, "cpu", prefix_cache=PrefixCache(max_bytes=64 * 1024 * 1024))
+        entry = probe.prefill_prefix(("generate", THEMES[0]), _request("generate", THEMES[0], "").messages)
+
+        cache = PrefixCache(max_bytes=int(entry.nbytes * 2.5))
+        scheduler = BatchScheduler(model, tokenizer, "cpu", prefix_cache=cache)
+        for theme in THEMES:
+            scheduler.prefill_prefix(("generate", theme), _request("generate", theme, "").messages)
+        # THEMES[0]을 최근 사용으로 갱신한 뒤 새 엔트리 추가 → THEMES[1]이 제거되어야 함
+        assert cache.get(("generate", THEMES[0]), entry.text) is not None
+        scheduler.prefill_prefix(("movie_detail", THEMES[0]), _request("movie_detail", THEMES[0], "").messages)
+
+        stats = cache.stats()
+        assert stats["evictions"] >= 1
+        assert stats["bytes"] <= cache.max_bytes
+        assert cache.get(("generate", THEMES[0]), entry.text) is not None
+        assert ("generate", THEMES[1]) not in cache._entries
@@ -0,0 +1,66 @@
+"""
+서버 시작 상태 테스트 (구성요소 동시 로드 / readiness)
+
+실행:
+    cd ai && pytest tests/test_startup.py -v
+"""
+import asyncio
+import time
+
+from app.core.startup import FAILED, READY, StartupState
+
+
+def _sleeper(seconds: float):
+    return lambda: time.sleep(seconds)
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+class TestStartupState:
+    def test_components_load_concurrently_then_warm_up(self):
+        state = StartupState()
+        for name in ("llm", "embedding", "guardrails"):
+            state.register(name)
+        warmed = []
+
+        started = time.perf_counter()
+        assert not state.is_ready()
+        asyncio.run(state.run(
+            {"llm": _sleeper(0.2), "embedding": _sleeper(0.2), "guardrails": _sleeper(0.2)},
+            [("llm", lambda: warmed.append("llm"))],
+        ))
+
+        # 순차 로드(0.6초)가 아니라 가장 느린 구성요소 시간 수준
+        assert time.perf_counter() - started < 0.5
+        assert state.is_ready() and state.is_alive() and warmed == ["llm"]
+        snapshot = state.snapshot()
+        assert snapshot["components"]["llm"]["status"] == READY
+        assert snapshot["components"]["llm"]["seconds"] >= 0.2
+
+    def test_optional_failure_still_ready(self):
+        state = StartupState()
+        state.register("llm")
+        state.register("guardrails", required=False)
+        asyncio.run(state.run({"llm": _sleeper(0), "guardrails": _fail}))
+
+        assert state.is_ready() and state.is_alive()
+        assert state.snapshot()["components"]["guardrails"]["error"] == "boom"
+
+    def test_required_failure_is_not_alive_and_skips_warmup(self):
+        state = StartupState()
+        state.register("llm")
+        warmed = []
+        asyncio.run(state.run({"llm": _fail}, [("llm", lambda: warmed.append("llm"))]))
+
+        assert state.components["llm"].status == FAILED
+        assert not state.is_ready() and not state.is_alive() and warmed == []
+
+    def test_warmup_failure_does_not_block_readiness(self):
+        state = StartupState()
+        state.register("embedding")
+        asyncio.run(state.run({"embedding": _sleeper(0)}, [("embedding", _fail)]))
+
+        assert state.is_ready()
+        assert state.snapshot()["warmup"]["error"] == "boom"
@@ -0,0 +1,71 @@
+"""
+토큰 스트리밍 테스트 (CPU + 초소형 Causal LM)
+
+실행:
+    cd ai && pytest tests/test_token_stream.py -v
+"""
+import pytest
+
+pytest.importorskip("torch")
+
+from app.models.batch_scheduler import BatchScheduler, GenerationRequest
+from app.models.token_stream import TokenStream, _stable_prefix, strip_think
+
+
+def _request(content: str, max_new_tokens: int = 16) -> GenerationRequest:
+    return GenerationRequest(
+        messages=[{"role": "user", "content": content}],
+        max_new_tokens=max_new_tokens,
+        temperature=0.0,
+        top_p=1.0,
+        top_k=0,
+    )
+
+
+class TestTokenStream:
+    """스트리밍 delta와 일괄 생성 결과 일치 / 중단 테스트"""
+
+    def test_stream_matches_batch_output(self, tiny_lm):
+        """delta를 이어붙인 결과가 일괄 생성 결과와 같아야 함 (다른 요청과 같은 배치여도)"""
+        model, tokenizer = tiny_lm
+        scheduler = BatchScheduler(model, tokenizer, "cpu", max_batch_size=4, max_wait_ms=200)
+        expected = scheduler.run_batch([_request("잔잔한 영화 추천해줘")])[0]
+
+        scheduler.start()
+        try:
+            streamed = _request("잔잔한 영화 추천해줘")
+            stream = TokenStream(tokenizer, streamed)
+            scheduler.submit(streamed)
+            other = scheduler.submit(_request("hi"))
+            deltas = list(stream)
+            other.result(timeout=60)
+        finally:
+            scheduler.stop()
+
+        assert len(deltas) > 1
+        assert "".join(deltas) == strip_think(expected).lstrip()
+        assert stream.text == "".join(deltas)
+
+    def test_close_cancels_generation(self, tiny_lm):
+        """close() 후에는 해당 행의 생성이 다음 step에서 멈춰야 함"""
+        model, tokenizer = tiny_lm
+        scheduler = BatchScheduler(model, tokenizer, "cpu")
+        request = _request("잔잔한 영화 추천해줘", max_new_tokens=64)
+        stream = TokenStream(tokenizer, request)
+        received = []
+
+        def on_token(token_id):
+            received.append(token_id)
+            if len(received) == 3:
+                stream.close()
+
+        request.on_token = on_token
+        scheduler.run_batch([request])
+
+        assert len(received) == 3
+
+    def test_think_block_is_held_back(self):
+        """<think> 블록과 태그 조각은 확정 전까지 노출하지 않음"""
+        assert _stable_prefix("안녕 <thi") == "안녕 "
+        assert _stable_prefix("안녕 <think>고민 중") == "안녕 "
+        assert _stable_prefix("<think>고민</think> 추천합니다") == "추천합니다"
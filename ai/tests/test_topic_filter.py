@@ -0,0 +1,57 @@
+"""
+로컬 주제 분류기 테스트 (임베딩 모델 대신 단어 해시 bag-of-words 인코더 사용)
+
+실행:
+    cd ai && pytest tests/test_topic_filter.py -v
+"""
+import zlib
+
+import numpy as np
+import pytest
+
+from app.core.topic_filter import ALLOW, BLOCK, ESCALATE, TopicFilter, load_topic_examples
+
+DIM = 256
+
+
+def _encode(texts):
+    # 같은 단어를 공유할수록 코사인 유사도가 높아지는 결정적 인코더
+    matrix = np.zeros((len(texts), DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in text.split():
+            matrix[i, zlib.crc32(word.encode("utf-8")) % DIM] += 1.0
+    return matrix
+
+
+ON_TOPIC = ["잔잔한 영화 추천해줘", "슬픈 영화 보고 싶어", "비 오는 날 영화 추천"]
+OFF_TOPIC = ["주식 시장 전망 알려줘", "파이썬 코드 짜줘", "내일 날씨 알려줘"]
+
+
+@pytest.fixture
+def topic_filter():
+    return TopicFilter(ON_TOPIC, OFF_TOPIC, top_k=1, allow_threshold=0.2, block_threshold=0.2).fit(_encode)
+
+
+class TestTopicFilter:
+    def test_confident_inputs_decided_locally(self, topic_filter):
+        assert topic_filter.classify(_encode(["잔잔한 영화 추천해줘 제발"])[0]).decision == ALLOW
+        assert topic_filter.classify(_encode(["주식 시장 전망 알려줘 빨리"])[0]).decision == BLOCK
+
+    def test_ambiguous_band_escalates(self, topic_filter):
+        # on/off 양쪽과 비슷하게 겹치는 입력
+        decision = topic_filter.classify(_encode(["영화 알려줘"])[0])
+        assert decision.decision == ESCALATE
+        assert abs(decision.margin) < 0.2
+
+    def test_not_fitted_always_escalates(self):
+        unfitted = TopicFilter(ON_TOPIC, OFF_TOPIC)
+        assert unfitted.classify(np.ones(DIM)).decision == ESCALATE
+
+    def test_thresholds_widen_escalation(self):
+        strict = TopicFilter(ON_TOPIC, OFF_TOPIC, top_k=1, allow_threshold=2.0, block_threshold=2.0).fit(_encode)
+        assert strict.classify(_encode(["잔잔한 영화 추천해줘"])[0]).decision == ESCALATE
+
+    def test_bundled_examples_load(self):
+        on_topic, off_topic = load_topic_examples()
+        assert len(on_topic) >= 10 and len(off_topic) >= 10
+        assert not set(on_topic) & set(off_topic)
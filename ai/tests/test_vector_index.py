@@ -0,0 +1,197 @@
+"""
+In-process 벡터 인덱스 테스트 (DB 없이 합성 임베딩 행 사용)
+
+실행:
+    cd ai && pytest tests/test_vector_index.py -v
+"""
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import IndexSnapshot, VectorIndex, build_partitions
+
+DIM = 16
+
+
+def _row(ticket_id: int, movie_id: int, vector: np.ndarray, certification: str = "12") -> SimpleNamespace:
+    # DB의 embedding::text 와 같은 pgvector 텍스트 형식
+    return SimpleNamespace(
+        ticket_group_id=ticket_id,
+        id=movie_id,
+        title_ko=f"영화 {movie_id}",
+        overview_ko=None,
+        poster_path=f"/{movie_id}.jpg",
+        certification=certification,
+        embedding="[" + ",".join(f"{v:.6f}" for v in vector) + "]",
+    )
+
+
+def _index(rows, dtype="float32") -> VectorIndex:
+    index = VectorIndex(dtype=dtype)
+    partitions, movies = build_partitions(rows, dtype=index.dtype)
+    index._swap(IndexSnapshot(partitions=partitions, movies=movies, signature=(), loaded_at=time.time()), "full")
+    return index
+
+
+def _brute_force(vectors: dict, query: np.ndarray, allowed: set, limit: int) -> list:
+    query = query / np.linalg.norm(query)
+    scores = {
+        movie_id: float(vector @ query / np.linalg.norm(vector))
+        for movie_id, vector in vectors.items()
+        if movie_id in allowed
+    }
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    vectors = {movie_id: rng.normal(size=DIM).astype(np.float32) for movie_id in range(1, 41)}
+    adult = {3, 7, 11, 19}
+    rows = [
+        _row(1 if movie_id <= 30 else 2, movie_id, vector, "19" if movie_id in adult else "15")
+        for movie_id, vector in vectors.items()
+    ]
+    return vectors, adult, rows, rng
+
+
+class TestVectorIndex:
+    """인덱스 검색 결과와 Postgres 쿼리 의미(티켓/19금/제외 필터, 코사인 정렬) 일치 테스트"""
+
+    def test_topk_matches_brute_force(self, corpus):
+        vectors, adult, rows, rng = corpus
+        index = _index(rows)
+        query = rng.normal(size=DIM)
+        ticket_movies = {m for m in vectors if m <= 30}
+
+        result = index.search(1, query.tolist(), limit=5, is_adult_allowed=True)
+
+        assert [m["id"] for m in result] == _brute_force(vectors, query, ticket_movies, 5)
+        assert result[0]["overview"] == "설명 없음"
+        assert all(result[i]["similarity"] >= result[i + 1]["similarity"] for i in range(4))
+
+    def test_adult_mask_and_exclude_ids(self, corpus):
+        vectors, adult, rows, rng = corpus
+        index = _index(rows)
+        query = rng.normal(size=DIM)
+        exclude = _brute_force(vectors, query, {m for m in vectors if m <= 30} - adult, 2)
+        allowed = {m for m in vectors if m <= 30} - adult - set(exclude)
+
+        result = index.search(1, query, limit=5, exclude_ids=exclude, is_adult_allowed=False)
+
+        assert [m["id"] for m in result] == _brute_force(vectors, query, allowed, 5)
+        assert not {m["id"] for m in result} & (adult | set(exclude))
+
+    def test_float16_keeps_ranking(self, corpus):
+        vectors, adult, rows, rng = corpus
+        query = rng.normal(size=DIM)
+        full = _index(rows, dtype="float32").search(2, query, limit=3, is_adult_allowed=True)
+        half = _index(rows, dtype="float16").search(2, query, limit=3, is_adult_allowed=True)
+
+        assert [m["id"] for m in half] == [m["id"] for m in full]
+
+    def test_unknown_ticket_or_not_ready_falls_back(self, corpus):
+        _, _, rows, _ = corpus
+        assert VectorIndex().search(1, np.ones(DIM)) is None
+        assert _index(rows).search(99, np.ones(DIM)) is None
+
+    def test_incremental_merge_replaces_only_changed_partition(self, corpus):
+        vectors, _, rows, rng = corpus
+        index = _index(rows)
+        before = index._snapshot
+
+        new_vector = rng.normal(size=DIM).astype(np.float32)
+        partitions, movies = build_partitions(
+            [_row(1, 5, new_vector, "ALL"), _row(1, 41, -new_vector, "ALL")], dtype=index.dtype, base=before
+        )
+        index._swap(IndexSnapshot(partitions=partitions, movies=movies, signature=(), loaded_at=time.time()), "incremental")
+
+        assert partitions[2] is before.partitions[2]
+        assert len(partitions[1]) == 31
+        assert [m["id"] for m in index.search(1, new_vector, limit=1)] == [5]
+        assert index.search(1, -new_vector, limit=1)[0]["id"] == 41
+        # 이전 스냅샷은 그대로 유지 (진행 중인 검색에 영향 없음)
+        assert len(before.partitions[1]) == 30
+
+
+class _Result(list):
+    def fetchall(self):
+        return list(self)
+
+
+class FakeMovieDB:
+    """refresh()가 보내는 버전/행 쿼리에 응답하는 메모리 DB (Postgres 전용 SQL 대신 쿼리 종류로 분기)"""
+
+    def __init__(self, rows):
+        self.rows = {row.id: row for row in rows}
+        self.queries = []
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.queries.append((sql, params))
+        if "embedding_count" in sql:
+            rows = self.rows.values()
+            certifications = ",".join(f"{row.id}:{row.certification or ''}" for row in sorted(rows, key=lambda r: r.id))
+            return SimpleNamespace(one=lambda: SimpleNamespace(
+                embedding_count=len(self.rows),
+                embedding_updated_at=max(row.updated_at for row in rows),
+                embedding_updated_sum=sum(row.updated_at.timestamp() for row in rows),
+                ticket_movie_count=len(self.rows),
+                ticket_movie_created_at=None,
+                certification_checksum=certifications,
+            ))
+        rows = list(self.rows.values())
+        if params and "since" in params:
+            rows = [row for row in rows if row.updated_at >= params["since"]]
+        return _Result(rows)
+
+
+class TestRefresh:
+    @pytest.fixture
+    def db(self, corpus):
+        _, _, rows, _ = corpus
+        for row in rows:
+            row.updated_at = datetime(2026, 1, 1)
+        return FakeMovieDB(rows)
+
+    def test_certification_change_rebuilds_adult_mask(self, corpus, db):
+        vectors, _, _, _ = corpus
+        index = VectorIndex(engine=db, dtype="float32")
+        index.load()
+        assert index.refresh() == "noop"
+
+        # 임베딩은 그대로, 등급만 19로 변경 (movies UPDATE)
+        db.rows[5].certification = "19"
+        assert index.refresh() == "full"
+        result = index.search(1, vectors[5], limit=30, is_adult_allowed=False)
+        assert 5 not in {m["id"] for m in result}
+        assert index.search(1, vectors[5], limit=1, is_adult_allowed=True)[0]["id"] == 5
+
+    def test_late_commit_before_watermark_is_picked_up(self, corpus, db):
+        _, _, _, rng = corpus
+        index = VectorIndex(engine=db, dtype="float32", incremental_overlap=60)
+        db.rows[1].updated_at = datetime(2026, 1, 1, 0, 10)
+        index.load()
+
+        # 트랜잭션이 워터마크(00:10)보다 먼저 시작(NOW() = 00:09:30)했지만 나중에 커밋된 샤드
+        # → 최신 updated_at, 건수 모두 그대로
+        new_vector = rng.normal(size=DIM).astype(np.float32)
+        db.rows[2].embedding = "[" + ",".join(f"{v:.6f}" for v in new_vector) + "]"
+        db.rows[2].updated_at = datetime(2026, 1, 1, 0, 9, 30)
+
+        assert index.refresh() == "incremental"
+        assert index.search(1, new_vector, limit=1, is_adult_allowed=True)[0]["id"] == 2
+        _, params = db.queries[-1]
+        assert params["since"] == datetime(2026, 1, 1, 0, 9)
@@ -20,6 +20,7 @@ from app.schemas.admin import (
 from app.services.admin_service import AdminTokenService
 from app.services.console_service import ConsoleTokenService
 from app.services.api_key_service import ApiKeyService
+from app.services import credential_cache_service
 from app.utils.dependencies import get_admin_token
 from app.models.console import ApiAccessToken
 from app.models.api_usage import CukApiKey
@@ -155,6 +156,8 @@ def revoke_console_token(
         raise NotFoundException(message="토큰을 찾을 수 없습니다.")
     db.delete(record)
     db.commit()
+    credential_cache_service.invalidate_console_token(record.access_token)
+    credential_cache_service.invalidate_console_api_key(record.api_key)
     return {"message": "ok"}
 
 
@@ -167,6 +170,7 @@ def create_api_key(
     record = db.query(ApiAccessToken).filter(ApiAccessToken.id == data.owner_token_id).first()
     if not record:
         raise BadRequestException(message="유효하지 않은 콘솔 토큰입니다.")
+    previous_api_key = record.api_key
     try:
         api_key_record, raw_api_key = ApiKeyService.create_api_key(
             db,
@@ -175,6 +179,8 @@ def create_api_key(
         )
         record.api_key = raw_api_key
         db.commit()
+        credential_cache_service.invalidate_console_token(record.access_token)
+        credential_cache_service.invalidate_console_api_key(previous_api_key)
         return CreatedApiKeyResponse(
             id=api_key_record.id,
             owner_token_id=api_key_record.console_token_id,
@@ -188,6 +194,8 @@ def create_api_key(
         raw_api_key = ConsoleTokenService.generate_api_key()
         record.api_key = raw_api_key
         db.commit()
+        credential_cache_service.invalidate_console_token(record.access_token)
+        credential_cache_service.invalidate_console_api_key(previous_api_key)
         return CreatedApiKeyResponse(
             id=record.id,
             owner_token_id=record.id,
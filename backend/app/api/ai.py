@@ -5,23 +5,25 @@ import httpx
 import logging
 from typing import Optional
 from fastapi import APIRouter, Depends, status, Cookie
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session as DBSession
+from starlette.background import BackgroundTask
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
 from app.core.exceptions import BadRequestException, InternalServerErrorException
 from app.schemas.ai import AIGenerateRequest, AIGenerateResponse
 from app.utils.dependencies import get_current_user, get_session_id
-from app.models import User
+from app.services.session_cache_service import CachedUser
 from app.models.ticket import TicketGroup
-from app.services import persona_cache_service
+from app.services import curation_pool_service, persona_cache_service
+from app.services.ai_upstream import ai_upstream
+from app.utils.sse import format_sse, iter_sse_events
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
 
-# VM2 AI 서버 설정
-AI_SERVER_URL = "http://10.0.19.117:5000"
-
 # ticketId -> AI 서버 테마 매핑
 TICKET_TO_THEME = {
     1: "숏폼 러버 MZ 스타일",
@@ -38,17 +40,40 @@ TICKET_TO_THEME = {
 }
 
 
-@router.post("/generate", response_model=AIGenerateResponse, status_code=status.HTTP_200_OK)
-async def generate_exhibition(
-    request_data: AIGenerateRequest,
-    current_user: User = Depends(get_current_user),
-    db: DBSession = Depends(get_db)
-):
-    """
-    AI 전시회 생성
-    - HttpOnly Cookie 필요
-    - VM2 AI 서버와 연동하여 영화 추천 생성
-    """
+def _enrich_movie_titles(db: DBSession, result_json: dict) -> None:
+    """AI 서버 결과의 movies에 DB 영화 제목 주입 (실패해도 원본 유지)"""
+    try:
+        movies_data = result_json.get("movies", [])
+
+        if movies_data:
+            # 1. 영화 ID 목록 추출
+            movie_ids = [m.get("movieId") for m in movies_data if m.get("movieId")]
+
+            if movie_ids:
+                from app.models.movie import Movie
+                # 2. DB에서 영화 제목 조회
+                movies_db = db.query(Movie.id, Movie.title_ko).filter(Movie.id.in_(movie_ids)).all()
+
+                # 3. ID -> Title 매핑 생성
+                title_map = {m.id: m.title_ko for m in movies_db}
+
+                # 4. 응답 데이터에 title 주입
+                for movie in movies_data:
+                    mid = movie.get("movieId")
+                    if mid in title_map:
+                        movie["title"] = title_map[mid]
+                    else:
+                        movie["title"] = "알 수 없는 영화" # Fallback
+
+        logger.info("Enriched movie titles successfully")
+
+    except Exception as e:
+        logger.error(f"Failed to enrich movie titles: {e}")
+        # Enrichment 실패해도 전체 로직을 죽이지 않고 원본 그대로 반환하도록 pass
+
+
+def _generate_payload(request_data: AIGenerateRequest) -> dict:
+    """AI 서버 /api/v1/generate 요청 본문 (테마 검증 포함)"""
     if not request_data.prompt:
         raise BadRequestException(
             message="프롬프트를 입력해주세요.",
@@ -63,68 +88,82 @@ async def generate_exhibition(
             details=f"ticketId {request_data.ticketId}에 해당하는 테마를 찾을 수 없습니다."
         )
 
+    return {
+        "prompt": request_data.prompt,
+        "theme": theme,
+        "ticketId": request_data.ticketId,
+        "pinnedMovieIds": request_data.pinnedMovieIds,
+        "isAdultAllowed": request_data.isAdultAllowed,  # [수정] 필터 파라미터 변경
+        "useCache": request_data.useCache,
+        "max_length": 2048,
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "top_k": 50
+    }
+
+
+@router.post("/generate", response_model=AIGenerateResponse, status_code=status.HTTP_200_OK)
+async def generate_exhibition(
+    request_data: AIGenerateRequest,
+    current_user: CachedUser = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """
+    AI 전시회 생성
+    - HttpOnly Cookie 필요
+    - VM2 AI 서버와 연동하여 영화 추천 생성
+    """
+    payload = _generate_payload(request_data)
+    theme = payload["theme"]
+
     try:
-        # VM2 AI 서버 호출
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{AI_SERVER_URL}/api/v1/generate",
-                json={
-                    "prompt": request_data.prompt,
-                    "theme": theme,
-                    "ticketId": request_data.ticketId,
-                    "pinnedMovieIds": request_data.pinnedMovieIds,
-                    "isAdultAllowed": request_data.isAdultAllowed,  # [수정] 필터 파라미터 변경
-                    "max_length": 2048,
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "top_k": 50
-                }
+        # VM2 AI 서버 호출 (공용 업스트림 클라이언트, 생성은 비멱등이라 연결 실패만 재시도)
+        response = await ai_upstream.request("POST", "/api/v1/generate", json=payload, timeout=120.0)
+
+        if response.status_code != 200:
+            logger.error(f"AI Server error: {response.status_code} - {response.text}")
+            raise InternalServerErrorException(
+                message="AI 서버 오류가 발생했습니다.",
+                details=f"Status: {response.status_code}"
             )
 
-            if response.status_code != 200:
-                logger.error(f"AI Server error: {response.status_code} - {response.text}")
-                raise InternalServerErrorException(
-                    message="AI 서버 오류가 발생했습니다.",
-                    details=f"Status: {response.status_code}"
-                )
-
-            ai_response = response.json()
-            logger.info(f"AI Server response received for theme: {theme}")
-            
-            # [추가] 영화 제목 Enrichment (VM2 AI가 title을 안 주므로 DB에서 채움)
-            try:
-                result_json = ai_response.get("result_json", ai_response.get("resultJson", {}))
-                movies_data = result_json.get("movies", [])
-                
-                if movies_data:
-                    # 1. 영화 ID 목록 추출
-                    movie_ids = [m.get("movieId") for m in movies_data if m.get("movieId")]
-                    
-                    if movie_ids:
-                        from app.models.movie import Movie
-                        # 2. DB에서 영화 제목 조회
-                        movies_db = db.query(Movie.id, Movie.title_ko).filter(Movie.id.in_(movie_ids)).all()
-                        
-                        # 3. ID -> Title 매핑 생성
-                        title_map = {m.id: m.title_ko for m in movies_db}
-                        
-                        # 4. 응답 데이터에 title 주입
-                        for movie in movies_data:
-                            mid = movie.get("movieId")
-                            if mid in title_map:
-                                movie["title"] = title_map[mid]
-                            else:
-                                movie["title"] = "알 수 없는 영화" # Fallback
-
-                logger.info("Enriched movie titles successfully")
-
-            except Exception as e:
-                logger.error(f"Failed to enrich movie titles: {e}")
-                # Enrichment 실패해도 전체 로직을 죽이지 않고 원본 그대로 반환하도록 pass
-                pass
-
-            return AIGenerateResponse(resultJson=ai_response.get("result_json", ai_response.get("resultJson", {})))
+        ai_response = response.json()
+        logger.info(f"AI Server response received for theme: {theme}")
+
+        # [추가] 영화 제목 Enrichment (VM2 AI가 title을 안 주므로 DB에서 채움)
+        _enrich_movie_titles(db, ai_response.get("result_json", ai_response.get("resultJson", {})))
 
+        return AIGenerateResponse(resultJson=ai_response.get("result_json", ai_response.get("resultJson", {})))
+
+    except httpx.TimeoutException:
+        logger.error("AI Server timeout")
+        raise InternalServerErrorException(
+            message="AI 서버 응답 시간이 초과되었습니다.",
+            details="잠시 후 다시 시도해주세요."
+        )
+    except httpx.RequestError as e:
+        logger.error(f"AI Server connection error: {e}")
+        raise InternalServerErrorException(
+            message="AI 서버에 연결할 수 없습니다.",
+            details=str(e)
+        )
+
+
+@router.post("/generate/stream", status_code=status.HTTP_200_OK)
+async def generate_exhibition_stream(
+    request_data: AIGenerateRequest,
+    current_user: CachedUser = Depends(get_current_user)
+):
+    """
+    AI 전시회 생성 (큐레이터 코멘트 토큰 스트리밍, text/event-stream)
+    - HttpOnly Cookie 필요
+    - event: meta(영화 목록) → token({"delta"}) 반복 → done(최종 resultJson) / error
+    - AI 서버 연결/상태 오류는 스트림 시작 전에 일반 오류 응답으로 반환
+    """
+    payload = _generate_payload(request_data)
+
+    try:
+        upstream = await ai_upstream.send_stream("/api/v1/generate/stream", json=payload, timeout=120.0)
     except httpx.TimeoutException:
         logger.error("AI Server timeout")
         raise InternalServerErrorException(
@@ -138,6 +177,39 @@ async def generate_exhibition(
             details=str(e)
         )
 
+    if upstream.status_code != 200:
+        body = await upstream.aread()
+        await ai_upstream.close(upstream)
+        logger.error(f"AI Server error: {upstream.status_code} - {body[:500]!r}")
+        raise InternalServerErrorException(
+            message="AI 서버 오류가 발생했습니다.",
+            details=f"Status: {upstream.status_code}"
+        )
+
+    async def event_stream():
+        # 요청 의존성 세션은 스트리밍 시작 전에 닫히므로 스트림 전용 세션 사용
+        db = SessionLocal()
+        try:
+            async for event, data in iter_sse_events(upstream):
+                if event in ("meta", "done") and isinstance(data, dict):
+                    result_json = data.get("result_json", data.get("resultJson", {}))
+                    # 영화 목록이 있는 이벤트만 제목 보강 (meta/done 각 1회)
+                    _enrich_movie_titles(db, result_json)
+                    data = {"resultJson": result_json}
+                yield format_sse(data, event=event)
+        except httpx.HTTPError as e:
+            logger.error(f"AI Server stream error: {e}")
+            yield format_sse({"detail": "AI 서버 스트림이 중단되었습니다."}, event="error")
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(ai_upstream.close, upstream)
+    )
+
 
 @router.post("/curate-movies", status_code=status.HTTP_200_OK)
 async def curate_movies(
@@ -146,11 +218,10 @@ async def curate_movies(
 ):
     """
     티켓 ID로 영화 목록 조회 (빠른 조회)
-    - ticket_group_movies 테이블에서 직접 조회
+    - Redis 티켓 풀에서 샘플링 (풀 재구성 중/장애 시 ticket_group_movies 직접 조회)
     - 인증 불필요
     """
     from sqlalchemy import text
-    import random
 
     ticket_id = request_data.get("ticketId")
     limit = request_data.get("limit", 5)
@@ -162,6 +233,15 @@ async def curate_movies(
             details="ticketId는 필수 항목입니다."
         )
 
+    if settings.CURATION_POOL_ENABLED:
+        pooled = curation_pool_service.sample_movies(db, ticket_id, limit, is_adult_allowed)
+        if pooled is not None:
+            logger.info(f"Curated {len(pooled)} movies for ticket {ticket_id} (pool)")
+            return {
+                "ticketId": ticket_id,
+                "movies": pooled
+            }
+
     try:
         # ticket_group_movies와 movies 테이블 조인하여 영화 조회
         # [수정] 19금 필터링 조건 추가
@@ -249,38 +329,41 @@ async def get_movie_detail(
     
     try:
         # 2. VM2 AI 서버 호출
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{AI_SERVER_URL}/api/v1/movie-detail",
-                json={
-                    "movieId": movie_id,
-                    "theme": theme
-                }
+        # 영화 설명 조회는 멱등 → 타임아웃/5xx도 다른 replica로 재시도
+        response = await ai_upstream.request(
+            "POST",
+            "/api/v1/movie-detail",
+            json={
+                "movieId": movie_id,
+                "theme": theme
+            },
+            timeout=30.0,
+            idempotent=True,
+        )
+
+        if response.status_code != 200:
+            logger.error(f"AI Server error: {response.status_code} - {response.text}")
+            raise InternalServerErrorException(
+                message="영화 정보를 가져오는데 실패했습니다.",
+                details=f"AI Server returned {response.status_code}"
             )
-            
-            if response.status_code != 200:
-                logger.error(f"AI Server error: {response.status_code} - {response.text}")
-                raise InternalServerErrorException(
-                    message="영화 정보를 가져오는데 실패했습니다.",
-                    details=f"AI Server returned {response.status_code}"
-                )
-            
-            result = response.json()
-            
-            # 3. Redis에 캐싱 (세션 ID가 있을 때만)
-            if session_id:
-                title = result.get("title", "")
-                detail = result.get("detail", "")
-                cache_value = f"{title}|{detail}"  # title과 detail 함께 저장
-                persona_cache_service.cache_summary(
-                    session_id=session_id,
-                    movie_id=movie_id,
-                    ticket_id=ticket_id,
-                    summary=cache_value
-                )
-            
-            return result
-            
+
+        result = response.json()
+
+        # 3. Redis에 캐싱 (세션 ID가 있을 때만)
+        if session_id:
+            title = result.get("title", "")
+            detail = result.get("detail", "")
+            cache_value = f"{title}|{detail}"  # title과 detail 함께 저장
+            persona_cache_service.cache_summary(
+                session_id=session_id,
+                movie_id=movie_id,
+                ticket_id=ticket_id,
+                summary=cache_value
+            )
+
+        return result
+
     except httpx.RequestError as e:
         logger.error(f"AI server connection failed: {e}")
         raise InternalServerErrorException(
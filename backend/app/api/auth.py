@@ -16,6 +16,7 @@ from app.schemas.user import (
 from app.schemas.common import MessageResponse
 from app.services.auth_service import AuthService
 from app.services.session_service import SessionService
+from app.services.session_cache_service import CachedUser
 from app.services.verification_service import VerificationService
 from app.utils.dependencies import get_current_user
 
@@ -438,7 +439,7 @@ def reset_password(
 
 @router.get("/me", response_model=LoginResponse, response_model_by_alias=False, status_code=status.HTTP_200_OK)
 def get_current_user_info(
-    current_user=Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user)
 ):
     """
     내 정보 조회 (세션 확인용)
@@ -107,7 +107,7 @@ def list_keys(
             ConsoleKeyItem(
                 id=token.id,
                 name=token.token_name,
-                key_preview=f"{token.api_key[:6]}...{token.api_key[-4:]}",
+                key_preview=token.key_preview,
                 created_at=token.created_at,
             )
         ]
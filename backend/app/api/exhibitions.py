@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session as DBSession
 from typing import Optional, List
 
 from app.core.database import get_db
-from app.models.user import User
+from app.services.session_cache_service import CachedUser
 from app.models.exhibition import Exhibition
 from app.schemas.exhibition import (
     ExhibitionCreate, ExhibitionUpdate, ExhibitionResponse,
@@ -25,7 +25,7 @@ router = APIRouter(prefix="/api/exhibitions", tags=["Exhibitions"])
 async def create_exhibition(
     exhibition_data: ExhibitionCreate,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     session_id: Optional[str] = Depends(get_session_id),
     db: DBSession = Depends(get_db)
 ):
@@ -97,7 +97,7 @@ def get_exhibitions(
     limit: int = Query(20, ge=1, le=100, description="페이지당 개수"),
     user_id: Optional[int] = Query(None, description="사용자 ID로 필터"),
     is_public: Optional[bool] = Query(None, description="공개 여부로 필터"),
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    current_user: Optional[CachedUser] = Depends(get_current_user_optional),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -143,7 +143,7 @@ def get_exhibitions(
 @router.get("/{exhibition_id}", response_model=dict, status_code=status.HTTP_200_OK)
 def get_exhibition_detail(
     exhibition_id: int,
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    current_user: Optional[CachedUser] = Depends(get_current_user_optional),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -227,7 +227,7 @@ def get_exhibition_detail(
 def update_exhibition(
     exhibition_id: int,
     exhibition_data: ExhibitionUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -254,7 +254,7 @@ def update_exhibition(
 @router.delete("/{exhibition_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_exhibition(
     exhibition_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -272,7 +272,7 @@ def delete_exhibition(
 @router.post("/{exhibition_id}/save", status_code=status.HTTP_201_CREATED)
 def save_exhibition(
     exhibition_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -294,7 +294,7 @@ def save_exhibition(
 @router.delete("/{exhibition_id}/save", status_code=status.HTTP_204_NO_CONTENT)
 def unsave_exhibition(
     exhibition_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -312,7 +312,7 @@ def unsave_exhibition(
 @router.post("/{exhibition_id}/pin", status_code=status.HTTP_201_CREATED)
 def pin_exhibition(
     exhibition_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -334,7 +334,7 @@ def pin_exhibition(
 @router.delete("/{exhibition_id}/pin", status_code=status.HTTP_204_NO_CONTENT)
 def unpin_exhibition(
     exhibition_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -6,24 +6,28 @@ from __future__ import annotations
 import logging
 import time
 import uuid
-from datetime import datetime
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
 import httpx
 from fastapi import APIRouter, Header, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session as DBSession
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.services.api_key_service import ApiKeyService
+from app.services.ai_upstream import ai_upstream
+from app.services import credential_cache_service
 from app.services.api_usage_service import estimate_tokens, log_usage
+from app.services.rate_limit_service import RateLimitResult, rate_limiter
+from app.utils.sse import format_sse, iter_sse_events
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/cuk/et", tags=["Public AI"])
 
 EXTERNAL_MODEL_NAME = "Cukee-1.5-it"
-AI_SERVER_URL = "http://10.0.19.117:5000"
 
 TICKET_TO_THEME = {
     1: "숏폼 러버 MZ 스타일",
@@ -55,6 +59,42 @@ def _openai_error(
     return JSONResponse(status_code=status_code, content=payload)
 
 
+def _rate_limit_error(limit_result: RateLimitResult) -> JSONResponse:
+    """OpenAI 형식 429 (type: requests/tokens, code: rate_limit_exceeded)"""
+    exceeded = limit_result.exceeded
+    label = {"rpm": "requests per min (RPM)", "tpm": "tokens per min (TPM)", "rpd": "requests per day (RPD)"}
+    if exceeded.name == "tpm" and limit_result.requested_tokens > exceeded.limit:
+        message = (
+            f"Request too large for {EXTERNAL_MODEL_NAME} on {label['tpm']}: "
+            f"Limit {exceeded.limit}, Requested {limit_result.requested_tokens}. "
+            "Please reduce your prompt or max_tokens."
+        )
+    else:
+        message = (
+            f"Rate limit reached for {EXTERNAL_MODEL_NAME} on {label[exceeded.name]}: "
+            f"Limit {exceeded.limit}. Please try again in {limit_result.retry_after_seconds}s."
+        )
+    response = _openai_error(
+        message,
+        error_type="tokens" if exceeded.name == "tpm" else "requests",
+        code="rate_limit_exceeded",
+        status_code=429,
+    )
+    response.headers.update(limit_result.headers())
+    return response
+
+
+def _estimate_request_tokens(prompt: str, max_tokens: Any) -> int:
+    """tpm 선차감용 추정치: 프롬프트 토큰 + 요청한 max_tokens (없으면 기본값)"""
+    try:
+        completion_tokens = int(max_tokens)
+    except (TypeError, ValueError):
+        completion_tokens = 0
+    if completion_tokens <= 0:
+        completion_tokens = settings.RATE_LIMIT_DEFAULT_COMPLETION_TOKENS
+    return estimate_tokens(prompt) + completion_tokens
+
+
 def _extract_api_key(authorization: Optional[str], x_api_key: Optional[str]) -> Optional[str]:
     if x_api_key:
         return x_api_key.strip()
@@ -143,7 +183,8 @@ async def enterprise_chat(
             status_code=401,
         )
 
-    api_key_record = ApiKeyService.get_by_api_key(db, api_key)
+    # 캐시 미스 시 Redis/DB 조회가 이벤트 루프를 막지 않도록 스레드풀에서 조회
+    api_key_record = await run_in_threadpool(credential_cache_service.get_api_key, api_key, db)
     if not api_key_record:
         return _openai_error(
             "Invalid API key.",
@@ -152,11 +193,7 @@ async def enterprise_chat(
             status_code=401,
         )
 
-    if (
-        api_key_record.status != "active"
-        or api_key_record.revoked_at is not None
-        or (api_key_record.expires_at and api_key_record.expires_at <= datetime.utcnow())
-    ):
+    if not api_key_record.is_active():
         return _openai_error(
             "API key is not active.",
             param="authorization",
@@ -185,25 +222,11 @@ async def enterprise_chat(
         )
         return response
 
-    if payload.get("stream") is True:
-        response = _openai_error(
-            "Streaming is not supported.",
-            param="stream",
-            code="unsupported",
-        )
-        _log_public_usage(
-            db=db,
-            api_key_id=api_key_record.id,
-            endpoint=endpoint,
-            model=model,
-            prompt_text=prompt,
-            completion_text=None,
-            status_code=response.status_code,
-            latency_ms=_elapsed_ms(start_time),
-            ip=ip,
-            user_agent=user_agent,
-        )
-        return response
+    stream = payload.get("stream") is True
+    stream_options = payload.get("stream_options")
+    include_usage = (
+        stream and isinstance(stream_options, dict) and stream_options.get("include_usage") is True
+    )
 
     prompt = _extract_prompt(payload.get("messages"))
     if not prompt:
@@ -295,6 +318,7 @@ async def enterprise_chat(
         "ticketId": ticket_id,
         "pinnedMovieIds": pinned_ids,
         "isAdultAllowed": is_adult_allowed,
+        "useCache": bool(payload.get("useCache", True)),
     }
 
     if payload.get("max_tokens") is not None:
@@ -306,12 +330,39 @@ async def enterprise_chat(
     if payload.get("top_k") is not None:
         ai_request["top_k"] = payload.get("top_k")
 
+    # 업스트림(GPU)으로 보내기 전에 키별 rpm/tpm/rpd 한도 확인
+    limit_result = await rate_limiter.check_async(
+        api_key_record.id,
+        rpm=api_key_record.rpm_limit,
+        tpm=api_key_record.tpm_limit,
+        rpd=api_key_record.rpd_limit,
+        tokens=_estimate_request_tokens(prompt, payload.get("max_tokens")),
+    )
+    if not limit_result.allowed:
+        response = _rate_limit_error(limit_result)
+        _log_public_usage(
+            db=db,
+            api_key_id=api_key_record.id,
+            endpoint=endpoint,
+            model=model,
+            prompt_text=prompt,
+            completion_text=None,
+            status_code=response.status_code,
+            latency_ms=_elapsed_ms(start_time),
+            ip=ip,
+            user_agent=user_agent,
+        )
+        return response
+
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{AI_SERVER_URL}/api/v1/generate",
-                json=ai_request,
-            )
+        if stream:
+            # 스트리밍: 상태 코드만 먼저 확인하고 본문은 StreamingResponse에서 소비
+            response = await ai_upstream.send_stream("/api/v1/generate/stream", json=ai_request, timeout=120.0)
+            if response.status_code != 200:
+                await response.aread()
+                await ai_upstream.close(response)
+        else:
+            response = await ai_upstream.request("POST", "/api/v1/generate", json=ai_request, timeout=120.0)
         if response.status_code != 200:
             logger.error("AI server error: %s - %s", response.status_code, response.text)
             error_response = _openai_error(
@@ -375,6 +426,26 @@ async def enterprise_chat(
         )
         return error_response
 
+    request.state.api_model = EXTERNAL_MODEL_NAME
+
+    if stream:
+        return StreamingResponse(
+            _stream_chat_completion(
+                response,
+                api_key_id=api_key_record.id,
+                endpoint=endpoint,
+                model=model,
+                prompt=prompt,
+                include_usage=include_usage,
+                start_time=start_time,
+                ip=ip,
+                user_agent=user_agent,
+            ),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **limit_result.headers()},
+            background=BackgroundTask(ai_upstream.close, response),
+        )
+
     result = response.json()
     result_json = result.get("result_json", result.get("resultJson", {}))
     content = ""
@@ -398,11 +469,11 @@ async def enterprise_chat(
         user_agent=user_agent,
     )
 
-    request.state.api_model = EXTERNAL_MODEL_NAME
     request.state.api_cost = api_cost
 
     return JSONResponse(
         status_code=200,
+        headers=limit_result.headers(),
         content={
             "id": f"chatcmpl-{uuid.uuid4().hex}",
             "object": "chat.completion",
@@ -424,12 +495,125 @@ async def enterprise_chat(
     )
 
 
+async def _stream_chat_completion(
+    upstream: httpx.Response,
+    api_key_id: int,
+    endpoint: str,
+    model: str,
+    prompt: str,
+    include_usage: bool,
+    start_time: float,
+    ip: Optional[str],
+    user_agent: Optional[str],
+) -> AsyncIterator[str]:
+    """
+    AI 서버 SSE(meta/token/done)를 OpenAI chat.completion.chunk 스트림으로 변환
+    - 사용량은 스트림이 끝나거나 끊긴 시점에 실제로 전송한 텍스트 기준으로 기록
+    """
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    parts: list[str] = []
+    # 완료 전에 연결이 끊기면 499 (client closed request)
+    status_code = 499
+
+    def chunk(delta: dict[str, Any], finish_reason: Optional[str] = None, **extra: Any) -> str:
+        body: dict[str, Any] = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": EXTERNAL_MODEL_NAME,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        body.update(extra)
+        return format_sse(body)
+
+    try:
+        yield chunk({"role": "assistant", "content": ""})
+        completed = False
+        async for event, data in iter_sse_events(upstream):
+            if not isinstance(data, dict):
+                continue
+            if event == "token":
+                delta = data.get("delta")
+                if isinstance(delta, str) and delta:
+                    parts.append(delta)
+                    yield chunk({"content": delta})
+            elif event == "done":
+                # 토큰 없이 끝난 경우(guardrails 안내 등) 최종 코멘트를 한 번에 전송
+                if not parts:
+                    result_json = data.get("result_json", data.get("resultJson", {}))
+                    content = ""
+                    if isinstance(result_json, dict):
+                        content = result_json.get("curatorComment") or ""
+                    parts.append(content or "OK")
+                    yield chunk({"content": parts[-1]})
+                completed = True
+                break
+            elif event == "error":
+                break
+
+        if not completed:
+            logger.error("AI server stream ended without completion")
+            status_code = 502
+            yield format_sse({
+                "error": {
+                    "message": "Upstream AI server error.",
+                    "type": "server_error",
+                    "code": "upstream_error",
+                }
+            })
+            return
+
+        status_code = 200
+        yield chunk({}, finish_reason="stop")
+        if include_usage:
+            prompt_tokens = estimate_tokens(prompt)
+            completion_tokens = estimate_tokens("".join(parts))
+            yield format_sse({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": EXTERNAL_MODEL_NAME,
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+        yield format_sse("[DONE]")
+    except httpx.HTTPError as exc:
+        logger.error("AI server stream error: %s", exc)
+        status_code = 502
+        yield format_sse({
+            "error": {
+                "message": "Upstream AI server connection error.",
+                "type": "server_error",
+                "code": "upstream_unavailable",
+            }
+        })
+    finally:
+        # 요청 의존성 세션은 이미 닫혔으므로 db 없이 기록 (write-behind가 아니면 log_usage가 세션을 연다)
+        _log_public_usage(
+            db=None,
+            api_key_id=api_key_id,
+            endpoint=endpoint,
+            model=model,
+            prompt_text=prompt,
+            completion_text="".join(parts) or None,
+            status_code=status_code,
+            latency_ms=_elapsed_ms(start_time),
+            ip=ip,
+            user_agent=user_agent,
+        )
+
+
 def _elapsed_ms(start_time: float) -> int:
     return int((time.monotonic() - start_time) * 1000)
 
 
 def _log_public_usage(
-    db: DBSession,
+    db: Optional[DBSession],
     api_key_id: int,
     endpoint: str,
     model: str,
@@ -10,7 +10,7 @@ from app.core.database import get_db
 from app.models.ticket import TicketGroup, UserTicketLike
 from app.schemas.ticket import TicketResponse, TicketListResponse, TicketDetailResponse
 from app.utils.dependencies import get_current_user_optional, get_current_user
-from app.models import User
+from app.services.session_cache_service import CachedUser
 
 router = APIRouter(prefix="/api/tickets", tags=["Tickets"])
 
@@ -41,7 +41,7 @@ def ticket_to_response_dict(ticket_row) -> dict:
 
 @router.get("", response_model=TicketListResponse, status_code=status.HTTP_200_OK)
 def get_tickets(
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    current_user: Optional[CachedUser] = Depends(get_current_user_optional),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -87,7 +87,7 @@ def get_tickets(
 @router.get("/{ticket_code}", response_model=TicketDetailResponse, status_code=status.HTTP_200_OK)
 def get_ticket_detail(
     ticket_code: str,
-    current_user: Optional[User] = Depends(get_current_user_optional),
+    current_user: Optional[CachedUser] = Depends(get_current_user_optional),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -129,7 +129,7 @@ def get_ticket_detail(
 @router.post("/{ticket_id}/like", status_code=status.HTTP_200_OK)
 def toggle_ticket_like(
     ticket_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -7,15 +7,16 @@ from sqlalchemy.orm import Session as DBSession
 from app.core.database import get_db
 from app.schemas.user import UserResponse, UpdateUserRequest, WithdrawRequest
 from app.services.auth_service import AuthService
+from app.services import session_cache_service
+from app.services.session_cache_service import CachedUser
 from app.utils.dependencies import get_current_user
-from app.models import User
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
 
 @router.get("/me", response_model=UserResponse, response_model_by_alias=False, status_code=status.HTTP_200_OK)
 def get_current_user_info(
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
 ):
     """
     현재 로그인한 사용자 정보 조회
@@ -32,7 +33,7 @@ def get_current_user_info(
 @router.patch("/me", response_model=UserResponse, response_model_by_alias=False, status_code=status.HTTP_200_OK)
 def update_user_info(
     update_data: UpdateUserRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db)
 ):
     """
@@ -61,7 +62,7 @@ def update_user_info(
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user(
     request: WithdrawRequest,  # [추가] 비밀번호 입력 받기
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: DBSession = Depends(get_db),
     response: Response = None # Cookie 삭제를 위해 response 객체 필요
 ):
@@ -77,16 +78,18 @@ def delete_user(
     from app.core.security import verify_password
     from fastapi import HTTPException
     
-    if not verify_password(request.password, current_user.hashed_password):
+    # get_current_user는 캐시된 사용자 정보만 주므로 수정할 ORM 객체를 다시 조회
+    user = AuthService.get_user_by_id(db, current_user.id)
+    if not verify_password(request.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="비밀번호가 일치하지 않습니다."
         )
 
     # 2. Soft Delete 처리
-    current_user.is_deleted = True
+    user.is_deleted = True
     from datetime import datetime
-    current_user.deleted_at = datetime.utcnow()
+    user.deleted_at = datetime.utcnow()
     
     # 3. 세션 종료 (로그아웃 처리)
     from app.services.session_service import SessionService
@@ -96,6 +99,8 @@ def delete_user(
     # (엄밀히는 현재 세션도 DB에서 지워주는게 좋음. get_current_user dependency가 세션을 리턴하지 않고 유저만 리턴해서 세션 ID를 모르는 상태)
     
     db.commit()
+    # 다른 워커의 캐시에 남은 사용자 정보도 즉시 무효화 (이후 요청은 DB에서 탈퇴 확인)
+    session_cache_service.invalidate_user(user.id)
 
     # 4. 쿠키 삭제 (클라이언트 로그아웃) - Response 객체 활용
     # 주의: status_code가 204이면 Response Body를 보낼 수 없음.
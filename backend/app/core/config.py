@@ -25,6 +25,57 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # AI Upstream (AI 서버 replica 목록, 콤마 구분 - 공유 연결 풀 + least-outstanding 분산)
+    AI_SERVER_URLS: str = "http://10.0.19.117:5000"
+    AI_UPSTREAM_HTTP2: bool = False  # h2 패키지 필요 (pip install "httpx[http2]")
+    AI_UPSTREAM_MAX_CONNECTIONS: int = 100
+    AI_UPSTREAM_MAX_KEEPALIVE: int = 20
+    AI_UPSTREAM_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    AI_UPSTREAM_HEALTH_PATH: str = "/health/ready"
+    AI_UPSTREAM_HEALTH_INTERVAL_SECONDS: float = 5.0
+    AI_UPSTREAM_MAX_RETRIES: int = 2
+    AI_UPSTREAM_BREAKER_FAILURES: int = 5
+    AI_UPSTREAM_BREAKER_COOLDOWN_SECONDS: float = 30.0
+
+    # Curation Pools (티켓별 영화 id Redis Set, NOTIFY로 무효화)
+    CURATION_POOL_ENABLED: bool = True
+    CURATION_POOL_TTL_SECONDS: int = 3600
+    CURATION_POOL_NOTIFY_CHANNEL: str = "movie_index_changed"
+
+    # Session Cache (세션→사용자 조회 2단계 캐시: 프로세스 LRU + Redis, pub/sub 무효화)
+    SESSION_CACHE_ENABLED: bool = True
+    SESSION_CACHE_TTL_SECONDS: int = 300
+    SESSION_CACHE_LOCAL_TTL_SECONDS: int = 30  # pub/sub 메시지 유실 시 최대 지연
+    SESSION_CACHE_LOCAL_MAXSIZE: int = 10000
+    SESSION_CACHE_CHANNEL: str = "session_cache:invalidate"
+
+    # Credential Cache (API 키/콘솔 토큰/관리자 토큰 조회 캐시, pub/sub 무효화)
+    CREDENTIAL_CACHE_ENABLED: bool = True
+    CREDENTIAL_CACHE_TTL_SECONDS: int = 300
+    CREDENTIAL_CACHE_NEGATIVE_TTL_SECONDS: int = 30  # 존재하지 않는 키 조회 결과 캐싱
+    CREDENTIAL_CACHE_LOCAL_TTL_SECONDS: int = 30
+    CREDENTIAL_CACHE_LOCAL_MAXSIZE: int = 10000
+    CREDENTIAL_CACHE_CHANNEL: str = "credential_cache:invalidate"
+    CREDENTIAL_LAST_USED_FLUSH_SECONDS: int = 30  # 콘솔 토큰 마지막 사용 시각 일괄 갱신 주기
+
+    # API Rate Limit (CukApiKey rpm/tpm/rpd, Redis GCRA + Redis 장애 시 프로세스 로컬 한도)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT_COMPLETION_TOKENS: int = 256  # max_tokens 미지정 요청의 tpm 선차감 추정치
+    RATE_LIMIT_REDIS_RETRY_SECONDS: float = 5.0  # Redis 실패 후 로컬 한도만 쓰는 시간
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = 0.05  # limiter 전용 Redis 연결/응답 타임아웃
+
+    # API Usage Metering (Redis Stream write-behind → 배치 INSERT + 일별 upsert)
+    API_USAGE_WRITE_BEHIND: bool = True
+    API_USAGE_STREAM: str = "api_usage:events"
+    API_USAGE_CONSUMER_GROUP: str = "api_usage_writers"
+    API_USAGE_BATCH_SIZE: int = 500
+    API_USAGE_FLUSH_INTERVAL_MS: int = 1000
+    API_USAGE_CLAIM_IDLE_SECONDS: int = 60  # 죽은 워커가 남긴 미확인 이벤트 회수 기준
+    API_USAGE_LOCAL_BUFFER_MAX: int = 10000  # Redis 장애 시 메모리 버퍼 상한
+    API_USAGE_MAX_ATTEMPTS: int = 5  # 같은 이벤트 기록 실패(제약 위반 등) 허용 횟수, 넘으면 버림
+    API_USAGE_REDIS_TIMEOUT_SECONDS: float = 0.05  # XADD 전용 Redis 연결/응답 타임아웃
+    API_USAGE_REDIS_RETRY_SECONDS: float = 5.0  # XADD 실패 후 메모리 버퍼만 쓰는 시간
+
     # Prometheus
     PROMETHEUS_URL: str = "http://localhost:9090"
 
@@ -58,6 +109,11 @@ class Settings(BaseSettings):
     KAKAO_CLIENT_SECRET: Optional[str] = None
     KAKAO_REDIRECT_URI: str = "https://cukee.world/api/auth/kakao/callback"
 
+    @property
+    def ai_server_urls_list(self) -> List[str]:
+        """AI 서버 replica URL 리스트 반환"""
+        return [url.strip().rstrip("/") for url in self.AI_SERVER_URLS.split(",") if url.strip()]
+
     @property
     def allowed_origins_list(self) -> List[str]:
         """CORS 허용 출처 리스트 반환"""
@@ -2,6 +2,7 @@
 FastAPI 메인 애플리케이션
 """
 from fastapi import FastAPI
+import logging
 import threading
 import time
 from fastapi.middleware.cors import CORSMiddleware
@@ -22,7 +23,14 @@ from app.core.exception_handlers import (
 )
 from app.api import auth, users, ai, public_ai, exhibitions, tickets, google_oauth, kakao_oauth, animalese, admin, console
 from app.services.admin_service import AdminTokenService
+from app.services.ai_upstream import ai_upstream
+from app.services.curation_pool_service import listen_for_changes
 from app.services.metrics_service import ApiMetricsMiddleware
+from app.services import credential_cache_service
+from app.services.session_cache_service import listen_for_invalidations
+from app.services.usage_meter import usage_meter
+
+logger = logging.getLogger(__name__)
 
 # 데이터베이스 테이블 생성
 Base.metadata.create_all(bind=engine)
@@ -98,6 +106,83 @@ def ensure_admin_token_on_startup():
     thread.start()
 
 
+@app.on_event("startup")
+def listen_curation_pool_changes():
+    """ticket_group_movies / movies 변경 시 큐레이션 풀 무효화"""
+    if not settings.CURATION_POOL_ENABLED or not settings.CURATION_POOL_NOTIFY_CHANNEL:
+        return
+    thread = threading.Thread(
+        target=listen_for_changes,
+        args=(engine, settings.CURATION_POOL_NOTIFY_CHANNEL),
+        daemon=True,
+    )
+    thread.start()
+
+
+@app.on_event("startup")
+def listen_session_cache_invalidations():
+    """다른 워커의 로그아웃/사용자 변경 시 로컬 세션 캐시 정리"""
+    if not settings.SESSION_CACHE_ENABLED:
+        return
+    thread = threading.Thread(
+        target=listen_for_invalidations,
+        args=(settings.SESSION_CACHE_CHANNEL,),
+        daemon=True,
+    )
+    thread.start()
+
+
+@app.on_event("startup")
+def start_credential_cache_threads():
+    """API 키/토큰 캐시 무효화 구독 + 콘솔 토큰 마지막 사용 시각 일괄 기록"""
+    if settings.CREDENTIAL_CACHE_ENABLED:
+        threading.Thread(
+            target=credential_cache_service.listen_for_invalidations,
+            args=(settings.CREDENTIAL_CACHE_CHANNEL,),
+            daemon=True,
+        ).start()
+    threading.Thread(
+        target=credential_cache_service.run_last_used_flusher,
+        args=(settings.CREDENTIAL_LAST_USED_FLUSH_SECONDS,),
+        daemon=True,
+    ).start()
+
+
+@app.on_event("shutdown")
+def flush_credential_last_used():
+    """남은 마지막 사용 시각 기록"""
+    try:
+        credential_cache_service.flush_last_used()
+    except Exception as exc:
+        logger.error(f"Console token last-used flush on shutdown failed: {exc}")
+
+
+@app.on_event("startup")
+def start_usage_meter():
+    """API 사용량 write-behind 기록 스레드 시작"""
+    if settings.API_USAGE_WRITE_BEHIND:
+        usage_meter.start()
+
+
+@app.on_event("shutdown")
+def stop_usage_meter():
+    """메모리 버퍼에 남은 사용량 기록"""
+    if settings.API_USAGE_WRITE_BEHIND:
+        usage_meter.stop()
+
+
+@app.on_event("startup")
+async def start_ai_upstream_health_checks():
+    """AI 서버 replica 헬스 프로브 시작"""
+    ai_upstream.start_health_checks()
+
+
+@app.on_event("shutdown")
+async def close_ai_upstream():
+    """AI 서버 공용 연결 풀 정리"""
+    await ai_upstream.aclose()
+
+
 @app.get("/health")
 def health_check():
     """헬스체크"""
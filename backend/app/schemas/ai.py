@@ -53,6 +53,7 @@ class AIGenerateRequest(BaseModel):
     ticketId: int
     pinnedMovieIds: List[int] = []
     isAdultAllowed: bool = False  # [추가] 19금 필터 (허용 여부)
+    useCache: bool = True  # 비슷한 요청의 큐레이션 코멘트 재사용 (false면 항상 새로 생성)
 
     model_config = ConfigDict(
         json_schema_extra={
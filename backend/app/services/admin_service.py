@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session as DBSession
 
 from app.core.config import settings
 from app.models.admin import AdminToken
+from app.services import credential_cache_service
 from app.services.email_service import EmailService
 from app.utils.token_utils import generate_token, hash_token
 
@@ -49,6 +50,7 @@ class AdminTokenService:
             db.add(record)
 
         db.commit()
+        credential_cache_service.invalidate_admin_token()
         EmailService.send_admin_token_email(settings.ADMIN_EMAIL, raw_token, expires_at)
         return raw_token
 
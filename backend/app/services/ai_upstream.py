@@ -0,0 +1,383 @@
+"""
+AI 서버 업스트림 클라이언트 (모든 AI 호출이 공유)
+- 요청마다 httpx.AsyncClient를 새로 만들지 않고 프로세스 공용 연결 풀(keep-alive, 선택적으로 HTTP/2) 사용
+- AI_SERVER_URLS의 replica 중 진행 중인 요청이 가장 적은 곳으로 분산 (least-outstanding)
+- 백그라운드 헬스 프로브(/health/ready)로 준비 안 된 replica 제외
+- replica별 circuit breaker: 연속 실패 시 cooldown 동안 제외 후 시험 요청 1건으로 복구 확인
+- 연결 단계 실패는 항상 다른 replica로 재시도, 응답 지연/5xx는 멱등 호출만 재시도
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.metrics_service import (
+    AI_UPSTREAM_CIRCUIT_STATE,
+    AI_UPSTREAM_HEALTHY,
+    AI_UPSTREAM_LATENCY,
+    AI_UPSTREAM_OUTSTANDING,
+    AI_UPSTREAM_REQUESTS,
+    AI_UPSTREAM_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# circuit breaker 상태 (메트릭 값과 동일)
+CIRCUIT_CLOSED = 0
+CIRCUIT_HALF_OPEN = 1
+CIRCUIT_OPEN = 2
+
+# 멱등 호출에서 다른 replica로 재시도할 응답 코드
+RETRYABLE_STATUS = frozenset({502, 503, 504})
+
+# 스트리밍 응답에 replica 정보를 붙여두는 extensions 키
+_EXTENSION_KEY = "cukee_replica"
+
+
+class AIUpstreamUnavailable(httpx.ConnectError):
+    """사용 가능한 replica가 없음 (기존 httpx.RequestError 처리 경로를 그대로 탐)"""
+
+
+@dataclass
+class Replica:
+    """AI 서버 replica 하나의 상태"""
+    url: str
+    healthy: bool = True  # 첫 프로브 전에는 사용 가능으로 간주
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    circuit: int = CIRCUIT_CLOSED
+    opened_at: float = 0.0
+    trial_in_flight: bool = False
+
+    def available(self, now: float, cooldown: float) -> bool:
+        if not self.healthy:
+            return False
+        if self.circuit == CIRCUIT_OPEN:
+            return now - self.opened_at >= cooldown
+        if self.circuit == CIRCUIT_HALF_OPEN:
+            return not self.trial_in_flight
+        return True
+
+
+class AIUpstreamClient:
+    """replica 선택 + 공용 연결 풀 + 재시도/circuit breaker를 묶은 AI 서버 클라이언트"""
+
+    def __init__(
+        self,
+        urls: List[str],
+        http2: bool = False,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        connect_timeout: float = 10.0,
+        health_path: str = "/health/ready",
+        health_interval: float = 5.0,
+        max_retries: int = 2,
+        breaker_failures: int = 5,
+        breaker_cooldown: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        if not urls:
+            raise ValueError("AI_SERVER_URLS is empty")
+        self.replicas = [Replica(url=url.rstrip("/")) for url in urls]
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.connect_timeout = connect_timeout
+        self.health_path = health_path
+        self.health_interval = health_interval
+        self.max_retries = max_retries
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self._transport = transport
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+        for replica in self.replicas:
+            AI_UPSTREAM_HEALTHY.labels(replica=replica.url).set(1)
+            AI_UPSTREAM_CIRCUIT_STATE.labels(replica=replica.url).set(CIRCUIT_CLOSED)
+
+    # ------------------------------------------------------------------
+    # 연결 풀
+    # ------------------------------------------------------------------
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """공용 AsyncClient (첫 사용 시 생성, 이벤트 루프당 하나)"""
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("AI_UPSTREAM_HTTP2 requires the 'h2' package, falling back to HTTP/1.1")
+                    http2 = False
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                ),
+                timeout=httpx.Timeout(120.0, connect=self.connect_timeout),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        await self.stop_health_checks()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ------------------------------------------------------------------
+    # replica 선택 / circuit breaker
+    # ------------------------------------------------------------------
+    def pick(self, exclude: Optional[set] = None) -> Replica:
+        """
+        사용 가능한 replica 중 진행 중인 요청이 가장 적은 곳 (동률은 무작위)
+        - exclude(이미 시도한 replica)는 다른 후보가 있을 때만 제외
+        """
+        now = time.monotonic()
+        candidates = [replica for replica in self.replicas if replica.available(now, self.breaker_cooldown)]
+        if exclude:
+            candidates = [replica for replica in candidates if replica.url not in exclude] or candidates
+        if not candidates:
+            raise AIUpstreamUnavailable("No available AI server replica")
+
+        fewest = min(replica.outstanding for replica in candidates)
+        replica = random.choice([replica for replica in candidates if replica.outstanding == fewest])
+        if replica.circuit == CIRCUIT_OPEN:
+            # cooldown이 지난 replica는 시험 요청 1건만 허용
+            self._set_circuit(replica, CIRCUIT_HALF_OPEN)
+        if replica.circuit == CIRCUIT_HALF_OPEN:
+            replica.trial_in_flight = True
+        return replica
+
+    def _acquire(self, replica: Replica):
+        replica.outstanding += 1
+        AI_UPSTREAM_OUTSTANDING.labels(replica=replica.url).set(replica.outstanding)
+
+    def _release(self, replica: Replica):
+        replica.outstanding = max(replica.outstanding - 1, 0)
+        AI_UPSTREAM_OUTSTANDING.labels(replica=replica.url).set(replica.outstanding)
+
+    def _set_circuit(self, replica: Replica, state: int):
+        replica.circuit = state
+        AI_UPSTREAM_CIRCUIT_STATE.labels(replica=replica.url).set(state)
+
+    def _record_success(self, replica: Replica):
+        replica.consecutive_failures = 0
+        replica.trial_in_flight = False
+        if replica.circuit != CIRCUIT_CLOSED:
+            logger.info(f"AI upstream {replica.url} recovered, circuit closed")
+            self._set_circuit(replica, CIRCUIT_CLOSED)
+
+    def _record_failure(self, replica: Replica):
+        replica.consecutive_failures += 1
+        replica.trial_in_flight = False
+        if replica.circuit == CIRCUIT_HALF_OPEN or replica.consecutive_failures >= self.breaker_failures:
+            if replica.circuit != CIRCUIT_OPEN:
+                logger.warning(
+                    f"AI upstream {replica.url} circuit opened after "
+                    f"{replica.consecutive_failures} consecutive failures"
+                )
+            replica.opened_at = time.monotonic()
+            self._set_circuit(replica, CIRCUIT_OPEN)
+
+    def _record_response(self, replica: Replica, path: str, status_code: int, started: float):
+        AI_UPSTREAM_REQUESTS.labels(replica=replica.url, path=path, outcome=f"{status_code // 100}xx").inc()
+        AI_UPSTREAM_LATENCY.labels(replica=replica.url, path=path).observe((time.monotonic() - started) * 1000)
+        # 503은 과부하/준비 중 신호라 breaker 대신 헬스 프로브와 재시도로 처리
+        if status_code >= 500 and status_code != 503:
+            self._record_failure(replica)
+        else:
+            self._record_success(replica)
+
+    def _record_error(self, replica: Replica, path: str, error: Exception):
+        if isinstance(error, httpx.TimeoutException):
+            outcome = "timeout"
+        elif isinstance(error, httpx.ConnectError):
+            outcome = "connect_error"
+        else:
+            outcome = "transport_error"
+        AI_UPSTREAM_REQUESTS.labels(replica=replica.url, path=path, outcome=outcome).inc()
+        self._record_failure(replica)
+
+    @staticmethod
+    def _is_connect_phase(error: Exception) -> bool:
+        """요청이 replica에 도달하지 않은 실패 (비멱등 호출도 안전하게 재시도 가능)"""
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+    async def _backoff(self, attempt: int):
+        await asyncio.sleep(min(0.05 * (2 ** attempt), 0.5) * random.uniform(0.5, 1.0))
+
+    # ------------------------------------------------------------------
+    # 호출
+    # ------------------------------------------------------------------
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        idempotent: bool = False,
+    ) -> httpx.Response:
+        """
+        일반(비스트리밍) 호출
+        - idempotent=True면 timeout/502/503/504도 다른 replica로 재시도
+        - 재시도 소진 시 마지막 응답을 반환하거나 마지막 예외를 그대로 던짐
+        """
+        tried: set = set()
+        attempt = 0
+        while True:
+            replica = self.pick(exclude=tried)
+            tried.add(replica.url)
+            self._acquire(replica)
+            started = time.monotonic()
+            try:
+                response = await self.client.request(
+                    method, f"{replica.url}{path}", json=json,
+                    timeout=httpx.Timeout(timeout, connect=self.connect_timeout) if timeout else httpx.USE_CLIENT_DEFAULT,
+                )
+            except httpx.TransportError as e:
+                self._record_error(replica, path, e)
+                if attempt < self.max_retries and (idempotent or self._is_connect_phase(e)):
+                    attempt += 1
+                    AI_UPSTREAM_RETRIES.labels(path=path, reason=type(e).__name__).inc()
+                    logger.warning(f"AI upstream {replica.url}{path} failed ({e!r}), retrying")
+                    await self._backoff(attempt)
+                    continue
+                raise
+            except BaseException:
+                # 취소 등으로 결과를 못 받은 시험 요청은 다음 요청이 다시 시험
+                replica.trial_in_flight = False
+                raise
+            finally:
+                self._release(replica)
+
+            self._record_response(replica, path, response.status_code, started)
+            if idempotent and response.status_code in RETRYABLE_STATUS and attempt < self.max_retries:
+                attempt += 1
+                AI_UPSTREAM_RETRIES.labels(path=path, reason=str(response.status_code)).inc()
+                await self._backoff(attempt)
+                continue
+            return response
+
+    async def send_stream(self, path: str, json: Optional[dict] = None, timeout: Optional[float] = None) -> httpx.Response:
+        """
+        스트리밍 호출 - 응답 헤더까지만 받은 Response 반환 (본문은 호출측이 읽음)
+        - 연결 단계 실패만 다른 replica로 재시도 (생성 요청은 멱등이 아님)
+        - 사용 후 반드시 close(response)로 반납해야 outstanding 수가 줄어듦
+        """
+        tried: set = set()
+        attempt = 0
+        while True:
+            replica = self.pick(exclude=tried)
+            tried.add(replica.url)
+            self._acquire(replica)
+            started = time.monotonic()
+            request = self.client.build_request(
+                "POST", f"{replica.url}{path}", json=json,
+                timeout=httpx.Timeout(timeout, connect=self.connect_timeout) if timeout else httpx.USE_CLIENT_DEFAULT,
+            )
+            try:
+                response = await self.client.send(request, stream=True)
+            except httpx.TransportError as e:
+                self._release(replica)
+                self._record_error(replica, path, e)
+                if attempt < self.max_retries and self._is_connect_phase(e):
+                    attempt += 1
+                    AI_UPSTREAM_RETRIES.labels(path=path, reason=type(e).__name__).inc()
+                    logger.warning(f"AI upstream {replica.url}{path} failed ({e!r}), retrying")
+                    await self._backoff(attempt)
+                    continue
+                raise
+            except BaseException:
+                replica.trial_in_flight = False
+                self._release(replica)
+                raise
+
+            self._record_response(replica, path, response.status_code, started)
+            response.extensions[_EXTENSION_KEY] = replica
+            return response
+
+    async def close(self, response: Optional[httpx.Response]):
+        """스트리밍 응답 반납 (여러 번 호출해도 안전)"""
+        if response is None:
+            return
+        replica = response.extensions.pop(_EXTENSION_KEY, None)
+        try:
+            await response.aclose()
+        finally:
+            if replica is not None:
+                self._release(replica)
+
+    # ------------------------------------------------------------------
+    # 헬스 프로브
+    # ------------------------------------------------------------------
+    async def probe(self, replica: Replica):
+        """replica 준비 상태 확인 (결과는 pick 대상 여부에만 반영, breaker와는 별개)"""
+        try:
+            response = await self.client.get(
+                f"{replica.url}{self.health_path}",
+                timeout=httpx.Timeout(self.connect_timeout, connect=self.connect_timeout),
+            )
+            healthy = response.status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+
+        if healthy != replica.healthy:
+            logger.info(f"AI upstream {replica.url} is now {'healthy' if healthy else 'unhealthy'}")
+        replica.healthy = healthy
+        AI_UPSTREAM_HEALTHY.labels(replica=replica.url).set(1 if healthy else 0)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.gather(*(self.probe(replica) for replica in self.replicas))
+            await asyncio.sleep(self.health_interval)
+
+    def start_health_checks(self):
+        """서버 시작 시 호출 (replica가 하나면 프로브 대신 breaker만 사용)"""
+        if len(self.replicas) < 2 or self.health_interval <= 0:
+            return
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop_health_checks(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._health_task = None
+
+    def stats(self) -> List[dict]:
+        return [
+            {
+                "url": replica.url,
+                "healthy": replica.healthy,
+                "outstanding": replica.outstanding,
+                "circuit": ("closed", "half_open", "open")[replica.circuit],
+            }
+            for replica in self.replicas
+        ]
+
+
+# 전역 AI 업스트림 클라이언트
+ai_upstream = AIUpstreamClient(
+    urls=settings.ai_server_urls_list,
+    http2=settings.AI_UPSTREAM_HTTP2,
+    max_connections=settings.AI_UPSTREAM_MAX_CONNECTIONS,
+    max_keepalive=settings.AI_UPSTREAM_MAX_KEEPALIVE,
+    connect_timeout=settings.AI_UPSTREAM_CONNECT_TIMEOUT_SECONDS,
+    health_path=settings.AI_UPSTREAM_HEALTH_PATH,
+    health_interval=settings.AI_UPSTREAM_HEALTH_INTERVAL_SECONDS,
+    max_retries=settings.AI_UPSTREAM_MAX_RETRIES,
+    breaker_failures=settings.AI_UPSTREAM_BREAKER_FAILURES,
+    breaker_cooldown=settings.AI_UPSTREAM_BREAKER_COOLDOWN_SECONDS,
+)
@@ -7,6 +7,7 @@ from typing import Optional
 from sqlalchemy.orm import Session as DBSession
 
 from app.models.api_usage import CukApiKey
+from app.services import credential_cache_service
 from app.services.console_service import ConsoleTokenService
 
 
@@ -41,6 +42,8 @@ class ApiKeyService:
         db.add(record)
         db.commit()
         db.refresh(record)
+        # 발급 전 조회로 남았을 수 있는 "없음" 캐시 제거
+        credential_cache_service.invalidate_api_key(raw_key)
         return record, raw_key
 
     @staticmethod
@@ -52,4 +55,5 @@ class ApiKeyService:
         record.revoked_at = datetime.utcnow()
         db.commit()
         db.refresh(record)
+        credential_cache_service.invalidate_api_key(record.api_key)
         return record
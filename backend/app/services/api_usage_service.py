@@ -6,10 +6,15 @@ from __future__ import annotations
 import math
 import uuid
 from datetime import datetime, date
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session as DBSession
 
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.models.api_usage import CukApiUsageDaily, CukApiUsageLog
 
 
@@ -17,6 +22,9 @@ INPUT_COST_PER_MILLION = 2000.0
 CACHED_INPUT_COST_PER_MILLION = 250.0
 OUTPUT_COST_PER_MILLION = 15000.0
 
+# cuk_api_usage_daily columns accumulated by the rollup upsert
+_DAILY_SUM_COLUMNS = ("requests", "errors", "prompt_tokens", "completion_tokens", "total_tokens", "cost")
+
 
 def estimate_tokens(text: Optional[str]) -> int:
     if not text:
@@ -38,8 +46,7 @@ def calculate_cost(
     return float(prompt_cost + cached_cost + completion_cost)
 
 
-def log_usage(
-    db: DBSession,
+def build_usage_event(
     api_key_id: int,
     endpoint: str,
     model: str,
@@ -50,60 +57,141 @@ def log_usage(
     ip: Optional[str],
     user_agent: Optional[str],
     created_at: Optional[datetime] = None,
-) -> Tuple[int, float]:
+) -> dict:
+    """Build one JSON-serialisable usage event (request_id doubles as the dedupe key)."""
     timestamp = created_at or datetime.utcnow()
-    total_tokens = prompt_tokens + completion_tokens
-    cost = calculate_cost(prompt_tokens, completion_tokens)
-    request_id = uuid.uuid4().hex
+    return {
+        "request_id": uuid.uuid4().hex,
+        "api_key_id": api_key_id,
+        "endpoint": endpoint,
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "status_code": status_code,
+        "latency_ms": latency_ms,
+        "cost": calculate_cost(prompt_tokens, completion_tokens),
+        "ip": ip,
+        "user_agent": user_agent,
+        "created_at": timestamp.isoformat(),
+    }
+
+
+def write_usage_events(db: DBSession, events: List[dict]) -> int:
+    """
+    Persist a batch of usage events (caller commits).
+    - one multi-row INSERT into cuk_api_usage_logs
+    - one INSERT ... ON CONFLICT DO UPDATE per batch into cuk_api_usage_daily
+    - events whose request_id is already stored are skipped, so redelivery is safe
+    Returns the number of newly written events.
+    """
+    if not events:
+        return 0
+
+    seen = {
+        row[0]
+        for row in db.execute(
+            select(CukApiUsageLog.request_id).where(
+                CukApiUsageLog.request_id.in_([event["request_id"] for event in events])
+            )
+        )
+    }
+    rows = []
+    for event in events:
+        if event["request_id"] in seen:
+            continue
+        seen.add(event["request_id"])
+        rows.append({**event, "created_at": datetime.fromisoformat(event["created_at"])})
+    if not rows:
+        return 0
+
+    db.execute(insert(CukApiUsageLog).values(rows))
+
+    daily: Dict[Tuple[date, int, str], dict] = {}
+    for row in rows:
+        key = (row["created_at"].date(), row["api_key_id"], row["model"])
+        bucket = daily.setdefault(key, {
+            "day": key[0],
+            "api_key_id": key[1],
+            "model": key[2],
+            "requests": 0,
+            "errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "cost": 0.0,
+        })
+        bucket["requests"] += 1
+        if row["status_code"] >= 400:
+            bucket["errors"] += 1
+        bucket["prompt_tokens"] += row["prompt_tokens"]
+        bucket["completion_tokens"] += row["completion_tokens"]
+        bucket["total_tokens"] += row["total_tokens"]
+        bucket["cost"] += row["cost"]
+
+    upsert = _dialect_insert(db)(CukApiUsageDaily).values(list(daily.values()))
+    table = CukApiUsageDaily.__table__
+    db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.api_key_id, table.c.model],
+            set_={
+                column: table.c[column] + upsert.excluded[column]
+                for column in _DAILY_SUM_COLUMNS
+            },
+        )
+    )
+    return len(rows)
+
+
+def _dialect_insert(db: DBSession):
+    # ON CONFLICT is dialect specific; SQLite is only used by the local test suite.
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return pg_insert
+
 
-    log = CukApiUsageLog(
+def log_usage(
+    db: Optional[DBSession],
+    api_key_id: int,
+    endpoint: str,
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    status_code: int,
+    latency_ms: int,
+    ip: Optional[str],
+    user_agent: Optional[str],
+    created_at: Optional[datetime] = None,
+) -> Tuple[int, float]:
+    """
+    Record one API call.
+    - write-behind (default): enqueue to the usage meter, the DB write happens in batches
+    - otherwise write synchronously with ``db`` (or a short-lived session when None)
+    """
+    event = build_usage_event(
         api_key_id=api_key_id,
-        request_id=request_id,
         endpoint=endpoint,
         model=model,
         prompt_tokens=prompt_tokens,
         completion_tokens=completion_tokens,
-        total_tokens=total_tokens,
         status_code=status_code,
         latency_ms=latency_ms,
-        cost=cost,
         ip=ip,
         user_agent=user_agent,
-        created_at=timestamp,
-    )
-    db.add(log)
-
-    day_value: date = timestamp.date()
-    daily = (
-        db.query(CukApiUsageDaily)
-        .filter(
-            CukApiUsageDaily.day == day_value,
-            CukApiUsageDaily.api_key_id == api_key_id,
-            CukApiUsageDaily.model == model,
-        )
-        .first()
+        created_at=created_at,
     )
-    if daily:
-        daily.requests += 1
-        if status_code >= 400:
-            daily.errors += 1
-        daily.prompt_tokens += prompt_tokens
-        daily.completion_tokens += completion_tokens
-        daily.total_tokens += total_tokens
-        daily.cost = float(daily.cost) + cost
-    else:
-        daily = CukApiUsageDaily(
-            day=day_value,
-            api_key_id=api_key_id,
-            model=model,
-            requests=1,
-            errors=1 if status_code >= 400 else 0,
-            prompt_tokens=prompt_tokens,
-            completion_tokens=completion_tokens,
-            total_tokens=total_tokens,
-            cost=cost,
-        )
-        db.add(daily)
+    if settings.API_USAGE_WRITE_BEHIND:
+        from app.services.usage_meter import usage_meter
 
-    db.commit()
-    return total_tokens, cost
+        usage_meter.enqueue(event)
+    else:
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            write_usage_events(db, [event])
+            db.commit()
+        finally:
+            if own_session:
+                db.close()
+    return event["total_tokens"], event["cost"]
@@ -7,6 +7,7 @@ from app.models import User
 from app.models.user import SocialProviderEnum
 from app.core.security import verify_password, get_password_hash
 from app.schemas.user import SignupRequest, LoginRequest
+from app.services import session_cache_service
 from app.core.exceptions import (
     ConflictException,
     UnauthorizedException,
@@ -107,6 +108,7 @@ class AuthService:
         user.nickname = nickname
         db.commit()
         db.refresh(user)
+        session_cache_service.invalidate_user(user_id)
         return user
 
     @staticmethod
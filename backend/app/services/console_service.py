@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session as DBSession
 
 from app.core.config import settings
 from app.models.console import ApiAccessToken
+from app.services import credential_cache_service
 from app.utils.token_utils import generate_token
 
 
@@ -32,6 +33,7 @@ class ConsoleTokenService:
         db.add(record)
         db.commit()
         db.refresh(record)
+        credential_cache_service.invalidate_console_token(raw_access_token)
         return record, raw_access_token, raw_api_key
 
     @staticmethod
@@ -0,0 +1,317 @@
+"""
+API 키 / 콘솔 토큰 / 관리자 토큰 조회 캐시
+- ApiMetricsMiddleware, public_ai, get_console_token, get_admin_token이 요청마다 하던 DB 조회를 대체
+- 프로세스 LRU → Redis → Postgres 순으로 조회, 키는 원문 대신 SHA-256 해시로만 보관
+- 존재하지 않는 키도 짧게 캐싱 (잘못된 키 반복 요청이 DB까지 가지 않도록)
+- 발급/폐기/토큰 갱신 시 Redis 키 삭제 + pub/sub으로 다른 워커 LRU 무효화
+- 콘솔 토큰 마지막 사용 시각은 메모리에 모았다가 주기적으로 한 번의 UPDATE로 기록
+"""
+import hmac
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session as DBSession
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.redis import get_redis
+from app.models.admin import AdminToken
+from app.models.api_usage import CukApiKey
+from app.models.console import ApiAccessToken
+from app.services.metrics_service import CREDENTIAL_CACHE_LOOKUPS, CREDENTIAL_LAST_USED_UPDATES
+from app.utils import cache_utils
+from app.utils.cache_utils import to_epoch
+from app.utils.token_utils import hash_token
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Redis 키 설정
+CACHE_PREFIX = "credential_cache"
+ADMIN_KEY = f"{CACHE_PREFIX}:admin"
+
+# 로컬 LRU에서 "DB에 없음"을 나타내는 값 (None은 캐시 미스)
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CachedApiKey:
+    """public API 인증/한도 판단에 필요한 API 키 정보"""
+    id: int
+    console_token_id: int
+    status: str
+    revoked: bool
+    expires_at: Optional[float]
+    rpm_limit: int
+    tpm_limit: int
+    rpd_limit: int
+
+    def is_active(self) -> bool:
+        if self.status != "active" or self.revoked:
+            return False
+        return self.expires_at is None or self.expires_at > time.time()
+
+    @classmethod
+    def from_record(cls, record: CukApiKey) -> "CachedApiKey":
+        return cls(
+            id=record.id,
+            console_token_id=record.console_token_id,
+            status=record.status,
+            revoked=record.revoked_at is not None,
+            expires_at=to_epoch(record.expires_at),
+            rpm_limit=record.rpm_limit,
+            tpm_limit=record.tpm_limit,
+            rpd_limit=record.rpd_limit,
+        )
+
+
+@dataclass(frozen=True)
+class CachedConsoleToken:
+    """콘솔 라우트에서 쓰는 콘솔 토큰 정보 (API 키는 미리보기만)"""
+    id: int
+    token_name: Optional[str]
+    key_preview: str
+    created_at: Optional[str]  # ISO 8601
+    expires_at: Optional[float]
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= time.time()
+
+    @classmethod
+    def from_record(cls, record: ApiAccessToken) -> "CachedConsoleToken":
+        return cls(
+            id=record.id,
+            token_name=record.token_name,
+            key_preview=f"{record.api_key[:6]}...{record.api_key[-4:]}",
+            created_at=record.created_at.isoformat() if record.created_at else None,
+            expires_at=to_epoch(record.expires_at),
+        )
+
+
+@dataclass(frozen=True)
+class CachedAdminToken:
+    """관리자 토큰 (해시만 보관)"""
+    id: int
+    admin_id: str
+    token_hash: str
+    expires_at: float
+
+    def verify(self, raw_token: str) -> bool:
+        if self.expires_at <= time.time():
+            return False
+        return hmac.compare_digest(hash_token(raw_token), self.token_hash)
+
+    @classmethod
+    def from_record(cls, record: AdminToken) -> "CachedAdminToken":
+        stored = record.admin_token or ""
+        # 예전 평문 저장 토큰도 해시로 변환해 보관
+        token_hash = stored if len(stored) == 64 else hash_token(stored)
+        return cls(
+            id=record.id,
+            admin_id=record.admin_id,
+            token_hash=token_hash,
+            expires_at=to_epoch(record.expires_at),
+        )
+
+
+_local = TTLCache(settings.CREDENTIAL_CACHE_LOCAL_MAXSIZE, settings.CREDENTIAL_CACHE_LOCAL_TTL_SECONDS)
+
+
+def _api_key_key(raw_api_key: str) -> str:
+    return f"{CACHE_PREFIX}:api_key:{hash_token(raw_api_key)}"
+
+
+def _console_key(raw_access_token: str) -> str:
+    return f"{CACHE_PREFIX}:console:{hash_token(raw_access_token)}"
+
+
+def _legacy_api_key_key(raw_api_key: str) -> str:
+    return f"{CACHE_PREFIX}:legacy_api_key:{hash_token(raw_api_key)}"
+
+
+def _cached(kind: str, key: str, cls, load: Callable[[DBSession], object], db: Optional[DBSession]):
+    """LRU → Redis → DB(load) 순 조회. Returns: cls 인스턴스, DB에도 없으면 None"""
+    value = _local.get(key)
+    if value is not None:
+        CREDENTIAL_CACHE_LOOKUPS.labels(kind=kind, tier="local").inc()
+        return None if value is _MISSING else value
+
+    if settings.CREDENTIAL_CACHE_ENABLED:
+        try:
+            raw = get_redis().get(key)
+        except Exception as e:
+            logger.warning(f"Credential cache get error: {e}")
+            raw = None
+        if raw is not None:
+            data = json.loads(raw)
+            value = cls(**data) if data is not None else None
+            _local.set(key, _MISSING if value is None else value)
+            CREDENTIAL_CACHE_LOOKUPS.labels(kind=kind, tier="redis").inc()
+            return value
+
+    CREDENTIAL_CACHE_LOOKUPS.labels(kind=kind, tier="db").inc()
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    try:
+        record = load(db)
+    finally:
+        if own_session:
+            db.close()
+    value = cls.from_record(record) if record is not None else None
+
+    if settings.CREDENTIAL_CACHE_ENABLED:
+        ttl = settings.CREDENTIAL_CACHE_TTL_SECONDS if value is not None else settings.CREDENTIAL_CACHE_NEGATIVE_TTL_SECONDS
+        try:
+            payload = asdict(value) if value is not None else None
+            get_redis().set(key, json.dumps(payload, ensure_ascii=False), ex=ttl)
+        except Exception as e:
+            logger.warning(f"Credential cache set error: {e}")
+        _local.set(key, _MISSING if value is None else value)
+    return value
+
+
+def get_api_key(raw_api_key: str, db: Optional[DBSession] = None) -> Optional[CachedApiKey]:
+    """API 키 조회 (활성 여부는 호출측에서 is_active로 판단)"""
+    return _cached(
+        "api_key",
+        _api_key_key(raw_api_key),
+        CachedApiKey,
+        lambda session: session.query(CukApiKey).filter(CukApiKey.api_key == raw_api_key).first(),
+        db,
+    )
+
+
+def get_console_token(raw_access_token: str, db: Optional[DBSession] = None) -> Optional[CachedConsoleToken]:
+    return _cached(
+        "console",
+        _console_key(raw_access_token),
+        CachedConsoleToken,
+        lambda session: session.query(ApiAccessToken).filter(
+            ApiAccessToken.access_token == raw_access_token
+        ).first(),
+        db,
+    )
+
+
+def get_console_token_by_api_key(raw_api_key: str, db: Optional[DBSession] = None) -> Optional[CachedConsoleToken]:
+    """api_access_tokens.api_key로 콘솔 토큰 조회 (cuk_api_keys에 없는 이전 방식 키)"""
+    return _cached(
+        "legacy_api_key",
+        _legacy_api_key_key(raw_api_key),
+        CachedConsoleToken,
+        lambda session: session.query(ApiAccessToken).filter(ApiAccessToken.api_key == raw_api_key).first(),
+        db,
+    )
+
+
+def get_admin_token(db: Optional[DBSession] = None) -> Optional[CachedAdminToken]:
+    return _cached(
+        "admin",
+        ADMIN_KEY,
+        CachedAdminToken,
+        lambda session: session.query(AdminToken).first(),
+        db,
+    )
+
+
+# ----------------------------------------------------------------------
+# 무효화
+# ----------------------------------------------------------------------
+def _invalidate(key: str):
+    _local.delete(key)
+    if not settings.CREDENTIAL_CACHE_ENABLED:
+        return
+    try:
+        redis = get_redis()
+        redis.delete(key)
+        redis.publish(settings.CREDENTIAL_CACHE_CHANNEL, key)
+    except Exception as e:
+        logger.warning(f"Credential cache invalidate error: {e}")
+
+
+def invalidate_api_key(raw_api_key: str):
+    """API 키 발급/폐기 후 호출"""
+    _invalidate(_api_key_key(raw_api_key))
+
+
+def invalidate_console_token(raw_access_token: str):
+    """콘솔 토큰 발급/삭제/API 키 교체 후 호출"""
+    _invalidate(_console_key(raw_access_token))
+
+
+def invalidate_console_api_key(raw_api_key: str):
+    """api_access_tokens.api_key 교체/콘솔 토큰 삭제 후 호출"""
+    _invalidate(_legacy_api_key_key(raw_api_key))
+
+
+def invalidate_admin_token():
+    """관리자 토큰 갱신 후 호출"""
+    _invalidate(ADMIN_KEY)
+
+
+def listen_for_invalidations(channel: str, stop_event=None, reconnect_delay: float = 5.0):
+    """다른 워커의 무효화 메시지로 로컬 LRU 정리 (백그라운드 스레드에서 실행)"""
+    cache_utils.listen_for_invalidations(
+        lambda: get_redis(),
+        channel,
+        _local,
+        "Credential cache",
+        stop_event=stop_event,
+        reconnect_delay=reconnect_delay,
+    )
+
+
+# ----------------------------------------------------------------------
+# 콘솔 토큰 마지막 사용 시각 (요청마다 commit 대신 주기적 일괄 UPDATE)
+# ----------------------------------------------------------------------
+_used_console_tokens: set = set()
+_used_lock = threading.Lock()
+
+
+def mark_console_token_used(token_id: int):
+    with _used_lock:
+        _used_console_tokens.add(token_id)
+
+
+def flush_last_used() -> int:
+    """모아둔 콘솔 토큰 id의 updated_at을 한 번에 갱신. Returns: 갱신 행 수"""
+    with _used_lock:
+        token_ids = list(_used_console_tokens)
+        _used_console_tokens.clear()
+    if not token_ids:
+        return 0
+
+    db = SessionLocal()
+    try:
+        updated = (
+            db.query(ApiAccessToken)
+            .filter(ApiAccessToken.id.in_(token_ids))
+            .update({ApiAccessToken.updated_at: datetime.utcnow()}, synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        # 다음 주기에 다시 시도
+        with _used_lock:
+            _used_console_tokens.update(token_ids)
+        raise
+    finally:
+        db.close()
+    CREDENTIAL_LAST_USED_UPDATES.inc(updated)
+    return updated
+
+
+def run_last_used_flusher(interval: float, stop_event=None):
+    """flush_last_used 주기 실행 (백그라운드 스레드에서 실행)"""
+    while stop_event is None or not stop_event.is_set():
+        time.sleep(interval)
+        try:
+            flush_last_used()
+        except Exception as e:
+            logger.error(f"Console token last-used flush failed: {e}")
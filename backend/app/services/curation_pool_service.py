@@ -0,0 +1,169 @@
+"""
+티켓별 큐레이션 풀 서비스 (Redis)
+- ORDER BY RANDOM() 대신 티켓별 영화 id Set에서 SRANDMEMBER로 샘플링 (limit에 비례, 카탈로그 크기와 무관)
+- 성인 허용(all) / 비허용(general, 허용 등급만) 풀을 따로 보관
+- 제목/포스터는 Hash 하나에 보관하고 HMGET으로 샘플한 id만 조회
+- 키는 버전별로 만들고 curation:version 교체로 원자적 전환 (이전 버전 키는 TTL로 정리)
+- ticket_group_movies / movies 변경 NOTIFY → 버전 키 삭제 → 다음 요청이 재구성
+- 재구성 중이거나 Redis 장애 시 None을 반환해 Postgres 쿼리로 폴백
+"""
+import json
+import logging
+import select
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.services.metrics_service import CURATION_POOL_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Redis 키 설정
+CACHE_PREFIX = "curation"
+VERSION_KEY = f"{CACHE_PREFIX}:version"
+LOCK_KEY = f"{CACHE_PREFIX}:rebuild_lock"
+LOCK_TTL = 30
+
+# 19금 필터 (Postgres 쿼리와 동일한 허용 등급)
+ALLOWED_CERTIFICATIONS = frozenset({"ALL", "12", "15", "G", "PG", "PG-13"})
+
+_ROWS_QUERY = text("""
+    SELECT tgm.ticket_group_id, m.id, m.title_ko, m.poster_path, m.certification
+    FROM ticket_group_movies tgm
+    JOIN movies m ON m.id = tgm.movie_id
+""")
+
+
+def _pool_key(version: str, ticket_id: int, is_adult_allowed: bool) -> str:
+    """티켓 풀 키 생성"""
+    return f"{CACHE_PREFIX}:{version}:pool:{ticket_id}:{'all' if is_adult_allowed else 'general'}"
+
+
+def _movies_key(version: str) -> str:
+    """영화 메타데이터 Hash 키 (movie_id → [title, posterUrl])"""
+    return f"{CACHE_PREFIX}:{version}:movies"
+
+
+def rebuild_pools(db: Session) -> Optional[str]:
+    """
+    DB에서 티켓별 풀을 만들어 새 버전으로 교체
+    Returns: 새 버전, 다른 워커가 재구성 중이면 None
+    """
+    redis = get_redis()
+    if not redis.set(LOCK_KEY, "1", nx=True, ex=LOCK_TTL):
+        return None
+    try:
+        started = time.monotonic()
+        pools: Dict[str, List[int]] = {}
+        movies: Dict[int, str] = {}
+        version = uuid.uuid4().hex[:12]
+        for row in db.execute(_ROWS_QUERY):
+            pools.setdefault(_pool_key(version, row.ticket_group_id, True), []).append(row.id)
+            if row.certification and row.certification in ALLOWED_CERTIFICATIONS:
+                pools.setdefault(_pool_key(version, row.ticket_group_id, False), []).append(row.id)
+            movies[row.id] = json.dumps([row.title_ko, row.poster_path or ""], ensure_ascii=False)
+
+        # 버전 키보다 데이터 키가 오래 살아야 전환 직후 요청이 빈 키를 읽지 않음
+        data_ttl = settings.CURATION_POOL_TTL_SECONDS + LOCK_TTL
+        pipe = redis.pipeline(transaction=False)
+        for key, movie_ids in pools.items():
+            pipe.sadd(key, *movie_ids)
+            pipe.expire(key, data_ttl)
+        if movies:
+            pipe.hset(_movies_key(version), mapping=movies)
+            pipe.expire(_movies_key(version), data_ttl)
+        pipe.set(VERSION_KEY, version, ex=settings.CURATION_POOL_TTL_SECONDS)
+        pipe.execute()
+
+        logger.info(
+            f"Curation pools rebuilt: version={version}, {len(movies)} movies, "
+            f"{len(pools)} pools in {time.monotonic() - started:.2f}s"
+        )
+        return version
+    finally:
+        redis.delete(LOCK_KEY)
+
+
+def sample_movies(db: Session, ticket_id: int, limit: int, is_adult_allowed: bool) -> Optional[List[dict]]:
+    """
+    티켓 풀에서 중복 없이 limit개 무작위 추출
+    Returns: [{"movieId", "title", "posterUrl"}], 풀 없음/Redis 장애면 None (호출측 Postgres 폴백)
+    """
+    try:
+        redis = get_redis()
+        version = redis.get(VERSION_KEY)
+        if version is None:
+            version = rebuild_pools(db)
+            if version is None:
+                CURATION_POOL_LOOKUPS.labels(result="rebuilding").inc()
+                return None
+
+        # 양수 count의 SRANDMEMBER는 중복 없는 샘플 (Set 크기보다 크면 전체)
+        movie_ids = redis.srandmember(_pool_key(version, ticket_id, is_adult_allowed), limit) if limit > 0 else []
+        if not movie_ids:
+            CURATION_POOL_LOOKUPS.labels(result="hit").inc()
+            return []
+        metadata = redis.hmget(_movies_key(version), movie_ids)
+        if any(value is None for value in metadata):
+            # 버전 키만 남고 데이터 키가 만료된 경우 → 다음 요청에서 재구성
+            redis.delete(VERSION_KEY)
+            CURATION_POOL_LOOKUPS.labels(result="stale").inc()
+            return None
+    except Exception as e:
+        logger.error(f"Curation pool lookup error: {e}")
+        CURATION_POOL_LOOKUPS.labels(result="error").inc()
+        return None
+
+    CURATION_POOL_LOOKUPS.labels(result="hit").inc()
+    movies = []
+    for movie_id, value in zip(movie_ids, metadata):
+        title, poster_url = json.loads(value)
+        movies.append({"movieId": int(movie_id), "title": title, "posterUrl": poster_url})
+    return movies
+
+
+def invalidate_pools():
+    """현재 버전 폐기 → 다음 요청에서 재구성"""
+    try:
+        get_redis().delete(VERSION_KEY)
+        logger.info("Curation pools invalidated")
+    except Exception as e:
+        logger.error(f"Curation pool invalidate error: {e}")
+
+
+def listen_for_changes(engine, channel: str, stop_event=None, reconnect_delay: float = 5.0):
+    """
+    ticket_group_movies / movies 변경 NOTIFY를 받아 풀 무효화 (백그라운드 스레드에서 실행)
+    - database/05_create_notify_triggers.sql 트리거가 없으면 TTL 만료로만 갱신
+    """
+    while stop_event is None or not stop_event.is_set():
+        raw = None
+        try:
+            raw = engine.raw_connection()
+            connection = raw.driver_connection
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{channel}"')
+            logger.info(f"Curation pools listening on channel '{channel}'")
+            while stop_event is None or not stop_event.is_set():
+                readable, _, _ = select.select([connection], [], [], 5.0)
+                if readable:
+                    connection.poll()
+                    if connection.notifies:
+                        # 연속 변경은 한 번의 무효화로 합침
+                        connection.notifies.clear()
+                        invalidate_pools()
+        except Exception as e:
+            logger.warning(f"Curation pool LISTEN failed, retrying: {e}")
+            time.sleep(reconnect_delay)
+        finally:
+            if raw is not None:
+                try:
+                    raw.invalidate()
+                except Exception:
+                    pass
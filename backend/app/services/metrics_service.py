@@ -1,11 +1,10 @@
 """Prometheus 메트릭 수집 서비스"""
 import time
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
-from app.core.database import SessionLocal
-from app.services.console_service import ConsoleTokenService
 
 API_REQUESTS = Counter(
     "cukee_api_requests_total",
@@ -26,6 +25,108 @@ API_COST = Counter(
     ["token_id", "model"],
 )
 
+CURATION_POOL_LOOKUPS = Counter(
+    "cukee_curation_pool_lookups_total",
+    "큐레이션 풀 조회 수 (hit / rebuilding·stale·error는 Postgres 폴백)",
+    ["result"],
+)
+
+AI_UPSTREAM_REQUESTS = Counter(
+    "cukee_ai_upstream_requests_total",
+    "AI 서버 replica 호출 수 (outcome: 2xx/4xx/5xx/timeout/connect_error/transport_error)",
+    ["replica", "path", "outcome"],
+)
+
+AI_UPSTREAM_LATENCY = Histogram(
+    "cukee_ai_upstream_latency_ms",
+    "AI 서버 replica 응답 지연(ms, 스트리밍은 응답 헤더까지)",
+    ["replica", "path"],
+    buckets=(10, 25, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000),
+)
+
+AI_UPSTREAM_OUTSTANDING = Gauge(
+    "cukee_ai_upstream_outstanding",
+    "AI 서버 replica별 진행 중인 요청 수 (스트리밍 포함)",
+    ["replica"],
+)
+
+AI_UPSTREAM_HEALTHY = Gauge(
+    "cukee_ai_upstream_healthy",
+    "AI 서버 replica 헬스 프로브 결과 (1: ready)",
+    ["replica"],
+)
+
+AI_UPSTREAM_CIRCUIT_STATE = Gauge(
+    "cukee_ai_upstream_circuit_state",
+    "AI 서버 replica circuit breaker 상태 (0: closed, 1: half-open, 2: open)",
+    ["replica"],
+)
+
+AI_UPSTREAM_RETRIES = Counter(
+    "cukee_ai_upstream_retries_total",
+    "AI 서버 호출 재시도 수",
+    ["path", "reason"],
+)
+
+SESSION_CACHE_LOOKUPS = Counter(
+    "cukee_session_cache_lookups_total",
+    "세션/사용자 캐시 조회 (tier: local/redis/db)",
+    ["kind", "tier"],
+)
+
+SESSION_CACHE_DB_QUERIES_SAVED = Counter(
+    "cukee_session_cache_db_queries_saved_total",
+    "세션/사용자 캐시 적중으로 생략한 DB 쿼리 수",
+)
+
+SESSION_CACHE_INVALIDATIONS = Counter(
+    "cukee_session_cache_invalidations_total",
+    "세션/사용자 캐시 무효화 (source: local=이 워커, remote=pub/sub 수신)",
+    ["kind", "source"],
+)
+
+CREDENTIAL_CACHE_LOOKUPS = Counter(
+    "cukee_credential_cache_lookups_total",
+    "API 키/콘솔 토큰/관리자 토큰 캐시 조회 (tier: local/redis/db)",
+    ["kind", "tier"],
+)
+
+CREDENTIAL_LAST_USED_UPDATES = Counter(
+    "cukee_credential_last_used_updates_total",
+    "일괄 갱신한 콘솔 토큰 마지막 사용 시각 (행 수)",
+)
+
+RATE_LIMIT_DECISIONS = Counter(
+    "cukee_rate_limit_decisions_total",
+    "API 키 rate limit 판정 (limit: 거절 원인 rpm/tpm/rpd, 허용은 none)",
+    ["result", "limit", "backend"],
+)
+
+RATE_LIMIT_LATENCY = Histogram(
+    "cukee_rate_limit_latency_ms",
+    "API 키 rate limit 판정 지연(ms)",
+    ["backend"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 25),
+)
+
+API_USAGE_BACKLOG = Gauge(
+    "cukee_api_usage_backlog",
+    "DB에 아직 기록되지 않은 API 사용량 이벤트 수",
+    ["buffer"],
+)
+
+API_USAGE_FLUSHED = Counter(
+    "cukee_api_usage_flushed_total",
+    "API 사용량 이벤트 기록 결과 (written/duplicate/dropped/error)",
+    ["result"],
+)
+
+API_USAGE_FLUSH_LATENCY = Histogram(
+    "cukee_api_usage_flush_latency_ms",
+    "API 사용량 배치 기록 지연(ms)",
+    buckets=(5, 10, 25, 50, 100, 200, 500, 1000, 2000, 5000),
+)
+
 
 def _get_endpoint(request: Request) -> str:
     route = request.scope.get("route")
@@ -45,6 +146,18 @@ def _extract_api_key(request: Request) -> str | None:
     return None
 
 
+def _resolve_console_token_id(api_key: str) -> int | None:
+    """API 키의 콘솔 토큰 id (cuk_api_keys 우선, 없으면 api_access_tokens.api_key)"""
+    from app.services import credential_cache_service
+
+    key_record = credential_cache_service.get_api_key(api_key)
+    if key_record:
+        return key_record.console_token_id
+    # admin의 cuk_api_keys 실패 시 폴백으로 발급된 키는 api_access_tokens에만 있음
+    console_record = credential_cache_service.get_console_token_by_api_key(api_key)
+    return console_record.id if console_record else None
+
+
 class ApiMetricsMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         start = time.monotonic()
@@ -52,16 +165,17 @@ class ApiMetricsMiddleware(BaseHTTPMiddleware):
 
         api_key = _extract_api_key(request)
         if api_key:
-            db = SessionLocal()
-            try:
-                token_record = ConsoleTokenService.get_by_api_key(db, api_key)
-                if token_record:
-                    token_id = str(token_record.id)
-                    ConsoleTokenService.mark_used(db, token_record.id)
-                else:
-                    token_id = "invalid"
-            finally:
-                db.close()
+            # credential_cache_service가 이 모듈의 메트릭을 import하므로 지연 import
+            from app.services import credential_cache_service
+
+            # 캐시 미스 시 Redis/DB 조회가 이벤트 루프를 막지 않도록 스레드풀에서 실행
+            # 마지막 사용 시각은 주기적으로 일괄 기록
+            console_token_id = await run_in_threadpool(_resolve_console_token_id, api_key)
+            if console_token_id is not None:
+                token_id = str(console_token_id)
+                credential_cache_service.mark_console_token_used(console_token_id)
+            else:
+                token_id = "invalid"
 
         try:
             response = await call_next(request)
@@ -5,12 +5,12 @@ Persona Summary 캐싱 서비스
 - 백그라운드 생성: 캐시되지 않은 영화의 소개 생성
 """
 import logging
-import httpx
 from typing import Optional, List, Dict
 from sqlalchemy.orm import Session
 
 from app.core.redis import get_redis
 from app.models.exhibition import ExhibitionMovie
+from app.services.ai_upstream import ai_upstream
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +18,6 @@ logger = logging.getLogger(__name__)
 CACHE_PREFIX = "persona"
 CACHE_TTL = 1800  # 30분
 
-# AI 서버 설정
-AI_SERVER_URL = "http://10.0.19.117:5000"
-
 # 테마 매핑 (ai.py에서 가져옴)
 TICKET_TO_THEME = {
     1: "숏폼 러버 MZ 스타일",
@@ -187,28 +184,30 @@ async def generate_missing_summaries(
         theme = TICKET_TO_THEME.get(ticket_id, "편안하고 잔잔한 감성 추구")
         generated_count = 0
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for em in missing_movies:
-                try:
-                    response = await client.post(
-                        f"{AI_SERVER_URL}/api/v1/movie-detail",
-                        json={
-                            "movieId": em.movie_id,
-                            "theme": theme
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        em.persona_summary = data.get("detail", "")
-                        generated_count += 1
-                        logger.info(f"Generated summary for movie {em.movie_id}")
-                    else:
-                        logger.warning(f"AI server error for movie {em.movie_id}: {response.status_code}")
-                        
-                except Exception as e:
-                    logger.error(f"Failed to generate summary for movie {em.movie_id}: {e}")
-                    continue
+        for em in missing_movies:
+            try:
+                response = await ai_upstream.request(
+                    "POST",
+                    "/api/v1/movie-detail",
+                    json={
+                        "movieId": em.movie_id,
+                        "theme": theme
+                    },
+                    timeout=30.0,
+                    idempotent=True,
+                )
+
+                if response.status_code == 200:
+                    data = response.json()
+                    em.persona_summary = data.get("detail", "")
+                    generated_count += 1
+                    logger.info(f"Generated summary for movie {em.movie_id}")
+                else:
+                    logger.warning(f"AI server error for movie {em.movie_id}: {response.status_code}")
+
+            except Exception as e:
+                logger.error(f"Failed to generate summary for movie {em.movie_id}: {e}")
+                continue
         
         if generated_count > 0:
             db.commit()
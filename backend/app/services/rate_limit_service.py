@@ -0,0 +1,270 @@
+"""
+public API 키별 rate limit (CukApiKey.rpm_limit / tpm_limit / rpd_limit)
+- GCRA(Generic Cell Rate Algorithm): 한도마다 TAT(다음 허용 시각) 하나만 저장 → 슬라이딩 윈도우와 같은 평활 효과, 키당 값 1개
+- rpm/tpm/rpd 세 한도를 Lua 스크립트 하나로 원자적으로 판정 (EVALSHA 1회 왕복)
+  → 하나라도 초과하면 어떤 한도도 차감하지 않음
+- 시각은 Redis TIME 기준 → 워커 간 시계 차이 영향 없음
+- tpm은 업스트림 호출 전이므로 추정 토큰(프롬프트 + max_tokens)으로 선차감
+- Redis 장애 시 프로세스 로컬 GCRA로 판정하고 일정 시간 Redis 호출을 건너뜀 (요청 지연 방지)
+  (로컬 한도는 워커마다 따로 적용되므로 근사치)
+- limiter 전용 Redis 연결은 짧은 타임아웃 사용, async 라우트는 check_async로 스레드풀에서 호출
+  → Redis 지연/연결 타임아웃이 이벤트 루프를 멈추지 않음
+"""
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import redis
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.metrics_service import RATE_LIMIT_DECISIONS, RATE_LIMIT_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Redis 키 설정
+KEY_PREFIX = "ratelimit"
+
+# 한도 이름 → 기간(ms)
+PERIODS_MS = {
+    "rpm": 60_000,
+    "tpm": 60_000,
+    "rpd": 86_400_000,
+}
+
+# KEYS: 한도별 TAT 키
+# ARGV: 한도마다 (기간 ms, 한도, 비용) 3개씩
+# 반환: 한도마다 (허용 여부, 남은 양, 완전 회복까지 ms, 재시도까지 ms) 4개씩
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local states = {}
+local all_ok = 1
+for i = 1, #KEYS do
+  local period = tonumber(ARGV[3 * i - 2])
+  local limit = tonumber(ARGV[3 * i - 1])
+  local cost = tonumber(ARGV[3 * i])
+  local interval = period / limit
+  local tat = tonumber(redis.call('GET', KEYS[i]) or now)
+  if tat < now then tat = now end
+  local new_tat = tat + cost * interval
+  local ok = 1
+  local retry = 0
+  if new_tat - now > period then
+    ok = 0
+    all_ok = 0
+    retry = new_tat - now - period
+  end
+  states[i] = {tat, new_tat, ok, retry, period, interval}
+end
+local out = {}
+for i = 1, #KEYS do
+  local s = states[i]
+  local current = s[1]
+  if all_ok == 1 then
+    current = s[2]
+    redis.call('SET', KEYS[i], tostring(current), 'PX', math.ceil(current - now) + 1000)
+  end
+  local remaining = math.floor((s[5] - (current - now)) / s[6])
+  if remaining < 0 then remaining = 0 end
+  out[#out + 1] = s[3]
+  out[#out + 1] = remaining
+  out[#out + 1] = math.ceil(current - now)
+  out[#out + 1] = math.ceil(s[4])
+end
+return out
+"""
+
+
+@dataclass(frozen=True)
+class LimitState:
+    """한도 하나의 판정 결과"""
+    name: str
+    limit: int
+    allowed: bool
+    remaining: int
+    reset_ms: int  # 한도가 완전히 회복되기까지
+    retry_after_ms: int  # 거절 시 이 요청이 허용되기까지
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    backend: str  # redis / local / disabled
+    limits: Dict[str, LimitState]
+    requested_tokens: int = 0
+
+    @property
+    def exceeded(self) -> Optional[LimitState]:
+        """거절 원인 한도 (재시도까지 가장 오래 걸리는 것)"""
+        denied = [state for state in self.limits.values() if not state.allowed]
+        return max(denied, key=lambda state: state.retry_after_ms) if denied else None
+
+    @property
+    def retry_after_seconds(self) -> int:
+        exceeded = self.exceeded
+        return max(1, math.ceil(exceeded.retry_after_ms / 1000)) if exceeded else 0
+
+    def headers(self) -> Dict[str, str]:
+        """OpenAI 호환 x-ratelimit-* 헤더 (rpd는 -day 접미사)"""
+        headers = {}
+        for name, header in (("rpm", "requests"), ("tpm", "tokens"), ("rpd", "requests-day")):
+            state = self.limits.get(name)
+            if state is None:
+                continue
+            headers[f"x-ratelimit-limit-{header}"] = str(state.limit)
+            headers[f"x-ratelimit-remaining-{header}"] = str(state.remaining)
+            headers[f"x-ratelimit-reset-{header}"] = format_duration(state.reset_ms)
+        if not self.allowed:
+            headers["retry-after"] = str(self.retry_after_seconds)
+            headers["retry-after-ms"] = str(self.exceeded.retry_after_ms)
+        return headers
+
+
+def format_duration(ms: int) -> str:
+    """OpenAI reset 헤더 형식 (예: 20ms, 1s, 6m0s, 1h2m3s)"""
+    if ms < 1000:
+        return f"{max(ms, 0)}ms"
+    seconds = math.ceil(ms / 1000)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}h{minutes}m{seconds}s"
+    if minutes:
+        return f"{minutes}m{seconds}s"
+    return f"{seconds}s"
+
+
+class RateLimiter:
+    """Redis GCRA 판정 + Redis 장애 시 로컬 GCRA"""
+
+    def __init__(
+        self,
+        redis_retry_seconds: float = 5.0,
+        redis_timeout: float = 0.05,
+        redis_client: Optional[redis.Redis] = None,
+    ):
+        self.redis_retry_seconds = redis_retry_seconds
+        self.redis_timeout = redis_timeout
+        self._redis = redis_client
+        self._script = None
+        self._redis_down_until = 0.0
+        self._local_tats: Dict[str, float] = {}
+        self._local_lock = threading.Lock()
+
+    async def check_async(self, api_key_id: int, rpm: int, tpm: int, rpd: int, tokens: int) -> RateLimitResult:
+        """check를 스레드풀에서 실행 (async 라우트용)"""
+        return await run_in_threadpool(self.check, api_key_id, rpm, tpm, rpd, tokens)
+
+    def check(self, api_key_id: int, rpm: int, tpm: int, rpd: int, tokens: int) -> RateLimitResult:
+        """요청 1건 + 추정 토큰 tokens를 차감할 수 있는지 판정 (허용 시에만 차감)"""
+        limits = [
+            (name, limit, cost)
+            for name, limit, cost in (("rpm", rpm, 1), ("tpm", tpm, tokens), ("rpd", rpd, 1))
+            if limit and limit > 0
+        ]
+        if not settings.RATE_LIMIT_ENABLED or not limits:
+            return RateLimitResult(allowed=True, backend="disabled", limits={}, requested_tokens=tokens)
+
+        started = time.perf_counter()
+        keys = [f"{KEY_PREFIX}:{api_key_id}:{name}" for name, _, _ in limits]
+        backend = "local"
+        states = None
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                states = self._check_redis(keys, limits)
+                backend = "redis"
+            except Exception as e:
+                logger.warning(f"Rate limit Redis check failed, using local limiter: {e}")
+                self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+        if states is None:
+            states = self._check_local(keys, limits)
+
+        result = RateLimitResult(
+            allowed=all(state.allowed for state in states),
+            backend=backend,
+            limits={state.name: state for state in states},
+            requested_tokens=tokens,
+        )
+        RATE_LIMIT_LATENCY.labels(backend=backend).observe((time.perf_counter() - started) * 1000)
+        exceeded = result.exceeded
+        RATE_LIMIT_DECISIONS.labels(
+            result="allowed" if result.allowed else "limited",
+            limit=exceeded.name if exceeded else "none",
+            backend=backend,
+        ).inc()
+        return result
+
+    def _check_redis(self, keys: List[str], limits: List[Tuple[str, int, int]]) -> List[LimitState]:
+        if self._script is None:
+            if self._redis is None:
+                self._redis = redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    socket_timeout=self.redis_timeout,
+                    socket_connect_timeout=self.redis_timeout,
+                )
+            # register_script: EVALSHA 우선, NOSCRIPT면 자동으로 EVAL
+            self._script = self._redis.register_script(_GCRA_SCRIPT)
+        args = []
+        for name, limit, cost in limits:
+            args.extend([PERIODS_MS[name], limit, cost])
+        raw = self._script(keys=keys, args=args)
+        return [
+            LimitState(
+                name=name,
+                limit=limit,
+                allowed=bool(int(raw[4 * i])),
+                remaining=int(raw[4 * i + 1]),
+                reset_ms=int(raw[4 * i + 2]),
+                retry_after_ms=int(raw[4 * i + 3]),
+            )
+            for i, (name, limit, _) in enumerate(limits)
+        ]
+
+    def _check_local(self, keys: List[str], limits: List[Tuple[str, int, int]]) -> List[LimitState]:
+        """Lua 스크립트와 같은 GCRA를 프로세스 메모리에서 수행"""
+        now = time.time() * 1000
+        with self._local_lock:
+            pending = []
+            for key, (name, limit, cost) in zip(keys, limits):
+                period = PERIODS_MS[name]
+                interval = period / limit
+                tat = max(self._local_tats.get(key, now), now)
+                new_tat = tat + cost * interval
+                retry = max(new_tat - now - period, 0)
+                pending.append((key, name, limit, period, interval, tat, new_tat, retry))
+            all_ok = all(retry <= 0 for *_, retry in pending)
+
+            states = []
+            for key, name, limit, period, interval, tat, new_tat, retry in pending:
+                current = new_tat if all_ok else tat
+                if all_ok:
+                    self._local_tats[key] = new_tat
+                states.append(LimitState(
+                    name=name,
+                    limit=limit,
+                    allowed=retry <= 0,
+                    remaining=max(math.floor((period - (current - now)) / interval), 0),
+                    reset_ms=math.ceil(current - now),
+                    retry_after_ms=math.ceil(retry),
+                ))
+            self._prune_local(now)
+        return states
+
+    def _prune_local(self, now: float):
+        # TAT가 지난 키는 기본값(now)과 같으므로 삭제해도 판정이 달라지지 않음
+        if len(self._local_tats) < 10000:
+            return
+        for key in [key for key, tat in self._local_tats.items() if tat <= now]:
+            del self._local_tats[key]
+
+
+# 전역 rate limiter
+rate_limiter = RateLimiter(
+    redis_retry_seconds=settings.RATE_LIMIT_REDIS_RETRY_SECONDS,
+    redis_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+)
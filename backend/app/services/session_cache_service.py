@@ -0,0 +1,196 @@
+"""
+세션 → 사용자 조회 캐시 (get_current_user / get_current_user_optional)
+- 요청마다 sessions + users 두 번 조회하던 것을 프로세스 LRU → Redis → Postgres 순으로 조회
+- 세션 레코드(user_id, 만료 시각, revoked)와 사용자 레코드(id, email, nickname, created_at)를 따로 캐싱
+  → 닉네임 변경/탈퇴는 사용자 키만, 로그아웃/갱신은 세션 키만 무효화
+- 로그아웃은 revoked 레코드를 남겨 동시에 진행 중인 DB 조회가 캐시를 되살리지 못하게 함
+- 무효화는 Redis pub/sub으로 다른 워커의 LRU에도 전파 (유실 대비 LRU는 짧은 TTL)
+- Redis 장애 시 로컬 LRU + Postgres로 동작
+"""
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.services.metrics_service import (
+    SESSION_CACHE_DB_QUERIES_SAVED,
+    SESSION_CACHE_INVALIDATIONS,
+    SESSION_CACHE_LOOKUPS,
+)
+from app.utils import cache_utils
+from app.utils.cache_utils import to_epoch
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Redis 키 설정
+CACHE_PREFIX = "session_cache"
+
+
+@dataclass(frozen=True)
+class CachedSession:
+    """세션 레코드 (만료/revoked 판단에 필요한 값만)"""
+    user_id: int
+    expires_at: float  # epoch seconds
+    revoked: bool = False
+
+    def is_valid(self) -> bool:
+        return not self.revoked and self.expires_at > time.time()
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """get_current_user가 반환하는 사용자 정보 (라우트에서 읽는 필드만)"""
+    id: int
+    email: str
+    nickname: str
+    created_at: Optional[datetime] = None
+
+
+_local = TTLCache(settings.SESSION_CACHE_LOCAL_MAXSIZE, settings.SESSION_CACHE_LOCAL_TTL_SECONDS)
+
+
+def _session_key(session_id: str) -> str:
+    return f"{CACHE_PREFIX}:session:{session_id}"
+
+
+def _user_key(user_id: int) -> str:
+    return f"{CACHE_PREFIX}:user:{user_id}"
+
+
+def _lookup(key: str, kind: str, decode):
+    """LRU → Redis 순 조회. Returns: 캐시 값 또는 None (DB 조회 필요)"""
+    value = _local.get(key)
+    if value is not None:
+        SESSION_CACHE_LOOKUPS.labels(kind=kind, tier="local").inc()
+        SESSION_CACHE_DB_QUERIES_SAVED.inc()
+        return value
+    try:
+        raw = get_redis().get(key)
+    except Exception as e:
+        logger.warning(f"Session cache get error: {e}")
+        raw = None
+    if raw is not None:
+        value = decode(json.loads(raw))
+        _local.set(key, value)
+        SESSION_CACHE_LOOKUPS.labels(kind=kind, tier="redis").inc()
+        SESSION_CACHE_DB_QUERIES_SAVED.inc()
+        return value
+    SESSION_CACHE_LOOKUPS.labels(kind=kind, tier="db").inc()
+    return None
+
+
+def _store(key: str, value, payload: dict, ttl: int, nx: bool = False):
+    try:
+        stored = get_redis().set(key, json.dumps(payload, ensure_ascii=False), ex=max(ttl, 1), nx=nx)
+    except Exception as e:
+        logger.warning(f"Session cache set error: {e}")
+        stored = True
+    if stored:
+        _local.set(key, value)
+
+
+def get_session(session_id: str) -> Optional[CachedSession]:
+    """캐시된 세션 레코드 (만료/revoked 레코드도 그대로 반환 - 판단은 is_valid)"""
+    if not settings.SESSION_CACHE_ENABLED:
+        return None
+    return _lookup(_session_key(session_id), "session", lambda data: CachedSession(**data))
+
+
+def cache_session(session_id: str, user_id: int, expires_at: datetime):
+    """DB에서 확인한 유효 세션 저장 (TTL은 세션 만료 시각을 넘지 않음)"""
+    if not settings.SESSION_CACHE_ENABLED:
+        return
+    record = CachedSession(user_id=user_id, expires_at=to_epoch(expires_at))
+    ttl = min(settings.SESSION_CACHE_TTL_SECONDS, int(record.expires_at - time.time()))
+    if ttl <= 0:
+        return
+    # 로그아웃 직후 남긴 revoked 레코드를 덮어쓰지 않도록 NX
+    _store(_session_key(session_id), record, asdict(record), ttl, nx=True)
+
+
+def get_user(user_id: int) -> Optional[CachedUser]:
+    if not settings.SESSION_CACHE_ENABLED:
+        return None
+
+    def decode(data: dict) -> CachedUser:
+        created_at = data.get("created_at")
+        return CachedUser(
+            id=data["id"],
+            email=data["email"],
+            nickname=data["nickname"],
+            created_at=datetime.fromisoformat(created_at) if created_at else None,
+        )
+
+    return _lookup(_user_key(user_id), "user", decode)
+
+
+def cache_user(user) -> CachedUser:
+    """ORM User → CachedUser 변환 후 저장"""
+    cached = CachedUser(id=user.id, email=user.email, nickname=user.nickname, created_at=user.created_at)
+    if settings.SESSION_CACHE_ENABLED:
+        payload = asdict(cached)
+        payload["created_at"] = cached.created_at.isoformat() if cached.created_at else None
+        _store(_user_key(user.id), cached, payload, settings.SESSION_CACHE_TTL_SECONDS)
+    return cached
+
+
+# ----------------------------------------------------------------------
+# 무효화
+# ----------------------------------------------------------------------
+def _publish(key: str):
+    try:
+        get_redis().publish(settings.SESSION_CACHE_CHANNEL, key)
+    except Exception as e:
+        logger.warning(f"Session cache publish error: {e}")
+
+
+def revoke_session(session_id: str):
+    """로그아웃/세션 교체 - revoked 레코드로 덮어써 모든 워커가 즉시 거부"""
+    key = _session_key(session_id)
+    _local.delete(key)
+    SESSION_CACHE_INVALIDATIONS.labels(kind="session", source="local").inc()
+    if not settings.SESSION_CACHE_ENABLED:
+        return
+    try:
+        record = CachedSession(user_id=0, expires_at=0.0, revoked=True)
+        get_redis().set(key, json.dumps(asdict(record)), ex=settings.SESSION_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Session cache revoke error: {e}")
+    _publish(key)
+
+
+def invalidate_user(user_id: int):
+    """닉네임 변경/탈퇴 - 사용자 레코드 삭제 (다음 요청이 DB에서 다시 읽음)"""
+    key = _user_key(user_id)
+    _local.delete(key)
+    SESSION_CACHE_INVALIDATIONS.labels(kind="user", source="local").inc()
+    if not settings.SESSION_CACHE_ENABLED:
+        return
+    try:
+        get_redis().delete(key)
+    except Exception as e:
+        logger.warning(f"Session cache delete error: {e}")
+    _publish(key)
+
+
+def _count_remote_invalidation(key: str):
+    kind = "user" if key.startswith(f"{CACHE_PREFIX}:user:") else "session"
+    SESSION_CACHE_INVALIDATIONS.labels(kind=kind, source="remote").inc()
+
+
+def listen_for_invalidations(channel: str, stop_event=None, reconnect_delay: float = 5.0):
+    """다른 워커의 무효화 메시지로 로컬 LRU 정리 (백그라운드 스레드에서 실행)"""
+    cache_utils.listen_for_invalidations(
+        lambda: get_redis(),
+        channel,
+        _local,
+        "Session cache",
+        on_invalidate=_count_remote_invalidation,
+        stop_event=stop_event,
+        reconnect_delay=reconnect_delay,
+    )
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from sqlalchemy.orm import Session as DBSession
 from app.models import Session
 from app.core.config import settings
+from app.services import session_cache_service
 import uuid
 
 
@@ -52,6 +53,7 @@ class SessionService:
         if db_session:
             db_session.is_revoked = True
             db.commit()
+            session_cache_service.revoke_session(session_id)
             return True
         return False
 
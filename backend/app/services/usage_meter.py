@@ -0,0 +1,303 @@
+"""
+API 사용량 write-behind 미터링
+- 요청 경로에서는 이벤트를 Redis Stream에 XADD만 하고 바로 반환 (DB 왕복 없음)
+- 워커마다 백그라운드 스레드가 consumer group으로 배치를 읽어 write_usage_events로 기록
+  (로그는 multi-row INSERT, 일별 집계는 INSERT ... ON CONFLICT DO UPDATE → 동시 요청 경합 없음)
+- DB 커밋 후에만 XACK/XDEL → 기록 전에 프로세스가 죽어도 pending 이벤트를 다른 워커가 XAUTOCLAIM으로 회수
+- 재전달된 이벤트는 request_id로 중복 제거
+- Redis 장애 시 프로세스 메모리 버퍼(상한 있음)에 쌓았다가 같은 스레드가 DB에 직접 기록
+- XADD는 짧은 타임아웃의 전용 연결 사용, 실패 후 일정 시간은 Redis를 건너뛰고 바로 메모리 버퍼
+  → async 라우트에서 호출돼도 Redis 지연이 이벤트 루프를 오래 멈추지 않음
+- 배치가 DB 연결 문제가 아닌 이유(제약 위반, 잘못된 값 등)로 실패하면 한 건씩 다시 기록해 문제 이벤트만 골라냄
+  → 같은 이벤트가 max_attempts번 실패하면 로그를 남기고 버림 (한 건 때문에 전체 기록이 멈추지 않도록)
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import redis
+from redis.exceptions import ResponseError
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.redis import get_redis
+from app.services.api_usage_service import write_usage_events
+from app.services.metrics_service import API_USAGE_BACKLOG, API_USAGE_FLUSHED, API_USAGE_FLUSH_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# 재시도하면 성공할 수 있는 오류 (DB 연결/풀/데드락) → 실패 횟수에 세지 않음
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError)
+
+
+def _is_transient(error: Exception) -> bool:
+    return isinstance(error, _TRANSIENT_ERRORS) or getattr(error, "connection_invalidated", False)
+
+
+def _event_key(event) -> str:
+    if isinstance(event, dict) and event.get("request_id"):
+        return event["request_id"]
+    return json.dumps(event, sort_keys=True, default=str)
+
+
+class UsageMeter:
+    """사용량 이벤트 버퍼 + 배치 기록 스레드"""
+
+    def __init__(
+        self,
+        stream: str,
+        group: str,
+        batch_size: int = 500,
+        flush_interval_ms: int = 1000,
+        claim_idle_seconds: int = 60,
+        local_buffer_max: int = 10000,
+        max_attempts: int = 5,
+        redis_timeout: float = 0.05,
+        redis_retry_seconds: float = 5.0,
+        redis_client: Optional[redis.Redis] = None,
+    ):
+        self.stream = stream
+        self.group = group
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.claim_idle_seconds = claim_idle_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.redis_timeout = redis_timeout
+        self.redis_retry_seconds = redis_retry_seconds
+
+        # enqueue 전용 연결 (기록 스레드는 블로킹 XREADGROUP이 있으므로 공용 연결 사용)
+        self._redis = redis_client
+        self._redis_down_until = 0.0
+
+        self._local: deque = deque(maxlen=local_buffer_max)
+        self._local_lock = threading.Lock()
+        # 이벤트 키(request_id) → 연결 문제가 아닌 기록 실패 횟수
+        self._attempts: Dict[str, int] = {}
+        self._group_ready = False
+        self._last_claim = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # 요청 경로
+    # ------------------------------------------------------------------
+    def enqueue(self, event: dict):
+        """이벤트 적재 (Redis 실패 시 메모리 버퍼, 가득 차면 가장 오래된 이벤트부터 버림)"""
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                self._enqueue_redis().xadd(self.stream, {"event": json.dumps(event, ensure_ascii=False)})
+                return
+            except Exception as e:
+                logger.warning(f"Usage stream XADD failed, buffering locally: {e}")
+                self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+        with self._local_lock:
+            if len(self._local) == self._local.maxlen:
+                API_USAGE_FLUSHED.labels(result="dropped").inc()
+            self._local.append(event)
+            API_USAGE_BACKLOG.labels(buffer="local").set(len(self._local))
+
+    def _enqueue_redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+                socket_timeout=self.redis_timeout,
+                socket_connect_timeout=self.redis_timeout,
+            )
+        return self._redis
+
+    # ------------------------------------------------------------------
+    # 백그라운드 기록 스레드
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="usage-meter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """스레드 중지 후 메모리 버퍼를 마지막으로 기록 (Stream의 미기록분은 다른 워커/재시작 후 회수)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        try:
+            while self._flush_local():
+                pass
+        except Exception as e:
+            logger.error(f"Usage meter final flush failed, {len(self._local)} events lost: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            # 메모리 버퍼는 Redis 없이도 기록되도록 먼저 처리 (실패해도 Stream 소비는 계속)
+            try:
+                self._flush_local()
+            except Exception as e:
+                logger.error(f"Usage meter local flush failed: {e}")
+                API_USAGE_FLUSHED.labels(result="error").inc()
+            try:
+                self._ensure_group()
+                self._reclaim()
+                self._write_entries(self._read())
+                self._update_backlog()
+            except Exception as e:
+                logger.error(f"Usage meter flush failed: {e}")
+                API_USAGE_FLUSHED.labels(result="error").inc()
+                self._group_ready = False
+                self._stop.wait(self.flush_interval_ms / 1000)
+
+    def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            get_redis().xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def _read(self) -> list:
+        response = get_redis().xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=self.batch_size, block=self.flush_interval_ms,
+        )
+        return response[0][1] if response else []
+
+    def _reclaim(self):
+        """idle 시간이 지난 pending 이벤트(죽은 워커/기록 실패분)를 가져와 다시 기록"""
+        now = time.monotonic()
+        if now - self._last_claim < self.claim_idle_seconds / 2:
+            return
+        self._last_claim = now
+        _, entries, *_ = get_redis().xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_seconds * 1000, start_id="0-0", count=self.batch_size,
+        )
+        entries = [(entry_id, fields) for entry_id, fields in entries if fields]
+        if entries:
+            logger.info(f"Reclaimed {len(entries)} pending usage events")
+            self._write_entries(entries)
+
+    def _write_entries(self, entries: list):
+        if not entries:
+            return
+        done_ids = []
+        parsed = []
+        for entry_id, fields in entries:
+            try:
+                parsed.append((entry_id, json.loads(fields["event"])))
+            except (KeyError, TypeError, ValueError):
+                logger.error(f"Dropping malformed usage event {entry_id}: {fields!r}")
+                API_USAGE_FLUSHED.labels(result="dropped").inc()
+                done_ids.append(entry_id)
+
+        retry = {id(event) for event in self._write_events([event for _, event in parsed])}
+        # DB 커밋(또는 버림) 이후에만 확인 → 재시도할 이벤트와 여기 전에 죽은 경우는 pending으로 남아 회수됨
+        done_ids.extend(entry_id for entry_id, event in parsed if id(event) not in retry)
+        if not done_ids:
+            return
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.xack(self.stream, self.group, *done_ids)
+        pipe.xdel(self.stream, *done_ids)
+        pipe.execute()
+
+    def _flush_local(self) -> bool:
+        """메모리 버퍼에서 한 배치 기록. Returns: 기록할 이벤트가 있었는지"""
+        with self._local_lock:
+            events = [self._local.popleft() for _ in range(min(self.batch_size, len(self._local)))]
+        if not events:
+            return False
+        try:
+            retry = self._write_events(events)
+        except Exception:
+            retry = events
+            raise
+        finally:
+            if retry:
+                with self._local_lock:
+                    self._local.extendleft(reversed(retry))
+            API_USAGE_BACKLOG.labels(buffer="local").set(len(self._local))
+        return True
+
+    def _write_events(self, events: List[dict]) -> List[dict]:
+        """
+        배치 기록, 연결 문제가 아닌 이유로 실패하면 한 건씩 기록
+        Returns: 다음에 다시 시도할 이벤트 (max_attempts번 실패한 이벤트는 버림)
+        Raises: 연결/풀 오류 (전체를 나중에 다시 시도)
+        """
+        if not events:
+            return []
+        try:
+            self._write(events)
+            return []
+        except Exception as e:
+            if _is_transient(e):
+                raise
+            logger.warning(f"Usage batch of {len(events)} events failed, writing one by one: {e}")
+
+        retry = []
+        for event in events:
+            key = _event_key(event)
+            try:
+                self._write([event])
+                self._attempts.pop(key, None)
+            except Exception as e:
+                if _is_transient(e):
+                    raise
+                attempts = self._attempts.pop(key, 0) + 1
+                if attempts >= self.max_attempts:
+                    logger.error(
+                        f"Dropping usage event after {attempts} failed attempts: "
+                        f"{json.dumps(event, ensure_ascii=False, default=str)} ({e})"
+                    )
+                    API_USAGE_FLUSHED.labels(result="dropped").inc()
+                else:
+                    self._attempts[key] = attempts
+                    retry.append(event)
+        return retry
+
+    def _write(self, events: List[dict]):
+        if not events:
+            return
+        started = time.monotonic()
+        db = SessionLocal()
+        try:
+            written = write_usage_events(db, events)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        API_USAGE_FLUSH_LATENCY.observe((time.monotonic() - started) * 1000)
+        API_USAGE_FLUSHED.labels(result="written").inc(written)
+        if written < len(events):
+            API_USAGE_FLUSHED.labels(result="duplicate").inc(len(events) - written)
+
+    def _update_backlog(self):
+        # 기록 후 XDEL하므로 Stream 길이 = 아직 DB에 없는 이벤트 (미배달 + pending)
+        API_USAGE_BACKLOG.labels(buffer="stream").set(get_redis().xlen(self.stream))
+        API_USAGE_BACKLOG.labels(buffer="local").set(len(self._local))
+
+
+# 전역 사용량 미터 (서버 시작 시 start())
+usage_meter = UsageMeter(
+    stream=settings.API_USAGE_STREAM,
+    group=settings.API_USAGE_CONSUMER_GROUP,
+    batch_size=settings.API_USAGE_BATCH_SIZE,
+    flush_interval_ms=settings.API_USAGE_FLUSH_INTERVAL_MS,
+    claim_idle_seconds=settings.API_USAGE_CLAIM_IDLE_SECONDS,
+    local_buffer_max=settings.API_USAGE_LOCAL_BUFFER_MAX,
+    max_attempts=settings.API_USAGE_MAX_ATTEMPTS,
+    redis_timeout=settings.API_USAGE_REDIS_TIMEOUT_SECONDS,
+    redis_retry_seconds=settings.API_USAGE_REDIS_RETRY_SECONDS,
+)
@@ -0,0 +1,61 @@
+"""
+Redis 앞단 로컬 캐시 공통 유틸 (세션 캐시, API 키/토큰 캐시)
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import redis
+
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def to_epoch(value: Optional[datetime]) -> Optional[float]:
+    """DB datetime → epoch seconds (utcnow()로 저장된 naive 값은 UTC로 해석)"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def listen_for_invalidations(
+    get_redis: Callable[[], redis.Redis],
+    channel: str,
+    local: TTLCache,
+    label: str,
+    on_invalidate: Optional[Callable[[str], None]] = None,
+    stop_event=None,
+    reconnect_delay: float = 5.0,
+):
+    """
+    다른 워커가 publish한 캐시 키를 로컬 LRU에서 삭제 (백그라운드 스레드에서 실행)
+    - 연결이 끊기면 reconnect_delay 후 재구독
+    """
+    while stop_event is None or not stop_event.is_set():
+        pubsub = None
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(channel)
+            # 구독 전 놓친 메시지가 있을 수 있으므로 재연결 시 LRU 비움
+            local.clear()
+            logger.info(f"{label} listening on channel '{channel}'")
+            while stop_event is None or not stop_event.is_set():
+                message = pubsub.get_message(timeout=5.0)
+                if message and message.get("type") == "message":
+                    key = message["data"]
+                    local.delete(key)
+                    if on_invalidate is not None:
+                        on_invalidate(key)
+        except Exception as e:
+            logger.warning(f"{label} subscribe failed, retrying: {e}")
+            time.sleep(reconnect_delay)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
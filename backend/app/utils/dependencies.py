@@ -2,18 +2,37 @@
 FastAPI 의존성 (Dependency Injection)
 """
 from typing import Optional
-from datetime import datetime
 from fastapi import Cookie, Depends, Header, Request
 from sqlalchemy.orm import Session as DBSession
 from app.core.database import get_db
 from app.core.exceptions import UnauthorizedException
 from app.services.session_service import SessionService
-from app.services.admin_service import AdminTokenService
-from app.services.console_service import ConsoleTokenService
-from app.models.admin import AdminToken
-from app.models.console import ApiAccessToken
+from app.services import credential_cache_service
+from app.services.credential_cache_service import CachedAdminToken, CachedConsoleToken
 from app.services.auth_service import AuthService
-from app.models import User
+from app.services import session_cache_service
+from app.services.session_cache_service import CachedUser
+
+
+def _get_session_user_id(db: DBSession, session_id: str) -> Optional[int]:
+    """세션 검증 (캐시 → DB). Returns: user_id, 만료/무효 세션이면 None"""
+    cached = session_cache_service.get_session(session_id)
+    if cached is not None:
+        return cached.user_id if cached.is_valid() else None
+
+    db_session = SessionService.get_session(db, session_id)
+    if not db_session:
+        return None
+    session_cache_service.cache_session(session_id, db_session.user_id, db_session.expires_at)
+    return db_session.user_id
+
+
+def _get_user(db: DBSession, user_id: int) -> CachedUser:
+    """사용자 조회 (캐시 → DB, 탈퇴 사용자는 NotFoundException)"""
+    cached = session_cache_service.get_user(user_id)
+    if cached is not None:
+        return cached
+    return session_cache_service.cache_user(AuthService.get_user_by_id(db, user_id))
 
 
 def get_current_user(
@@ -21,11 +40,12 @@ def get_current_user(
     session: Optional[str] = Cookie(None),
     authorization: Optional[str] = Header(None),
     db: DBSession = Depends(get_db)
-) -> User:
+) -> CachedUser:
     """
     현재 인증된 사용자 조회 (HttpOnly Cookie 또는 Authorization 헤더)
     - 쿠키: 웹 브라우저에서 자동 전송
     - Authorization: 익스텐션에서 세션 ID를 헤더로 전송 (Bearer <session_id>)
+    - 세션/사용자는 session_cache_service 캐시 우선 (ORM 객체가 필요하면 AuthService로 다시 조회)
     """
     # 1. 쿠키에서 세션 확인
     session_id = session
@@ -42,16 +62,15 @@ def get_current_user(
         )
 
     # 세션 검증
-    db_session = SessionService.get_session(db, session_id)
-    if not db_session:
+    user_id = _get_session_user_id(db, session_id)
+    if user_id is None:
         raise UnauthorizedException(
             message="유효하지 않은 세션입니다.",
             details="세션이 만료되었거나 유효하지 않습니다."
         )
 
     # 사용자 조회
-    user = AuthService.get_user_by_id(db, db_session.user_id)
-    return user
+    return _get_user(db, user_id)
 
 
 def get_current_user_optional(
@@ -59,7 +78,7 @@ def get_current_user_optional(
     session: Optional[str] = Cookie(None),
     authorization: Optional[str] = Header(None),
     db: DBSession = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[CachedUser]:
     """
     현재 사용자 조회 (선택적) - 인증되지 않아도 None 반환
     쿠키 또는 Authorization 헤더 지원
@@ -76,12 +95,11 @@ def get_current_user_optional(
         return None
 
     try:
-        db_session = SessionService.get_session(db, session_id)
-        if not db_session:
+        user_id = _get_session_user_id(db, session_id)
+        if user_id is None:
             return None
 
-        user = AuthService.get_user_by_id(db, db_session.user_id)
-        return user
+        return _get_user(db, user_id)
     except:
         return None
 
@@ -98,23 +116,23 @@ def get_session_id(
 def get_admin_token(
     admin_token: Optional[str] = Cookie(None),
     db: DBSession = Depends(get_db)
-) -> AdminToken:
-    """관리자 토큰 쿠키 검증"""
+) -> CachedAdminToken:
+    """관리자 토큰 쿠키 검증 (credential_cache_service 캐시 우선)"""
     if not admin_token:
         raise UnauthorizedException(
             message="관리자 인증이 필요합니다.",
             details="쿠키에 관리자 토큰이 없습니다."
         )
-    if not AdminTokenService.verify_token(db, admin_token):
+    record = credential_cache_service.get_admin_token(db)
+    if not record:
         raise UnauthorizedException(
             message="관리자 토큰이 유효하지 않습니다.",
-            details="토큰이 만료되었거나 일치하지 않습니다."
+            details="토큰을 찾을 수 없습니다."
         )
-    record = AdminTokenService.get_record(db)
-    if not record:
+    if not record.verify(admin_token):
         raise UnauthorizedException(
             message="관리자 토큰이 유효하지 않습니다.",
-            details="토큰을 찾을 수 없습니다."
+            details="토큰이 만료되었거나 일치하지 않습니다."
         )
     return record
 
@@ -122,20 +140,20 @@ def get_admin_token(
 def get_console_token(
     console_token: Optional[str] = Cookie(None),
     db: DBSession = Depends(get_db)
-) -> ApiAccessToken:
-    """콘솔 토큰 쿠키 검증"""
+) -> CachedConsoleToken:
+    """콘솔 토큰 쿠키 검증 (credential_cache_service 캐시 우선)"""
     if not console_token:
         raise UnauthorizedException(
             message="콘솔 인증이 필요합니다.",
             details="쿠키에 콘솔 토큰이 없습니다."
         )
-    record = ConsoleTokenService.get_by_access_token(db, console_token)
+    record = credential_cache_service.get_console_token(console_token, db)
     if not record:
         raise UnauthorizedException(
             message="유효하지 않은 콘솔 토큰입니다.",
             details="토큰이 만료되었거나 존재하지 않습니다."
         )
-    if record.expires_at and record.expires_at <= datetime.utcnow():
+    if record.is_expired():
         raise UnauthorizedException(
             message="콘솔 토큰이 만료되었습니다.",
             details="관리자에게 문의해주세요."
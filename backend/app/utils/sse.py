@@ -0,0 +1,45 @@
+"""
+Server-Sent Events 유틸리티 - AI 서버 스트리밍 응답 파싱/재전송
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(data: Any, event: str = None) -> str:
+    """SSE 이벤트 한 건 (dict는 JSON 직렬화)"""
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {payload}\n\n"
+
+
+async def iter_sse_events(response: httpx.Response) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    httpx 스트리밍 응답에서 (event, data) 순회
+    - event가 없으면 "message", data는 JSON이면 파싱 결과 아니면 원문
+    """
+    event = "message"
+    data_lines: list[str] = []
+    async for line in response.aiter_lines():
+        if not line:
+            if data_lines:
+                raw = "\n".join(data_lines)
+                try:
+                    data = json.loads(raw)
+                except ValueError:
+                    data = raw
+                yield event, data
+            event, data_lines = "message", []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "event":
+            event = value
+        elif field == "data":
+            data_lines.append(value)
@@ -0,0 +1,42 @@
+"""
+pytest 공통 fixture
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def fake_redis():
+    """Lua 스크립트까지 지원하는 메모리 Redis (fakeredis[lua] 미설치 시 skip)"""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    yield client
+    client.flushall()
+
+
+@pytest.fixture
+def sqlite_sessionmaker():
+    """
+    주어진 테이블만 만든 SQLite 메모리 DB의 sessionmaker를 돌려주는 함수
+    (연결 하나를 스레드 간 공유 → 백그라운드 스레드에서도 같은 DB)
+    """
+    engines = []
+
+    def make(tables) -> sessionmaker:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        tables[0].metadata.create_all(engine, tables=tables)
+        engines.append(engine)
+        return sessionmaker(bind=engine, autoflush=False)
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture
+def other_worker(cache):
+    """다른 워커처럼 로컬 LRU를 비워 Redis에서 읽게 하는 함수 (cache: 테스트 모듈의 캐시 서비스 fixture)"""
+    return cache._local.clear
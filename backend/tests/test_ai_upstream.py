@@ -0,0 +1,206 @@
+"""
+AI 업스트림 클라이언트 테스트 (httpx.MockTransport로 replica 응답 흉내, 네트워크 없음)
+
+실행:
+    cd backend && pytest tests/test_ai_upstream.py -v
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.ai_upstream import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    AIUpstreamClient,
+    AIUpstreamUnavailable,
+)
+
+A = "http://ai-a:5000"
+B = "http://ai-b:5000"
+
+
+class FakeReplicas:
+    """replica URL → 응답 함수 (호출 기록)"""
+
+    def __init__(self, handlers: dict):
+        self.handlers = handlers
+        self.calls = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        base = f"{request.url.scheme}://{request.url.host}:{request.url.port}"
+        self.calls.append(base)
+        result = self.handlers[base](request)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _client(handlers: dict, **kwargs) -> tuple:
+    replicas = FakeReplicas(handlers)
+    options = {"max_retries": 2, "breaker_failures": 2, "breaker_cooldown": 30.0}
+    options.update(kwargs)
+    client = AIUpstreamClient(list(handlers), transport=httpx.MockTransport(replicas), **options)
+    return client, replicas
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    async def _no_wait(self, attempt):
+        return None
+
+    monkeypatch.setattr(AIUpstreamClient, "_backoff", _no_wait)
+
+
+def _ok(request):
+    return httpx.Response(200, json={"ok": True})
+
+
+def _fail(status_code):
+    return lambda request: httpx.Response(status_code)
+
+
+def _raise(error_cls):
+    return lambda request: error_cls("boom", request=request)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        client, replicas = _client({A: _fail(500)})
+
+        async def run():
+            for _ in range(2):
+                response = await client.request("POST", "/api/v1/generate")
+                assert response.status_code == 500
+            with pytest.raises(AIUpstreamUnavailable):
+                await client.request("POST", "/api/v1/generate")
+
+        asyncio.run(run())
+        assert client.replicas[0].circuit == CIRCUIT_OPEN
+        assert len(replicas.calls) == 2
+
+    def test_half_open_allows_single_trial_then_closes(self):
+        client, _ = _client({A: _ok})
+        replica = client.replicas[0]
+        client._record_failure(replica)
+        client._record_failure(replica)
+        assert replica.circuit == CIRCUIT_OPEN
+
+        # cooldown 경과
+        replica.opened_at -= client.breaker_cooldown
+        picked = client.pick()
+        assert picked is replica and replica.circuit == CIRCUIT_HALF_OPEN
+        # 시험 요청이 진행 중이면 다른 요청은 받지 않음
+        with pytest.raises(AIUpstreamUnavailable):
+            client.pick()
+
+        client._record_success(replica)
+        assert replica.circuit == CIRCUIT_CLOSED
+        assert not replica.trial_in_flight
+
+    def test_failed_trial_reopens(self):
+        client, _ = _client({A: _fail(500)})
+        replica = client.replicas[0]
+        client._record_failure(replica)
+        client._record_failure(replica)
+        replica.opened_at -= client.breaker_cooldown
+
+        response = asyncio.run(client.request("POST", "/api/v1/generate"))
+        assert response.status_code == 500
+        assert replica.circuit == CIRCUIT_OPEN
+        assert not replica.trial_in_flight
+
+    def test_cancelled_trial_does_not_block_next_trial(self):
+        class SlowTransport(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request):
+                await asyncio.sleep(10)
+
+        client = AIUpstreamClient([A], transport=SlowTransport(), breaker_failures=1)
+        replica = client.replicas[0]
+        client._record_failure(replica)
+        replica.opened_at -= client.breaker_cooldown
+
+        async def run():
+            task = asyncio.create_task(client.request("GET", "/health"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        assert not replica.trial_in_flight
+        assert client.pick() is replica
+
+    def test_503_does_not_trip_breaker(self):
+        client, _ = _client({A: _fail(503)})
+        for _ in range(3):
+            asyncio.run(client.request("POST", "/api/v1/generate"))
+        assert client.replicas[0].circuit == CIRCUIT_CLOSED
+
+
+class TestRetries:
+    def test_5xx_retried_only_when_idempotent(self):
+        client, replicas = _client({A: _fail(503), B: _ok})
+        client.replicas[1].outstanding = 1  # 첫 시도는 A로
+
+        response = asyncio.run(client.request("POST", "/api/v1/generate"))
+        assert response.status_code == 503
+        assert replicas.calls == [A]
+
+        replicas.calls.clear()
+        response = asyncio.run(client.request("GET", "/api/v1/themes", idempotent=True))
+        assert response.status_code == 200
+        assert replicas.calls == [A, B]
+
+    def test_timeout_retried_only_when_idempotent(self):
+        client, replicas = _client({A: _raise(httpx.ReadTimeout), B: _ok})
+        client.replicas[1].outstanding = 1
+
+        with pytest.raises(httpx.ReadTimeout):
+            asyncio.run(client.request("POST", "/api/v1/generate"))
+        assert replicas.calls == [A]
+
+        replicas.calls.clear()
+        response = asyncio.run(client.request("GET", "/api/v1/themes", idempotent=True))
+        assert response.status_code == 200
+        assert replicas.calls == [A, B]
+
+    def test_connect_errors_always_retried(self):
+        client, replicas = _client({A: _raise(httpx.ConnectError), B: _ok})
+        client.replicas[1].outstanding = 1
+
+        response = asyncio.run(client.request("POST", "/api/v1/generate"))
+        assert response.status_code == 200
+        assert replicas.calls == [A, B]
+
+    def test_retries_are_bounded(self):
+        client, replicas = _client({A: _raise(httpx.ConnectError)}, breaker_failures=10)
+        with pytest.raises(httpx.ConnectError):
+            asyncio.run(client.request("POST", "/api/v1/generate"))
+        assert len(replicas.calls) == 1 + client.max_retries
+
+
+class TestRouting:
+    def test_least_outstanding_replica_is_picked(self):
+        client, _ = _client({A: _ok, B: _ok})
+        client.replicas[0].outstanding = 3
+        assert all(client.pick().url == B for _ in range(10))
+
+    def test_unhealthy_replica_is_skipped(self):
+        client, _ = _client({A: _ok, B: _ok})
+        client.replicas[1].healthy = False
+        assert all(client.pick().url == A for _ in range(10))
+
+    def test_stream_holds_slot_until_closed(self):
+        client, _ = _client({A: _ok})
+        replica = client.replicas[0]
+
+        async def run():
+            response = await client.send_stream("/api/v1/generate/stream")
+            assert replica.outstanding == 1
+            await client.close(response)
+            await client.close(response)
+            assert replica.outstanding == 0
+
+        asyncio.run(run())
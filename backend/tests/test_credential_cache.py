@@ -0,0 +1,201 @@
+"""
+API 키 / 콘솔 토큰 / 관리자 토큰 캐시 테스트 (DB는 SQLite 메모리, Redis는 fakeredis)
+
+실행:
+    cd backend && pytest tests/test_credential_cache.py -v
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.admin import AdminToken
+from app.models.api_usage import CukApiKey
+from app.models.console import ApiAccessToken
+from app.services import credential_cache_service as credentials
+from app.utils.token_utils import hash_token
+
+RAW_KEY = "cuk-test-key-0001"
+RAW_CONSOLE = "console-access-token"
+RAW_ADMIN = "admin-raw-token"
+
+
+@pytest.fixture
+def db_factory(sqlite_sessionmaker):
+    return sqlite_sessionmaker([ApiAccessToken.__table__, CukApiKey.__table__, AdminToken.__table__])
+
+
+@pytest.fixture
+def db(db_factory):
+    session = db_factory()
+    session.add(ApiAccessToken(id=1, api_key=RAW_KEY, access_token=RAW_CONSOLE, token_name="콘솔"))
+    session.add(CukApiKey(
+        id=10, console_token_id=1, api_key=RAW_KEY, status="active",
+        rpm_limit=60, tpm_limit=1000, rpd_limit=500,
+    ))
+    session.add(AdminToken(
+        id=1, admin_id="admin", admin_token=hash_token(RAW_ADMIN),
+        expires_at=datetime.utcnow() + timedelta(hours=1),
+    ))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def cache(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "CREDENTIAL_CACHE_ENABLED", True)
+    monkeypatch.setattr(credentials, "get_redis", lambda: fake_redis)
+    credentials._local.clear()
+    yield credentials
+    credentials._local.clear()
+
+
+def _api_key_row(db) -> CukApiKey:
+    return db.query(CukApiKey).filter(CukApiKey.id == 10).one()
+
+
+class TestApiKey:
+    def test_lookup_is_cached_until_invalidated(self, db, other_worker):
+        first = credentials.get_api_key(RAW_KEY, db)
+        assert first.id == 10 and first.is_active()
+        assert (first.rpm_limit, first.tpm_limit, first.rpd_limit) == (60, 1000, 500)
+
+        # 폐기만 하고 무효화하지 않으면 캐시 값 유지 (LRU, Redis 모두)
+        _api_key_row(db).revoked_at = datetime.utcnow()
+        _api_key_row(db).status = "revoked"
+        db.commit()
+        assert credentials.get_api_key(RAW_KEY, db).is_active()
+        other_worker()
+        assert credentials.get_api_key(RAW_KEY, db).is_active()
+
+        credentials.invalidate_api_key(RAW_KEY)
+        revoked = credentials.get_api_key(RAW_KEY, db)
+        assert revoked.revoked and not revoked.is_active()
+
+    def test_expired_key_is_inactive(self, db):
+        _api_key_row(db).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+        assert not credentials.get_api_key(RAW_KEY, db).is_active()
+
+    def test_raw_key_is_not_stored_in_redis(self, db, fake_redis):
+        credentials.get_api_key(RAW_KEY, db)
+        keys = fake_redis.keys("*")
+        assert keys and all(RAW_KEY not in key and RAW_KEY not in fake_redis.get(key) for key in keys)
+
+    def test_unknown_key_is_negatively_cached_until_expiry(self, db, monkeypatch, other_worker):
+        monkeypatch.setattr(settings, "CREDENTIAL_CACHE_NEGATIVE_TTL_SECONDS", 1)
+        monkeypatch.setattr(credentials._local, "ttl", 0.05)
+
+        assert credentials.get_api_key("cuk-new-key", db) is None
+        db.add(CukApiKey(id=11, console_token_id=1, api_key="cuk-new-key", status="active",
+                         rpm_limit=1, tpm_limit=1, rpd_limit=1))
+        db.commit()
+        # 음수 캐시가 살아 있는 동안은 DB를 보지 않음
+        assert credentials.get_api_key("cuk-new-key", db) is None
+        other_worker()
+        assert credentials.get_api_key("cuk-new-key", db) is None
+
+        time.sleep(1.1)
+        assert credentials.get_api_key("cuk-new-key", db).id == 11
+
+    def test_issuing_a_key_clears_its_negative_entry(self, db):
+        assert credentials.get_api_key("cuk-new-key", db) is None
+        db.add(CukApiKey(id=11, console_token_id=1, api_key="cuk-new-key", status="active",
+                         rpm_limit=1, tpm_limit=1, rpd_limit=1))
+        db.commit()
+        credentials.invalidate_api_key("cuk-new-key")
+        assert credentials.get_api_key("cuk-new-key", db).id == 11
+
+    def test_redis_down_falls_back_to_db(self, db, monkeypatch):
+        def broken():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(credentials, "get_redis", broken)
+        assert credentials.get_api_key(RAW_KEY, db).id == 10
+        credentials.invalidate_api_key(RAW_KEY)
+        assert credentials.get_api_key(RAW_KEY, db).id == 10
+
+
+class TestConsoleToken:
+    def test_preview_only_and_invalidation(self, db, other_worker):
+        token = credentials.get_console_token(RAW_CONSOLE, db)
+        assert token.id == 1 and not token.is_expired()
+        assert token.key_preview == f"{RAW_KEY[:6]}...{RAW_KEY[-4:]}"
+
+        db.query(ApiAccessToken).delete()
+        db.commit()
+        other_worker()
+        assert credentials.get_console_token(RAW_CONSOLE, db) is not None
+        credentials.invalidate_console_token(RAW_CONSOLE)
+        assert credentials.get_console_token(RAW_CONSOLE, db) is None
+
+    def test_legacy_api_key_resolves_console_token(self, db, db_factory, monkeypatch):
+        from app.services.metrics_service import _resolve_console_token_id
+
+        monkeypatch.setattr(credentials, "SessionLocal", db_factory)
+        assert _resolve_console_token_id(RAW_KEY) == 1
+        assert _resolve_console_token_id("ck_unknown") is None
+
+        # cuk_api_keys에 없고 api_access_tokens.api_key에만 있는 키 (admin 폴백 발급)
+        db.query(CukApiKey).delete()
+        db.commit()
+        credentials.invalidate_api_key(RAW_KEY)
+        assert _resolve_console_token_id(RAW_KEY) == 1
+
+        db.query(ApiAccessToken).one().api_key = "ck_rotated"
+        db.commit()
+        credentials.invalidate_console_api_key(RAW_KEY)
+        assert _resolve_console_token_id(RAW_KEY) is None
+        assert _resolve_console_token_id("ck_rotated") == 1
+
+    def test_last_used_updates_are_batched(self, db, db_factory, monkeypatch):
+        monkeypatch.setattr(credentials, "SessionLocal", db_factory)
+        credentials.mark_console_token_used(1)
+        credentials.mark_console_token_used(1)
+        assert credentials.flush_last_used() == 1
+        assert credentials.flush_last_used() == 0
+
+    def test_failed_last_used_flush_is_retried(self, monkeypatch):
+        class BrokenSession:
+            def query(self, *args):
+                raise RuntimeError("db down")
+
+            def rollback(self):
+                pass
+
+            def close(self):
+                pass
+
+        monkeypatch.setattr(credentials, "SessionLocal", BrokenSession)
+        credentials.mark_console_token_used(5)
+        with pytest.raises(RuntimeError):
+            credentials.flush_last_used()
+        assert 5 in credentials._used_console_tokens
+        credentials._used_console_tokens.clear()
+
+
+class TestAdminToken:
+    def test_verify_and_rotation(self, db):
+        cached = credentials.get_admin_token(db)
+        assert cached.verify(RAW_ADMIN)
+        assert not cached.verify("wrong")
+
+        db.query(AdminToken).one().admin_token = hash_token("rotated")
+        db.commit()
+        credentials.invalidate_admin_token()
+        rotated = credentials.get_admin_token(db)
+        assert rotated.verify("rotated") and not rotated.verify(RAW_ADMIN)
+
+    def test_legacy_plaintext_token_is_hashed(self, db):
+        db.query(AdminToken).one().admin_token = "plain-token"
+        db.commit()
+        cached = credentials.get_admin_token(db)
+        assert cached.token_hash == hash_token("plain-token")
+        assert cached.verify("plain-token")
+
+    def test_expired_token_fails_verification(self, db):
+        db.query(AdminToken).one().expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+        assert not credentials.get_admin_token(db).verify(RAW_ADMIN)
@@ -0,0 +1,198 @@
+"""
+public API rate limit 테스트 (GCRA Lua 스크립트는 fakeredis + lupa로 실행)
+
+실행:
+    cd backend && pytest tests/test_rate_limit.py -v
+"""
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services.rate_limit_service import RateLimiter, RateLimitResult, LimitState, format_duration
+
+API_KEY_ID = 7
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+
+
+@pytest.fixture
+def limiter(fake_redis):
+    return RateLimiter(redis_client=fake_redis)
+
+
+class _BrokenRedis:
+    def __init__(self):
+        self.calls = 0
+
+    def register_script(self, script):
+        def run(keys, args):
+            self.calls += 1
+            raise ConnectionError("redis down")
+        return run
+
+
+def _remaining(result: RateLimitResult) -> dict:
+    return {name: state.remaining for name, state in result.limits.items()}
+
+
+class TestGCRA:
+    def test_rpm_allows_up_to_limit_then_denies(self, limiter):
+        results = [limiter.check(API_KEY_ID, rpm=3, tpm=0, rpd=0, tokens=10) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert all(r.backend == "redis" for r in results)
+        assert [r.limits["rpm"].remaining for r in results] == [2, 1, 0, 0]
+        denied = results[-1]
+        assert denied.exceeded.name == "rpm"
+        # 간격 20초 중 경과분만큼 빠짐
+        assert 19_000 < denied.limits["rpm"].retry_after_ms <= 20_000
+
+    def test_denial_charges_no_limit(self, limiter):
+        first = limiter.check(API_KEY_ID, rpm=10, tpm=100, rpd=50, tokens=80)
+        assert first.allowed
+        assert _remaining(first) == {"rpm": 9, "tpm": 20, "rpd": 49}
+
+        # tpm만 초과 → rpm/rpd도 차감되지 않아야 함
+        denied = limiter.check(API_KEY_ID, rpm=10, tpm=100, rpd=50, tokens=80)
+        assert not denied.allowed
+        assert denied.exceeded.name == "tpm"
+        assert denied.limits["rpm"].allowed and denied.limits["rpd"].allowed
+        assert _remaining(denied) == {"rpm": 9, "tpm": 20, "rpd": 49}
+
+        small = limiter.check(API_KEY_ID, rpm=10, tpm=100, rpd=50, tokens=20)
+        assert small.allowed
+        assert _remaining(small) == {"rpm": 8, "tpm": 0, "rpd": 48}
+
+    def test_request_larger_than_tpm_is_denied(self, limiter):
+        result = limiter.check(API_KEY_ID, rpm=10, tpm=100, rpd=50, tokens=150)
+        assert not result.allowed
+        assert result.exceeded.name == "tpm"
+        assert _remaining(result) == {"rpm": 10, "tpm": 100, "rpd": 50}
+
+    def test_keys_are_per_api_key(self, limiter, fake_redis):
+        assert limiter.check(1, rpm=1, tpm=0, rpd=0, tokens=0).allowed
+        assert limiter.check(2, rpm=1, tpm=0, rpd=0, tokens=0).allowed
+        assert not limiter.check(1, rpm=1, tpm=0, rpd=0, tokens=0).allowed
+        assert sorted(fake_redis.keys("ratelimit:*")) == ["ratelimit:1:rpm", "ratelimit:2:rpm"]
+        assert 0 < fake_redis.pttl("ratelimit:1:rpm") <= 61_000
+
+    def test_disabled_or_zero_limits_skip_checks(self, limiter, monkeypatch, fake_redis):
+        assert limiter.check(API_KEY_ID, rpm=0, tpm=0, rpd=0, tokens=10).backend == "disabled"
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        result = limiter.check(API_KEY_ID, rpm=1, tpm=1, rpd=1, tokens=10)
+        assert result.allowed and result.backend == "disabled" and result.headers() == {}
+        assert fake_redis.keys("*") == []
+
+
+class TestLocalFallback:
+    SEQUENCE = [
+        (10, 100, 50, 60),
+        (10, 100, 50, 60),
+        (10, 100, 50, 30),
+        (10, 100, 50, 10),
+        (10, 100, 50, 200),
+        (10, 100, 50, 1),
+    ]
+
+    def test_local_matches_lua_script(self, fake_redis):
+        redis_limiter = RateLimiter(redis_client=fake_redis)
+        local_limiter = RateLimiter(redis_client=_BrokenRedis(), redis_retry_seconds=60)
+
+        for rpm, tpm, rpd, tokens in self.SEQUENCE:
+            remote = redis_limiter.check(API_KEY_ID, rpm, tpm, rpd, tokens)
+            local = local_limiter.check(API_KEY_ID, rpm, tpm, rpd, tokens)
+            assert (remote.backend, local.backend) == ("redis", "local")
+            assert remote.allowed == local.allowed
+            assert _remaining(remote) == _remaining(local)
+            assert {n: s.allowed for n, s in remote.limits.items()} == {n: s.allowed for n, s in local.limits.items()}
+
+    def test_redis_failure_backs_off(self, fake_redis):
+        broken = _BrokenRedis()
+        limiter = RateLimiter(redis_client=broken, redis_retry_seconds=60)
+        assert limiter.check(API_KEY_ID, rpm=1, tpm=0, rpd=0, tokens=0).backend == "local"
+
+        # 재시도 시각 전에는 Redis를 다시 호출하지 않음
+        result = limiter.check(API_KEY_ID, rpm=1, tpm=0, rpd=0, tokens=0)
+        assert result.backend == "local" and not result.allowed
+        assert broken.calls == 1
+
+        limiter._redis_down_until = 0.0
+        limiter._redis, limiter._script = fake_redis, None
+        assert limiter.check(API_KEY_ID, rpm=1, tpm=0, rpd=0, tokens=0).backend == "redis"
+
+
+def _result(allowed=True, requested_tokens=0, **states) -> RateLimitResult:
+    return RateLimitResult(
+        allowed=allowed,
+        backend="redis",
+        limits={name: LimitState(name, *values) for name, values in states.items()},
+        requested_tokens=requested_tokens,
+    )
+
+
+class TestHeaders:
+    def test_format_duration(self):
+        assert [format_duration(ms) for ms in (-5, 20, 999, 1000, 1001, 360_000, 3_723_000)] == [
+            "0ms", "20ms", "999ms", "1s", "2s", "6m0s", "1h2m3s",
+        ]
+
+    def test_allowed_headers(self):
+        result = _result(
+            rpm=(60, True, 59, 1000, 0),
+            tpm=(1000, True, 900, 6000, 0),
+            rpd=(500, True, 499, 172_800, 0),
+        )
+        assert result.headers() == {
+            "x-ratelimit-limit-requests": "60",
+            "x-ratelimit-remaining-requests": "59",
+            "x-ratelimit-reset-requests": "1s",
+            "x-ratelimit-limit-tokens": "1000",
+            "x-ratelimit-remaining-tokens": "900",
+            "x-ratelimit-reset-tokens": "6s",
+            "x-ratelimit-limit-requests-day": "500",
+            "x-ratelimit-remaining-requests-day": "499",
+            "x-ratelimit-reset-requests-day": "2m53s",
+        }
+
+    def test_denied_headers_use_longest_wait(self):
+        result = _result(
+            allowed=False,
+            rpm=(60, False, 0, 60_000, 400),
+            tpm=(1000, False, 0, 60_000, 2500),
+        )
+        headers = result.headers()
+        assert result.exceeded.name == "tpm"
+        assert headers["retry-after"] == "3"
+        assert headers["retry-after-ms"] == "2500"
+
+    def test_retry_after_is_at_least_one_second(self):
+        result = _result(allowed=False, rpm=(60, False, 0, 1000, 1))
+        assert result.headers()["retry-after"] == "1"
+
+
+class TestRateLimitError:
+    @pytest.fixture
+    def rate_limit_error(self):
+        from app.api.public_ai import _rate_limit_error
+        return _rate_limit_error
+
+    def test_rate_limit_reached(self, rate_limit_error):
+        response = rate_limit_error(_result(allowed=False, rpm=(60, False, 0, 60_000, 1500)))
+        body = json.loads(response.body)["error"]
+        assert response.status_code == 429
+        assert body["type"] == "requests" and body["code"] == "rate_limit_exceeded"
+        assert body["message"].startswith("Rate limit reached") and "try again in 2s" in body["message"]
+        assert response.headers["retry-after"] == "2"
+        assert response.headers["x-ratelimit-remaining-requests"] == "0"
+
+    def test_request_too_large(self, rate_limit_error):
+        response = rate_limit_error(_result(
+            allowed=False, requested_tokens=150, tpm=(100, False, 100, 0, 30_000),
+        ))
+        body = json.loads(response.body)["error"]
+        assert body["type"] == "tokens"
+        assert body["message"].startswith("Request too large") and "Requested 150" in body["message"]
@@ -0,0 +1,153 @@
+"""
+세션 → 사용자 캐시 테스트 (Redis는 fakeredis)
+
+실행:
+    cd backend && pytest tests/test_session_cache.py -v
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import session_cache_service
+from app.services.session_cache_service import CachedUser
+from app.utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def cache(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_CACHE_ENABLED", True)
+    monkeypatch.setattr(session_cache_service, "get_redis", lambda: fake_redis)
+    session_cache_service._local.clear()
+    yield session_cache_service
+    session_cache_service._local.clear()
+
+
+def _expires(minutes=30):
+    return datetime.utcnow() + timedelta(minutes=minutes)
+
+
+class TestSessionCache:
+    def test_cached_session_served_from_local_then_redis(self, cache, other_worker):
+        cache.cache_session("sid", 7, _expires())
+        session = cache.get_session("sid")
+        assert session.user_id == 7 and session.is_valid()
+
+        other_worker()
+        assert cache.get_session("sid").user_id == 7
+
+    def test_miss_returns_none(self, cache):
+        assert cache.get_session("unknown") is None
+
+    def test_revoke_makes_next_lookup_invalid_on_every_worker(self, cache, other_worker):
+        cache.cache_session("sid", 7, _expires())
+        cache.revoke_session("sid")
+
+        assert not cache.get_session("sid").is_valid()
+        other_worker()
+        assert not cache.get_session("sid").is_valid()
+
+    def test_db_fill_after_revoke_does_not_resurrect(self, cache, other_worker):
+        # 로그아웃과 동시에 진행 중이던 요청이 DB에서 읽은 세션을 다시 캐싱하려는 경우
+        cache.revoke_session("sid")
+        cache.cache_session("sid", 7, _expires())
+        other_worker()
+        assert not cache.get_session("sid").is_valid()
+
+    def test_expired_session_is_not_cached(self, cache, fake_redis):
+        cache.cache_session("sid", 7, datetime.utcnow() - timedelta(seconds=1))
+        assert cache.get_session("sid") is None
+        assert fake_redis.keys("*") == []
+
+    def test_ttl_capped_by_session_expiry(self, cache, fake_redis):
+        cache.cache_session("sid", 7, _expires(minutes=1))
+        ttl = fake_redis.ttl(session_cache_service._session_key("sid"))
+        assert 0 < ttl <= 60
+
+    def test_disabled_cache_is_bypassed(self, cache, monkeypatch):
+        cache.cache_session("sid", 7, _expires())
+        monkeypatch.setattr(settings, "SESSION_CACHE_ENABLED", False)
+        assert cache.get_session("sid") is None
+
+
+class TestUserCache:
+    def _user(self, nickname="쿠키"):
+        return SimpleNamespace(id=7, email="a@b.c", nickname=nickname, created_at=datetime(2026, 1, 1, 9, 0))
+
+    def test_user_round_trips_through_redis(self, cache, other_worker):
+        cache.cache_user(self._user())
+        other_worker()
+        assert cache.get_user(7) == CachedUser(7, "a@b.c", "쿠키", datetime(2026, 1, 1, 9, 0))
+
+    def test_invalidate_user_makes_next_lookup_miss(self, cache, other_worker):
+        cache.cache_user(self._user())
+        cache.invalidate_user(7)
+        assert cache.get_user(7) is None
+        other_worker()
+        assert cache.get_user(7) is None
+
+    def test_invalidation_reaches_other_workers_via_pubsub(self, cache, fake_redis):
+        stop = threading.Event()
+        listener = threading.Thread(
+            target=cache.listen_for_invalidations,
+            args=(settings.SESSION_CACHE_CHANNEL, stop, 0.01),
+            daemon=True,
+        )
+        listener.start()
+        try:
+            deadline = time.monotonic() + 2
+            while not fake_redis.pubsub_numsub(settings.SESSION_CACHE_CHANNEL)[0][1]:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+            cache.cache_user(self._user())
+            key = session_cache_service._user_key(7)
+            # 다른 워커가 보낸 무효화 메시지
+            fake_redis.publish(settings.SESSION_CACHE_CHANNEL, key)
+            while session_cache_service._local.get(key) is not None:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+        finally:
+            stop.set()
+            listener.join(timeout=10)
+
+
+class TestRedisDown:
+    def test_falls_back_to_local_cache(self, monkeypatch):
+        def broken():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(settings, "SESSION_CACHE_ENABLED", True)
+        monkeypatch.setattr(session_cache_service, "get_redis", broken)
+        session_cache_service._local.clear()
+        try:
+            assert session_cache_service.get_session("sid") is None
+            session_cache_service.cache_session("sid", 7, _expires())
+            assert session_cache_service.get_session("sid") == session_cache_service._local.get(
+                session_cache_service._session_key("sid")
+            )
+            session_cache_service.revoke_session("sid")
+            assert session_cache_service.get_session("sid") is None
+        finally:
+            session_cache_service._local.clear()
+
+
+class TestTTLCache:
+    def test_entries_expire(self):
+        local = TTLCache(maxsize=10, ttl=0.01)
+        local.set("a", 1)
+        assert local.get("a") == 1
+        time.sleep(0.02)
+        assert local.get("a") is None
+
+    def test_least_recently_used_is_evicted(self):
+        local = TTLCache(maxsize=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+        assert local.get("b") is None
+        assert local.get("a") == 1 and local.get("c") == 3
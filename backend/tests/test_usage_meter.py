@@ -0,0 +1,197 @@
+"""
+API 사용량 write-behind 테스트 (DB는 SQLite 메모리, Redis는 fakeredis)
+
+실행:
+    cd backend && pytest tests/test_usage_meter.py -v
+"""
+import json
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.models.api_usage import CukApiUsageDaily, CukApiUsageLog
+from app.services import usage_meter as usage_meter_module
+from app.services.api_usage_service import build_usage_event, write_usage_events
+from app.services.metrics_service import API_USAGE_FLUSHED
+from app.services.usage_meter import UsageMeter
+
+STREAM = "test:api_usage"
+GROUP = "test_writers"
+
+
+@pytest.fixture
+def db_factory(sqlite_sessionmaker):
+    return sqlite_sessionmaker([CukApiUsageLog.__table__, CukApiUsageDaily.__table__])
+
+
+def _event(api_key_id=1, status_code=200, prompt_tokens=10, completion_tokens=5, day="2026-10-01T09:00:00"):
+    return build_usage_event(
+        api_key_id=api_key_id,
+        endpoint="/api/cuk/et/chat/completions",
+        model="Cukee-1.5-it",
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        status_code=status_code,
+        latency_ms=12,
+        ip="127.0.0.1",
+        user_agent="pytest",
+        created_at=datetime.fromisoformat(day),
+    )
+
+
+def _daily(db):
+    return {(row.day.isoformat(), row.api_key_id): row for row in db.query(CukApiUsageDaily).all()}
+
+
+def _dropped() -> float:
+    return API_USAGE_FLUSHED.labels(result="dropped")._value.get()
+
+
+class TestWriteUsageEvents:
+    def test_daily_rollup_sums_per_day_key_and_model(self, db_factory):
+        db = db_factory()
+        events = [
+            _event(prompt_tokens=10, completion_tokens=5),
+            _event(prompt_tokens=20, completion_tokens=1, status_code=429),
+            _event(api_key_id=2),
+            _event(day="2026-10-02T00:00:01"),
+        ]
+        assert write_usage_events(db, events) == 4
+        db.commit()
+
+        daily = _daily(db)
+        first = daily[("2026-10-01", 1)]
+        assert (first.requests, first.errors) == (2, 1)
+        assert (first.prompt_tokens, first.completion_tokens, first.total_tokens) == (30, 6, 36)
+        assert daily[("2026-10-01", 2)].requests == 1
+        assert daily[("2026-10-02", 1)].requests == 1
+
+    def test_later_batches_add_to_existing_daily_rows(self, db_factory):
+        db = db_factory()
+        write_usage_events(db, [_event()])
+        write_usage_events(db, [_event(), _event()])
+        db.commit()
+        row = _daily(db)[("2026-10-01", 1)]
+        assert row.requests == 3
+        assert row.total_tokens == 45
+
+    def test_redelivered_events_are_deduplicated(self, db_factory):
+        db = db_factory()
+        event = _event()
+        assert write_usage_events(db, [event, dict(event)]) == 1
+        db.commit()
+        assert write_usage_events(db, [event]) == 0
+        db.commit()
+        assert db.query(CukApiUsageLog).count() == 1
+        assert _daily(db)[("2026-10-01", 1)].requests == 1
+
+
+@pytest.fixture
+def meter(fake_redis, db_factory, monkeypatch):
+    monkeypatch.setattr(usage_meter_module, "get_redis", lambda: fake_redis)
+    monkeypatch.setattr(usage_meter_module, "SessionLocal", db_factory)
+    meter = UsageMeter(
+        STREAM, GROUP, batch_size=10, flush_interval_ms=20, claim_idle_seconds=0, max_attempts=3,
+        redis_client=fake_redis,
+    )
+    yield meter
+    meter.stop()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+class TestUsageMeter:
+    def test_stream_events_written_then_acked_and_deleted(self, meter, fake_redis, db_factory):
+        for _ in range(3):
+            meter.enqueue(_event())
+        meter.start()
+        _wait_for(lambda: db_factory().query(CukApiUsageLog).count() == 3)
+        _wait_for(lambda: fake_redis.xlen(STREAM) == 0)
+
+    def test_redis_down_buffers_locally_and_writes_directly(self, meter, db_factory, monkeypatch):
+        def broken():
+            raise ConnectionError("redis down")
+
+        monkeypatch.setattr(usage_meter_module, "get_redis", broken)
+        monkeypatch.setattr(meter._redis, "xadd", lambda *args, **kwargs: broken())
+        meter.enqueue(_event())
+        assert len(meter._local) == 1
+
+        meter.start()
+        _wait_for(lambda: db_factory().query(CukApiUsageLog).count() == 1)
+        assert len(meter._local) == 0
+
+    def test_failed_xadd_skips_redis_until_retry(self, meter, fake_redis):
+        class StalledRedis:
+            calls = 0
+
+            def xadd(self, *args, **kwargs):
+                StalledRedis.calls += 1
+                raise TimeoutError("Timeout reading from socket")
+
+        meter._redis = StalledRedis()
+        for _ in range(3):
+            meter.enqueue(_event())
+        # 첫 실패 후 retry 시간 동안은 Redis를 호출하지 않고 바로 메모리 버퍼
+        assert StalledRedis.calls == 1
+        assert len(meter._local) == 3
+
+        meter._redis, meter._redis_down_until = fake_redis, 0.0
+        meter.enqueue(_event())
+        assert fake_redis.xlen(STREAM) == 1
+
+    def test_poison_event_dropped_after_max_attempts_without_blocking_stream(self, meter, db_factory):
+        dropped = _dropped()
+        good = _event()
+        bad = {**_event(), "created_at": "not-a-date"}
+        meter._local.extend([bad, good])
+        meter.start()
+        # 로컬 버퍼의 문제 이벤트와 상관없이 Stream 이벤트도 계속 기록
+        meter.enqueue(_event(api_key_id=2))
+
+        _wait_for(lambda: db_factory().query(CukApiUsageLog).count() == 2)
+        _wait_for(lambda: _dropped() - dropped == 1)
+        meter.stop()
+        assert len(meter._local) == 0
+        assert meter._attempts == {}
+
+    def test_malformed_stream_entry_dropped_and_acked(self, meter, fake_redis, db_factory):
+        dropped = _dropped()
+        fake_redis.xadd(STREAM, {"event": json.dumps({**_event(), "created_at": "not-a-date"})})
+        meter.enqueue(_event())
+        meter.start()
+
+        _wait_for(lambda: fake_redis.xlen(STREAM) == 0)
+        assert db_factory().query(CukApiUsageLog).count() == 1
+        assert _dropped() - dropped == 1
+
+    def test_transient_errors_keep_events_without_counting_attempts(self, meter, monkeypatch):
+        def db_down(events):
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+
+        monkeypatch.setattr(meter, "_write", db_down)
+        event = _event()
+        meter._local.append(event)
+        for _ in range(5):
+            with pytest.raises(OperationalError):
+                meter._flush_local()
+        assert list(meter._local) == [event]
+        assert meter._attempts == {}
+
+    def test_pending_entries_of_dead_consumer_are_reclaimed(self, meter, fake_redis, db_factory):
+        meter.enqueue(_event())
+        meter._ensure_group()
+        # 다른 워커가 읽고 기록 전에 죽은 상황
+        fake_redis.xreadgroup(GROUP, "dead-worker", {STREAM: ">"}, count=10)
+
+        meter.start()
+        _wait_for(lambda: db_factory().query(CukApiUsageLog).count() == 1)
+        _wait_for(lambda: fake_redis.xlen(STREAM) == 0)
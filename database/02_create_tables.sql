@@ -122,10 +122,12 @@ CREATE TABLE movie_embeddings (
     movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
     embedding FLOAT8[768],
     model_name VARCHAR(100),
+    content_hash VARCHAR(64),
     updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
 COMMENT ON COLUMN movie_embeddings.embedding IS '영화 임베딩 벡터 (768차원) - FLOAT8 배열 사용 (PostgreSQL 14에서 pgvector 미지원)';
+COMMENT ON COLUMN movie_embeddings.content_hash IS '임베딩 입력(모델명+제목+장르+줄거리) SHA-256 - 변경된 영화만 재임베딩';
 
 -- ================================================
 -- 9. AiKeywords (AI가 해석한 의미 키워드)
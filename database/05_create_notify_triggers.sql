@@ -0,0 +1,33 @@
+-- ================================================
+-- Cukee Notify Triggers Script
+-- Version: 1.8
+-- ================================================
+
+-- ================================================
+-- AI 서버 벡터 인덱스 / 큐레이션 풀 갱신 알림
+-- movie_embeddings / ticket_group_movies / movies 변경 시 NOTIFY movie_index_changed
+-- (문장 단위 트리거 - 대량 적재도 알림 1건)
+-- ================================================
+CREATE OR REPLACE FUNCTION notify_movie_index_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('movie_index_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS movie_embeddings_notify ON movie_embeddings;
+CREATE TRIGGER movie_embeddings_notify
+AFTER INSERT OR UPDATE OR DELETE ON movie_embeddings
+FOR EACH STATEMENT EXECUTE PROCEDURE notify_movie_index_changed();
+
+DROP TRIGGER IF EXISTS ticket_group_movies_notify ON ticket_group_movies;
+CREATE TRIGGER ticket_group_movies_notify
+AFTER INSERT OR UPDATE OR DELETE ON ticket_group_movies
+FOR EACH STATEMENT EXECUTE PROCEDURE notify_movie_index_changed();
+
+-- 큐레이션 풀의 제목/포스터/등급 메타데이터, 벡터 인덱스의 성인 등급 마스크 갱신용
+DROP TRIGGER IF EXISTS movies_notify ON movies;
+CREATE TRIGGER movies_notify
+AFTER UPDATE OR DELETE ON movies
+FOR EACH STATEMENT EXECUTE PROCEDURE notify_movie_index_changed();
@@ -0,0 +1,22 @@
+-- ================================================
+-- Cukee Persona Details Script
+-- Version: 1.8
+-- ================================================
+
+-- ================================================
+-- MoviePersonaDetails (테마별 영화 소개 사전 생성 결과)
+-- version: 모델 + 프롬프트 + 생성 파라미터 hash (AI 서버 persona_detail_version)
+-- ================================================
+CREATE TABLE IF NOT EXISTS movie_persona_details (
+    movie_id INTEGER NOT NULL REFERENCES movies(id) ON DELETE CASCADE,
+    theme VARCHAR(100) NOT NULL,
+    version VARCHAR(32) NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    detail TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (movie_id, theme, version)
+);
+
+COMMENT ON COLUMN movie_persona_details.version IS '모델/프롬프트 버전 hash - 버전이 바뀌면 기존 행은 조회되지 않음 (pregenerate --prune으로 정리)';
+
+CREATE INDEX IF NOT EXISTS idx_movie_persona_details_theme_version ON movie_persona_details(theme, version);
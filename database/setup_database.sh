@@ -53,6 +53,24 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
+echo ""
+echo "Step 5: Creating notify triggers..."
+psql -U $POSTGRES_USER -d cukee -f "$SCRIPT_DIR/05_create_notify_triggers.sql"
+
+if [ $? -ne 0 ]; then
+    echo "Error: Failed to create notify triggers"
+    exit 1
+fi
+
+echo ""
+echo "Step 6: Creating persona details table..."
+psql -U $POSTGRES_USER -d cukee -f "$SCRIPT_DIR/06_create_persona_details.sql"
+
+if [ $? -ne 0 ]; then
+    echo "Error: Failed to create persona details table"
+    exit 1
+fi
+
 echo ""
 echo "================================================"
 echo "Database setup completed successfully!"